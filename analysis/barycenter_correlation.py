@@ -12,7 +12,6 @@ import ephem
 from datetime import datetime, timedelta
 import pandas as pd
 from typing import Dict, List, Tuple
-import matplotlib.pyplot as plt
 from scipy import stats
 
 class BarycentricAnalyzer:
@@ -27,6 +26,7 @@ class BarycentricAnalyzer:
         'uranus': 1/22869,       # Masa de Urano/Sol
         'neptune': 1/19314       # Masa de Neptuno/Sol
     }
+    SOLAR_RADIUS = 696340e3  # metros
 
     # Eventos solares mayores para análisis
     MAJOR_EVENTS = {
@@ -94,8 +94,7 @@ class BarycentricAnalyzer:
             total_moment += moment
 
         # Convertir a radios solares (R☉)
-        solar_radius = 696340e3  # metros
-        return total_moment / solar_radius
+        return total_moment / self.SOLAR_RADIUS
 
     def analyze_planetary_configuration(self, date: datetime) -> Dict:
         """
@@ -155,6 +154,46 @@ class BarycentricAnalyzer:
 
         return tension * self.barycenter_baseline
 
+    def barycenter_series(self, dates) -> Dict[str, np.ndarray]:
+        """
+        Offset del baricentro e índice de tensión para un array de fechas.
+
+        Mismas fórmulas que calculate_barycenter_offset y
+        calculate_gravitational_tension, con las efemérides vectorizadas
+        de ftrt_efemerides en lugar de una llamada a ephem por día.
+
+        Args:
+            dates: Fechas (datetime64, str, datetime) o días desde J2000
+
+        Returns:
+            Dict con arrays 'barycenter_offset' (R☉) y 'tension_index'
+        """
+        from ftrt_efemerides import EfemeridesVectorizadas, dias_desde_j2000
+
+        days = np.atleast_1d(dias_desde_j2000(dates))
+        ephemeris = EfemeridesVectorizadas(self.MASS_RATIOS)
+        positions = ephemeris.posiciones_heliocentricas(days)
+        longitudes = ephemeris.longitudes_heliocentricas(days)
+
+        total_moment = sum(
+            np.linalg.norm(positions[p], axis=-1) * ephem.meters_per_au * ratio
+            for p, ratio in self.MASS_RATIOS.items()
+        )
+
+        tension = np.zeros(len(days))
+        for p1 in self.MASS_RATIOS:
+            for p2 in self.MASS_RATIOS:
+                if p1 >= p2:
+                    continue
+                angle = np.abs(np.degrees(longitudes[p1] - longitudes[p2]))
+                angle = np.where(angle > 180, 360 - angle, angle)
+                tension += np.sin(np.radians(angle)) * self.MASS_RATIOS[p1] * self.MASS_RATIOS[p2]
+
+        return {
+            'barycenter_offset': total_moment / self.SOLAR_RADIUS,
+            'tension_index': tension * self.barycenter_baseline
+        }
+
     def analyze_event_correlation(self, event_date: datetime, 
                                 window_days: int = 30) -> Dict:
         """
@@ -250,7 +289,12 @@ class BarycentricAnalyzer:
         
         Args:
             event_name: Nombre del evento a visualizar
+
+        Returns:
+            matplotlib.figure.Figure (ver ftrt_figuras.py para el informe por lotes)
         """
+        import matplotlib.pyplot as plt
+
         event = self.MAJOR_EVENTS[event_name]
         analysis = self.analyze_event_correlation(event['date'])
         
@@ -275,7 +319,7 @@ class BarycentricAnalyzer:
         ax2.set_ylabel('Índice de Tensión')
         ax2.legend()
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
 
 if __name__ == "__main__":
@@ -300,8 +344,15 @@ if __name__ == "__main__":
         print(f"Offset Baricentro: {data['analysis']['barycenter_offset']:.2f} R☉")
         print(f"Índice de Tensión: {data['analysis']['tension_index']:.2f}")
         
-    # Generar visualizaciones
-    for event_name in analyzer.MAJOR_EVENTS.keys():
-        fig = analyzer.plot_event_analysis(event_name)
-        plt.savefig(f'analysis/plots/{event_name}_analysis.png')
-        plt.close()
\ No newline at end of file
+    # Generar visualizaciones (en paralelo y solo las que hayan cambiado)
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from ftrt_figuras import TareaFigura, renderizar_figuras
+
+    renderizar_figuras([
+        TareaFigura(f'{event_name}_analysis',
+                    'analysis.barycenter_correlation:BarycentricAnalyzer.plot_event_analysis',
+                    args=(event_name,))
+        for event_name in analyzer.MAJOR_EVENTS
+    ], directorio='analysis/plots')
\ No newline at end of file
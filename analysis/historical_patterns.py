@@ -4,17 +4,20 @@ Autores: Benjamin Cabeza Duran / DeepSeek / GitHub Copilot
 Fecha: Octubre 2025
 """
 
+import os
+import sys
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import ephem
 from scipy import stats
 from scipy.signal import find_peaks
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ftrt_catalogo_eventos import CatalogoEventos
+
 class FTRTHistoricalPatternAnalyzer:
     def __init__(self):
         self.initialize_databases()
@@ -71,6 +74,9 @@ class FTRTHistoricalPatternAnalyzer:
                  'effects': ['Colapso servicios cloud', 'Pérdidas millonarias']}
             ]
         }
+        
+        # Misma información en columnas, con índices por año, id y tipo
+        self.event_catalog = CatalogoEventos.desde_eras(self.historical_events)
     
     def setup_analysis_parameters(self):
         """Configura parámetros para análisis de patrones"""
@@ -111,14 +117,10 @@ class FTRTHistoricalPatternAnalyzer:
     
     def find_events_by_cycle(self, cycle_period):
         """Encuentra eventos asociados a un ciclo específico"""
-        events = []
-        for era in self.historical_events.values():
-            for event in era:
-                # Calcular fase del ciclo para cada evento
-                phase = (event['year'] % cycle_period) / cycle_period
-                if phase > 0.9 or phase < 0.1:  # Eventos cerca del pico
-                    events.append(event)
-        return events
+        # Fase del ciclo para todos los eventos a la vez
+        phase = (self.event_catalog.años % cycle_period) / cycle_period
+        near_peak = np.flatnonzero((phase > 0.9) | (phase < 0.1))  # Eventos cerca del pico
+        return [self.event_catalog.evento(i) for i in near_peak]
     
     def generate_correlation_matrices(self):
         """Genera matrices de correlación entre variables"""
@@ -130,35 +132,42 @@ class FTRTHistoricalPatternAnalyzer:
     
     def prepare_correlation_data(self):
         """Prepara datos para análisis de correlación"""
-        data = {
-            'ftrt': [],
-            'sunspots': [],
-            'geomagnetic': [],
-            'societal': []
-        }
+        ftrt = self.event_catalog.datos['ftrt'].astype(np.float64)
         
         # Convertir eventos históricos a series temporales
-        for era in self.historical_events.values():
-            for event in era:
-                data['ftrt'].append(event['ftrt'])
-                # Simular otros datos (en práctica real, usar datos históricos)
-                data['sunspots'].append(np.random.normal(100, 30))
-                data['geomagnetic'].append(-1 * event['ftrt'] * 100)
-                data['societal'].append(len(event['effects']))
+        data = {
+            'ftrt': ftrt,
+            'ftrt_physical': self.physical_ftrt_by_event(),
+            # Simular otros datos (en práctica real, usar datos históricos)
+            'sunspots': np.random.normal(100, 30, size=len(ftrt)),
+            'geomagnetic': -1 * ftrt * 100,
+            'societal': self.event_catalog.numero_efectos()
+        }
         
         return data
     
+    def physical_ftrt_by_event(self, column='ftrt_normalized'):
+        """
+        Máximo anual de la FTRT física en el año de cada evento del catálogo
+
+        Solo se leen esta columna y los años de los eventos del dataset
+        Parquet (ftrt_dataset.py); sin dataset se calculan con el motor.
+        """
+        from ftrt_dataset import leer_ftrt
+
+        years = self.event_catalog.años
+        series = leer_ftrt([column], años=np.unique(years))
+        annual_max = series.groupby(series['time'].dt.year)[column].max()
+        return annual_max.reindex(years).to_numpy()
+
     def cluster_historical_events(self):
         """Agrupa eventos históricos por características similares"""
-        # Preparar datos para clustering
-        events_data = []
-        for era in self.historical_events.values():
-            for event in era:
-                events_data.append([
-                    event['ftrt'],
-                    event['year'],
-                    len(event['effects'])
-                ])
+        # Preparar datos para clustering (una fila por evento del catálogo)
+        events_data = np.column_stack([
+            self.event_catalog.datos['ftrt'],
+            self.event_catalog.años,
+            self.event_catalog.numero_efectos()
+        ]).astype(np.float64)
         
         # Normalizar datos
         scaler = StandardScaler()
@@ -171,18 +180,16 @@ class FTRTHistoricalPatternAnalyzer:
         # Organizar resultados
         clustered_events = {i: [] for i in range(4)}
         for idx, cluster in enumerate(clusters):
-            era_event = self.find_event_by_data(events_data[idx])
-            clustered_events[cluster].append(era_event)
+            clustered_events[cluster].append(self.event_catalog.evento(idx))
         
         return clustered_events
     
     def find_event_by_data(self, data):
         """Encuentra evento original basado en datos procesados"""
         ftrt, year, _ = data
-        for era in self.historical_events.values():
-            for event in era:
-                if event['year'] == year and abs(event['ftrt'] - ftrt) < 0.01:
-                    return event
+        for row in self.event_catalog.por_año(int(year)):
+            if abs(self.event_catalog.datos['ftrt'][row] - ftrt) < 0.01:
+                return self.event_catalog.evento(row)
         return None
     
     def generate_future_predictions(self):
@@ -214,19 +221,30 @@ class FTRTHistoricalPatternAnalyzer:
                 })
         
         return predictions
-    
+
+    def find_ftrt_events(self, years=10, start=None):
+        """
+        Localiza cruces de umbral y máximos de la FTRT real sin recorrer día a día
+
+        A diferencia de predict_next_events, usa la FTRT física de
+        FTRTCalculator con muestreo grueso y refinamiento de Brent.
+        """
+        from ftrt_eventos import BuscadorEventosFTRT
+
+        start = start or datetime.now()
+        end = start + timedelta(days=365.25 * years)
+        return BuscadorEventosFTRT().buscar_eventos(
+            start, end, ftrt_minima=self.analysis_config['ftrt_threshold']
+        )
+
     def calculate_future_ftrt(self, date):
         """Calcula FTRT para fecha futura"""
         # Implementación simple para demo
+        # Añadir componente cíclica basada en eventos históricos
+        years_diff = np.abs(date.year - self.event_catalog.años)
         base = 1.0
-        for era in self.historical_events.values():
-            for event in era:
-                # Añadir componente cíclica basada en eventos históricos
-                years_diff = abs(date.year - event['year'])
-                if years_diff % 11.2 < 1:  # Cerca de ciclo solar
-                    base += 0.2
-                if years_diff % 19.86 < 1:  # Cerca de ciclo Júpiter-Saturno
-                    base += 0.3
+        base += 0.2 * np.count_nonzero(years_diff % 11.2 < 1)  # Cerca de ciclo solar
+        base += 0.3 * np.count_nonzero(years_diff % 19.86 < 1)  # Cerca de ciclo Júpiter-Saturno
         return base
     
     def calculate_risk_level(self, ftrt):
@@ -242,35 +260,36 @@ class FTRTHistoricalPatternAnalyzer:
     
     def generate_visual_report(self):
         """Genera reporte visual de patrones históricos"""
-        plt.style.use('dark_background')
-        fig = plt.figure(figsize=(20, 15))
-        
-        # Timeline de eventos
-        ax1 = fig.add_subplot(311)
-        self.plot_historical_timeline(ax1)
-        
-        # Patrones cíclicos
-        ax2 = fig.add_subplot(312)
-        self.plot_cyclic_patterns(ax2)
-        
-        # Correlaciones
-        ax3 = fig.add_subplot(313)
-        self.plot_correlation_heatmap(ax3)
-        
-        plt.tight_layout()
+        import matplotlib.pyplot as plt
+
+        # El estilo solo afecta a esta figura
+        with plt.style.context('dark_background'):
+            fig = plt.figure(figsize=(20, 20))
+            
+            # Timeline de eventos
+            ax1 = fig.add_subplot(411)
+            self.plot_historical_timeline(ax1)
+            
+            # FTRT física anual del periodo estudiado
+            ax2 = fig.add_subplot(412)
+            self.plot_annual_rollup(ax2)
+            
+            # Patrones cíclicos
+            ax3 = fig.add_subplot(413)
+            self.plot_cyclic_patterns(ax3)
+            
+            # Correlaciones
+            ax4 = fig.add_subplot(414)
+            self.plot_correlation_heatmap(ax4)
+            
+            fig.tight_layout()
         return fig
     
     def plot_historical_timeline(self, ax):
         """Visualiza timeline de eventos históricos"""
-        years = []
-        ftrts = []
-        labels = []
-        
-        for era in self.historical_events.values():
-            for event in era:
-                years.append(event['year'])
-                ftrts.append(event['ftrt'])
-                labels.append(event['event'])
+        years = self.event_catalog.años
+        ftrts = self.event_catalog.datos['ftrt']
+        labels = self.event_catalog.categorias.decodificar(self.event_catalog.datos['nombre'])
         
         ax.scatter(years, ftrts, c=ftrts, cmap='plasma', s=100)
         
@@ -282,6 +301,23 @@ class FTRTHistoricalPatternAnalyzer:
         ax.set_xlabel('Año')
         ax.set_ylabel('FTRT')
     
+    def plot_annual_rollup(self, ax, start_year=1725, end_year=2025):
+        """Máximo y media anual de la FTRT real (agregados precalculados)"""
+        from ftrt_agregados import PiramideFTRT
+        from ftrt_core import obtener_calculador_compartido
+
+        rollup = PiramideFTRT(obtener_calculador_compartido()).cargar().consultar(
+            'anual', f'{start_year:04d}-01-01', f'{end_year + 1:04d}-01-01'
+        )
+        years = [int(inicio[:4]) for inicio in rollup['inicio']]
+        
+        ax.fill_between(years, rollup['ftrt_min'], rollup['ftrt_max'], alpha=0.3, label='Rango anual')
+        ax.plot(years, rollup['ftrt_media'], label='Media anual')
+        ax.set_title(f'FTRT Anual {start_year}-{end_year}')
+        ax.set_xlabel('Año')
+        ax.set_ylabel('FTRT')
+        ax.legend()
+    
     def plot_cyclic_patterns(self, ax):
         """Visualiza patrones cíclicos identificados"""
         cycles = self.find_cyclic_patterns()
@@ -298,6 +334,8 @@ class FTRTHistoricalPatternAnalyzer:
     
     def plot_correlation_heatmap(self, ax):
         """Visualiza matriz de correlación como heatmap"""
+        import seaborn as sns
+
         corr_matrix = self.generate_correlation_matrices()
         sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', ax=ax)
         ax.set_title('Correlaciones entre Variables')
@@ -329,5 +367,6 @@ if __name__ == "__main__":
             print(f"  {pred['date'].strftime('%Y-%m-%d')}: FTRT {pred['ftrt']:.2f} - {pred['risk_level']}")
     
     # Generar visualizaciones
+    import matplotlib.pyplot as plt
     fig = analyzer.generate_visual_report()
     plt.show()
\ No newline at end of file
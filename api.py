@@ -4,21 +4,62 @@ Autores: Benjamin Cabeza Duran / DeepSeek
 Fecha: Octubre 2025
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, send_file, abort
 from flask_restful import Api, Resource
 from flask_cors import CORS
-from datetime import datetime
+from datetime import datetime, timedelta
+import base64
+import json
+import os
 import traceback
 
-from ftrt_core import FTRTCalculator
+from ftrt_lotes import MAX_FECHAS_LOTE, expandir_consulta_lote, respuesta_columnar
+from ftrt_teselas import ruta_estatica
+from ftrt_admision import AdmisionRechazada
+from ftrt_servicio import obtener_servicio
+from ftrt_ejecucion import ejecutar_cpu
+from ftrt_agregados import MAX_FILAS
+from ftrt_cache_http import etag_ftrt, coincide_if_none_match, cabeceras_cache
 from utils.logger import ftrt_logger
 
 app = Flask(__name__)
 CORS(app)  # Habilitar CORS para todas las rutas
 api = Api(app)
 
-# Crear instancia global del calculador
-calculador = FTRTCalculator()
+# Límites de la predicción por rangos (configurables por entorno)
+app.config['FTRT_MAX_DIAS_PREDICCION'] = int(os.environ.get('FTRT_MAX_DIAS_PREDICCION', 3660))
+app.config['FTRT_TAMANO_PAGINA'] = int(os.environ.get('FTRT_TAMANO_PAGINA', 366))
+app.config['FTRT_MAX_FECHAS_LOTE'] = MAX_FECHAS_LOTE
+
+# Motor compartido con las demás APIs del proceso (ver ftrt_servicio.py);
+# servicio.iniciar() lo arranca run_api.py en cada worker, o __main__
+servicio = obtener_servicio()
+calculador = servicio.calculador
+pronostico = servicio.pronostico
+cache = servicio.cache
+
+# Admisión de endpoints costosos (predicción y lotes); calcular/alerta quedan fuera
+admision = servicio.admision
+
+def admitir(endpoint, coste):
+    """Cuota por cliente y hueco de ejecución; AdmisionRechazada si no hay"""
+    return admision.admitir(request.remote_addr or 'anonimo', endpoint, coste)
+
+def etag_solicitud(*partes):
+    """ETag de una respuesta determinista de la ruta actual"""
+    return etag_ftrt(calculador, request.path, *partes)
+
+def no_modificado(etag):
+    """Respuesta 304 si el cliente ya tiene la versión vigente, si no None"""
+    if coincide_if_none_match(request.headers.get('If-None-Match'), etag):
+        return '', 304, cabeceras_cache(etag)
+    return None
+
+def con_cache(respuesta, etag):
+    """Añade ETag y Cache-Control a una respuesta si es determinista"""
+    if etag:
+        respuesta.headers.update(cabeceras_cache(etag))
+    return respuesta
 
 class HealthCheck(Resource):
     def get(self):
@@ -44,32 +85,28 @@ class FTRTCalculator_API(Resource):
         try:
             # Obtener fecha del query string o usar hoy
             fecha_str = request.args.get('fecha', None)
+            etag = None
             if fecha_str:
                 fecha = datetime.strptime(fecha_str, '%Y-%m-%d')
+                etag = etag_solicitud(fecha.date())
+                respuesta = no_modificado(etag)
+                if respuesta:
+                    return respuesta
             else:
                 fecha = datetime.now()
             
             ftrt_logger.info(f"📊 Solicitud de cálculo FTRT para {fecha.strftime('%Y-%m-%d')}")
             
-            # Calcular FTRT
-            resultado = calculador.calcular_ftrt_total(fecha)
-            
-            # Generar respuesta
+            # Calcular FTRT (o reutilizar el de otro worker o frontend)
             response = {
                 'success': True,
-                'data': {
-                    'fecha': fecha.strftime('%Y-%m-%d'),
-                    'ftrt_normalizada': round(resultado['ftrt_normalizada'], 3),
-                    'ftrt_total': resultado['ftrt_total'],
-                    'contribuciones': {
-                        k: round(v, 2) for k, v in resultado['contribuciones'].items()
-                    },
-                    'metodo': resultado['metodo']
-                },
-                'timestamp': datetime.now().isoformat()
+                'data': servicio.datos_calculo(fecha, fija=etag is not None)
             }
+            if etag is None:
+                # Con ETag fuerte el cuerpo debe ser idéntico byte a byte
+                response['timestamp'] = datetime.now().isoformat()
             
-            return jsonify(response)
+            return con_cache(jsonify(response), etag)
             
         except Exception as e:
             ftrt_logger.error(f"❌ Error en cálculo FTRT: {str(e)}")
@@ -93,36 +130,28 @@ class FTRTAlert_API(Resource):
         try:
             # Obtener fecha
             fecha_str = request.args.get('fecha', None)
+            etag = None
             if fecha_str:
                 fecha = datetime.strptime(fecha_str, '%Y-%m-%d')
+                etag = etag_solicitud(fecha.date())
+                respuesta = no_modificado(etag)
+                if respuesta:
+                    return respuesta
             else:
                 fecha = datetime.now()
             
             ftrt_logger.info(f"⚠️ Solicitud de alerta para {fecha.strftime('%Y-%m-%d')}")
             
-            # Generar alerta
-            alerta = calculador.generar_alerta(fecha)
-            
-            # Generar respuesta
+            # Generar alerta (o reutilizar el cálculo de otro worker o frontend)
             response = {
                 'success': True,
-                'data': {
-                    'fecha': fecha.strftime('%Y-%m-%d'),
-                    'nivel_riesgo': alerta['nivel_riesgo'],
-                    'color_alerta': alerta['color_alerta'],
-                    'ftrt_normalizada': round(alerta['ftrt_normalizada'], 3),
-                    'metodo_calculo': alerta['metodo_calculo']
-                },
-                'timestamp': datetime.now().isoformat()
+                'data': servicio.datos_alerta(fecha, fija=etag is not None)
             }
+            if etag is None:
+                # Con ETag fuerte el cuerpo debe ser idéntico byte a byte
+                response['timestamp'] = datetime.now().isoformat()
             
-            # Añadir contribuciones si están disponibles
-            if 'contribuciones_principales' in alerta:
-                response['data']['contribuciones_principales'] = {
-                    k: round(v, 2) for k, v in alerta['contribuciones_principales'].items()
-                }
-            
-            return jsonify(response)
+            return con_cache(jsonify(response), etag)
             
         except Exception as e:
             ftrt_logger.error(f"❌ Error generando alerta: {str(e)}")
@@ -132,6 +161,24 @@ class FTRTAlert_API(Resource):
                 'traceback': traceback.format_exc()
             }), 500
 
+def codificar_cursor(estado):
+    """Token opaco de paginación (JSON en base64 url-safe)"""
+    return base64.urlsafe_b64encode(json.dumps(estado).encode()).decode().rstrip('=')
+
+def decodificar_cursor(cursor):
+    """Inversa de codificar_cursor; ValueError si el token no es válido"""
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        estado = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return {
+            'fecha_inicio': datetime.fromisoformat(estado['fecha_inicio']),
+            'dias': int(estado['dias']),
+            'offset': int(estado['offset']),
+            'limite': int(estado['limite'])
+        }
+    except Exception:
+        raise ValueError("Cursor de paginación inválido")
+
 class FTRTPrediction_API(Resource):
     def get(self):
         """
@@ -139,61 +186,241 @@ class FTRTPrediction_API(Resource):
         
         Parámetros Query:
         - fecha_inicio: Fecha inicial YYYY-MM-DD
-        - dias: Número de días a predecir (default=30)
+        - dias: Número de días a predecir (default=30, máximo FTRT_MAX_DIAS_PREDICCION)
+        - limite: Días por página (default=FTRT_TAMANO_PAGINA)
+        - cursor: Token 'siguiente_cursor' de la página anterior
         
         Returns:
-            JSON con predicciones diarias
+            JSON con predicciones diarias de la página solicitada
         """
         try:
-            # Obtener parámetros
+            max_dias = app.config['FTRT_MAX_DIAS_PREDICCION']
+            tamano_pagina = app.config['FTRT_TAMANO_PAGINA']
+            
+            # Obtener parámetros (del cursor o de la query)
+            cursor = request.args.get('cursor', None)
             fecha_str = request.args.get('fecha_inicio', None)
-            if fecha_str:
-                fecha_inicio = datetime.strptime(fecha_str, '%Y-%m-%d')
+            if cursor:
+                estado = decodificar_cursor(cursor)
             else:
-                fecha_inicio = datetime.now()
+                if fecha_str:
+                    fecha_inicio = datetime.strptime(fecha_str, '%Y-%m-%d')
+                else:
+                    # Alineada a la hora para leer de la ventana precalculada
+                    fecha_inicio = datetime.now().replace(minute=0, second=0, microsecond=0)
+                estado = {
+                    'fecha_inicio': fecha_inicio,
+                    'dias': int(request.args.get('dias', 30)),
+                    'offset': 0,
+                    'limite': int(request.args.get('limite', tamano_pagina))
+                }
             
-            dias = int(request.args.get('dias', 30))
+            fecha_inicio, dias = estado['fecha_inicio'], estado['dias']
+            offset, limite = estado['offset'], min(estado['limite'], tamano_pagina)
+            if dias < 1 or dias > max_dias:
+                raise ValueError(f"'dias' debe estar entre 1 y {max_dias}")
+            if limite < 1 or offset < 0 or offset >= dias:
+                raise ValueError("Parámetros de paginación fuera de rango")
             
-            ftrt_logger.info(f"🔮 Solicitud de predicción: {dias} días desde {fecha_inicio.strftime('%Y-%m-%d')}")
+            # Con fecha fija (query o cursor) la página no depende del reloj
+            etag = None
+            if cursor or fecha_str:
+                etag = etag_solicitud(fecha_inicio.isoformat(), dias, offset, limite)
+                respuesta = no_modificado(etag)
+                if respuesta:
+                    return respuesta
             
-            # Calcular predicciones
-            predicciones = []
-            for i in range(dias):
-                fecha = fecha_inicio + timedelta(days=i)
-                resultado = calculador.calcular_ftrt_total(fecha)
-                alerta = calculador.generar_alerta(fecha)
-                
-                predicciones.append({
+            ftrt_logger.info(f"🔮 Solicitud de predicción: {dias} días desde {fecha_inicio.strftime('%Y-%m-%d')} (offset {offset})")
+            
+            # Calcular la página en una sola llamada vectorizada
+            fin = min(offset + limite, dias)
+            fechas = [fecha_inicio + timedelta(days=i) for i in range(offset, fin)]
+            with admitir('prediccion', len(fechas)):
+                rango = servicio.rango(fechas)
+            
+            predicciones = [
+                {
                     'fecha': fecha.strftime('%Y-%m-%d'),
-                    'ftrt_normalizada': round(resultado['ftrt_normalizada'], 3),
-                    'nivel_riesgo': alerta['nivel_riesgo'],
-                    'color_alerta': alerta['color_alerta']
+                    'ftrt_normalizada': round(float(ftrt), 3),
+                    'nivel_riesgo': calculador.NIVELES_RIESGO[nivel][0],
+                    'color_alerta': calculador.NIVELES_RIESGO[nivel][1]
+                }
+                for fecha, ftrt, nivel in zip(fechas, rango['ftrt_normalizada'], rango['nivel'])
+            ]
+            
+            siguiente_cursor = None
+            if fin < dias:
+                siguiente_cursor = codificar_cursor({
+                    'fecha_inicio': fecha_inicio.isoformat(),
+                    'dias': dias,
+                    'offset': fin,
+                    'limite': limite
                 })
             
-            return jsonify({
+            metadata = {
+                'fecha_inicio': fecha_inicio.strftime('%Y-%m-%d'),
+                'dias': dias,
+                'offset': offset,
+                'limite': limite,
+                'siguiente_cursor': siguiente_cursor
+            }
+            if etag is None:
+                # Con ETag fuerte el cuerpo debe ser idéntico byte a byte
+                metadata['timestamp'] = datetime.now().isoformat()
+            
+            return {
                 'success': True,
                 'data': predicciones,
-                'metadata': {
-                    'fecha_inicio': fecha_inicio.strftime('%Y-%m-%d'),
-                    'dias': dias,
-                    'timestamp': datetime.now().isoformat()
-                }
-            })
+                'metadata': metadata
+            }, 200, cabeceras_cache(etag) if etag else {}
+            
+        except AdmisionRechazada as e:
+            ftrt_logger.warning(f"⚠️ Predicción rechazada: {e.motivo}")
+            return {
+                'success': False,
+                'error': e.motivo
+            }, 429, {'Retry-After': str(e.reintentar_en)}
+            
+        except ValueError as e:
+            ftrt_logger.warning(f"⚠️ Solicitud de predicción inválida: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }, 400
             
         except Exception as e:
             ftrt_logger.error(f"❌ Error generando predicción: {str(e)}")
-            return jsonify({
+            return {
                 'success': False,
                 'error': str(e),
                 'traceback': traceback.format_exc()
-            }), 500
+            }, 500
+
+class FTRTBatch_API(Resource):
+    def post(self):
+        """
+        Calcula FTRT para muchas fechas y/o rangos en una sola llamada
+        
+        Cuerpo JSON:
+        - fechas: Lista de fechas ISO 8601
+        - rangos: Lista de {inicio, fin, paso_horas (default=24)}
+        
+        Returns:
+            JSON columnar: arrays paralelos de fechas, FTRT, códigos de nivel
+            y contribuciones por planeta
+        """
+        try:
+            consulta = request.get_json(silent=True)
+            fechas = expandir_consulta_lote(consulta, app.config['FTRT_MAX_FECHAS_LOTE'])
+            
+            ftrt_logger.info(f"📦 Solicitud por lotes: {len(fechas)} fechas")
+            
+            with admitir('lote', len(fechas)):
+                columnas = ejecutar_cpu(respuesta_columnar, calculador, fechas)
+            
+            return {
+                'success': True,
+                'data': columnas,
+                'timestamp': datetime.now().isoformat()
+            }
+            
+        except AdmisionRechazada as e:
+            ftrt_logger.warning(f"⚠️ Solicitud por lotes rechazada: {e.motivo}")
+            return {
+                'success': False,
+                'error': e.motivo
+            }, 429, {'Retry-After': str(e.reintentar_en)}
+            
+        except ValueError as e:
+            ftrt_logger.warning(f"⚠️ Solicitud por lotes inválida: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }, 400
+            
+        except Exception as e:
+            ftrt_logger.error(f"❌ Error en cálculo por lotes: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }, 500
+
+class FTRTRollup_API(Resource):
+    def get(self):
+        """
+        FTRT agregada por semana, mes o año (pirámide precalculada)
+        
+        Parámetros Query:
+        - resolucion: diaria, semanal, mensual, anual o auto (default=auto)
+        - inicio, fin: Rango YYYY-MM-DD (default: todo el rango disponible)
+        - max_filas: Límite de filas (default=FTRT_AGREGADOS_MAX_FILAS)
+        
+        Returns:
+            JSON columnar: inicio, dias, ftrt_max, ftrt_media, ftrt_min,
+            fecha_max y dias_por_nivel por fila
+        """
+        try:
+            resolucion = request.args.get('resolucion', 'auto')
+            inicio = request.args.get('inicio', None)
+            fin = request.args.get('fin', None)
+            max_filas = int(request.args.get('max_filas', MAX_FILAS))
+            
+            etag = etag_solicitud(resolucion, inicio, fin, max_filas)
+            respuesta = no_modificado(etag)
+            if respuesta:
+                return respuesta
+            
+            return {
+                'success': True,
+                'data': servicio.agregados(resolucion, inicio, fin, max_filas)
+            }, 200, cabeceras_cache(etag)
+            
+        except ValueError as e:
+            ftrt_logger.warning(f"⚠️ Consulta de agregados inválida: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }, 400
+            
+        except Exception as e:
+            ftrt_logger.error(f"❌ Error consultando agregados: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'traceback': traceback.format_exc()
+            }, 500
+
+class FTRTForecastStatus_API(Resource):
+    def get(self):
+        """Antigüedad y aciertos de la ventana de pronóstico precalculada"""
+        return {
+            'success': True,
+            'data': pronostico.metricas()
+        }
+
+@app.route('/teselas/<archivo>')
+def servir_tesela(archivo):
+    """Teselas anuales precalculadas (ver ftrt_teselas.py) e indice.json"""
+    estatico = ruta_estatica(archivo)
+    if estatico is None:
+        abort(404)
+    ruta, media_type, cabeceras = estatico
+    respuesta = send_file(ruta, mimetype=media_type, conditional=True, etag=True)
+    respuesta.headers.update(cabeceras)
+    return respuesta
 
 # Registrar rutas
 api.add_resource(HealthCheck, '/health')
 api.add_resource(FTRTCalculator_API, '/api/v1/ftrt/calcular')
 api.add_resource(FTRTAlert_API, '/api/v1/ftrt/alerta')
 api.add_resource(FTRTPrediction_API, '/api/v1/ftrt/prediccion')
+api.add_resource(FTRTBatch_API, '/api/v1/ftrt/lote')
+api.add_resource(FTRTRollup_API, '/api/v1/ftrt/agregados')
+api.add_resource(FTRTForecastStatus_API, '/api/v1/ftrt/pronostico/estado')
 
 if __name__ == '__main__':
+    # Servidor de desarrollo; en producción usar run_api.py
     ftrt_logger.info("🚀 Iniciando API FTRT")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    servicio.iniciar()
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1')
\ No newline at end of file
@@ -1,20 +1,56 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+import asyncio
+import json
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from datetime import datetime, timedelta
+from typing import List, Optional
+import numpy as np
 import sys
 import os
 
 # Agregar el directorio raíz al path para importar módulos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from ftrt_core import FTRTCalculator
 from config.global_variables import UMBRALES
+from ftrt_lotes import expandir_consulta_lote, respuesta_columnar
+from ftrt_cache_http import etag_ftrt, coincide_if_none_match, cabeceras_cache
+from ftrt_teselas import ruta_estatica
+from ftrt_admision import AdmisionRechazada, coste_puntos
+from ftrt_servicio import obtener_servicio
+from ftrt_agregados import MAX_FILAS
+from ftrt_formatos import (
+    MEDIA_JSON, formatos_disponibles, negociar_formato, serializar_rango
+)
+
+# Motor compartido con api.py y ftrt_api_corregido.py (ver ftrt_servicio.py):
+# calculador, pronóstico precalculado, difusor de alertas, caché y admisión
+servicio = obtener_servicio()
+calculator = servicio.calculador
+pronostico = servicio.pronostico
+difusor = servicio.difusor
+
+# Admisión de endpoints costosos; /ftrt/actual y el canal en vivo quedan fuera
+admision = servicio.admision
+
+# Las APIs Flask se montan en este mismo proceso (FTRT_MONTAR_FLASK=0 lo evita)
+MONTAR_FLASK = os.environ.get('FTRT_MONTAR_FLASK', '1') == '1'
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    await asyncio.to_thread(servicio.iniciar)
+    difusor.iniciar()
+    yield
+    await difusor.detener()
+    servicio.detener()
 
 app = FastAPI(
     title="FTRT API",
     description="API para predicción de actividad solar basada en configuraciones planetarias",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=ciclo_de_vida
 )
 
 # Configurar CORS
@@ -24,6 +60,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabeceras que el navegador debe dejar leer al JavaScript de otro origen
+    expose_headers=["X-FTRT-Epoca", "X-FTRT-N", "X-FTRT-Columnas", "ETag"],
 )
 
 # Modelos de datos
@@ -43,8 +81,52 @@ class PrediccionPeriodo(BaseModel):
     alertas: list
     valores_diarios: list
 
-# Inicializar calculador FTRT
-calculator = FTRTCalculator()
+class RangoLote(BaseModel):
+    inicio: datetime
+    fin: datetime
+    paso_horas: float = 24
+
+class ConsultaLote(BaseModel):
+    fechas: List[datetime] = []
+    rangos: List[RangoLote] = []
+
+def _negociar(request: Request):
+    """Formato de respuesta según Accept; 406 si ninguno es servible"""
+    formato = negociar_formato(request.headers.get("accept"))
+    if formato is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Formatos disponibles: {', '.join(formatos_disponibles())}"
+        )
+    return formato
+
+@contextmanager
+def _admitir(request: Request, endpoint: str, coste: int):
+    """
+    Control de admisión de ftrt_admision; 429 con Retry-After si se rechaza
+    y 400 si la consulta supera lo que un cliente puede pedir de una vez
+    """
+    cliente = request.client.host if request.client else "anonimo"
+    with ExitStack() as pila:
+        # Solo la admisión se traduce a 400/429; los errores del cuerpo del
+        # endpoint salen tal cual
+        try:
+            pila.enter_context(admision.admitir(cliente, endpoint, coste))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except AdmisionRechazada as e:
+            raise HTTPException(
+                status_code=429,
+                detail=e.motivo,
+                headers={"Retry-After": str(e.reintentar_en)}
+            )
+        yield
+
+def _respuesta_binaria(rango, media_type, precision):
+    niveles = [nombre for nombre, _ in calculator.NIVELES_RIESGO]
+    cuerpo, cabeceras = serializar_rango(rango, media_type, precision, niveles)
+    cabeceras.update(cabeceras_cache(vary="Accept"))
+    return Response(content=cuerpo, media_type=media_type, headers=cabeceras)
 
 @app.get("/")
 async def root():
@@ -82,64 +164,196 @@ async def obtener_ftrt_actual():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/ftrt/prediccion/{dias}", response_model=PrediccionPeriodo)
-async def obtener_prediccion(dias: int):
+def obtener_prediccion(dias: int, request: Request, response: Response):
     if dias < 1 or dias > 90:
         raise HTTPException(
             status_code=400, 
             detail="El período de predicción debe estar entre 1 y 90 días"
         )
+    formato = _negociar(request)
+    response.headers.update(cabeceras_cache(vary="Accept"))
     
-    fecha_inicio = datetime.now()
+    # Alineada a la hora para leer de la ventana de pronóstico precalculada
+    fecha_inicio = datetime.now().replace(minute=0, second=0, microsecond=0)
     fecha_fin = fecha_inicio + timedelta(days=dias)
-    valores_diarios = []
-    alertas = []
-    ftrt_max = 0
-    fecha_max = fecha_inicio
+    fechas = [fecha_inicio + timedelta(days=i) for i in range(dias)]
 
-    try:
-        for i in range(dias):
-            fecha = fecha_inicio + timedelta(days=i)
-            resultado = calculator.calcular_ftrt_total(fecha)
-            ftrt = resultado['ftrt_normalizada']
-            
-            valores_diarios.append({
-                "fecha": fecha,
-                "ftrt": ftrt
-            })
-
-            if ftrt > ftrt_max:
-                ftrt_max = ftrt
-                fecha_max = fecha
+    with _admitir(request, "prediccion", coste_puntos(dias)):
+        try:
+            rango = servicio.rango(fechas)
+            if formato[0] != MEDIA_JSON:
+                return _respuesta_binaria(rango, *formato)
+
+            ftrt = rango['ftrt_normalizada']
+            i_max = int(np.argmax(ftrt))
+            valores_diarios = [
+                {"fecha": fecha, "ftrt": float(valor)} for fecha, valor in zip(fechas, ftrt)
+            ]
 
             # Verificar alertas
-            if ftrt >= UMBRALES['alto']:
-                alertas.append({
-                    "fecha": fecha,
-                    "ftrt": ftrt,
-                    "nivel": "ALTO" if ftrt < UMBRALES['extremo'] else "EXTREMO"
-                })
-
-        return PrediccionPeriodo(
-            fecha_inicio=fecha_inicio,
-            fecha_fin=fecha_fin,
-            ftrt_max=ftrt_max,
-            fecha_max=fecha_max,
-            alertas=alertas,
-            valores_diarios=valores_diarios
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            alertas = [
+                {
+                    "fecha": fechas[i],
+                    "ftrt": float(ftrt[i]),
+                    "nivel": "ALTO" if ftrt[i] < UMBRALES['extremo'] else "EXTREMO"
+                }
+                for i in np.flatnonzero(ftrt >= UMBRALES['alto'])
+            ]
+
+            return PrediccionPeriodo(
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                ftrt_max=float(ftrt[i_max]),
+                fecha_max=fechas[i_max],
+                alertas=alertas,
+                valores_diarios=valores_diarios
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/ftrt/pronostico/estado")
+def estado_pronostico():
+    """Antigüedad y aciertos de la ventana de pronóstico precalculada"""
+    return pronostico.metricas()
+
+@app.get("/ftrt/servicio/estado")
+def estado_servicio():
+    """Modelo, calentamiento, caché y admisión del motor compartido"""
+    return servicio.metricas()
 
 @app.get("/ftrt/historico/{fecha}")
-async def obtener_historico(fecha: str):
+def obtener_historico(fecha: str, request: Request):
     try:
         fecha_dt = datetime.strptime(fecha, "%Y-%m-%d")
-        resultado = calculator.calcular_ftrt_total(fecha_dt)
-        return resultado
     except ValueError:
         raise HTTPException(
             status_code=400, 
             detail="Formato de fecha inválido. Use YYYY-MM-DD"
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+
+    # Resultado determinista: se valida contra If-None-Match antes de calcular
+    etag = etag_ftrt(calculator, request.url.path, fecha_dt.date())
+    if coincide_if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabeceras_cache(etag))
+
+    with _admitir(request, "historico", 1):
+        try:
+            # Mismo resultado que reutilizan las rutas Flask para ese día
+            cuerpo = json.dumps(servicio.resultado_dia(fecha_dt)).encode()
+            return Response(content=cuerpo, media_type="application/json", headers=cabeceras_cache(etag))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/ftrt/agregados/{resolucion}")
+def obtener_agregados(resolucion: str, request: Request, inicio: Optional[str] = None,
+                      fin: Optional[str] = None, max_filas: int = MAX_FILAS):
+    """
+    FTRT máxima/media/mínima y días por nivel agregados por semana, mes o año
+
+    'resolucion' es diaria, semanal, mensual, anual o auto (la más fina que
+    quepa en max_filas). Se responde desde la pirámide precalculada.
+    """
+    etag = etag_ftrt(calculator, request.url.path, inicio, fin, max_filas)
+    if coincide_if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabeceras_cache(etag))
+
+    try:
+        datos = servicio.agregados(resolucion, inicio, fin, max_filas)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content=datos, headers=cabeceras_cache(etag))
+
+@app.post("/ftrt/lote")
+def calcular_lote(consulta: ConsultaLote, request: Request, response: Response):
+    """
+    FTRT para muchas fechas y/o rangos en una sola llamada vectorizada
+
+    Respuesta columnar: arrays paralelos 'fechas', 'ftrt', 'nivel' (códigos
+    de 'niveles') y 'contribuciones' por planeta. Admite los formatos
+    binarios de ftrt_formatos según la cabecera Accept.
+    """
+    formato = _negociar(request)
+    response.headers.update(cabeceras_cache(vary="Accept"))
+    try:
+        fechas = expandir_consulta_lote({
+            'fechas': consulta.fechas,
+            'rangos': [rango.dict() for rango in consulta.rangos]
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with _admitir(request, "lote", len(fechas)):
+        try:
+            if formato[0] != MEDIA_JSON:
+                return _respuesta_binaria(calculator.calcular_ftrt_rango(fechas), *formato)
+            return respuesta_columnar(calculator, fechas)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/teselas/{archivo}")
+def obtener_tesela(archivo: str):
+    """
+    Teselas anuales precalculadas (ver ftrt_teselas.py) e indice.json
+
+    Un proxy o CDN puede servir este prefijo directamente desde disco.
+    """
+    estatico = ruta_estatica(archivo)
+    if estatico is None:
+        raise HTTPException(status_code=404, detail="Tesela no encontrada")
+    ruta, media_type, cabeceras = estatico
+    return FileResponse(ruta, media_type=media_type, headers=cabeceras)
+
+@app.get("/ftrt/stream")
+async def stream_alertas():
+    """
+    Estado FTRT actual por Server-Sent Events
+
+    Un único ciclo de fondo calcula el estado; cada cliente solo recibe
+    el estado inicial y después los cambios (eventos 'estado' y 'delta').
+    """
+    return StreamingResponse(
+        difusor.eventos_sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.websocket("/ftrt/ws")
+async def ws_alertas(websocket: WebSocket):
+    """Mismo canal que /ftrt/stream sobre WebSocket (un mensaje JSON por cambio)"""
+    await websocket.accept()
+    cola = difusor.suscribir()
+    try:
+        while True:
+            await websocket.send_json(await cola.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        difusor.cancelar(cola)
+
+# Rutas de ftrt_api_corregido.py; el resto de rutas Flask son de api.py
+RUTAS_INTERACTIVAS = ('/api/ftrt/', '/api/status')
+
+def _montar_flask():
+    """
+    Sirve las rutas de api.py (/api/v1, /health) y ftrt_api_corregido.py
+    (/api/ftrt, /api/status) desde este proceso y con el mismo servicio
+
+    Se monta al final: las rutas FastAPI tienen prioridad y el resto de
+    peticiones pasan a las aplicaciones WSGI.
+    """
+    try:
+        from a2wsgi import WSGIMiddleware
+    except ImportError:
+        from starlette.middleware.wsgi import WSGIMiddleware
+    import api as api_flask
+    import ftrt_api_corregido
+
+    def aplicaciones_flask(environ, start_response):
+        ruta = environ.get('PATH_INFO', '')
+        destino = ftrt_api_corregido.app if ruta.startswith(RUTAS_INTERACTIVAS) else api_flask.app
+        return destino(environ, start_response)
+
+    app.mount("/", WSGIMiddleware(aplicaciones_flask))
+
+if MONTAR_FLASK:
+    _montar_flask()
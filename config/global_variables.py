@@ -249,3 +249,10 @@ UMBRALES_ALERTA = {
     'elevado': 1.8,
     'critico': 2.5
 }
+
+# Umbrales usados por la API FastAPI (api/main.py), en orden ascendente
+UMBRALES = {
+    'moderado': UMBRALES_ALERTA['moderado'],
+    'alto': UMBRALES_ALERTA['elevado'],
+    'extremo': UMBRALES_ALERTA['critico']
+}
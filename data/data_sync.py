@@ -1,9 +1,29 @@
-from data_sync import SincronizadorDatos
+"""
+Sincronización Diaria de Datos FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
 
-sincronizador = SincronizadorDatos()
+Actualiza la base histórica solo con lo nuevo desde la última ejecución
+(ver ftrt_ingesta.py). Las fuentes se configuran con FTRT_INGESTA_FUENTES
+(JSON) y la base con FTRT_INGESTA_DB.
 
-# Sincronizar con NASA Horizons
-sincronizador.sincronizar_posiciones_planetarias()
+Uso:
+    python data/data_sync.py
+"""
 
-# Sincronizar con datos solares
-sincronizador.sincronizar_datos_solares()
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ftrt_ingesta import SincronizadorDatos
+
+if __name__ == "__main__":
+    sincronizador = SincronizadorDatos()
+
+    # Posiciones planetarias (efemérides locales en lugar de NASA Horizons)
+    sincronizador.sincronizar_posiciones_planetarias()
+
+    # Catálogos solares: fulguraciones, índices geomagnéticos y CMEs
+    for fuente, resultado in sincronizador.sincronizar_datos_solares().items():
+        print(f"{fuente}: {resultado}")
@@ -0,0 +1,203 @@
+"""
+Control de Admisión para Endpoints Costosos de la API FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Tres barreras, en este orden:
+
+1. Cubo de tokens por cliente. Cada petición cuesta el número de puntos
+   que pide calcular (días × 24 / paso_horas), no una unidad fija.
+2. Límite de concurrencia por endpoint, para que las consultas largas no
+   ocupen todos los workers y /ftrt/actual siga respondiendo.
+3. Cola acotada: si el endpoint está saturado y ya hay 'max_cola'
+   peticiones esperando, la nueva se rechaza al instante (load shedding).
+
+Los rechazos lanzan AdmisionRechazada con los segundos de Retry-After;
+las APIs la traducen a HTTP 429.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+CAPACIDAD_CUBO = float(os.environ.get('FTRT_CUBO_CAPACIDAD', 50000))
+RECARGA_CUBO = float(os.environ.get('FTRT_CUBO_RECARGA', 500))
+CONCURRENCIA_ENDPOINT = int(os.environ.get('FTRT_CONCURRENCIA_ENDPOINT', 4))
+MAX_COLA = int(os.environ.get('FTRT_COLA_MAX', 16))
+ESPERA_MAX = float(os.environ.get('FTRT_ESPERA_MAX', 2.0))
+MAX_CLIENTES = 10000
+
+
+class AdmisionRechazada(Exception):
+    """Petición no admitida; reintentar_en son los segundos para Retry-After"""
+
+    def __init__(self, motivo, reintentar_en):
+        super().__init__(motivo)
+        self.motivo = motivo
+        self.reintentar_en = max(1, math.ceil(reintentar_en))
+
+
+def coste_puntos(dias, paso_horas=24):
+    """Coste de una consulta: puntos a calcular (días × resolución)"""
+    return max(1, math.ceil(dias * 24 / paso_horas))
+
+
+class CuboTokens:
+    """Cubo de tokens con recarga continua"""
+
+    def __init__(self, capacidad, recarga_por_segundo, ahora=None):
+        self.capacidad = capacidad
+        self.recarga = recarga_por_segundo
+        self.tokens = capacidad
+        self.actualizado = time.monotonic() if ahora is None else ahora
+
+    def consumir(self, coste, ahora=None):
+        """
+        Descuenta 'coste' si hay tokens suficientes
+
+        Returns:
+            0.0 si se admitió; si no, segundos hasta poder admitirlo
+        """
+        ahora = time.monotonic() if ahora is None else ahora
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self.actualizado) * self.recarga)
+        self.actualizado = ahora
+        if coste <= self.tokens:
+            self.tokens -= coste
+            return 0.0
+        return (coste - self.tokens) / self.recarga
+
+    def devolver(self, coste):
+        """Reintegra 'coste' de una petición cobrada que no llegó a ejecutarse"""
+        self.tokens = min(self.capacidad, self.tokens + coste)
+
+
+class ControlAdmision:
+    """Cubos por cliente, límite de concurrencia y cola acotada por endpoint"""
+
+    def __init__(self, capacidad=CAPACIDAD_CUBO, recarga=RECARGA_CUBO,
+                 concurrencia=CONCURRENCIA_ENDPOINT, max_cola=MAX_COLA,
+                 espera_max=ESPERA_MAX, limites=None):
+        """
+        Args:
+            capacidad (float): Puntos que un cliente puede pedir de golpe
+            recarga (float): Puntos por segundo que recupera cada cliente
+            concurrencia (int): Peticiones simultáneas por endpoint (default)
+            max_cola (int): Peticiones que pueden esperar turno por endpoint
+            espera_max (float): Segundos máximos de espera en la cola
+            limites (dict): Concurrencia específica por endpoint
+        """
+        self.capacidad = capacidad
+        self.recarga = recarga
+        self.concurrencia = concurrencia
+        self.max_cola = max_cola
+        self.espera_max = espera_max
+        self.limites = dict(limites or {})
+        self._cubos = {}
+        self._semaforos = {}
+        self._esperando = {}
+        self._bloqueo = threading.Lock()
+        self.admitidas = 0
+        self.rechazadas = {'cuota': 0, 'cola_llena': 0, 'espera': 0}
+
+    def _cobrar(self, cliente, coste):
+        with self._bloqueo:
+            cubo = self._cubos.get(cliente)
+            if cubo is None:
+                if len(self._cubos) >= MAX_CLIENTES:
+                    self._purgar()
+                cubo = self._cubos[cliente] = CuboTokens(self.capacidad, self.recarga)
+            espera = cubo.consumir(coste)
+        if espera:
+            self.rechazadas['cuota'] += 1
+            raise AdmisionRechazada("Cuota de cálculo agotada para este cliente", espera)
+
+    def _reembolsar(self, cliente, coste):
+        with self._bloqueo:
+            cubo = self._cubos.get(cliente)
+            if cubo is not None:
+                cubo.devolver(coste)
+
+    def _purgar(self):
+        # Los clientes con el cubo lleno no aportan estado: se pueden olvidar
+        ahora = time.monotonic()
+        for cliente, cubo in list(self._cubos.items()):
+            if cubo.tokens + (ahora - cubo.actualizado) * cubo.recarga >= cubo.capacidad:
+                del self._cubos[cliente]
+
+    def _semaforo(self, endpoint):
+        with self._bloqueo:
+            if endpoint not in self._semaforos:
+                limite = self.limites.get(endpoint, self.concurrencia)
+                self._semaforos[endpoint] = threading.BoundedSemaphore(limite)
+                self._esperando[endpoint] = 0
+            return self._semaforos[endpoint]
+
+    def _esperar_turno(self, endpoint):
+        """Hueco de ejecución en el endpoint (AdmisionRechazada si no llega)"""
+        semaforo = self._semaforo(endpoint)
+        if not semaforo.acquire(blocking=False):
+            with self._bloqueo:
+                if self._esperando[endpoint] >= self.max_cola:
+                    self.rechazadas['cola_llena'] += 1
+                    raise AdmisionRechazada("Servicio saturado, cola llena", 1)
+                self._esperando[endpoint] += 1
+            try:
+                admitido = semaforo.acquire(timeout=self.espera_max)
+            finally:
+                with self._bloqueo:
+                    self._esperando[endpoint] -= 1
+            if not admitido:
+                self.rechazadas['espera'] += 1
+                raise AdmisionRechazada("Servicio saturado, reintente más tarde", self.espera_max)
+        return semaforo
+
+    @contextmanager
+    def admitir(self, cliente, endpoint, coste):
+        """
+        Contexto que reserva cuota y un hueco de ejecución en el endpoint
+
+        Una petición rechazada por cola llena o espera excesiva no consume
+        cuota: el coste cobrado se devuelve al cubo del cliente.
+
+        Raises:
+            ValueError: El coste supera la capacidad del cubo (nunca se admitiría)
+            AdmisionRechazada: Cuota agotada, cola llena o espera excesiva
+        """
+        if coste > self.capacidad:
+            raise ValueError(
+                f"La consulta ({coste} puntos) supera el máximo por petición ({self.capacidad:g})"
+            )
+        self._cobrar(cliente, coste)
+        try:
+            semaforo = self._esperar_turno(endpoint)
+        except AdmisionRechazada:
+            self._reembolsar(cliente, coste)
+            raise
+
+        self.admitidas += 1
+        try:
+            yield
+        finally:
+            semaforo.release()
+
+    def reiniciar_tras_fork(self):
+        """
+        Sustituye locks y semáforos heredados del maestro por otros nuevos
+
+        Tras el fork (y el parcheo de gevent) los primitivos creados antes
+        no son cooperativos; el worker aún no tiene peticiones en curso.
+        """
+        self._bloqueo = threading.Lock()
+        self._semaforos = {}
+        self._esperando = {}
+
+    def metricas(self):
+        with self._bloqueo:
+            return {
+                'admitidas': self.admitidas,
+                'rechazadas': dict(self.rechazadas),
+                'clientes': len(self._cubos),
+                'esperando': dict(self._esperando)
+            }
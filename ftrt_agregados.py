@@ -0,0 +1,258 @@
+"""
+Agregados FTRT Multirresolución (Pirámide Semanal / Mensual / Anual)
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Precalcula, a partir de la serie diaria, resúmenes por semana (ISO, desde
+el lunes), mes y año: FTRT máxima, media y mínima, fecha del máximo y
+días en cada nivel de riesgo. El nivel anual se construye desde el
+mensual, como en una pirámide de teselas. Una consulta de cualquier
+rango se responde con unos cientos de filas del nivel adecuado, sin
+tocar los datos diarios.
+
+La pirámide se guarda junto a las teselas diarias (ftrt_teselas.py) en un
+.npz cuyo nombre incluye la huella del modelo; si el modelo cambia, el
+archivo antiguo deja de coincidir y se reconstruye.
+
+Uso:
+    python ftrt_agregados.py --desde 1600 --hasta 2400
+"""
+
+import hashlib
+import os
+from datetime import datetime
+
+import numpy as np
+
+from ftrt_teselas import DIRECTORIO_TESELAS
+from utils.logger import ftrt_logger
+
+AÑO_DESDE = int(os.environ.get('FTRT_AGREGADOS_DESDE', 1600))
+AÑO_HASTA = int(os.environ.get('FTRT_AGREGADOS_HASTA', 2400))
+MAX_FILAS = int(os.environ.get('FTRT_AGREGADOS_MAX_FILAS', 500))
+
+# De la más fina a la más gruesa; 'auto' elige la primera que quepa en max_filas
+RESOLUCIONES = ('diaria', 'semanal', 'mensual', 'anual')
+COLUMNAS = ('inicio', 'dias', 'ftrt_max', 'ftrt_media', 'ftrt_min', 'fecha_max', 'dias_por_nivel')
+
+
+def _grupos(claves):
+    """Índices de inicio de cada tramo de claves iguales (claves ordenadas)"""
+    return np.concatenate([[0], np.flatnonzero(np.diff(claves)) + 1])
+
+
+def _agregar(nivel, claves):
+    """
+    Combina las filas de un nivel en tramos de 'claves' iguales
+
+    Args:
+        nivel (dict): Columnas de COLUMNAS del nivel más fino
+        claves (np.ndarray): Grupo de cada fila, no decreciente
+    """
+    inicios = _grupos(claves)
+    dias = np.add.reduceat(nivel['dias'], inicios)
+
+    # Fila con el máximo de cada grupo: orden por (grupo, -ftrt_max), primera de cada uno
+    orden = np.lexsort((-nivel['ftrt_max'], claves))
+    primera = orden[inicios]
+
+    return {
+        'inicio': nivel['inicio'][inicios],
+        'dias': dias,
+        'ftrt_max': nivel['ftrt_max'][primera],
+        'ftrt_media': np.add.reduceat(nivel['ftrt_media'] * nivel['dias'], inicios) / dias,
+        'ftrt_min': np.minimum.reduceat(nivel['ftrt_min'], inicios),
+        'fecha_max': nivel['fecha_max'][primera],
+        'dias_por_nivel': np.add.reduceat(nivel['dias_por_nivel'], inicios, axis=0)
+    }
+
+
+def _nivel_diario(fechas, ftrt, nivel, n_niveles):
+    """Base de la pirámide: una fila por día"""
+    return {
+        'inicio': fechas,
+        'dias': np.ones(len(fechas), dtype=np.int64),
+        'ftrt_max': ftrt,
+        'ftrt_media': ftrt,
+        'ftrt_min': ftrt,
+        'fecha_max': fechas,
+        'dias_por_nivel': np.eye(n_niveles, dtype=np.int32)[nivel]
+    }
+
+
+def construir_piramide(calculador, desde=AÑO_DESDE, hasta=AÑO_HASTA):
+    """
+    Serie diaria [desde, hasta] y sus agregados
+
+    Returns:
+        dict resolución -> columnas (ver COLUMNAS), todas como arrays
+    """
+    fechas = np.arange(np.datetime64(f'{desde:04d}-01-01', 'D'),
+                       np.datetime64(f'{hasta + 1:04d}-01-01', 'D'))
+    rango = calculador.calcular_ftrt_rango(fechas)
+    diaria = _nivel_diario(fechas, rango['ftrt_normalizada'], rango['nivel'],
+                           len(calculador.NIVELES_RIESGO))
+
+    # Semanas ISO: 1970-01-05 fue lunes
+    dias_epoca = fechas.astype(np.int64)
+    semanal = _agregar(diaria, (dias_epoca + 3) // 7)
+    mensual = _agregar(diaria, fechas.astype('datetime64[M]').astype(np.int64))
+    anual = _agregar(mensual, mensual['inicio'].astype('datetime64[Y]').astype(np.int64))
+
+    return {'diaria': diaria, 'semanal': semanal, 'mensual': mensual, 'anual': anual}
+
+
+class PiramideFTRT:
+    """Agregados precalculados con consultas por rango y resolución"""
+
+    def __init__(self, calculador, desde=AÑO_DESDE, hasta=AÑO_HASTA, directorio=DIRECTORIO_TESELAS):
+        """
+        Args:
+            calculador (FTRTCalculator): Modelo
+            desde, hasta (int): Años cubiertos (ambos incluidos)
+            directorio (str): Dónde guardar el .npz ('' o None: solo en memoria)
+        """
+        self.calculador = calculador
+        self.desde = desde
+        self.hasta = hasta
+        self.directorio = directorio
+        self.niveles = [nombre for nombre, _ in calculador.NIVELES_RIESGO]
+        self.huella = calculador.huella_modelo()
+        self.niveles_datos = None
+
+    @property
+    def archivo(self):
+        clave = hashlib.sha1(f'{self.huella}:{self.desde}:{self.hasta}'.encode()).hexdigest()[:12]
+        return f'agregados.{clave}.npz'
+
+    def cargar(self):
+        """Carga el .npz vigente o lo construye (y guarda); devuelve self"""
+        ruta = os.path.join(self.directorio, self.archivo) if self.directorio else None
+        if ruta and os.path.exists(ruta):
+            with np.load(ruta) as datos:
+                self.niveles_datos = {
+                    resolucion: {
+                        columna: self._desde_disco(columna, datos[f'{resolucion}.{columna}'])
+                        for columna in COLUMNAS
+                    }
+                    for resolucion in RESOLUCIONES[1:]
+                }
+                # La base diaria se guarda solo como FTRT y nivel
+                self.niveles_datos['diaria'] = _nivel_diario(
+                    datos['diaria.inicio'].astype('datetime64[D]'), datos['diaria.ftrt'],
+                    datos['diaria.nivel'], len(self.niveles)
+                )
+            return self
+
+        inicio = datetime.now()
+        self.niveles_datos = construir_piramide(self.calculador, self.desde, self.hasta)
+        ftrt_logger.info(
+            f"🔺 Pirámide de agregados FTRT {self.desde}-{self.hasta} construida "
+            f"| ⏱️ {(datetime.now() - inicio).total_seconds():.3f}s"
+        )
+        if ruta:
+            self.guardar(ruta)
+        return self
+
+    @staticmethod
+    def _desde_disco(columna, valores):
+        if columna in ('inicio', 'fecha_max'):
+            return valores.astype('datetime64[D]')
+        return valores
+
+    def guardar(self, ruta):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        arrays = {
+            f'{resolucion}.{columna}': (
+                valores.astype(np.int64) if columna in ('inicio', 'fecha_max') else valores
+            )
+            for resolucion, columnas in self.niveles_datos.items() if resolucion != 'diaria'
+            for columna, valores in columnas.items()
+        }
+        diaria = self.niveles_datos['diaria']
+        arrays['diaria.inicio'] = diaria['inicio'].astype(np.int64)
+        arrays['diaria.ftrt'] = diaria['ftrt_max']
+        arrays['diaria.nivel'] = diaria['dias_por_nivel'].argmax(axis=1).astype(np.uint8)
+        temporal = ruta + '.tmp.npz'
+        np.savez_compressed(temporal, **arrays)
+        os.replace(temporal, ruta)
+
+        # Eliminar pirámides de otros modelos o rangos
+        for nombre in os.listdir(os.path.dirname(ruta)):
+            if nombre.startswith('agregados.') and nombre.endswith('.npz') and nombre != self.archivo:
+                os.remove(os.path.join(os.path.dirname(ruta), nombre))
+
+    def _tramo(self, resolucion, inicio, fin):
+        inicios = self.niveles_datos[resolucion]['inicio']
+        # Incluye la fila que contiene 'inicio' aunque empiece antes
+        i0 = max(int(np.searchsorted(inicios, inicio, side='right')) - 1, 0)
+        i1 = int(np.searchsorted(inicios, fin, side='left'))
+        return i0, max(i1, i0)
+
+    def consultar(self, resolucion='auto', inicio=None, fin=None, max_filas=MAX_FILAS):
+        """
+        Filas agregadas que cubren [inicio, fin)
+
+        Args:
+            resolucion (str): Una de RESOLUCIONES o 'auto'
+            inicio, fin: Fechas (datetime, date, str ISO); default: todo el rango
+            max_filas (int): Límite de filas; con 'auto' se elige la resolución
+                más fina que cabe (o la anual), y una fija que lo supere lanza
+                ValueError
+
+        Returns:
+            dict columnar serializable a JSON
+        """
+        if self.niveles_datos is None:
+            self.cargar()
+        if resolucion != 'auto' and resolucion not in RESOLUCIONES:
+            raise ValueError(f"Resolución desconocida: {resolucion} (use {', '.join(RESOLUCIONES)} o auto)")
+
+        diaria = self.niveles_datos['diaria']['inicio']
+        inicio = np.datetime64(inicio, 'D') if inicio is not None else diaria[0]
+        fin = np.datetime64(fin, 'D') if fin is not None else diaria[-1] + 1
+        if fin <= inicio:
+            raise ValueError("'fin' debe ser posterior a 'inicio'")
+        if inicio > diaria[-1] or fin <= diaria[0]:
+            raise ValueError(f"Rango fuera de los agregados ({self.desde}-{self.hasta})")
+
+        # Con 'auto' la resolución anual se acepta siempre (es la más gruesa)
+        candidatas = RESOLUCIONES if resolucion == 'auto' else (resolucion,)
+        for candidata in candidatas:
+            i0, i1 = self._tramo(candidata, inicio, fin)
+            if i1 - i0 <= max_filas or (resolucion == 'auto' and candidata == RESOLUCIONES[-1]):
+                break
+        else:
+            raise ValueError(
+                f"La consulta devuelve {i1 - i0} filas con resolución {candidata} "
+                f"(máximo {max_filas}); use una resolución mayor o 'auto'"
+            )
+
+        filas = {columna: valores[i0:i1] for columna, valores in self.niveles_datos[candidata].items()}
+        return {
+            'resolucion': candidata,
+            'huella_modelo': self.huella,
+            'niveles': self.niveles,
+            'n': i1 - i0,
+            'inicio': [str(d) for d in filas['inicio']],
+            'dias': filas['dias'].tolist(),
+            'ftrt_max': np.round(filas['ftrt_max'], 6).tolist(),
+            'ftrt_media': np.round(filas['ftrt_media'], 6).tolist(),
+            'ftrt_min': np.round(filas['ftrt_min'], 6).tolist(),
+            'fecha_max': [str(d) for d in filas['fecha_max']],
+            'dias_por_nivel': filas['dias_por_nivel'].tolist()
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    from ftrt_core import FTRTCalculator
+
+    parser = argparse.ArgumentParser(description="Precalcula la pirámide de agregados FTRT")
+    parser.add_argument('--desde', type=int, default=AÑO_DESDE)
+    parser.add_argument('--hasta', type=int, default=AÑO_HASTA)
+    parser.add_argument('--directorio', default=DIRECTORIO_TESELAS)
+    args = parser.parse_args()
+
+    piramide = PiramideFTRT(FTRTCalculator(), args.desde, args.hasta, args.directorio).cargar()
+    print(f"✅ Agregados {args.desde}-{args.hasta} → {os.path.join(args.directorio, piramide.archivo)}")
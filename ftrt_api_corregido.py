@@ -7,19 +7,20 @@ Fecha: Octubre 2025
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 import ephem
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
 import argparse
 
+from ftrt_servicio import obtener_servicio
+
 app = Flask(__name__)
 CORS(app)
 
 class FTRTInteractiveSystem:
-    def __init__(self):
+    def __init__(self, servicio=None):
+        # Mismo motor (modelo, caché y calentamiento) que api.py y api/main.py
+        self.servicio = servicio or obtener_servicio()
+        self.calculator = self.servicio.calculador
         self.initialize_system()
         
     def initialize_system(self):
@@ -29,25 +30,18 @@ class FTRTInteractiveSystem:
         self.initialize_visualization_engine()
     
     def load_constants(self):
-        """Carga constantes del sistema"""
-        self.R_SOL = 6.957e8  # Radio solar en metros
-        self.PLANETARY_MASSES = {
-            'mercury': 3.3011e23,
-            'venus': 4.8675e24,
-            'earth': 5.9722e24,
-            'mars': 6.4171e23,
-            'jupiter': 1.8982e27,
-            'saturn': 5.6834e26,
-            'uranus': 8.6810e25,
-            'neptune': 1.0241e26
-        }
+        """Carga constantes del sistema (las del modelo compartido)"""
+        self.R_SOL = self.calculator.R_SOL
+        self.PLANETARY_MASSES = self.calculator.MASAS
         
+        # Nombres en el orden de los códigos de NIVELES_RIESGO
+        umbrales = self.calculator.UMBRALES
         self.ALERT_LEVELS = {
-            'normal': {'threshold': 0.8, 'color': '🟢'},
-            'moderate': {'threshold': 1.2, 'color': '🟡'},
-            'elevated': {'threshold': 1.8, 'color': '🟠'},
-            'critical': {'threshold': 2.5, 'color': '🔴'},
-            'extreme': {'threshold': 10.0, 'color': '💜'}
+            'normal': {'threshold': umbrales['normal'], 'color': '🟢'},
+            'moderate': {'threshold': umbrales['moderado'], 'color': '🟡'},
+            'elevated': {'threshold': umbrales['elevado'], 'color': '🟠'},
+            'critical': {'threshold': umbrales['critico'], 'color': '🔴'},
+            'extreme': {'threshold': float('inf'), 'color': '💜'}
         }
     
     def load_historical_data(self):
@@ -85,24 +79,16 @@ class FTRTInteractiveSystem:
         }
     
     def calculate_ftrt(self, date):
-        """Calcula FTRT para una fecha específica"""
-        total_ftrt = 0
-        contributions = {}
-        
-        for planet, mass in self.PLANETARY_MASSES.items():
-            body = getattr(ephem, planet.capitalize())()
-            body.compute(date)
-            distance = body.sun_distance * 149597870700  # AU to meters
-            
-            ftrt = (mass * self.R_SOL) / (distance ** 3)
-            contributions[planet] = ftrt
-            total_ftrt += ftrt
+        """Calcula FTRT para una fecha específica (YYYY-MM-DD o datetime)"""
+        fecha = date if isinstance(date, datetime) else datetime.strptime(date, '%Y-%m-%d')
+        resultado = self.servicio.resultado_dia(fecha)
         
         return {
             'date': date,
-            'ftrt_total': total_ftrt,
-            'ftrt_normalized': total_ftrt / contributions['jupiter'],
-            'contributions': contributions
+            'ftrt_total': resultado['ftrt_total'],
+            'ftrt_normalized': resultado['ftrt_normalizada'],
+            'contributions': resultado['contribuciones'],
+            'method': resultado['metodo']
         }
     
     def generate_report(self, date):
@@ -122,11 +108,9 @@ class FTRTInteractiveSystem:
         return report
     
     def get_alert_level(self, ftrt):
-        """Determina nivel de alerta basado en FTRT"""
-        for level, info in self.ALERT_LEVELS.items():
-            if ftrt <= info['threshold']:
-                return {'level': level, 'color': info['color']}
-        return {'level': 'extreme', 'color': '💜'}
+        """Determina nivel de alerta basado en FTRT (clasificación del modelo)"""
+        level = list(self.ALERT_LEVELS)[int(self.calculator.clasificar_riesgo(ftrt))]
+        return {'level': level, 'color': self.ALERT_LEVELS[level]['color']}
     
     def get_planetary_config(self, date):
         """Obtiene configuración planetaria para fecha"""
@@ -172,6 +156,9 @@ class FTRTInteractiveSystem:
         
         return recommendations.get(alert_level['level'], ['Error: Nivel no reconocido'])
 
+# Instancia única: las constantes no cambian entre peticiones
+sistema = FTRTInteractiveSystem()
+
 # API Routes
 @app.route('/api/ftrt/calculate', methods=['POST'])
 def calculate_ftrt_endpoint():
@@ -179,8 +166,7 @@ def calculate_ftrt_endpoint():
     data = request.get_json()
     date = data.get('date', datetime.now().strftime('%Y-%m-%d'))
     
-    system = FTRTInteractiveSystem()
-    result = system.calculate_ftrt(date)
+    result = sistema.calculate_ftrt(date)
     
     return jsonify(result)
 
@@ -190,8 +176,7 @@ def generate_report_endpoint():
     data = request.get_json()
     date = data.get('date', datetime.now().strftime('%Y-%m-%d'))
     
-    system = FTRTInteractiveSystem()
-    report = system.generate_report(date)
+    report = sistema.generate_report(date)
     
     return jsonify(report)
 
@@ -201,6 +186,7 @@ def status():
     return jsonify({
         'status': 'online',
         'version': '2.0.0',
+        'modelo': sistema.calculator.huella_modelo(),
         'timestamp': datetime.now().isoformat()
     })
 
@@ -0,0 +1,119 @@
+"""
+Caché Compartida entre Procesos para Resultados FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Almacén clave-valor sobre un archivo SQLite en modo WAL. Todos los workers
+de gunicorn/uvicorn abren el mismo archivo, de modo que un resultado
+calculado por un worker lo sirven los demás sin recalcular. Cada proceso
+abre su propia conexión de forma perezosa (las conexiones SQLite no deben
+cruzar un fork).
+
+Las claves incluyen la huella del modelo (FTRTCalculator.huella_modelo):
+al cambiar el modelo o los umbrales, las entradas antiguas dejan de
+coincidir y se purgan al arrancar.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+RUTA_CACHE = os.environ.get(
+    'FTRT_CACHE_DB', os.path.join(tempfile.gettempdir(), 'ftrt_cache.sqlite')
+)
+MAX_ENTRADAS = int(os.environ.get('FTRT_CACHE_MAX_ENTRADAS', 200000))
+
+
+class CacheCompartida:
+    """Caché clave -> bytes compartida por todos los procesos de un host"""
+
+    def __init__(self, huella, ruta=RUTA_CACHE, max_entradas=MAX_ENTRADAS):
+        """
+        Args:
+            huella (str): Huella del modelo; separa entradas de versiones distintas
+            ruta (str): Archivo SQLite compartido
+            max_entradas (int): Tamaño máximo antes de descartar las más antiguas
+        """
+        self.huella = huella
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self._local = threading.local()
+        self._pid = None
+        self.aciertos = 0
+        self.fallos = 0
+        self._escrituras = 0
+
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " huella TEXT NOT NULL, clave TEXT NOT NULL, valor BLOB NOT NULL,"
+                " creado REAL NOT NULL, PRIMARY KEY (huella, clave))"
+            )
+            conexion.execute("CREATE INDEX IF NOT EXISTS cache_creado ON cache (creado)")
+            conexion.execute("DELETE FROM cache WHERE huella != ?", (huella,))
+
+    def _conexion(self):
+        # Una conexión por hilo y por proceso: tras un fork se abre otra
+        if self._pid != os.getpid():
+            self._local = threading.local()
+            self._pid = os.getpid()
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=10, isolation_level=None)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def obtener(self, clave):
+        """Valor guardado (bytes) o None"""
+        fila = self._conexion().execute(
+            "SELECT valor FROM cache WHERE huella = ? AND clave = ?", (self.huella, clave)
+        ).fetchone()
+        if fila is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        return fila[0]
+
+    def guardar(self, clave, valor):
+        """Guarda bytes bajo la clave; descarta las entradas más antiguas si sobra"""
+        conexion = self._conexion()
+        conexion.execute(
+            "INSERT OR REPLACE INTO cache (huella, clave, valor, creado) VALUES (?, ?, ?, ?)",
+            (self.huella, clave, sqlite3.Binary(valor), time.time())
+        )
+        self._escrituras += 1
+        if self._escrituras % 1000 == 0:
+            conexion.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache ORDER BY creado DESC"
+                " LIMIT -1 OFFSET ?)", (self.max_entradas,)
+            )
+
+    def obtener_o_calcular(self, clave, calcular):
+        """
+        Devuelve el valor de la clave, calculándolo y guardándolo si falta
+
+        Args:
+            clave (str): Clave determinista (p. ej. el ETag de la respuesta)
+            calcular (callable): Sin argumentos, devuelve bytes
+        """
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def metricas(self):
+        """Aciertos y fallos de este proceso y tamaño total del archivo"""
+        total = self._conexion().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {
+            'ruta': self.ruta,
+            'entradas': total,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'pid': os.getpid()
+        }
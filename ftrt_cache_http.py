@@ -0,0 +1,65 @@
+"""
+Caché HTTP para Resultados FTRT Deterministas
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+La FTRT de una fecha concreta solo depende de la fecha y del modelo
+(FTRTCalculator.huella_modelo). Las respuestas que no dependen del reloj
+llevan un ETag fuerte derivado de ambos y un Cache-Control largo, de modo
+que un proxy o CDN pueda servir las consultas repetidas. Las peticiones
+condicionales (If-None-Match) se resuelven antes de calcular nada.
+"""
+
+import hashlib
+import os
+
+CACHE_MAX_AGE = int(os.environ.get('FTRT_CACHE_MAX_AGE', 7 * 24 * 3600))
+
+
+def etag_ftrt(calculador, *partes):
+    """
+    ETag fuerte para una respuesta determinista
+
+    Args:
+        calculador (FTRTCalculator): Aporta la versión del modelo y los umbrales
+        *partes: Todo lo que distingue la respuesta (ruta, fecha, parámetros,
+            formato negociado...)
+
+    Returns:
+        str ETag entrecomillado
+    """
+    clave = '|'.join([calculador.huella_modelo()] + [str(p) for p in partes])
+    return '"' + hashlib.sha256(clave.encode()).hexdigest()[:32] + '"'
+
+
+def coincide_if_none_match(cabecera, etag):
+    """
+    True si la cabecera If-None-Match incluye el ETag
+
+    Sigue la comparación débil de RFC 9110 (se ignora el prefijo W/) y
+    acepta '*'.
+    """
+    if not cabecera:
+        return False
+    for candidato in cabecera.split(','):
+        candidato = candidato.strip()
+        if candidato == '*' or candidato.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+def cabeceras_cache(etag=None, vary=None):
+    """
+    Cabeceras de caché de una respuesta: ETag y Cache-Control si es
+    determinista (200 o 304) y Vary si su representación depende de
+    cabeceras de la petición (p. ej. 'Accept' en los formatos negociados)
+    """
+    cabeceras = {}
+    if etag:
+        cabeceras.update({
+            'ETag': etag,
+            'Cache-Control': f'public, max-age={CACHE_MAX_AGE}'
+        })
+    if vary:
+        cabeceras['Vary'] = vary
+    return cabeceras
@@ -0,0 +1,254 @@
+"""
+Catálogo Compacto de Eventos Solares e Históricos
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Un único tipo para los eventos que hoy viven en dicts anidados
+(HISTORICAL_EVENTS, SOLAR_EVENTS_DB, los eventos por era del analizador
+de patrones):
+
+- Un array estructurado de NumPy con una fila por evento: fechas int64,
+  valores float32 y textos como códigos de una tabla de cadenas
+  internadas (ftrt_catalogos.Categorias), de modo que 'Carrington' o
+  'NOAA archives' se guardan una sola vez.
+- Los efectos (listas de texto de longitud variable) van en un único
+  array de códigos; cada fila guarda dónde empiezan y cuántos son.
+- Índices: id -> fila por código (O(1); los ids deben ser únicos: los
+  derivados de fecha y tipo llevan sufijo _2, _3... si se repiten), fechas ordenadas para búsquedas
+  por rango (O(log n)) y filas por tipo (O(1)).
+
+evento(i) reconstruye el dict de una fila solo cuando se necesita.
+"""
+
+import numpy as np
+
+from ftrt_catalogos import (FALTA_CATEGORIA, FALTA_ENTERO, FALTA_FECHA, Categorias, campo_anidado,
+                            cargar_catalogo, desde_registros, dtype_esquema, fechas)
+
+ESQUEMA = (
+    ('id', 'categoria'), ('fecha', 'fecha'), ('tipo', 'categoria'), ('nombre', 'categoria'),
+    ('era', 'categoria'), ('ftrt', 'real32'), ('magnitud', 'real32'), ('clase', 'categoria'),
+    ('dst', 'real32'), ('kp', 'entero')
+)
+SEGUNDOS_DIA = 86400
+
+
+def _ids_unicos(bases):
+    """Ids 'fecha_tipo' únicos: la primera aparición se queda igual, las siguientes llevan _2, _3..."""
+    propios = set(bases)
+    usados = set()
+    ids = []
+    for base in bases:
+        nuevo, n = base, 1
+        # Un sufijo no puede coincidir con el id propio de otro evento
+        while nuevo in usados or (nuevo != base and nuevo in propios):
+            n += 1
+            nuevo = f'{base}_{n}'
+        usados.add(nuevo)
+        ids.append(nuevo)
+    return ids
+
+
+def _segundos(fecha):
+    """datetime, date, str ISO o int64 -> segundos desde 1970"""
+    if isinstance(fecha, (int, np.integer)):
+        return int(fecha)
+    return int(np.datetime64(fecha, 's').astype(np.int64))
+
+
+class CatalogoEventos:
+    """Eventos en un array estructurado con tabla de cadenas e índices"""
+
+    def __init__(self, datos, categorias, efectos=None, efectos_inicio=None):
+        """
+        Args:
+            datos (np.ndarray): Array estructurado con las columnas de ESQUEMA
+            categorias (Categorias): Tabla de cadenas de las columnas categóricas
+            efectos (np.ndarray): Códigos de todos los efectos, concatenados
+            efectos_inicio (np.ndarray): len(datos) + 1 posiciones en 'efectos'
+        """
+        self.datos = datos
+        self.categorias = categorias
+        self.efectos = efectos if efectos is not None else np.empty(0, dtype=np.int32)
+        self.efectos_inicio = (efectos_inicio if efectos_inicio is not None
+                               else np.zeros(len(datos) + 1, dtype=np.int32))
+        self._indexar()
+
+    def _indexar(self):
+        n = len(self.datos)
+        self.años = (fechas(self.datos['fecha']).astype('datetime64[Y]').astype(np.int64) + 1970).astype(np.int32)
+        self.años[self.datos['fecha'] == FALTA_FECHA] = FALTA_ENTERO
+
+        # id -> fila: array indexado por código de la tabla de cadenas
+        self._fila_por_id = np.full(len(self.categorias), -1, dtype=np.int32)
+        validos = self.datos['id'] != FALTA_CATEGORIA
+        codigos, repeticiones = np.unique(self.datos['id'][validos], return_counts=True)
+        if (repeticiones > 1).any():
+            duplicados = self.categorias.decodificar(codigos[repeticiones > 1][:5])
+            raise ValueError(f"Ids de evento duplicados: {', '.join(map(str, duplicados))}")
+        self._fila_por_id[self.datos['id'][validos]] = np.flatnonzero(validos)
+
+        self._orden_fecha = np.argsort(self.datos['fecha'], kind='stable').astype(np.int32)
+        self._fechas_ordenadas = self.datos['fecha'][self._orden_fecha]
+
+        orden_tipo = np.argsort(self.datos['tipo'], kind='stable').astype(np.int32)
+        tipos, inicios = np.unique(self.datos['tipo'][orden_tipo], return_index=True)
+        self._filas_por_tipo = dict(zip(tipos.tolist(), np.split(orden_tipo, inicios[1:]) if n else []))
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def desde_registros(cls, registros, alias=None, efectos=None):
+        """
+        Catálogo a partir de una lista de dicts
+
+        Args:
+            registros (list[dict]): Un dict por evento
+            alias (dict): Columna de ESQUEMA -> ruta 'a.b' en el registro
+            efectos (str): Ruta de la lista de efectos en cada registro
+        """
+        registros = list(registros)
+        categorias = Categorias()
+        datos, _ = desde_registros(registros, ESQUEMA, categorias, alias)
+
+        inicio = np.zeros(len(registros) + 1, dtype=np.int32)
+        codigos = []
+        if efectos:
+            for i, registro in enumerate(registros):
+                lista = campo_anidado(registro, efectos) or []
+                codigos.extend(categorias.codigo(str(e), crear=True) for e in lista)
+                inicio[i + 1] = len(codigos)
+        return cls(datos, categorias, np.array(codigos, dtype=np.int32), inicio)
+
+    @classmethod
+    def desde_historical_events(cls, eventos=None):
+        """HISTORICAL_EVENTS de historical_database (id: fecha_tipo)"""
+        if eventos is None:
+            from historical_database import HISTORICAL_EVENTS as eventos
+        ids = _ids_unicos([f"{evento['event_date']}_{evento['event_type']}" for evento in eventos])
+        registros = [dict(evento, id=id_evento) for evento, id_evento in zip(eventos, ids)]
+        return cls.desde_registros(registros, alias={
+            'fecha': 'event_date', 'tipo': 'event_type', 'nombre': 'event_type', 'magnitud': 'magnitude',
+            'clase': 'flare_class', 'dst': 'dst_index', 'kp': 'kp_index'
+        })
+
+    @classmethod
+    def desde_solar_events_db(cls, eventos=None):
+        """SOLAR_EVENTS_DB de historical_analysis.correlations_database (efectos tecnológicos)"""
+        if eventos is None:
+            from historical_analysis.correlations_database import SOLAR_EVENTS_DB as eventos
+        registros = [dict(evento, id=clave) for clave, evento in eventos.items()]
+        return cls.desde_registros(registros, alias={
+            'fecha': 'date', 'tipo': 'type', 'nombre': 'type', 'clase': 'magnitude',
+            'dst': 'effects.geomagnetic.dst_index', 'kp': 'effects.geomagnetic.kp_index'
+        }, efectos='effects.technological')
+
+    @classmethod
+    def desde_eras(cls, eras):
+        """
+        Eventos por era del analizador de patrones ({era: [{'year', 'event', 'ftrt', 'effects'}]})
+
+        Solo se conoce el año: la fecha es el 1 de enero.
+        """
+        eventos = [(era, evento) for era, lista in eras.items() for evento in lista]
+        ids = _ids_unicos([f"{evento['year']}_{evento['event']}" for _, evento in eventos])
+        registros = [
+            dict(evento, id=id_evento, era=era, fecha=f"{evento['year']:04d}-01-01")
+            for (era, evento), id_evento in zip(eventos, ids)
+        ]
+        return cls.desde_registros(registros, alias={'nombre': 'event', 'tipo': 'event'}, efectos='effects')
+
+    @classmethod
+    def desde_csv(cls, ruta):
+        """Catálogo con el formato de data/solar_events.csv (ftrt_catalogos.ESQUEMA_EVENTOS)"""
+        eventos, categorias = cargar_catalogo(ruta)
+        datos = np.empty(len(eventos), dtype=dtype_esquema(ESQUEMA))
+        datos['fecha'] = eventos['event_date']
+        datos['tipo'] = datos['nombre'] = eventos['event_type']
+        datos['era'] = FALTA_CATEGORIA
+        datos['ftrt'] = np.nan
+        datos['magnitud'] = eventos['magnitude']
+        datos['clase'] = eventos['flare_class']
+        datos['dst'] = eventos['dst_index']
+        datos['kp'] = eventos['kp_index']
+        dias = fechas(eventos['event_date']).astype('datetime64[D]').astype(str)
+        datos['id'] = categorias.codificar(
+            _ids_unicos([f'{d}_{t}' for d, t in zip(dias, categorias.decodificar(eventos['event_type']))])
+        )
+        return cls(datos, categorias)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.datos)
+
+    def __iter__(self):
+        return (self.evento(i) for i in range(len(self)))
+
+    @property
+    def nbytes(self):
+        """Memoria de los datos e índices en arrays (sin la tabla de cadenas)"""
+        return (self.datos.nbytes + self.efectos.nbytes + self.efectos_inicio.nbytes + self.años.nbytes
+                + self._fila_por_id.nbytes + self._orden_fecha.nbytes + self._fechas_ordenadas.nbytes)
+
+    def fila(self, id_evento):
+        """Fila del evento con ese id, o None (O(1))"""
+        codigo = self.categorias.codigo(id_evento)
+        if codigo == FALTA_CATEGORIA or codigo >= len(self._fila_por_id):
+            return None
+        fila = int(self._fila_por_id[codigo])
+        return fila if fila >= 0 else None
+
+    def por_id(self, id_evento):
+        fila = self.fila(id_evento)
+        return self.evento(fila) if fila is not None else None
+
+    def entre(self, inicio, fin):
+        """Filas con fecha en [inicio, fin), en orden cronológico (O(log n + k))"""
+        i0 = np.searchsorted(self._fechas_ordenadas, _segundos(inicio), side='left')
+        i1 = np.searchsorted(self._fechas_ordenadas, _segundos(fin), side='left')
+        return self._orden_fecha[i0:i1]
+
+    def por_fecha(self, fecha):
+        """Filas del día de 'fecha'"""
+        dia = _segundos(np.datetime64(fecha, 'D'))
+        return self.entre(dia, dia + SEGUNDOS_DIA)
+
+    def por_año(self, año):
+        return self.entre(f'{año:04d}-01-01', f'{año + 1:04d}-01-01')
+
+    def por_tipo(self, tipo):
+        """Filas de un tipo de evento (O(1))"""
+        codigo = self.categorias.codigo(tipo)
+        return self._filas_por_tipo.get(codigo, np.empty(0, dtype=np.int32))
+
+    def efectos_de(self, fila):
+        inicio, fin = self.efectos_inicio[fila], self.efectos_inicio[fila + 1]
+        return self.categorias.decodificar(self.efectos[inicio:fin])
+
+    def evento(self, fila):
+        """Dict del evento de una fila (claves del analizador de patrones y de la base histórica)"""
+        d = self.datos[fila]
+        texto = lambda codigo: None if codigo == FALTA_CATEGORIA else self.categorias.valores[codigo]
+        real = lambda valor: None if np.isnan(valor) else round(float(valor), 6)
+        return {
+            'id': texto(d['id']),
+            'date': None if d['fecha'] == FALTA_FECHA else str(fechas(d['fecha']).astype('datetime64[D]')),
+            'year': None if self.años[fila] == FALTA_ENTERO else int(self.años[fila]),
+            'type': texto(d['tipo']),
+            'event': texto(d['nombre']),
+            'era': texto(d['era']),
+            'ftrt': real(d['ftrt']),
+            'magnitude': real(d['magnitud']),
+            'flare_class': texto(d['clase']),
+            'dst_index': real(d['dst']),
+            'kp_index': None if d['kp'] == FALTA_ENTERO else int(d['kp']),
+            'effects': self.efectos_de(fila)
+        }
+
+    def numero_efectos(self):
+        return np.diff(self.efectos_inicio)
@@ -0,0 +1,292 @@
+"""
+Carga Tipada por Bloques de Catálogos FTRT (CSV / NDJSON)
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Convierte catálogos de eventos e índices geomagnéticos en arrays
+estructurados de NumPy, sin pasar por una lista de dicts en memoria:
+
+- Se leen bloques de tamaño fijo (TAMANO_BLOQUE filas). Cada bloque se
+  convierte columna a columna y se entrega antes de leer el siguiente, así
+  que un archivo de millones de filas se recorre en memoria constante.
+- Tipos compactos: fechas como int64 (segundos desde 1970), reales como
+  float64/float32 con NaN si faltan, enteros int32 con FALTA_ENTERO, y
+  categorías (tipo de evento, clase, fuentes) como códigos int32 de una
+  tabla de cadenas compartida (Categorias).
+- Los mismos esquemas sirven para registros ya en memoria (listas de
+  dicts como HISTORICAL_EVENTS), con rutas 'a.b.c' para campos anidados.
+
+Uso:
+    python ftrt_catalogos.py data/solar_events.csv --esquema eventos
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+TAMANO_BLOQUE = int(os.environ.get('FTRT_TAMANO_BLOQUE', 65536))
+FALTA_FECHA = np.iinfo(np.int64).min  # mismo valor que NaT
+FALTA_ENTERO = np.iinfo(np.int32).min
+FALTA_CATEGORIA = -1
+
+TIPOS = {
+    'fecha': np.int64,
+    'real': np.float64,
+    'real32': np.float32,
+    'entero': np.int32,
+    'bool': np.bool_,
+    'categoria': np.int32
+}
+
+# Columnas de data/solar_events.csv (tabla solar_events)
+ESQUEMA_EVENTOS = (
+    ('event_date', 'fecha'), ('event_type', 'categoria'), ('magnitude', 'real'),
+    ('carrington_rotation', 'entero'), ('region_number', 'entero'), ('flare_class', 'categoria'),
+    ('cme_speed', 'real'), ('dst_index', 'real'), ('kp_index', 'entero'),
+    ('aurora_latitude', 'real'), ('sources', 'categoria'), ('verified', 'bool')
+)
+
+# Índices geomagnéticos horarios (tabla geomagnetic_indices)
+ESQUEMA_INDICES = (
+    ('time', 'fecha'), ('dst_index', 'real32'), ('kp_index', 'real32'), ('ae_index', 'real32')
+)
+
+ESQUEMAS = {'eventos': ESQUEMA_EVENTOS, 'indices': ESQUEMA_INDICES}
+
+
+def dtype_esquema(esquema):
+    """dtype estructurado de un esquema ((columna, tipo), ...)"""
+    for columna, tipo in esquema:
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo desconocido en {columna}: {tipo} (use {', '.join(TIPOS)})")
+    return np.dtype([(columna, TIPOS[tipo]) for columna, tipo in esquema])
+
+
+class Categorias:
+    """Tabla de cadenas internadas: cada valor distinto se guarda una vez"""
+
+    def __init__(self, valores=()):
+        self.valores = []
+        self._codigos = {}
+        for valor in valores:
+            self.codigo(valor, crear=True)
+
+    def __len__(self):
+        return len(self.valores)
+
+    def codigo(self, valor, crear=False):
+        """Código de 'valor' (FALTA_CATEGORIA si no existe y crear=False)"""
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            if not crear:
+                return FALTA_CATEGORIA
+            codigo = self._codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+    def codificar(self, valores):
+        """Códigos int32 de una secuencia de cadenas (vacías o None: FALTA_CATEGORIA)"""
+        valores = np.asarray(['' if v is None else str(v).strip() for v in valores], dtype=object)
+        unicos, inversos = np.unique(valores, return_inverse=True)
+        codigos = np.array(
+            [FALTA_CATEGORIA if u == '' else self.codigo(u, crear=True) for u in unicos], dtype=np.int32
+        )
+        return codigos[inversos] if len(valores) else np.empty(0, dtype=np.int32)
+
+    def decodificar(self, codigos):
+        """Cadenas de los códigos (None donde falta)"""
+        return [None if c == FALTA_CATEGORIA else self.valores[c] for c in np.asarray(codigos).tolist()]
+
+
+def _falta(valor):
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def _convertir(valores, tipo, categorias):
+    """Lista de valores crudos (texto o JSON) -> array del tipo de la columna"""
+    if tipo == 'categoria':
+        return categorias.codificar(valores)
+    if tipo == 'fecha':
+        texto = ['NaT' if _falta(v) else str(v).strip().removesuffix('Z') for v in valores]
+        return np.array(texto, dtype='datetime64[s]').astype(np.int64)
+    if tipo == 'bool':
+        return np.array([v is True or str(v).strip().lower() in ('true', '1', 'yes', 'si', 'sí')
+                         for v in valores], dtype=np.bool_)
+
+    reales = np.array([np.nan if _falta(v) else v for v in valores], dtype=np.float64)
+    if tipo == 'entero':
+        return np.where(np.isnan(reales), FALTA_ENTERO, reales).astype(np.int32)
+    return reales.astype(TIPOS[tipo])
+
+
+def _bloque(columnas, esquema, dtype, categorias):
+    """Array estructurado a partir de una lista de valores por columna"""
+    n = len(columnas[0]) if columnas else 0
+    bloque = np.empty(n, dtype=dtype)
+    for (columna, tipo), valores in zip(esquema, columnas):
+        try:
+            bloque[columna] = _convertir(valores, tipo, categorias)
+        except ValueError as e:
+            raise ValueError(f"Columna {columna}: {e}")
+    return bloque
+
+
+def campo_anidado(registro, ruta):
+    """Valor de 'a.b.c' en dicts anidados (None si falta algún nivel)"""
+    for parte in ruta.split('.'):
+        if not isinstance(registro, dict):
+            return None
+        registro = registro.get(parte)
+    return registro
+
+
+def _filas_csv(flujo, esquema, alias):
+    lector = csv.reader(flujo)
+    cabecera = [alias.get(c, c) for c in next(lector, [])]
+    posiciones = {columna: i for i, columna in enumerate(cabecera)}
+    indices = [posiciones.get(columna) for columna, _ in esquema]
+    for fila in lector:
+        if fila:
+            yield [fila[i] if i is not None and i < len(fila) else None for i in indices]
+
+
+def _filas_registros(registros, esquema, alias):
+    # alias: columna -> ruta en el registro
+    rutas = [alias.get(columna, columna) for columna, _ in esquema]
+    for registro in registros:
+        yield [campo_anidado(registro, ruta) for ruta in rutas]
+
+
+def _filas_ndjson(flujo, esquema, alias):
+    registros = (json.loads(linea) for linea in flujo if linea.strip())
+    yield from _filas_registros(registros, esquema, alias)
+
+
+def _en_bloques(filas, esquema, tamano_bloque, categorias):
+    dtype = dtype_esquema(esquema)
+    columnas = [[] for _ in esquema]
+    for fila in filas:
+        for valores, valor in zip(columnas, fila):
+            valores.append(valor)
+        if len(columnas[0]) >= tamano_bloque:
+            yield _bloque(columnas, esquema, dtype, categorias)
+            columnas = [[] for _ in esquema]
+    if columnas[0]:
+        yield _bloque(columnas, esquema, dtype, categorias)
+
+
+def leer_por_bloques(origen, esquema, categorias, tamano_bloque=TAMANO_BLOQUE, formato=None, alias=None):
+    """
+    Arrays estructurados de hasta tamano_bloque filas, en orden del archivo
+
+    Args:
+        origen (str | file): Ruta o flujo de texto
+        esquema (tuple): ((columna, tipo), ...); tipos de TIPOS. Las
+            columnas ausentes en el archivo quedan como faltantes
+        categorias (Categorias): Tabla de cadenas (se amplía al leer)
+        formato (str): 'csv' o 'ndjson'; por defecto según la extensión
+        alias (dict): CSV: nombre en la cabecera -> columna.
+            NDJSON: columna -> ruta 'a.b' en el objeto
+
+    Raises:
+        ValueError: Formato desconocido o valor que no corresponde al tipo
+    """
+    alias = alias or {}
+    if formato is None:
+        nombre = origen if isinstance(origen, str) else getattr(origen, 'name', '')
+        formato = 'ndjson' if str(nombre).lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+    if formato not in ('csv', 'ndjson'):
+        raise ValueError(f"Formato no soportado: {formato} (use csv o ndjson)")
+    filas_de = _filas_csv if formato == 'csv' else _filas_ndjson
+
+    if isinstance(origen, str):
+        with open(origen, newline='', encoding='utf-8') as flujo:
+            yield from _en_bloques(filas_de(flujo, esquema, alias), esquema, tamano_bloque, categorias)
+    else:
+        yield from _en_bloques(filas_de(origen, esquema, alias), esquema, tamano_bloque, categorias)
+
+
+def cargar_catalogo(origen, esquema=ESQUEMA_EVENTOS, categorias=None, **opciones):
+    """
+    Catálogo completo como un único array estructurado
+
+    Returns:
+        (np.ndarray, Categorias)
+    """
+    categorias = categorias if categorias is not None else Categorias()
+    bloques = list(leer_por_bloques(origen, esquema, categorias, **opciones))
+    datos = np.concatenate(bloques) if bloques else np.empty(0, dtype=dtype_esquema(esquema))
+    return datos, categorias
+
+
+def desde_registros(registros, esquema=ESQUEMA_EVENTOS, categorias=None, alias=None):
+    """
+    Lo mismo que cargar_catalogo para una lista de dicts ya en memoria
+
+    Args:
+        alias (dict): columna -> ruta 'a.b' en cada registro
+
+    Returns:
+        (np.ndarray, Categorias)
+    """
+    categorias = categorias if categorias is not None else Categorias()
+    bloques = list(_en_bloques(_filas_registros(registros, esquema, alias or {}), esquema,
+                               TAMANO_BLOQUE, categorias))
+    datos = np.concatenate(bloques) if bloques else np.empty(0, dtype=dtype_esquema(esquema))
+    return datos, categorias
+
+
+def fechas(valores):
+    """int64 epoch (segundos) -> datetime64[s], con NaT donde falta"""
+    return np.asarray(valores, dtype=np.int64).astype('datetime64[s]')
+
+
+def resumir(origen, esquema, tamano_bloque=TAMANO_BLOQUE, **opciones):
+    """
+    Filas, rango de fechas y mínimo/máximo por columna numérica, en memoria
+    constante (un bloque a la vez)
+    """
+    categorias = Categorias()
+    filas = 0
+    extremos = {}
+    for bloque in leer_por_bloques(origen, esquema, categorias, tamano_bloque, **opciones):
+        filas += len(bloque)
+        for columna, tipo in esquema:
+            if tipo in ('categoria', 'bool'):
+                continue
+            valores = bloque[columna]
+            if tipo == 'fecha':
+                valores = valores[valores != FALTA_FECHA]
+            elif tipo == 'entero':
+                valores = valores[valores != FALTA_ENTERO]
+            else:
+                valores = valores[~np.isnan(valores)]
+            if not len(valores):
+                continue
+            minimo, maximo = extremos.get(columna, (valores.min(), valores.max()))
+            extremos[columna] = (min(minimo, valores.min()), max(maximo, valores.max()))
+
+    resumen = {'filas': filas, 'categorias': len(categorias), 'columnas': {}}
+    for columna, tipo in esquema:
+        if columna in extremos:
+            minimo, maximo = extremos[columna]
+            if tipo == 'fecha':
+                minimo, maximo = str(fechas(minimo)), str(fechas(maximo))
+            else:
+                minimo, maximo = minimo.item(), maximo.item()
+            resumen['columnas'][columna] = {'min': minimo, 'max': maximo}
+    return resumen
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resume un catálogo CSV/NDJSON por bloques")
+    parser.add_argument('ruta')
+    parser.add_argument('--esquema', choices=ESQUEMAS, default='eventos')
+    parser.add_argument('--bloque', type=int, default=TAMANO_BLOQUE)
+    args = parser.parse_args()
+
+    print(json.dumps(resumir(args.ruta, ESQUEMAS[args.esquema], args.bloque), indent=2, ensure_ascii=False))
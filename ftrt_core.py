@@ -11,8 +11,13 @@ import pandas as pd
 from datetime import datetime, timedelta
 import warnings
 import time
+import json
+import hashlib
+import os
+from functools import lru_cache
 from config.global_variables import *
 from utils.logger import ftrt_logger
+from ftrt_efemerides import EfemeridesVectorizadas, dias_desde_j2000, dias_a_datetime64
 warnings.filterwarnings('ignore')
 
 # Intentar importar ephem, si falla usar versión simple
@@ -24,6 +29,9 @@ except ImportError:
     print("⚠️  PyEphem no disponible, usando versión simplificada")
 
 class FTRTCalculator:
+    # Incrementar al cambiar fórmulas, efemérides o datos precalculados
+    VERSION_MODELO = '2.1.0'
+
     def __init__(self):
         # Constantes fundamentales
         self.R_SOL = 6.957e8  # Radio solar en metros
@@ -49,6 +57,18 @@ class FTRTCalculator:
             'critico': 2.5
         }
         
+        # Niveles de riesgo indexados por código (ver clasificar_riesgo)
+        self.NIVELES_RIESGO = [
+            ('NORMAL', '🟢'),
+            ('MODERADO', '🟡'),
+            ('ELEVADO', '🟠'),
+            ('CRÍTICO', '🔴'),
+            ('EXTREMO', '💜')
+        ]
+        
+        # Efemérides vectorizadas para cálculos por lotes
+        self.efemerides = EfemeridesVectorizadas(self.MASAS.keys())
+        
         # Datos precalculados para eventos históricos
         self.datos_precalculados = {
             '1859-09-01': 3.21,  # Carrington
@@ -193,6 +213,97 @@ class FTRTCalculator:
             ftrt_logger.error(f"Error en cálculo FTRT: {e}")
             raise
     
+    def calcular_ftrt_rango(self, fechas, usar_precalculados=True):
+        """
+        Calcula FTRT para un array de fechas en una sola pasada vectorizada
+        
+        Equivale a llamar calcular_ftrt_total por cada fecha, pero las
+        posiciones planetarias se obtienen de EfemeridesVectorizadas en
+        lugar de ephem y sólo se registra una línea de log por lote.
+        
+        Args:
+            fechas: Lista/array de fechas (datetime, str, datetime64) o días desde J2000
+            usar_precalculados (bool): Aplicar datos_precalculados a las fechas que coincidan
+        
+        Returns:
+            dict con arrays NumPy: 'fechas' (datetime64[s]), 'ftrt_total',
+            'ftrt_normalizada', 'contribuciones' (planeta -> array),
+            'nivel' (códigos de NIVELES_RIESGO) y 'precalculado' (bool)
+        """
+        inicio = time.time()
+        
+        dias = np.atleast_1d(dias_desde_j2000(fechas))
+        distancias = self.efemerides.distancias_tierra(dias, self.MASAS.keys())
+        
+        contribuciones = {
+            planeta: (masa * self.R_SOL) / (distancias[planeta] * self.UA) ** 3
+            for planeta, masa in self.MASAS.items()
+        }
+        ftrt_total = np.sum(list(contribuciones.values()), axis=0)
+        ftrt_normalizada = ftrt_total / contribuciones['jupiter']
+        
+        precalculado = np.zeros(len(dias), dtype=bool)
+        if usar_precalculados and self.datos_precalculados:
+            precalculado, valores = self._buscar_precalculados(dias)
+            if precalculado.any():
+                ftrt_normalizada[precalculado] = valores
+                ftrt_total[precalculado] = valores * 1e15
+                for planeta, base in self._contribuciones_estimadas(1.0).items():
+                    contribuciones[planeta][precalculado] = base * valores
+        
+        resultado = {
+            'fechas': dias_a_datetime64(dias),
+            'ftrt_total': ftrt_total,
+            'ftrt_normalizada': ftrt_normalizada,
+            'contribuciones': contribuciones,
+            'nivel': self.clasificar_riesgo(ftrt_normalizada),
+            'precalculado': precalculado
+        }
+        
+        duracion = time.time() - inicio
+        ftrt_logger.info(f"📊 Cálculo FTRT vectorizado - {len(dias)} fechas | ⏱️ {duracion:.3f}s")
+        return resultado
+    
+    def huella_modelo(self):
+        """
+        Identificador corto de la versión del modelo y del perfil de umbrales
+
+        Cambia si cambian VERSION_MODELO, UMBRALES, MASAS o datos_precalculados,
+        es decir, cuando cualquier resultado ya servido podría dejar de ser válido.
+        """
+        perfil = json.dumps({
+            'version': self.VERSION_MODELO,
+            'umbrales': self.UMBRALES,
+            'masas': self.MASAS,
+            'precalculados': self.datos_precalculados
+        }, sort_keys=True)
+        return f"{self.VERSION_MODELO}-{hashlib.sha1(perfil.encode()).hexdigest()[:12]}"
+
+    def _buscar_precalculados(self, dias):
+        """Localiza las fechas con valor precalculado (búsqueda binaria por día civil)"""
+        claves = np.array(sorted(self.datos_precalculados), dtype='datetime64[D]')
+        valores = np.array([self.datos_precalculados[k] for k in sorted(self.datos_precalculados)])
+        
+        dias_civiles = dias_a_datetime64(dias).astype('datetime64[D]')
+        idx = np.clip(np.searchsorted(claves, dias_civiles), 0, len(claves) - 1)
+        coincide = claves[idx] == dias_civiles
+        return coincide, valores[idx[coincide]]
+    
+    def clasificar_riesgo(self, ftrt_normalizada):
+        """
+        Versión vectorizada de evaluar_riesgo
+        
+        Returns:
+            np.ndarray de códigos enteros que indexan NIVELES_RIESGO
+        """
+        limites = [
+            self.UMBRALES['normal'],
+            self.UMBRALES['moderado'],
+            self.UMBRALES['elevado'],
+            self.UMBRALES['critico']
+        ]
+        return np.searchsorted(limites, np.asarray(ftrt_normalizada), side='right')
+    
     def _contribuciones_estimadas(self, ftrt_norm):
         """Estima contribuciones basadas en FTRT normalizada"""
         base_contributions = {
@@ -265,37 +376,63 @@ class FTRTCalculator:
         """Alias para mantener compatibilidad"""
         return self.calcular_ftrt_total(fecha)
 
+_calculador_compartido = None
+
+def obtener_calculador_compartido():
+    """Instancia única de FTRTCalculator reutilizada por los módulos auxiliares"""
+    global _calculador_compartido
+    if _calculador_compartido is None:
+        _calculador_compartido = FTRTCalculator()
+    return _calculador_compartido
+
 # =============================================================================
 # NUEVOS MECANISMOS MULTIDIMENSIONALES FTRT
 # =============================================================================
 
+# Instantes distintos de FTRT base que guarda cada FTRTMultidimensional
+MAX_CACHE_FTRT_BASE = int(os.environ.get('FTRT_MULTIDIMENSIONAL_CACHE_MAX', 4096))
+
 class FTRTMultidimensional:
     """Modelo FTRT expandido con múltiples mecanismos"""
     
-    def __init__(self):
+    # Umbrales del modelo multidimensional (NORMAL < 1.0 ≤ MODERADO < 1.8 ...)
+    UMBRALES_MULTIDIMENSIONALES = [1.0, 1.8, 2.5, 3.5]
+    NIVELES_MULTIDIMENSIONALES = ['NORMAL 🟢', 'MODERADO 🟡', 'ELEVADO 🟠', 'CRÍTICO 🔴', 'EXTREMO 💜']
+    
+    def __init__(self, calculador=None):
         self.planetas_disparadores = {
             'MARTE': {'peso': 1.2, 'rol': 'Activador rápido'},
             'VENUS': {'peso': 1.1, 'rol': 'Modulador frecuencia'}, 
             'JUPITER': {'peso': 1.5, 'rol': 'Amplificador escala'},
             'SATURNO': {'peso': 1.3, 'rol': 'Estructurador patrones'}
         }
-    
-    def calcular_alineacion_directa(self, planeta, fecha):
-        """Calcula alineación planeta-región activa (simplificado)"""
-        from datetime import datetime
         
         # Posición básica del planeta (simulada)
-        posiciones = {
+        self.configuracion_alineacion = {
             'MARTE': {'max_alineacion': 15, 'periodo': 687},
             'VENUS': {'max_alineacion': 12, 'periodo': 225},
             'JUPITER': {'max_alineacion': 25, 'periodo': 4333},
             'SATURNO': {'max_alineacion': 20, 'periodo': 10759}
         }
         
-        if planeta in posiciones:
-            config = posiciones[planeta]
+        # Un único calculador y caché LRU de FTRT base para todas las llamadas
+        # (acotada: la instancia del servicio vive lo que el proceso)
+        self.calculador = calculador or obtener_calculador_compartido()
+        self._lote_dia = lru_cache(maxsize=MAX_CACHE_FTRT_BASE)(self._calcular_lote_dia)
+    
+    @staticmethod
+    def _dia_del_ano(fechas):
+        """Día del año (1-366) para un array de fechas, sin strptime"""
+        instantes = dias_a_datetime64(np.atleast_1d(dias_desde_j2000(fechas)))
+        dias = instantes.astype('datetime64[D]')
+        return (dias - dias.astype('datetime64[Y]')).astype(int) + 1
+    
+    def calcular_alineacion_directa(self, planeta, fecha):
+        """Calcula alineación planeta-región activa (simplificado)"""
+        if planeta in self.configuracion_alineacion:
+            config = self.configuracion_alineacion[planeta]
             # Cálculo simple basado en días del año
-            dia_del_ano = datetime.strptime(fecha, '%Y-%m-%d').timetuple().tm_yday
+            dia_del_ano = self._dia_del_ano(fecha)[0]
             alineacion = abs(np.sin(dia_del_ano / config['periodo'] * 2 * np.pi)) * config['max_alineacion']
             
             return {
@@ -306,19 +443,25 @@ class FTRTMultidimensional:
             }
         return None
     
+    def _calcular_lote_dia(self, dia):
+        return self.calcular_ftrt_multidimensional_lote(np.atleast_1d(dias_a_datetime64(dia)))
+    
     def calcular_ftrt_multidimensional(self, fecha, planeta_principal=None):
-        """Calcula FTRT considerando múltiples mecanismos"""
+        """
+        Calcula FTRT considerando múltiples mecanismos
+        
+        Es el lote con una sola fecha (mismo motor vectorizado), cacheado
+        por instante.
+        """
+        lote = self._lote_dia(float(dias_desde_j2000(fecha)))
         
         # FTRT base (baricéntrica)
-        calc_base = FTRTCalculator()
-        ftrt_base = calc_base.calcular_ftrt_total(fecha)['ftrt_normalizada']
+        ftrt_base = float(lote['ftrt_base'][0])
         
         # Factor de alineación si se especifica planeta
         factor_alineacion = 1.0
-        if planeta_principal:
-            alineacion = self.calcular_alineacion_directa(planeta_principal, fecha)
-            if alineacion:
-                factor_alineacion = 1.0 + (alineacion['factor_impacto'] / 100)
+        if planeta_principal in lote['planetas']:
+            factor_alineacion = float(lote['factor_alineacion'][0, lote['planetas'].index(planeta_principal)])
         
         # FTRT multidimensional
         ftrt_multidimensional = ftrt_base * factor_alineacion
@@ -332,31 +475,65 @@ class FTRTMultidimensional:
             'nivel_riesgo': self._evaluar_riesgo_multidimensional(ftrt_multidimensional)
         }
     
+    def calcular_ftrt_multidimensional_lote(self, fechas, planetas=None):
+        """
+        FTRT multidimensional para fechas × planetas disparadores en una pasada
+        
+        Args:
+            fechas: Array/lista de fechas
+            planetas (list): Planetas disparadores (default: todos)
+        
+        Returns:
+            dict con 'fechas', 'planetas', 'ftrt_base' (n,) y arrays (n, p):
+            'alineacion', 'factor_alineacion', 'ftrt_multidimensional' y
+            'nivel' (códigos de NIVELES_MULTIDIMENSIONALES)
+        """
+        planetas = list(planetas or self.planetas_disparadores)
+        base = self.calculador.calcular_ftrt_rango(fechas)
+        dia_del_ano = self._dia_del_ano(base['fechas'])[:, np.newaxis]
+        
+        periodos = np.array([self.configuracion_alineacion[p]['periodo'] for p in planetas])
+        maximos = np.array([self.configuracion_alineacion[p]['max_alineacion'] for p in planetas])
+        pesos = np.array([self.planetas_disparadores[p]['peso'] for p in planetas])
+        
+        alineacion = np.abs(np.sin(dia_del_ano / periodos * 2 * np.pi)) * maximos
+        factor_alineacion = 1.0 + alineacion * pesos / 100
+        ftrt_multidimensional = base['ftrt_normalizada'][:, np.newaxis] * factor_alineacion
+        
+        return {
+            'fechas': base['fechas'],
+            'planetas': planetas,
+            'ftrt_base': base['ftrt_normalizada'],
+            'alineacion': alineacion,
+            'factor_alineacion': factor_alineacion,
+            'ftrt_multidimensional': ftrt_multidimensional,
+            'nivel': np.searchsorted(self.UMBRALES_MULTIDIMENSIONALES, ftrt_multidimensional, side='right')
+        }
+    
     def _evaluar_riesgo_multidimensional(self, ftrt):
         """Evalúa riesgo con nuevo modelo"""
-        if ftrt < 1.0:
-            return 'NORMAL 🟢'
-        elif ftrt < 1.8:
-            return 'MODERADO 🟡'
-        elif ftrt < 2.5:
-            return 'ELEVADO 🟠'
-        elif ftrt < 3.5:
-            return 'CRÍTICO 🔴'
-        else:
-            return 'EXTREMO 💜'
+        codigo = np.searchsorted(self.UMBRALES_MULTIDIMENSIONALES, ftrt, side='right')
+        return self.NIVELES_MULTIDIMENSIONALES[codigo]
 
 # =============================================================================
 # FUNCIONES FÁCILES DE USAR
 # =============================================================================
 
+_multidimensional_compartido = None
+
+def _obtener_multidimensional():
+    global _multidimensional_compartido
+    if _multidimensional_compartido is None:
+        _multidimensional_compartido = FTRTMultidimensional()
+    return _multidimensional_compartido
+
 def ftmt_rapido(fecha, planeta=None):
     """Función rápida para FTRT Multidimensional"""
-    calculador = FTRTMultidimensional()
-    return calculador.calcular_ftrt_multidimensional(fecha, planeta)
+    return _obtener_multidimensional().calcular_ftrt_multidimensional(fecha, planeta)
 
 def analizar_configuracion_especial(fecha):
     """Analiza configuración planetaria especial"""
-    calculador = FTRTMultidimensional()
+    calculador = _obtener_multidimensional()
     
     resultados = {}
     for planeta in ['MARTE', 'VENUS', 'JUPITER', 'SATURNO']:
@@ -373,28 +550,52 @@ def analizar_configuracion_especial(fecha):
 class AgujeroCoronalFTRT:
     """Agujeros coronales integrados en FTRT"""
     
+    # Planetas que afectan agujeros coronales
+    FACTORES_PLANETARIOS = {"JUPITER": 1.6, "SATURNO": 1.4, "MARTE": 1.2, "VENUS": 1.1}
+    UMBRALES_RIESGO = [0.3, 0.6]  # BAJO ≤ 0.3 < MEDIO ≤ 0.6 < ALTO
+    NIVELES_RIESGO = ["BAJO 🟢", "MEDIO 🟡", "ALTO 🟠"]
+    UMBRALES_TIPO = [0.4, 0.7]
+    TIPOS_AGUJERO = ["Pequeño", "Mediano", "Grande"]
+    
     def calcular_probabilidad(self, fecha, planeta="JUPITER"):
         """Calcula probabilidad de agujeros coronales"""
-        from datetime import datetime
-        import numpy as np
+        lote = self.calcular_probabilidad_lote([fecha], [planeta])
+        return {
+            "probabilidad": float(lote["probabilidad"][0, 0]),
+            "riesgo": self.NIVELES_RIESGO[lote["riesgo"][0, 0]],
+            "tipo_agujero": self.TIPOS_AGUJERO[lote["tipo_agujero"][0, 0]]
+        }
+    
+    def calcular_probabilidad_lote(self, fechas, planetas=None):
+        """
+        Probabilidad de agujeros coronales para fechas × planetas en una pasada
         
-        if isinstance(fecha, str):
-            fecha = datetime.strptime(fecha, "%Y-%m-%d")
+        Args:
+            fechas: Array/lista de fechas (datetime, str, datetime64)
+            planetas (list): Planetas (default: FACTORES_PLANETARIOS)
         
-        dia_año = fecha.timetuple().tm_yday
-        base = 0.25
-        variacion = abs(np.sin(dia_año / 365 * 2 * np.pi)) * 0.5
+        Returns:
+            dict con 'fechas', 'planetas' y arrays (n, p): 'probabilidad',
+            'riesgo' (índices de NIVELES_RIESGO) y 'tipo_agujero'
+            (índices de TIPOS_AGUJERO)
+        """
+        planetas = list(planetas or self.FACTORES_PLANETARIOS)
+        instantes = dias_a_datetime64(np.atleast_1d(dias_desde_j2000(fechas)))
+        dias = instantes.astype('datetime64[D]')
+        dia_año = (dias - dias.astype('datetime64[Y]')).astype(int) + 1
         
-        # Planetas que afectan agujeros coronales
-        factores = {"JUPITER": 1.6, "SATURNO": 1.4, "MARTE": 1.2, "VENUS": 1.1}
-        factor_planeta = factores.get(planeta, 1.0)
+        base = 0.25
+        variacion = np.abs(np.sin(dia_año / 365 * 2 * np.pi)) * 0.5
+        factor_planeta = np.array([self.FACTORES_PLANETARIOS.get(p, 1.0) for p in planetas])
         
-        probabilidad = (base + variacion) * factor_planeta
+        probabilidad = (base + variacion)[:, np.newaxis] * factor_planeta
         
         return {
-            "probabilidad": min(probabilidad, 0.99),
-            "riesgo": "ALTO 🟠" if probabilidad > 0.6 else "MEDIO 🟡" if probabilidad > 0.3 else "BAJO 🟢",
-            "tipo_agujero": "Grande" if probabilidad > 0.7 else "Mediano" if probabilidad > 0.4 else "Pequeño"
+            "fechas": dias,
+            "planetas": planetas,
+            "probabilidad": np.minimum(probabilidad, 0.99),
+            "riesgo": np.searchsorted(self.UMBRALES_RIESGO, probabilidad, side='left'),
+            "tipo_agujero": np.searchsorted(self.UMBRALES_TIPO, probabilidad, side='left')
         }
 
 
@@ -1,160 +1,169 @@
 #!/usr/bin/env python3
 """
 FTRT + AGUJEROS CORONALES - Modelo Unificado
+
+La probabilidad de agujero coronal es la media de cuatro factores,
+acotada a [0, 1]:
+0.7 × FTRT multidimensional, geometría heliocéntrica, configuración del
+dipolo e historial de regiones. Salvo el FTRT, son MARCADORES DE POSICIÓN
+sin calibrar ni respaldo observacional:
+
+- configuracion_dipolo = 0.5 y historial_regiones = 0.3 son constantes
+  fijas (no se consulta ningún dato del campo dipolar ni de regiones).
+- La geometría es |sin(2π · día_del_año / 365)|, una estacionalidad
+  arbitraria, no una posición heliocéntrica real.
+
+La predicción escalar es el lote con una sola fecha, así que ambas dan
+siempre el mismo resultado.
+
+Uso por lotes (exportación CSV):
+    python ftrt_coronal_integrado.py --inicio 2026-01-01 --dias 365 --salida coronal_2026.csv
 """
 
-from ftrt_multidimensional_real import analizar_ftrt_completo
+from ftrt_core import FTRTMultidimensional
+from ftrt_efemerides import dias_desde_j2000, dias_a_datetime64
 import numpy as np
+import pandas as pd
 
 class FTRTCoronalIntegrado:
     """Modelo que integra FTRT con agujeros coronales"""
-    
-    def __init__(self):
+
+    NIVELES_RIESGO = ['BAJO 🟢', 'MEDIO 🟡', 'ALTO 🟠', 'CRÍTICO 🔴']
+    TIPOS_AGUJERO = [
+        "Agujero transitorio pequeño",
+        "Agujero coronal recurrente",
+        "Agujero de resonancia magnética",
+        "Agujero de colapso crítico + CME posible"
+    ]
+    IMPACTOS = ["Mínimo", "Moderado", "Fuerte"]
+
+    def __init__(self, multidimensional=None):
         self.umbrales_coronales = {
             'bajo': 0.3,
-            'medio': 0.6, 
+            'medio': 0.6,
             'alto': 0.8
         }
-    
+        # Marcadores de posición (ver docstring del módulo), no datos medidos
+        self.configuracion_dipolo = 0.5
+        self.historial_regiones = 0.3
+        self.multidimensional = multidimensional or FTRTMultidimensional()
+
     def predecir_agujeros_coronales(self, fecha, planeta="JUPITER"):
-        """Predice formación de agujeros coronales"""
-        
-        # Análisis FTRT base
-        resultado_ftrt = analizar_ftrt_completo(fecha, planeta)
-        
-        # Factores específicos para agujeros coronales
-        factores_coronales = {
-            'ftrt_tension': resultado_ftrt['ftrt_multidimensional'] * 0.7,
-            'geometria_heliocentrica': self._calcular_geometria(fecha),
-            'configuracion_dipolo': self._analizar_configuracion_dipolo(),
-            'historial_region': self._consultar_historial_regiones(fecha)
-        }
-        
-        probabilidad_agujero = sum(factores_coronales.values()) / len(factores_coronales)
-        
+        """Predice formación de agujeros coronales (el lote con una sola fecha)"""
+        lote = self.predecir_agujeros_coronales_lote([fecha], [planeta])
+        ftrt = float(lote['ftrt_multidimensional'][0, 0])
+        probabilidad = float(lote['probabilidad'][0, 0])
+
         return {
-            **resultado_ftrt,
-            'probabilidad_agujero_coronal': probabilidad_agujero,
-            'nivel_riesgo_coronal': self._clasificar_riesgo_coronal(probabilidad_agujero),
-            'tipo_agujero_esperado': self._predecir_tipo_agujero(probabilidad_agujero, resultado_ftrt),
-            'impacto_geoestimado': self._estimar_impacto_terrestre(probabilidad_agujero)
+            'fecha': fecha,
+            'ftrt_base': float(lote['ftrt_base'][0]),
+            'ftrt_multidimensional': ftrt,
+            'factor_alineacion': float(lote['factor_alineacion'][0, 0]),
+            'planeta_principal': planeta,
+            'nivel_riesgo': self.multidimensional._evaluar_riesgo_multidimensional(ftrt),
+            'probabilidad_agujero_coronal': probabilidad,
+            'nivel_riesgo_coronal': self.NIVELES_RIESGO[lote['riesgo'][0, 0]],
+            'tipo_agujero_esperado': self.TIPOS_AGUJERO[lote['tipo_agujero'][0, 0]],
+            'impacto_geoestimado': self.IMPACTOS[lote['impacto'][0, 0]]
         }
-    
-    def _clasificar_riesgo_coronal(self, probabilidad):
-        if probabilidad < self.umbrales_coronales['bajo']:
-            return 'BAJO 🟢'
-        elif probabilidad < self.umbrales_coronales['medio']:
-            return 'MEDIO 🟡'
-        elif probabilidad < self.umbrales_coronales['alto']:
-            return 'ALTO 🟠'
-        else:
-            return 'CRÍTICO 🔴'
-    
-    def _predecir_tipo_agujero(self, probabilidad, resultado_ftrt):
-        if probabilidad < 0.4:
-            return "Agujero transitorio pequeño"
-        elif probabilidad < 0.7:
-            return "Agujero coronal recurrente"
-        elif resultado_ftrt['ftrt_multidimensional'] > 2.5:
-            return "Agujero de colapso crítico + CME posible"
-        else:
-            return "Agujero de resonancia magnética"
 
-# EJEMPLO DE USO
-if __name__ == "__main__":
-    modelo = FTRTCoronalIntegrado()
-    
-    fechas_importantes = ["2025-12-31", "2026-03-20", "2026-09-15"]
-    
-    print("🌌 FTRT + AGUJEROS CORONALES - PREDICCIÓN UNIFICADA")
-    print("=" * 60)
-    
-    for fecha in fechas_importantes:
-        prediccion = modelo.predecir_agujeros_coronales(fecha)
-        
-        print(f"\n📅 {fecha}:")
-        print(f"   FTRT: {prediccion['ftrt_multidimensional']:.3f}")
-        print(f"   Prob. Agujero Coronal: {prediccion['probabilidad_agujero_coronal']:.1%}")
-        print(f"   Riesgo Coronal: {prediccion['nivel_riesgo_coronal']}")
-        print(f"   Tipo Esperado: {prediccion['tipo_agujero_esperado']}")
-        print(f"   Impacto Tierra: {prediccion['impacto_geoestimado']}")
-#!/usr/bin/env python3
-"""
-FTRT + AGUJEROS CORONALES - Modelo Unificado
-"""
+    def predecir_agujeros_coronales_lote(self, fechas, planetas=None):
+        """
+        Predicción coronal para fechas × planetas en una sola pasada vectorizada
 
-from ftrt_multidimensional_real import analizar_ftrt_completo
-import numpy as np
+        Returns:
+            dict con 'fechas', 'planetas', 'ftrt_base' (n,) y arrays (n, p)
+            'factor_alineacion', 'ftrt_multidimensional', 'probabilidad',
+            'riesgo', 'tipo_agujero' e 'impacto' (índices de NIVELES_RIESGO,
+            TIPOS_AGUJERO e IMPACTOS)
+        """
+        lote = self.multidimensional.calcular_ftrt_multidimensional_lote(fechas, planetas)
+        ftrt = lote['ftrt_multidimensional']
+        geometria = self._calcular_geometria(lote['fechas'])[:, np.newaxis]
+
+        # Con FTRT alto la media pasa de 1: se acota para que sea una probabilidad
+        probabilidad = np.clip((
+            ftrt * 0.7 + geometria + self.configuracion_dipolo + self.historial_regiones
+        ) / 4, 0.0, 1.0)
+
+        umbrales = [self.umbrales_coronales['bajo'], self.umbrales_coronales['medio'],
+                    self.umbrales_coronales['alto']]
+        tipo = np.searchsorted([0.4, 0.7], probabilidad, side='right')
+        tipo = np.where((tipo == 2) & (ftrt > 2.5), 3, tipo)
 
-class FTRTCoronalIntegrado:
-    """Modelo que integra FTRT con agujeros coronales"""
-    
-    def __init__(self):
-        self.umbrales_coronales = {
-            'bajo': 0.3,
-            'medio': 0.6, 
-            'alto': 0.8
-        }
-    
-    def predecir_agujeros_coronales(self, fecha, planeta="JUPITER"):
-        """Predice formación de agujeros coronales"""
-        
-        # Análisis FTRT base
-        resultado_ftrt = analizar_ftrt_completo(fecha, planeta)
-        
-        # Factores específicos para agujeros coronales
-        factores_coronales = {
-            'ftrt_tension': resultado_ftrt['ftrt_multidimensional'] * 0.7,
-            'geometria_heliocentrica': self._calcular_geometria(fecha),
-            'configuracion_dipolo': self._analizar_configuracion_dipolo(),
-            'historial_region': self._consultar_historial_regiones(fecha)
-        }
-        
-        probabilidad_agujero = sum(factores_coronales.values()) / len(factores_coronales)
-        
         return {
-            **resultado_ftrt,
-            'probabilidad_agujero_coronal': probabilidad_agujero,
-            'nivel_riesgo_coronal': self._clasificar_riesgo_coronal(probabilidad_agujero),
-            'tipo_agujero_esperado': self._predecir_tipo_agujero(probabilidad_agujero, resultado_ftrt),
-            'impacto_geoestimado': self._estimar_impacto_terrestre(probabilidad_agujero)
+            'fechas': lote['fechas'],
+            'planetas': lote['planetas'],
+            'ftrt_base': lote['ftrt_base'],
+            'factor_alineacion': lote['factor_alineacion'],
+            'ftrt_multidimensional': ftrt,
+            'probabilidad': probabilidad,
+            'riesgo': np.searchsorted(umbrales, probabilidad, side='right'),
+            'tipo_agujero': tipo,
+            'impacto': np.searchsorted([0.4, 0.7], probabilidad, side='right')
         }
-    
-    def _clasificar_riesgo_coronal(self, probabilidad):
-        if probabilidad < self.umbrales_coronales['bajo']:
-            return 'BAJO 🟢'
-        elif probabilidad < self.umbrales_coronales['medio']:
-            return 'MEDIO 🟡'
-        elif probabilidad < self.umbrales_coronales['alto']:
-            return 'ALTO 🟠'
-        else:
-            return 'CRÍTICO 🔴'
-    
-    def _predecir_tipo_agujero(self, probabilidad, resultado_ftrt):
-        if probabilidad < 0.4:
-            return "Agujero transitorio pequeño"
-        elif probabilidad < 0.7:
-            return "Agujero coronal recurrente"
-        elif resultado_ftrt['ftrt_multidimensional'] > 2.5:
-            return "Agujero de colapso crítico + CME posible"
-        else:
-            return "Agujero de resonancia magnética"
+
+    def exportar_lote(self, fechas, planetas=None):
+        """Predicción por lotes como DataFrame en formato largo (fecha, planeta)"""
+        lote = self.predecir_agujeros_coronales_lote(fechas, planetas)
+        n, p = lote['probabilidad'].shape
+        return pd.DataFrame({
+            'fecha': np.repeat(lote['fechas'].astype('datetime64[D]').astype(str), p),
+            'planeta': np.tile(lote['planetas'], n),
+            'ftrt_multidimensional': lote['ftrt_multidimensional'].ravel(),
+            'probabilidad': lote['probabilidad'].ravel(),
+            'riesgo': np.array(self.NIVELES_RIESGO)[lote['riesgo'].ravel()],
+            'tipo_agujero': np.array(self.TIPOS_AGUJERO)[lote['tipo_agujero'].ravel()],
+            'impacto': np.array(self.IMPACTOS)[lote['impacto'].ravel()]
+        })
+
+    def _calcular_geometria(self, fecha):
+        """Marcador de posición: |sin(día del año)| (acepta fecha o array de fechas)"""
+        dias = dias_a_datetime64(np.atleast_1d(dias_desde_j2000(fecha))).astype('datetime64[D]')
+        dia_año = (dias - dias.astype('datetime64[Y]')).astype(int) + 1
+        geometria = np.abs(np.sin(dia_año / 365 * 2 * np.pi))
+        return geometria if np.ndim(fecha) else float(geometria[0])
+
+def exportar_prediccion_coronal(fecha_inicio, dias, planetas=None, salida=None):
+    """Exporta la predicción coronal diaria de un periodo a CSV (o la devuelve)"""
+    inicio = np.datetime64(fecha_inicio, 'D')
+    fechas = np.arange(inicio, inicio + dias)
+    df = FTRTCoronalIntegrado().exportar_lote(fechas, planetas)
+    if salida:
+        df.to_csv(salida, index=False)
+    return df
 
 # EJEMPLO DE USO
 if __name__ == "__main__":
-    modelo = FTRTCoronalIntegrado()
-    
-    fechas_importantes = ["2025-12-31", "2026-03-20", "2026-09-15"]
-    
-    print("🌌 FTRT + AGUJEROS CORONALES - PREDICCIÓN UNIFICADA")
-    print("=" * 60)
-    
-    for fecha in fechas_importantes:
-        prediccion = modelo.predecir_agujeros_coronales(fecha)
-        
-        print(f"\n📅 {fecha}:")
-        print(f"   FTRT: {prediccion['ftrt_multidimensional']:.3f}")
-        print(f"   Prob. Agujero Coronal: {prediccion['probabilidad_agujero_coronal']:.1%}")
-        print(f"   Riesgo Coronal: {prediccion['nivel_riesgo_coronal']}")
-        print(f"   Tipo Esperado: {prediccion['tipo_agujero_esperado']}")
-        print(f"   Impacto Tierra: {prediccion['impacto_geoestimado']}")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Predicción FTRT + agujeros coronales")
+    parser.add_argument('--inicio', help="Fecha inicial YYYY-MM-DD para exportación por lotes")
+    parser.add_argument('--dias', type=int, default=365, help="Número de días (default 365)")
+    parser.add_argument('--planetas', nargs='+', help="Planetas disparadores (default: todos)")
+    parser.add_argument('--salida', help="Archivo CSV de salida")
+    args = parser.parse_args()
+
+    if args.inicio:
+        df = exportar_prediccion_coronal(args.inicio, args.dias, args.planetas, args.salida)
+        destino = args.salida or 'stdout'
+        print(f"✅ {len(df)} filas ({args.dias} días × {df['planeta'].nunique()} planetas) → {destino}")
+        if not args.salida:
+            print(df.to_string(index=False))
+    else:
+        modelo = FTRTCoronalIntegrado()
+
+        fechas_importantes = ["2025-12-31", "2026-03-20", "2026-09-15"]
+
+        print("🌌 FTRT + AGUJEROS CORONALES - PREDICCIÓN UNIFICADA")
+        print("=" * 60)
+
+        for fecha in fechas_importantes:
+            prediccion = modelo.predecir_agujeros_coronales(fecha)
+
+            print(f"\n📅 {fecha}:")
+            print(f"   FTRT: {prediccion['ftrt_multidimensional']:.3f}")
+            print(f"   Prob. Agujero Coronal: {prediccion['probabilidad_agujero_coronal']:.1%}")
+            print(f"   Riesgo Coronal: {prediccion['nivel_riesgo_coronal']}")
+            print(f"   Tipo Esperado: {prediccion['tipo_agujero_esperado']}")
+            print(f"   Impacto Tierra: {prediccion['impacto_geoestimado']}")
@@ -0,0 +1,313 @@
+"""
+Dataset FTRT en Parquet Particionado por Año
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+La serie FTRT diaria u horaria (las columnas de ftrt_exportacion.VARIABLES)
+se escribe una vez como dataset columnar:
+
+    data/dataset/diaria/year=1749/part-0.parquet
+    data/dataset/horaria/year=2024/part-0.parquet
+
+- Un archivo por año (partición hive 'year=AAAA'): una consulta por rango
+  de fechas solo abre los años que lo cubren.
+- Estadísticas min/max por columna en cada grupo de filas (el año en la
+  serie diaria, el mes en la horaria): un filtro como ftrt_normalized > 2.5
+  descarta sin leerlos los grupos que no llegan.
+- Parquet es columnar: leer 'ftrt_normalized' no lee las contribuciones.
+
+manifiesto.json guarda la huella del modelo (FTRTCalculator.huella_modelo);
+si el modelo cambia, el dataset deja de usarse hasta regenerarlo.
+leer_ftrt() es el punto de entrada de los análisis: usa el dataset si
+está disponible y al día, y si no calcula la serie con el motor.
+
+Requiere pyarrow (opcional): pip install pyarrow
+
+Uso:
+    python ftrt_dataset.py --desde 1749-01-01
+    python ftrt_dataset.py --resolucion horaria --desde 2000-01-01
+"""
+
+import functools
+import json
+import operator
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ftrt_exportacion import DESDE, VARIABLES, como_dia, series_ftrt
+from utils.logger import ftrt_logger
+
+DIRECTORIO_DATASET = os.environ.get('FTRT_DATASET_DIR', os.path.join('data', 'dataset'))
+MANIFIESTO = 'manifiesto.json'
+
+# Resolución -> (paso de datetime64, filas por grupo de Parquet: un año / un mes)
+RESOLUCIONES = {'diaria': ('D', 366), 'horaria': ('h', 24 * 31)}
+COLUMNAS = tuple(nombre for nombre, _, _, _ in VARIABLES)
+OPERADORES = ('<', '<=', '>', '>=', '==', '!=')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("El dataset Parquet requiere pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def pyarrow_disponible():
+    try:
+        _pyarrow()
+        return True
+    except ImportError:
+        return False
+
+
+class DatasetFTRT:
+    """Serie FTRT en Parquet por año, con proyección de columnas y poda de particiones"""
+
+    def __init__(self, directorio=DIRECTORIO_DATASET, resolucion='diaria', calculador=None):
+        if resolucion not in RESOLUCIONES:
+            raise ValueError(f"Resolución desconocida: {resolucion} (use {', '.join(RESOLUCIONES)})")
+        self.directorio = os.path.join(directorio, resolucion)
+        self.resolucion = resolucion
+        self.paso, self.filas_por_grupo = RESOLUCIONES[resolucion]
+        self._calculador = calculador
+        self.ultima_consulta = {'archivos': 0, 'grupos': 0}
+
+    @property
+    def calculador(self):
+        if self._calculador is None:
+            from ftrt_core import obtener_calculador_compartido
+            self._calculador = obtener_calculador_compartido()
+        return self._calculador
+
+    def _ruta(self, año):
+        return os.path.join(self.directorio, f'year={año}', 'part-0.parquet')
+
+    def manifiesto(self):
+        try:
+            with open(os.path.join(self.directorio, MANIFIESTO), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'huella': None, 'años': {}}
+
+    def _guardar_manifiesto(self, manifiesto):
+        ruta = os.path.join(self.directorio, MANIFIESTO)
+        with open(f'{ruta}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifiesto, f, indent=1, sort_keys=True)
+        os.replace(f'{ruta}.tmp', ruta)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def escribir(self, desde=DESDE, hasta=None, compresion='zstd'):
+        """
+        (Re)escribe los años de [desde, hasta], cada uno desde el 1 de enero;
+        el último llega hasta 'hasta' y se completa en la siguiente llamada.
+        Si el modelo cambió, se borran antes los años del modelo anterior
+
+        Returns:
+            dict con 'años', 'filas' y 'bytes' escritos
+        """
+        pa = _pyarrow()
+        inicio_proceso = datetime.now()
+        desde, hasta = como_dia(desde), como_dia(hasta)
+        if hasta < desde:
+            raise ValueError(f"Rango vacío: {desde} > {hasta}")
+        desde = desde.astype('datetime64[Y]').astype('datetime64[D]')
+
+        manifiesto = self.manifiesto()
+        huella = self.calculador.huella_modelo()
+        if manifiesto['huella'] != huella:
+            for año in manifiesto['años']:
+                shutil.rmtree(os.path.dirname(self._ruta(int(año))), ignore_errors=True)
+            manifiesto = {'huella': huella, 'años': {}}
+
+        escritos = {'años': 0, 'filas': 0, 'bytes': 0}
+
+        def guardar(año, partes):
+            columnas = {c: np.concatenate([p[c] for p in partes]) for c in ('time',) + COLUMNAS}
+            tabla = pa.table({
+                'time': pa.array(columnas['time'].astype('datetime64[s]')),
+                **{c: pa.array(columnas[c]) for c in COLUMNAS}
+            })
+            ruta = self._ruta(año)
+            temporal = os.path.join(os.path.dirname(ruta), '.part-0.parquet.tmp')  # '.': no es del dataset
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            pa.parquet.write_table(tabla, temporal, row_group_size=self.filas_por_grupo,
+                                   compression=compresion, write_statistics=True)
+            os.replace(temporal, ruta)
+
+            manifiesto['años'][str(año)] = {
+                'desde': str(columnas['time'][0].astype('datetime64[D]')),
+                'hasta': str(columnas['time'][-1].astype('datetime64[D]')),
+                'filas': tabla.num_rows
+            }
+            escritos['años'] += 1
+            escritos['filas'] += tabla.num_rows
+            escritos['bytes'] += os.path.getsize(ruta)
+
+        # Los tramos del motor no coinciden con los años: se acumula el año en curso
+        año_actual, partes = None, []
+        for tramo in series_ftrt(desde, hasta, self.paso, self.calculador):
+            años = tramo['time'].astype('datetime64[Y]').astype(np.int64) + 1970
+            for año in np.unique(años).tolist():
+                if año != año_actual and partes:
+                    guardar(año_actual, partes)
+                    partes = []
+                año_actual = año
+                seleccion = años == año
+                partes.append({c: v[seleccion] for c, v in tramo.items()})
+        if partes:
+            guardar(año_actual, partes)
+
+        self._guardar_manifiesto(manifiesto)
+        ftrt_logger.info(f"💾 Dataset FTRT {self.resolucion}: {escritos['años']} años, {escritos['filas']} filas | "
+                         f"⏱️ {(datetime.now() - inicio_proceso).total_seconds():.3f}s")
+        return escritos
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def disponible(self, desde=None, hasta=None):
+        """
+        True si hay pyarrow, el dataset es del modelo actual y cubre [desde, hasta]
+        """
+        if not pyarrow_disponible():
+            return False
+        manifiesto = self.manifiesto()
+        if not manifiesto['años'] or manifiesto['huella'] != self.calculador.huella_modelo():
+            return False
+        años = manifiesto['años']
+        primero, ultimo = años[min(años, key=int)], años[max(años, key=int)]
+        desde = como_dia(desde) if desde is not None else np.datetime64(primero['desde'])
+        hasta = como_dia(hasta) if hasta is not None else np.datetime64(ultimo['hasta'])
+        for año in range(desde.astype(object).year, hasta.astype(object).year + 1):
+            cubierto = años.get(str(año))
+            if cubierto is None:
+                return False
+            if (np.datetime64(cubierto['desde']) > max(desde, np.datetime64(f'{año:04d}-01-01'))
+                    or np.datetime64(cubierto['hasta']) < min(hasta, np.datetime64(f'{año:04d}-12-31'))):
+                return False
+        return True
+
+    def _filtro(self, desde, hasta, años, filtros):
+        """(filtro del dataset, filtro de filas sin la columna de partición 'year')"""
+        ds = _pyarrow().dataset
+        particion, filas = [], []
+        if desde is not None:
+            desde = como_dia(desde)
+            particion.append(ds.field('year') >= desde.astype(object).year)
+            filas.append(ds.field('time') >= desde.astype('datetime64[s]'))
+        if hasta is not None:
+            hasta = como_dia(hasta)
+            particion.append(ds.field('year') <= hasta.astype(object).year)
+            filas.append(ds.field('time') < (hasta + 1).astype('datetime64[s]'))
+        if años is not None:
+            particion.append(ds.field('year').isin([int(a) for a in años]))
+        for columna, operador, valor in filtros or ():
+            if columna not in COLUMNAS:
+                raise ValueError(f"Columna desconocida: {columna}")
+            if operador not in OPERADORES:
+                raise ValueError(f"Operador no soportado: {operador} (use {' '.join(OPERADORES)})")
+            campo = ds.field(columna)
+            filas.append({'<': campo < valor, '<=': campo <= valor, '>': campo > valor,
+                          '>=': campo >= valor, '==': campo == valor, '!=': campo != valor}[operador])
+
+        unir = lambda condiciones: functools.reduce(operator.and_, condiciones) if condiciones else None
+        return unir(particion + filas), unir(filas)
+
+    def leer(self, columnas=None, desde=None, hasta=None, años=None, filtros=None):
+        """
+        Filas de [desde, hasta] (días incluidos) con solo las columnas pedidas
+
+        Args:
+            columnas (list): De COLUMNAS; por defecto todas
+            años (list): Solo estos años (poda de particiones)
+            filtros (list): Tuplas (columna, operador, valor), p. ej. ('ftrt_normalized', '>', 2.5);
+                se descartan los grupos de filas cuyo min/max no las cumple
+
+        Returns:
+            pd.DataFrame con 'time' y las columnas pedidas, en orden temporal
+        """
+        ds = _pyarrow().dataset
+        columnas = list(columnas or COLUMNAS)
+        desconocidas = set(columnas) - set(COLUMNAS)
+        if desconocidas:
+            raise ValueError(f"Columnas desconocidas: {', '.join(sorted(desconocidas))}")
+
+        dataset = ds.dataset(self.directorio, format='parquet', partitioning='hive',
+                             ignore_prefixes=['.', '_', MANIFIESTO])
+        filtro, filtro_filas = self._filtro(desde, hasta, años, filtros)
+        fragmentos = list(dataset.get_fragments(filter=filtro))
+        self.ultima_consulta = {
+            'archivos': len(fragmentos),
+            'grupos': sum(len(f.split_by_row_group(filter=filtro_filas)) for f in fragmentos)
+        }
+
+        tabla = dataset.to_table(columns=['time'] + columnas, filter=filtro)
+        datos = tabla.to_pandas().sort_values('time', ignore_index=True)
+        datos['time'] = datos['time'].astype('datetime64[s]')  # Parquet guarda milisegundos
+        return datos
+
+
+def leer_ftrt(columnas, desde=None, hasta=None, años=None, resolucion='diaria',
+              directorio=DIRECTORIO_DATASET, calculador=None):
+    """
+    Serie FTRT para los análisis: del dataset Parquet si está disponible
+    y al día; si no (sin pyarrow, sin dataset o de otro modelo), calculada
+    con el motor para el mismo rango
+
+    Args:
+        desde, hasta: Días incluidos; sin ellos se necesitan 'años'
+        años (list): Años concretos (p. ej. los de un catálogo de eventos)
+
+    Returns:
+        pd.DataFrame con 'time' y las columnas pedidas
+    """
+    columnas = list(columnas)
+    if años is not None:
+        años = sorted({int(a) for a in años})
+        desde = desde if desde is not None else f'{años[0]:04d}-01-01'
+        hasta = hasta if hasta is not None else f'{años[-1]:04d}-12-31'
+    if desde is None or hasta is None:
+        raise ValueError("Indique 'desde' y 'hasta' o 'años'")
+
+    dataset = DatasetFTRT(directorio, resolucion, calculador)
+    if dataset.disponible(desde, hasta):
+        return dataset.leer(columnas, desde, hasta, años)
+
+    # Sin dataset: solo los años pedidos
+    rangos = [(desde, hasta)] if años is None else [
+        (max(como_dia(desde), np.datetime64(f'{a:04d}-01-01', 'D')), min(como_dia(hasta), np.datetime64(f'{a:04d}-12-31', 'D')))
+        for a in años
+    ]
+    partes = [
+        pd.DataFrame({'time': tramo['time'].astype('datetime64[s]'), **{c: tramo[c] for c in columnas}})
+        for inicio, fin in rangos if como_dia(inicio) <= como_dia(fin)
+        for tramo in series_ftrt(inicio, fin, dataset.paso, dataset.calculador, variables=columnas)
+    ]
+    if not partes:
+        return pd.DataFrame({'time': np.empty(0, dtype='datetime64[s]'), **{c: [] for c in columnas}})
+    return pd.concat(partes, ignore_index=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Escribe el dataset FTRT en Parquet particionado por año")
+    parser.add_argument('--directorio', default=DIRECTORIO_DATASET)
+    parser.add_argument('--resolucion', choices=RESOLUCIONES, default='diaria')
+    parser.add_argument('--desde', default=DESDE)
+    parser.add_argument('--hasta', default=None)
+    args = parser.parse_args()
+
+    print(DatasetFTRT(args.directorio, args.resolucion).escribir(args.desde, args.hasta))
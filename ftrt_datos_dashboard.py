@@ -0,0 +1,157 @@
+"""
+Capa de Datos de los Dashboards Streamlit FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Streamlit vuelve a ejecutar el script entero con cada interacción. Esta
+capa evita repetir en cada rerun las llamadas a la API y los cálculos:
+
+- Los resultados se guardan con st.cache_data (compartido entre reruns y
+  sesiones). Sin Streamlit, por ejemplo en tests, se usa una caché LRU.
+- Cada clave incluye la huella del modelo (la de /api/status o
+  FTRTCalculator.huella_modelo). Si cambia el modelo, las entradas
+  antiguas dejan de coincidir sin tener que vaciar nada.
+- Las series largas se calculan con el motor vectorizado y se entregan
+  submuestreadas (ftrt_submuestreo) al ancho útil de la gráfica.
+"""
+
+import functools
+import os
+
+import numpy as np
+
+from ftrt_core import obtener_calculador_compartido
+from ftrt_submuestreo import MAX_PUNTOS, submuestrear
+from ftrt_agregados import MAX_FILAS, PiramideFTRT
+
+try:
+    import streamlit as st
+    STREAMLIT_DISPONIBLE = True
+except ImportError:
+    STREAMLIT_DISPONIBLE = False
+
+API_URL = os.environ.get('FTRT_DASHBOARD_API', 'http://localhost:1111')
+TTL_ESTADO = 60  # segundos entre consultas de la huella de la API
+MAX_PUNTOS_SERIE = 2_000_000  # por encima se reduce la resolución pedida
+
+
+def _cache(ttl=None, max_entradas=64):
+    """st.cache_data si hay Streamlit; si no, lru_cache (sin ttl)"""
+    def decorador(funcion):
+        if STREAMLIT_DISPONIBLE:
+            return st.cache_data(ttl=ttl, max_entries=max_entradas, show_spinner=False)(funcion)
+        return functools.lru_cache(maxsize=max_entradas)(funcion)
+    return decorador
+
+
+@_cache(ttl=TTL_ESTADO, max_entradas=8)
+def _huella_api(api_url, timeout):
+    import requests
+    try:
+        respuesta = requests.get(f"{api_url}/api/status", timeout=timeout)
+        respuesta.raise_for_status()
+        return respuesta.json().get('modelo')
+    except requests.exceptions.RequestException:
+        return None
+
+
+@_cache(max_entradas=256)
+def _informe_api(api_url, huella, fecha, timeout):
+    # 'huella' solo forma parte de la clave de caché
+    import requests
+    respuesta = requests.post(f"{api_url}/api/ftrt/report", json={'date': fecha}, timeout=timeout)
+    respuesta.raise_for_status()
+    return respuesta.json()
+
+
+@_cache(max_entradas=32)
+def _serie_motor(huella, inicio, fin, paso_horas):
+    calculador = obtener_calculador_compartido()
+    paso = np.timedelta64(int(paso_horas * 3600), 's')
+    fechas = np.arange(np.datetime64(inicio, 's'), np.datetime64(fin, 's'), paso)
+    rango = calculador.calcular_ftrt_rango(fechas)
+    return {
+        'fechas': rango['fechas'],
+        'ftrt': rango['ftrt_normalizada'],
+        'nivel': rango['nivel']
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _piramide_local():
+    # Vive mientras el proceso de Streamlit: se carga del .npz una sola vez
+    return PiramideFTRT(obtener_calculador_compartido()).cargar()
+
+
+@_cache(max_entradas=128)
+def _agregados_motor(huella, resolucion, inicio, fin, max_filas):
+    return _piramide_local().consultar(resolucion, inicio, fin, max_filas)
+
+
+class FuenteDatosFTRT:
+    """Acceso cacheado a la API FTRT y al motor local para los dashboards"""
+
+    def __init__(self, api_url=API_URL, timeout=5):
+        """
+        Args:
+            api_url (str): Base de la API interactiva (ftrt_api_corregido.py)
+            timeout (float): Segundos por petición HTTP
+        """
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+
+    def huella_modelo(self):
+        """Huella del modelo que sirve la API, o None si no responde"""
+        return _huella_api(self.api_url, self.timeout)
+
+    def informe(self, fecha):
+        """
+        Informe completo de /api/ftrt/report para una fecha
+
+        Raises:
+            requests.exceptions.RequestException: La API no está disponible
+        """
+        fecha = fecha.strftime('%Y-%m-%d') if hasattr(fecha, 'strftime') else str(fecha)
+        return _informe_api(self.api_url, self.huella_modelo(), fecha, self.timeout)
+
+    def serie(self, inicio, fin, paso_horas=24, max_puntos=MAX_PUNTOS, metodo='lttb'):
+        """
+        Serie FTRT [inicio, fin) del motor local, lista para dibujar
+
+        La serie completa se calcula una vez por huella de modelo y rango.
+        Cada llamada solo submuestrea, lo que es barato frente al cálculo.
+
+        Returns:
+            dict con 'fechas', 'ftrt' y 'nivel' submuestreados, 'total'
+            (puntos de la serie completa), 'ftrt_max' (máximo real) y
+            'paso_horas' (resolución usada, mayor que la pedida si el
+            rango superaba MAX_PUNTOS_SERIE)
+        """
+        inicio = inicio.isoformat() if hasattr(inicio, 'isoformat') else str(inicio)
+        fin = fin.isoformat() if hasattr(fin, 'isoformat') else str(fin)
+        horas = (np.datetime64(fin, 's') - np.datetime64(inicio, 's')) / np.timedelta64(1, 'h')
+        paso_horas = max(paso_horas, int(np.ceil(horas / MAX_PUNTOS_SERIE)))
+        huella = obtener_calculador_compartido().huella_modelo()
+        completa = _serie_motor(huella, inicio, fin, paso_horas)
+
+        indices = submuestrear(completa['fechas'], completa['ftrt'], max_puntos, metodo)
+        return {
+            'fechas': completa['fechas'][indices],
+            'ftrt': completa['ftrt'][indices],
+            'nivel': completa['nivel'][indices],
+            'total': int(len(completa['ftrt'])),
+            'ftrt_max': float(completa['ftrt'].max()) if len(completa['ftrt']) else None,
+            'paso_horas': paso_horas
+        }
+
+    def agregados(self, resolucion='auto', inicio=None, fin=None, max_filas=MAX_FILAS):
+        """
+        FTRT máxima/media/mínima y días por nivel por semana, mes o año
+
+        Mismo resultado que /ftrt/agregados/{resolucion}, leído de la
+        pirámide local (ver ftrt_agregados.py)
+        """
+        inicio = inicio.isoformat() if hasattr(inicio, 'isoformat') else inicio
+        fin = fin.isoformat() if hasattr(fin, 'isoformat') else fin
+        huella = obtener_calculador_compartido().huella_modelo()
+        return _agregados_motor(huella, resolucion, inicio, fin, max_filas)
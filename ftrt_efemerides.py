@@ -0,0 +1,203 @@
+"""
+Efemérides Planetarias Vectorizadas FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Posiciones heliocéntricas aproximadas a partir de los elementos keplerianos
+de JPL (Standish, tabla válida 3000 a.C. - 3000 d.C.). Todas las funciones
+aceptan arrays de fechas y calculan todos los instantes de una sola vez con
+NumPy, sin llamar a ephem fecha por fecha.
+"""
+
+import numpy as np
+from datetime import datetime, timedelta, timezone
+
+# Época J2000.0 (2000-01-01 12:00 TT) como datetime64
+J2000 = np.datetime64('2000-01-01T12:00:00', 's')
+SEGUNDOS_POR_DIA = 86400.0
+DIAS_POR_SIGLO = 36525.0
+
+# Elementos orbitales J2000 y sus tasas por siglo juliano:
+# (a [UA], e, I [°], L [°], longitud perihelio [°], longitud nodo [°])
+ELEMENTOS_ORBITALES = {
+    'mercury': (
+        (0.38709843, 0.20563661, 7.00559432, 252.25166724, 77.45771895, 48.33961819),
+        (0.00000000, 0.00002123, -0.00590158, 149472.67486623, 0.15940013, -0.12214182),
+    ),
+    'venus': (
+        (0.72332102, 0.00676399, 3.39777545, 181.97970850, 131.76755713, 76.67261496),
+        (-0.00000026, -0.00005107, 0.00043494, 58517.81560260, 0.05679648, -0.27274174),
+    ),
+    'earth': (  # Baricentro Tierra-Luna
+        (1.00000018, 0.01673163, -0.00054346, 100.46691572, 102.93005885, -5.11260389),
+        (-0.00000003, -0.00003661, -0.01337178, 35999.37306329, 0.31795260, -0.24123856),
+    ),
+    'mars': (
+        (1.52371243, 0.09336511, 1.85181869, -4.56813164, -23.91744784, 49.71320984),
+        (0.00000097, 0.00009149, -0.00724757, 19140.29934243, 0.45223625, -0.26852431),
+    ),
+    'jupiter': (
+        (5.20248019, 0.04853590, 1.29861416, 34.33479152, 14.27495244, 100.29282654),
+        (-0.00002864, 0.00018026, -0.00322699, 3034.90371757, 0.18199196, 0.13024619),
+    ),
+    'saturn': (
+        (9.54149883, 0.05550825, 2.49424102, 50.07571329, 92.86136063, 113.63998702),
+        (-0.00003065, -0.00032044, 0.00451969, 1222.11494724, 0.54179478, -0.25015002),
+    ),
+    'uranus': (
+        (19.18797948, 0.04685740, 0.77298127, 314.20276625, 172.43404441, 73.96250215),
+        (-0.00020455, -0.00001550, -0.00180155, 428.49512595, 0.09266985, 0.05739699),
+    ),
+    'neptune': (
+        (30.06952752, 0.00895439, 1.77005520, 304.22289287, 46.68158724, 131.78635853),
+        (0.00006447, 0.00000818, 0.00022400, 218.46515314, 0.01009938, -0.00606302),
+    ),
+}
+
+# Términos adicionales de la anomalía media para los planetas exteriores (b, c, s, f)
+TERMINOS_ADICIONALES = {
+    'jupiter': (-0.00012452, 0.06064060, -0.35635438, 38.35125000),
+    'saturn': (0.00025899, -0.13434469, 0.87320147, 38.35125000),
+    'uranus': (0.00058331, -0.97731848, 0.17689245, 7.67025000),
+    'neptune': (-0.00041348, 0.68346318, -0.10162547, 7.67025000),
+}
+
+PLANETAS = tuple(ELEMENTOS_ORBITALES.keys())
+
+
+def dias_desde_j2000(fechas):
+    """
+    Convierte fechas a días (float) desde J2000.0
+
+    Args:
+        fechas: datetime, str 'YYYY-MM-DD', datetime64, lista/array de
+            cualquiera de ellos, o números ya expresados en días desde J2000
+
+    Returns:
+        np.ndarray (o float si la entrada es escalar)
+    """
+    escalar = np.ndim(fechas) == 0
+    if hasattr(fechas, 'to_numpy'):  # pandas Series / DatetimeIndex
+        fechas = fechas.to_numpy()
+    arr = np.atleast_1d(np.asarray(fechas))
+
+    if arr.dtype.kind in 'fiu':
+        dias = arr.astype(float)
+    else:
+        if arr.dtype.kind == 'O':
+            arr = np.array([
+                f.astimezone(timezone.utc).replace(tzinfo=None)
+                if isinstance(f, datetime) and f.tzinfo else f
+                for f in arr
+            ])
+        instantes = arr.astype('datetime64[s]')
+        dias = (instantes - J2000).astype(float) / SEGUNDOS_POR_DIA
+
+    return float(dias[0]) if escalar else dias
+
+
+def dias_a_datetime64(dias):
+    """Convierte días desde J2000.0 a datetime64[s]"""
+    segundos = np.round(np.asarray(dias, dtype=float) * SEGUNDOS_POR_DIA)
+    return J2000 + segundos.astype('int64').astype('timedelta64[s]')
+
+
+def dias_a_datetime(dia):
+    """Convierte un instante (días desde J2000.0) a datetime"""
+    return datetime(2000, 1, 1, 12) + timedelta(days=float(dia))
+
+
+def _resolver_kepler(M, e, iteraciones=8):
+    """Resuelve la ecuación de Kepler E - e·sin(E) = M por Newton (vectorizado)"""
+    E = M + e * np.sin(M)
+    for _ in range(iteraciones):
+        dE = (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+        E = E - dE
+        if np.all(np.abs(dE) < 1e-12):
+            break
+    return E
+
+
+class EfemeridesVectorizadas:
+    """Posiciones planetarias heliocéntricas para arrays de instantes"""
+
+    def __init__(self, planetas=None):
+        self.planetas = tuple(planetas) if planetas else PLANETAS
+
+    def posiciones_heliocentricas(self, dias, planetas=None):
+        """
+        Posiciones heliocéntricas eclípticas J2000 en UA
+
+        Args:
+            dias (array): Días desde J2000.0
+            planetas (list): Planetas a calcular (default: todos)
+
+        Returns:
+            dict planeta -> np.ndarray de forma (n, 3)
+        """
+        dias = np.atleast_1d(np.asarray(dias, dtype=float))
+        T = dias / DIAS_POR_SIGLO
+        posiciones = {}
+
+        for planeta in planetas or self.planetas:
+            base, tasa = ELEMENTOS_ORBITALES[planeta]
+            a, e, I, L, varpi, Omega = (
+                b + r * T for b, r in zip(base, tasa)
+            )
+
+            M = L - varpi
+            if planeta in TERMINOS_ADICIONALES:
+                b, c, s, f = TERMINOS_ADICIONALES[planeta]
+                fT = np.radians(f * T)
+                M = M + b * T ** 2 + c * np.cos(fT) + s * np.sin(fT)
+
+            M = np.radians((M + 180.0) % 360.0 - 180.0)
+            omega = np.radians(varpi - Omega)
+            Omega = np.radians(Omega)
+            I = np.radians(I)
+
+            E = _resolver_kepler(M, e)
+            x_orb = a * (np.cos(E) - e)
+            y_orb = a * np.sqrt(1.0 - e ** 2) * np.sin(E)
+
+            cw, sw = np.cos(omega), np.sin(omega)
+            cO, sO = np.cos(Omega), np.sin(Omega)
+            cI, sI = np.cos(I), np.sin(I)
+
+            x = (cw * cO - sw * sO * cI) * x_orb + (-sw * cO - cw * sO * cI) * y_orb
+            y = (cw * sO + sw * cO * cI) * x_orb + (-sw * sO + cw * cO * cI) * y_orb
+            z = (sw * sI) * x_orb + (cw * sI) * y_orb
+
+            posiciones[planeta] = np.stack([x, y, z], axis=-1)
+
+        return posiciones
+
+    def longitudes_heliocentricas(self, dias, planetas=None):
+        """Longitudes eclípticas heliocéntricas en radianes [0, 2π)"""
+        posiciones = self.posiciones_heliocentricas(dias, planetas)
+        return {
+            planeta: np.mod(np.arctan2(pos[:, 1], pos[:, 0]), 2 * np.pi)
+            for planeta, pos in posiciones.items()
+        }
+
+    def distancias_tierra(self, dias, planetas=None):
+        """
+        Distancias en UA desde la Tierra, con el mismo criterio que
+        FTRTCalculator.calcular_posicion_planeta: para 'earth' se usa la
+        distancia Sol-Tierra.
+
+        Returns:
+            dict planeta -> np.ndarray de forma (n,)
+        """
+        planetas = list(planetas or self.planetas)
+        necesarios = planetas if 'earth' in planetas else planetas + ['earth']
+        posiciones = self.posiciones_heliocentricas(dias, necesarios)
+        tierra = posiciones['earth']
+
+        distancias = {}
+        for planeta in planetas:
+            if planeta == 'earth':
+                distancias[planeta] = np.linalg.norm(tierra, axis=-1)
+            else:
+                distancias[planeta] = np.linalg.norm(posiciones[planeta] - tierra, axis=-1)
+        return distancias
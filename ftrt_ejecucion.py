@@ -0,0 +1,48 @@
+"""
+Ejecución de Cálculos FTRT sin Bloquear el Servidor
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Con workers gevent (run_api.py --app flask) todas las peticiones de un
+worker comparten un hilo: un cálculo largo en C (ephem, NumPy) detiene
+al resto de greenlets hasta que termina. ejecutar_cpu() envía ese trabajo
+al pool de hilos nativos del hub de gevent y el greenlet que lo pidió
+espera sin bloquear a los demás.
+
+Fuera de gevent (desarrollo, tests, FastAPI, que ya usa su propio pool
+para los endpoints síncronos) la función se llama directamente.
+"""
+
+import os
+
+try:
+    import gevent
+    import gevent.monkey
+    GEVENT_DISPONIBLE = True
+except ImportError:
+    GEVENT_DISPONIBLE = False
+
+HILOS_CPU = int(os.environ.get('FTRT_HILOS_CPU', 4))
+
+
+def en_gevent():
+    """True si el proceso corre con threading parcheado por gevent"""
+    return GEVENT_DISPONIBLE and gevent.monkey.is_module_patched('threading')
+
+
+def configurar_pool(hilos=HILOS_CPU):
+    """Ajusta el tamaño del pool nativo del hub (llamar en cada worker)"""
+    if en_gevent():
+        gevent.get_hub().threadpool.maxsize = hilos
+
+
+def ejecutar_cpu(funcion, *args, **kwargs):
+    """
+    Ejecuta un cálculo intensivo sin bloquear el bucle de gevent
+
+    Returns:
+        El valor de funcion(*args, **kwargs); las excepciones se propagan
+    """
+    if en_gevent():
+        return gevent.get_hub().threadpool.apply(funcion, args, kwargs)
+    return funcion(*args, **kwargs)
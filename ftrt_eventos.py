@@ -0,0 +1,159 @@
+"""
+Búsqueda de Eventos FTRT: Cruces de Umbral y Máximos Locales
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Trata la FTRT normalizada como una función continua del tiempo. Se muestrea
+con paso grueso de forma vectorizada, se acotan los cambios de signo y los
+máximos, y cada evento se refina con el método de Brent. El coste del
+refinamiento crece con el número de eventos, no con el número de días.
+"""
+
+import numpy as np
+from scipy.optimize import brentq, minimize_scalar
+
+from ftrt_core import FTRTCalculator
+from ftrt_efemerides import dias_desde_j2000, dias_a_datetime
+from utils.logger import ftrt_logger
+
+
+class BuscadorEventosFTRT:
+    """Localiza cruces de UMBRALES y máximos locales de la FTRT normalizada"""
+
+    def __init__(self, calculador=None, paso_dias=2.0, tolerancia_dias=1e-5):
+        """
+        Args:
+            calculador (FTRTCalculator): Calculador a reutilizar (default: uno nuevo)
+            paso_dias (float): Paso del muestreo grueso. Debe ser menor que la
+                separación mínima entre eventos que se quiera distinguir.
+            tolerancia_dias (float): Tolerancia de Brent (1e-5 días ≈ 1 s)
+        """
+        self.calculador = calculador or FTRTCalculator()
+        self.paso_dias = paso_dias
+        self.tolerancia_dias = tolerancia_dias
+
+    def ftrt_continua(self, dias):
+        """
+        FTRT normalizada como función continua de días desde J2000
+
+        No aplica datos_precalculados, que son valores puntuales por fecha.
+        """
+        calc = self.calculador
+        distancias = calc.efemerides.distancias_tierra(np.atleast_1d(dias), calc.MASAS.keys())
+        ponderadas = {p: calc.MASAS[p] / distancias[p] ** 3 for p in calc.MASAS}
+        return np.sum(list(ponderadas.values()), axis=0) / ponderadas['jupiter']
+
+    def _escalar(self, dia):
+        return float(self.ftrt_continua(dia)[0])
+
+    def _muestrear(self, fecha_inicio, fecha_fin):
+        """Muestreo grueso vectorizado del intervalo"""
+        inicio = dias_desde_j2000(fecha_inicio)
+        fin = dias_desde_j2000(fecha_fin)
+        if fin <= inicio:
+            raise ValueError("fecha_fin debe ser posterior a fecha_inicio")
+
+        n = int(np.ceil((fin - inicio) / self.paso_dias)) + 1
+        dias = np.linspace(inicio, fin, n)
+        return dias, self.ftrt_continua(dias)
+
+    def buscar_cruces(self, fecha_inicio, fecha_fin, umbrales=None):
+        """
+        Encuentra los instantes exactos en que la FTRT cruza cada umbral
+
+        Args:
+            fecha_inicio, fecha_fin: Límites del intervalo
+            umbrales (dict): nombre -> valor (default: UMBRALES del calculador)
+
+        Returns:
+            list de dicts ordenados por fecha con 'fecha', 'umbral',
+            'valor_umbral', 'direccion' ('ascendente'/'descendente') y 'ftrt'
+        """
+        umbrales = umbrales or self.calculador.UMBRALES
+        dias, valores = self._muestrear(fecha_inicio, fecha_fin)
+
+        cruces = []
+        for nombre, valor_umbral in umbrales.items():
+            diferencia = valores - valor_umbral
+            signos = np.signbit(diferencia)
+            for i in np.flatnonzero(signos[:-1] != signos[1:]):
+                dia = brentq(
+                    lambda d: self._escalar(d) - valor_umbral,
+                    dias[i], dias[i + 1],
+                    xtol=self.tolerancia_dias
+                )
+                cruces.append({
+                    'fecha': dias_a_datetime(dia),
+                    'umbral': nombre,
+                    'valor_umbral': valor_umbral,
+                    'direccion': 'ascendente' if diferencia[i] < 0 else 'descendente',
+                    'ftrt': valor_umbral
+                })
+
+        cruces.sort(key=lambda c: c['fecha'])
+        ftrt_logger.info(f"🔎 Cruces de umbral: {len(cruces)} en {len(dias)} muestras")
+        return cruces
+
+    def buscar_maximos(self, fecha_inicio, fecha_fin, ftrt_minima=None):
+        """
+        Encuentra los máximos locales de la FTRT
+
+        Args:
+            fecha_inicio, fecha_fin: Límites del intervalo
+            ftrt_minima (float): Descartar máximos por debajo de este valor
+
+        Returns:
+            list de dicts ordenados por fecha con 'fecha', 'ftrt' y 'nivel_riesgo'
+        """
+        dias, valores = self._muestrear(fecha_inicio, fecha_fin)
+
+        candidatos = np.flatnonzero(
+            (valores[1:-1] > valores[:-2]) & (valores[1:-1] >= valores[2:])
+        ) + 1
+
+        maximos = []
+        for i in candidatos:
+            refinado = minimize_scalar(
+                lambda d: -self._escalar(d),
+                bounds=(dias[i - 1], dias[i + 1]),
+                method='bounded',
+                options={'xatol': self.tolerancia_dias}
+            )
+            ftrt = float(-refinado.fun)
+            if ftrt_minima is not None and ftrt < ftrt_minima:
+                continue
+            maximos.append({
+                'fecha': dias_a_datetime(refinado.x),
+                'ftrt': ftrt,
+                'nivel_riesgo': self.calculador.evaluar_riesgo(ftrt)[0]
+            })
+
+        ftrt_logger.info(f"🔎 Máximos locales: {len(maximos)} en {len(dias)} muestras")
+        return maximos
+
+    def buscar_eventos(self, fecha_inicio, fecha_fin, umbrales=None, ftrt_minima=None):
+        """Cruces de umbral y máximos locales del intervalo"""
+        return {
+            'cruces': self.buscar_cruces(fecha_inicio, fecha_fin, umbrales),
+            'maximos': self.buscar_maximos(fecha_inicio, fecha_fin, ftrt_minima)
+        }
+
+
+def buscar_eventos_ftrt(fecha_inicio, fecha_fin, **kwargs):
+    """Función rápida para buscar cruces y máximos en un intervalo"""
+    return BuscadorEventosFTRT().buscar_eventos(fecha_inicio, fecha_fin, **kwargs)
+
+
+if __name__ == "__main__":
+    from datetime import datetime
+
+    inicio = datetime.now()
+    fin = datetime(inicio.year + 30, inicio.month, 1)
+
+    eventos = buscar_eventos_ftrt(inicio, fin, ftrt_minima=FTRTCalculator().UMBRALES['critico'])
+    print(f"🔮 EVENTOS FTRT {inicio.year}-{fin.year}")
+    print("=" * 50)
+    print(f"Cruces de umbral: {len(eventos['cruces'])}")
+    print(f"Máximos críticos: {len(eventos['maximos'])}")
+    for maximo in eventos['maximos'][:10]:
+        print(f"  {maximo['fecha']:%Y-%m-%d %H:%M}  FTRT {maximo['ftrt']:.2f}  {maximo['nivel_riesgo']}")
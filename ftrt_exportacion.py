@@ -0,0 +1,433 @@
+"""
+Exportación de Series FTRT a NetCDF y FITS
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Serie diaria 1749-hoy con FTRT total y normalizada, nivel de riesgo,
+contribución de cada planeta, offset del baricentro e índice de tensión
+(analysis/barycenter_correlation.py):
+
+- NetCDF-4/HDF5 (con netCDF4 instalado): bloques de DIAS_CHUNK días con
+  compresión zlib + shuffle y metadatos CF-1.8 (unidades, calendario,
+  flag_values del nivel). Sin netCDF4 se escribe NetCDF-3 clásico con
+  scipy: sin compresión, pero legible con cualquier herramienta CF y
+  mapeable en memoria.
+- FITS: tabla binaria (BINTABLE) escrita directamente, con la convención
+  de tiempo FITS (TIMESYS/MJDREF). Sin compresión, para poder mapearla.
+
+La serie se calcula y escribe por tramos de un siglo, así que la memoria
+no depende del rango exportado. LectorSeries abre cualquiera de los tres
+formatos y lee ventanas de tiempo sin cargar el archivo.
+
+Uso:
+    python ftrt_exportacion.py ftrt_1749_2025.nc
+    python ftrt_exportacion.py ftrt_1749_2025.fits --desde 1900-01-01
+"""
+
+import os
+import unicodedata
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ftrt_efemerides import PLANETAS
+from utils.logger import ftrt_logger
+
+DESDE = '1749-01-01'
+DIAS_POR_TRAMO = 36525  # un siglo por llamada al motor
+DIAS_CHUNK = 3653  # ~10 años por bloque HDF5
+NIVEL_COMPRESION = 4
+BLOQUE_FITS = 2880
+EPOCA = np.datetime64('1970-01-01', 'D')
+MJD_EPOCA = 40587  # MJD de 1970-01-01
+
+# (variable, dtype, unidades, descripción); nombres de planetary_configurations
+VARIABLES = (
+    ('ftrt_total', np.float64, 'kg m-2', 'Factor de tensión relativa total (suma de M·R☉/d³)'),
+    ('ftrt_normalized', np.float64, '1', 'FTRT total normalizado por la contribución de Júpiter'),
+    ('risk_level', np.int8, '1', 'Nivel de riesgo FTRT'),
+) + tuple(
+    (f'{planeta}_ftrt', np.float32, 'kg m-2', f'Contribución de {planeta} al FTRT') for planeta in PLANETAS
+) + (
+    ('barycenter_offset', np.float32, '1', 'Offset del baricentro solar en radios solares'),
+    ('tension_index', np.float32, '1', 'Índice de tensión gravitacional de los planetas gigantes'),
+)
+
+
+def como_dia(fecha):
+    """datetime64[D] de una fecha; None es hoy (UTC)"""
+    return np.datetime64(fecha, 'D') if fecha is not None else np.datetime64(datetime.now(timezone.utc).date(), 'D')
+
+
+def series_ftrt(inicio=DESDE, fin=None, paso='D', calculador=None, filas_por_tramo=DIAS_POR_TRAMO,
+                variables=None):
+    """
+    Serie FTRT por tramos, diaria (paso='D') u horaria (paso='h')
+
+    Args:
+        inicio, fin: Primer y último día (incluidos); fin por defecto hoy (UTC)
+        variables: Subconjunto de VARIABLES (por defecto todas). El offset
+            del baricentro y el índice de tensión, lo más costoso, solo se
+            calculan si se piden
+
+    Yields:
+        dict con 'time' (datetime64[paso]) y un array por variable pedida
+    """
+    from ftrt_core import obtener_calculador_compartido
+
+    tipos = {nombre: tipo for nombre, tipo, _, _ in VARIABLES}
+    variables = list(tipos) if variables is None else list(variables)
+    desconocidas = [v for v in variables if v not in tipos]
+    if desconocidas:
+        raise ValueError(f"Variables desconocidas: {', '.join(desconocidas)}")
+
+    calculador = calculador or obtener_calculador_compartido()
+    analizador = None
+    if {'barycenter_offset', 'tension_index'} & set(variables):
+        from analysis.barycenter_correlation import BarycentricAnalyzer
+        analizador = BarycentricAnalyzer()
+    instantes = np.arange(como_dia(inicio).astype(f'datetime64[{paso}]'), (como_dia(fin) + 1).astype(f'datetime64[{paso}]'))
+    for i in range(0, len(instantes), filas_por_tramo):
+        tramo = instantes[i:i + filas_por_tramo]
+        rango = calculador.calcular_ftrt_rango(tramo.astype('datetime64[s]'))
+        columnas = {
+            'ftrt_total': rango['ftrt_total'],
+            'ftrt_normalized': rango['ftrt_normalizada'],
+            'risk_level': rango['nivel'],
+            **{f'{p}_ftrt': rango['contribuciones'][p] for p in PLANETAS},
+            **(analizador.barycenter_series(tramo.astype('datetime64[s]')) if analizador else {})
+        }
+        yield {'time': tramo, **{nombre: columnas[nombre].astype(tipos[nombre]) for nombre in variables}}
+
+
+def series_diarias(inicio=DESDE, fin=None, calculador=None, dias_por_tramo=DIAS_POR_TRAMO):
+    """Serie diaria por tramos (ver series_ftrt)"""
+    return series_ftrt(inicio, fin, 'D', calculador, dias_por_tramo)
+
+
+def _atributos_globales(calculador, inicio, fin):
+    from ftrt_core import obtener_calculador_compartido
+    calculador = calculador or obtener_calculador_compartido()
+    return {
+        'Conventions': 'CF-1.8',
+        'title': 'Serie diaria FTRT (factor de tensión relativa planetaria)',
+        'institution': 'HelioFisica-FTRT',
+        'source': f'FTRTCalculator {calculador.huella_modelo()}',
+        'history': f'{datetime.now(timezone.utc).isoformat(timespec="seconds")} ftrt_exportacion.py',
+        'time_coverage_start': str(inicio),
+        'time_coverage_end': str(fin)
+    }
+
+
+def _niveles(calculador):
+    """Nombres de NIVELES_RIESGO para flag_meanings (ASCII, sin espacios: 'CRÍTICO' → 'CRITICO')"""
+    return [_ascii(nombre).replace(' ', '_') for nombre, _ in calculador.NIVELES_RIESGO]
+
+
+def _atributos_variable(nombre, unidades, descripcion, calculador=None):
+    atributos = {'long_name': descripcion, 'units': unidades}
+    if nombre == 'risk_level':
+        from ftrt_core import obtener_calculador_compartido
+        niveles = _niveles(calculador or obtener_calculador_compartido())
+        atributos.update(flag_values=np.arange(len(niveles), dtype=np.int8), flag_meanings=' '.join(niveles))
+    return atributos
+
+
+def exportar_netcdf(ruta, inicio=DESDE, fin=None, calculador=None, dias_chunk=DIAS_CHUNK,
+                    nivel_compresion=NIVEL_COMPRESION):
+    """
+    Serie diaria en NetCDF (NetCDF-4 comprimido si está netCDF4; si no, NetCDF-3)
+
+    Returns:
+        dict con 'ruta', 'formato', 'dias' y 'bytes'
+    """
+    try:
+        import netCDF4
+    except ImportError:
+        netCDF4 = None
+    from scipy.io import netcdf_file
+
+    inicio_proceso = datetime.now()
+    inicio, fin = como_dia(inicio), como_dia(fin)
+    if fin < inicio:
+        raise ValueError(f"Rango vacío: {inicio} > {fin}")
+    n = int((fin - inicio).astype(int)) + 1
+    temporal = f'{ruta}.tmp'
+
+    if netCDF4 is not None:
+        formato = 'NETCDF4'
+        ds = netCDF4.Dataset(temporal, 'w', format=formato)
+        ds.createDimension('time', n)
+        crear = lambda nombre, tipo: ds.createVariable(
+            nombre, tipo, ('time',), zlib=True, complevel=nivel_compresion, shuffle=True,
+            chunksizes=(min(dias_chunk, n),))
+        fijar = lambda objeto, atributos: objeto.setncatts(atributos)
+    else:
+        formato = 'NETCDF3_64BIT_OFFSET'
+        ds = netcdf_file(temporal, 'w', version=2)
+        ds.createDimension('time', n)
+        crear = lambda nombre, tipo: ds.createVariable(nombre, np.dtype(tipo).char, ('time',))
+        # NetCDF-3: texto como bytes UTF-8 (scipy solo codifica ASCII)
+        fijar = lambda objeto, atributos: [
+            setattr(objeto, k, v.encode('utf-8') if isinstance(v, str) else v) for k, v in atributos.items()]
+
+    try:
+        fijar(ds, _atributos_globales(calculador, inicio, fin))
+        tiempo = crear('time', np.int32)
+        fijar(tiempo, {'standard_name': 'time', 'long_name': 'Día (00:00 UTC)', 'axis': 'T',
+                       'units': 'days since 1970-01-01 00:00:00', 'calendar': 'proleptic_gregorian'})
+        variables = {}
+        for nombre, tipo, unidades, descripcion in VARIABLES:
+            variables[nombre] = crear(nombre, tipo)
+            fijar(variables[nombre], _atributos_variable(nombre, unidades, descripcion, calculador))
+
+        posicion = 0
+        for tramo in series_diarias(inicio, fin, calculador):
+            fin_tramo = posicion + len(tramo['time'])
+            tiempo[posicion:fin_tramo] = (tramo['time'] - EPOCA).astype(np.int32)
+            for nombre, variable in variables.items():
+                variable[posicion:fin_tramo] = tramo[nombre]
+            posicion = fin_tramo
+    finally:
+        ds.close()
+    os.replace(temporal, ruta)
+
+    ftrt_logger.info(f"💾 Exportación {formato}: {n} días → {ruta} | "
+                     f"⏱️ {(datetime.now() - inicio_proceso).total_seconds():.3f}s")
+    return {'ruta': ruta, 'formato': formato, 'dias': n, 'bytes': os.path.getsize(ruta)}
+
+
+# ----------------------------------------------------------------------
+# FITS (tabla binaria, sin dependencias)
+# ----------------------------------------------------------------------
+
+FORMATOS_FITS = {np.dtype(np.float64): 'D', np.dtype(np.float32): 'E', np.dtype(np.int32): 'J',
+                 np.dtype(np.int8): 'B', np.dtype(np.uint8): 'B'}
+DTYPES_FITS = {'D': '>f8', 'E': '>f4', 'J': '>i4', 'B': 'u1', 'I': '>i2', 'K': '>i8'}
+
+
+def _ascii(texto):
+    """Las cabeceras FITS solo admiten ASCII imprimible"""
+    texto = unicodedata.normalize('NFKD', str(texto)).replace('☉', 'sun').replace('³', '3').replace('·', '*')
+    return texto.encode('ascii', 'ignore').decode()
+
+
+def _tarjeta(clave, valor=None, comentario=''):
+    """Registro de cabecera de 80 caracteres"""
+    if valor is None:  # COMMENT / HISTORY
+        return f'{clave:<8}{_ascii(comentario)}'.ljust(80)[:80]
+    if isinstance(valor, bool):
+        texto = f"{'T' if valor else 'F':>20}"
+    elif isinstance(valor, (int, np.integer)):
+        texto = f'{valor:>20}'
+    elif isinstance(valor, float):
+        texto = f'{valor:>20.12G}'
+    else:
+        texto = "'" + f"{_ascii(valor).replace(chr(39), chr(39) * 2):<8}" + "'"
+    tarjeta = f'{clave:<8}= {texto}'
+    if comentario:
+        tarjeta += f' / {_ascii(comentario)}'
+    return f'{tarjeta:<80}'[:80]
+
+
+def _cabecera(tarjetas):
+    texto = ''.join(tarjetas) + f"{'END':<80}"
+    texto += ' ' * (-len(texto) % BLOQUE_FITS)
+    return texto.encode('ascii')
+
+
+def exportar_fits(ruta, inicio=DESDE, fin=None, calculador=None):
+    """
+    Serie diaria como tabla binaria FITS (HDU 1, EXTNAME='FTRT')
+
+    TIME son días desde MJDREF (1970-01-01, UTC); el resto de columnas
+    usan los nombres y unidades de VARIABLES.
+
+    Returns:
+        dict con 'ruta', 'formato', 'dias' y 'bytes'
+    """
+    inicio_proceso = datetime.now()
+    inicio, fin = como_dia(inicio), como_dia(fin)
+    if fin < inicio:
+        raise ValueError(f"Rango vacío: {inicio} > {fin}")
+    n = int((fin - inicio).astype(int)) + 1
+
+    columnas = [('TIME', np.int32, 'd', 'Dia (00:00 UTC) desde MJDREF')] + [
+        (nombre.upper(), tipo, unidades, descripcion) for nombre, tipo, unidades, descripcion in VARIABLES
+    ]
+    formatos = [FORMATOS_FITS[np.dtype(tipo)] for _, tipo, _, _ in columnas]
+    fila = np.dtype([(nombre, DTYPES_FITS[f]) for (nombre, _, _, _), f in zip(columnas, formatos)])
+
+    primaria = [
+        _tarjeta('SIMPLE', True, 'conforms to FITS standard'), _tarjeta('BITPIX', 8), _tarjeta('NAXIS', 0),
+        _tarjeta('EXTEND', True), _tarjeta('ORIGIN', 'HelioFisica-FTRT'),
+        _tarjeta('DATE', datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'))
+    ]
+    atributos = _atributos_globales(calculador, inicio, fin)
+    tabla = [
+        _tarjeta('XTENSION', 'BINTABLE', 'binary table extension'), _tarjeta('BITPIX', 8),
+        _tarjeta('NAXIS', 2), _tarjeta('NAXIS1', fila.itemsize, 'bytes por fila'), _tarjeta('NAXIS2', n, 'dias'),
+        _tarjeta('PCOUNT', 0), _tarjeta('GCOUNT', 1), _tarjeta('TFIELDS', len(columnas)),
+        _tarjeta('EXTNAME', 'FTRT')
+    ]
+    for i, ((nombre, _, unidades, descripcion), formato) in enumerate(zip(columnas, formatos), 1):
+        tabla += [_tarjeta(f'TTYPE{i}', nombre, descripcion), _tarjeta(f'TFORM{i}', f'1{formato}')]
+        if unidades != '1':
+            tabla.append(_tarjeta(f'TUNIT{i}', unidades))
+    tabla += [
+        _tarjeta('TIMESYS', 'UTC'), _tarjeta('MJDREF', MJD_EPOCA), _tarjeta('TIMEUNIT', 'd'),
+        _tarjeta('DATE-BEG', str(inicio)), _tarjeta('DATE-END', str(fin)),
+        _tarjeta('ORIGIN', atributos['institution']), _tarjeta('CREATOR', atributos['source'][:68]),
+        _tarjeta('COMMENT', comentario=atributos['title'])
+    ]
+
+    temporal = f'{ruta}.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(_cabecera(primaria))
+        f.write(_cabecera(tabla))
+        escritos = 0
+        for tramo in series_diarias(inicio, fin, calculador):
+            filas = np.empty(len(tramo['time']), dtype=fila)
+            filas['TIME'] = (tramo['time'] - EPOCA).astype(np.int32)
+            for nombre, _, _, _ in VARIABLES:
+                filas[nombre.upper()] = tramo[nombre]
+            f.write(filas.tobytes())
+            escritos += filas.nbytes
+        f.write(b'\0' * (-escritos % BLOQUE_FITS))
+    os.replace(temporal, ruta)
+
+    ftrt_logger.info(f"💾 Exportación FITS: {n} días → {ruta} | "
+                     f"⏱️ {(datetime.now() - inicio_proceso).total_seconds():.3f}s")
+    return {'ruta': ruta, 'formato': 'FITS', 'dias': n, 'bytes': os.path.getsize(ruta)}
+
+
+def _leer_cabecera_fits(f):
+    """Tarjetas de un HDU hasta END; deja el archivo al inicio de los datos"""
+    tarjetas = {}
+    while True:
+        bloque = f.read(BLOQUE_FITS).decode('ascii')
+        if len(bloque) < BLOQUE_FITS:
+            raise ValueError("Cabecera FITS incompleta")
+        for i in range(0, BLOQUE_FITS, 80):
+            tarjeta = bloque[i:i + 80]
+            clave = tarjeta[:8].strip()
+            if clave == 'END':
+                return tarjetas
+            if tarjeta[8:10] == '= ':
+                valor = tarjeta[10:].split(' / ')[0].strip() if not tarjeta[10:].strip().startswith("'") \
+                    else tarjeta[10:].strip()[1:].split("'")[0].rstrip()
+                tarjetas.setdefault(clave, valor)
+
+
+# ----------------------------------------------------------------------
+# Lectura perezosa
+# ----------------------------------------------------------------------
+
+class LectorSeries:
+    """
+    Lee ventanas de tiempo de un archivo exportado sin cargarlo entero
+
+    NetCDF-4 se lee por bloques HDF5 (solo los que cubren la ventana);
+    NetCDF-3 y FITS se mapean en memoria.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with open(ruta, 'rb') as f:
+            firma = f.read(8)
+        self._ds = self._fits = None
+
+        if firma.startswith(b'SIMPLE'):
+            self.formato = 'FITS'
+            with open(ruta, 'rb') as f:
+                _leer_cabecera_fits(f)
+                cabecera = _leer_cabecera_fits(f)
+                desplazamiento = f.tell()
+            campos = int(cabecera['TFIELDS'])
+            dtype = np.dtype([(cabecera[f'TTYPE{i}'].lower(), DTYPES_FITS[cabecera[f'TFORM{i}'].lstrip('1')])
+                              for i in range(1, campos + 1)])
+            self._fits = np.memmap(ruta, dtype=dtype, mode='r', offset=desplazamiento,
+                                   shape=(int(cabecera['NAXIS2']),))
+            self._cabecera = cabecera
+            self.variables = tuple(n for n in dtype.names if n != 'time')
+            dias = np.asarray(self._fits['time'], dtype=np.int64)
+        elif firma.startswith(b'CDF'):
+            from scipy.io import netcdf_file
+            self.formato = 'NETCDF3'
+            self._ds = netcdf_file(ruta, 'r', mmap=True)
+            self.variables = tuple(n for n in self._ds.variables if n != 'time')
+            dias = np.array(self._ds.variables['time'][:], dtype=np.int64)
+        elif firma.startswith(b'\x89HDF'):
+            try:
+                import netCDF4
+            except ImportError:
+                raise ImportError("Leer NetCDF-4 requiere el paquete netCDF4 (pip install netCDF4)")
+            self.formato = 'NETCDF4'
+            self._ds = netCDF4.Dataset(ruta, 'r')
+            self._ds.set_auto_mask(False)
+            self.variables = tuple(n for n in self._ds.variables if n != 'time')
+            dias = np.asarray(self._ds.variables['time'][:], dtype=np.int64)
+        else:
+            raise ValueError(f"Formato no reconocido: {ruta}")
+
+        self.tiempo = EPOCA + dias.astype('timedelta64[D]')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def __len__(self):
+        return len(self.tiempo)
+
+    def cerrar(self):
+        if self._ds is not None:
+            self._ds.close()
+            self._ds = None
+        self._fits = None
+
+    def atributos(self, variable=None):
+        """Atributos globales o de una variable (en FITS, solo la cabecera de la tabla)"""
+        if self.formato == 'FITS':
+            return dict(self._cabecera)
+        objeto = self._ds if variable is None else self._ds.variables[variable]
+        if self.formato == 'NETCDF4':
+            return {k: objeto.getncattr(k) for k in objeto.ncattrs()}
+        return {k: v.decode('utf-8') if isinstance(v, bytes) else v for k, v in objeto._attributes.items()}
+
+    def ventana(self, inicio=None, fin=None, variables=None):
+        """
+        Días en [inicio, fin] (incluidos)
+
+        Returns:
+            dict con 'time' (datetime64[D]) y un array por variable pedida
+        """
+        variables = tuple(variables or self.variables)
+        desconocidas = set(variables) - set(self.variables)
+        if desconocidas:
+            raise ValueError(f"Variables desconocidas: {', '.join(sorted(desconocidas))}")
+        i0 = 0 if inicio is None else int(np.searchsorted(self.tiempo, np.datetime64(inicio, 'D'), side='left'))
+        i1 = len(self) if fin is None else int(np.searchsorted(self.tiempo, np.datetime64(fin, 'D'), side='right'))
+
+        resultado = {'time': self.tiempo[i0:i1]}
+        for nombre in variables:
+            if self._fits is not None:
+                valores = self._fits[nombre][i0:i1]
+            else:
+                valores = self._ds.variables[nombre][i0:i1]
+            resultado[nombre] = np.array(valores, dtype=np.asarray(valores).dtype.newbyteorder('='))
+        return resultado
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exporta la serie diaria FTRT a NetCDF o FITS")
+    parser.add_argument('ruta', help="Archivo de salida (.nc o .fits)")
+    parser.add_argument('--desde', default=DESDE)
+    parser.add_argument('--hasta', default=None)
+    args = parser.parse_args()
+
+    exportar = exportar_fits if args.ruta.lower().endswith(('.fits', '.fit', '.fts')) else exportar_netcdf
+    print(exportar(args.ruta, args.desde, args.hasta))
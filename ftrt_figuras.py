@@ -0,0 +1,328 @@
+"""
+Renderizado de Figuras FTRT sin Pantalla y en Paralelo
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Los informes nocturnos generan varias figuras matplotlib independientes
+(análisis baricéntrico por evento, patrones históricos, validación,
+comparativa). Este módulo las dibuja por lotes:
+
+- Backend Agg: no necesita pantalla y no depende de Tk/Qt en el servidor.
+- Un pool de procesos dibuja las figuras a la vez; cada tarea se describe
+  como 'modulo:funcion' o 'modulo:Clase.metodo', de modo que el proceso
+  hijo importa matplotlib/seaborn y el módulo por su cuenta.
+- Caché por huella de entrada: la función, sus argumentos, los formatos,
+  la resolución, el código fuente de los módulos del proyecto que importó
+  el último dibujo (diferencia de sys.modules respecto al estado inicial
+  del proceso que dibuja, guardada con la huella) y, si entre ellos está
+  ftrt_core, la huella del modelo (FTRTCalculator.huella_modelo()). Si la
+  huella no cambia y los archivos existen, la figura no se vuelve a
+  dibujar.
+
+Uso:
+    python ftrt_figuras.py --directorio data/figuras --procesos 4
+"""
+
+import hashlib
+import importlib
+import importlib.metadata
+import importlib.util
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+
+from utils.logger import ftrt_logger
+
+DIRECTORIO_FIGURAS = os.environ.get('FTRT_FIGURAS_DIR', os.path.join('data', 'figuras'))
+PROCESOS = int(os.environ.get('FTRT_FIGURAS_PROCESOS', os.cpu_count() or 1))
+FORMATOS = ('png', 'svg')
+INDICE = 'huellas.json'
+RAIZ_PROYECTO = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos cargados al arrancar el proceso del pool (None en el proceso principal)
+_MODULOS_INICIALES = None
+
+
+class TareaFigura:
+    """Una figura del informe: qué función la dibuja y con qué argumentos"""
+
+    def __init__(self, nombre, funcion, args=(), kwargs=None, formatos=('png',), dpi=150):
+        """
+        Args:
+            nombre (str): Nombre base de los archivos (sin extensión)
+            funcion (str): 'modulo:funcion' o 'modulo:Clase.metodo'; la clase
+                se instancia sin argumentos. Debe devolver la Figure
+            args, kwargs: Argumentos (deben poder serializarse con pickle)
+            formatos (tuple): Subconjunto de FORMATOS
+            dpi (int): Resolución de los PNG
+        """
+        formatos_invalidos = set(formatos) - set(FORMATOS)
+        if formatos_invalidos:
+            raise ValueError(f"Formatos no soportados: {', '.join(sorted(formatos_invalidos))}")
+        self.nombre = nombre
+        self.funcion = funcion
+        self.args = tuple(args)
+        self.kwargs = dict(kwargs or {})
+        self.formatos = tuple(formatos)
+        self.dpi = dpi
+
+    @property
+    def modulo(self):
+        return self.funcion.split(':', 1)[0]
+
+    def huella(self, modulos=()):
+        """
+        Huella de todo lo que determina el contenido de la figura
+
+        Args:
+            modulos: Módulos del proyecto que importó el último dibujo
+        """
+        if _huella_modulo(self.modulo) is None:
+            raise ValueError(f"Módulo no encontrado: {self.modulo}")
+        h = hashlib.sha1()
+        h.update(self.funcion.encode())
+        h.update(pickle.dumps((self.args, sorted(self.kwargs.items())), protocol=4))
+        h.update(repr((self.formatos, self.dpi, _version_matplotlib())).encode())
+        modulos = sorted(set(modulos) | {self.modulo})
+        for modulo in modulos:
+            # Un módulo que ya no existe cambia la huella y fuerza el redibujado
+            h.update(f'{modulo}={_huella_modulo(modulo)}'.encode())
+        if 'ftrt_core' in modulos:
+            from ftrt_core import obtener_calculador_compartido
+            h.update(obtener_calculador_compartido().huella_modelo().encode())
+        return h.hexdigest()[:16]
+
+    def rutas(self, directorio):
+        return [os.path.join(directorio, f'{self.nombre}.{formato}') for formato in self.formatos]
+
+
+@lru_cache(maxsize=None)
+def _huella_modulo(modulo):
+    """sha1 del código fuente del módulo, sin importarlo (None si no existe)"""
+    try:
+        spec = importlib.util.find_spec(modulo)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not os.path.exists(spec.origin):
+        return None
+    with open(spec.origin, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _es_modulo_proyecto(modulo):
+    """Módulo cargado desde el árbol del proyecto (sin tests ni entornos virtuales)"""
+    ruta = getattr(modulo, '__file__', None)
+    if not ruta:
+        return False
+    ruta = os.path.abspath(ruta)
+    relativa = os.path.relpath(ruta, RAIZ_PROYECTO)
+    return not (relativa.startswith(os.pardir) or relativa.split(os.sep)[0] == 'tests'
+                or 'site-packages' in relativa.split(os.sep))
+
+
+def _modulos_proyecto(excluir=()):
+    return sorted(
+        nombre for nombre, modulo in list(sys.modules.items())
+        if nombre != '__main__' and nombre not in excluir and _es_modulo_proyecto(modulo)
+    )
+
+
+@lru_cache(maxsize=1)
+def _version_matplotlib():
+    try:
+        return importlib.metadata.version('matplotlib')
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _configurar_backend():
+    """Agg antes de que nadie importe pyplot en este proceso"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _iniciar_proceso():
+    """Inicializador del pool: backend Agg y módulos de partida del proceso"""
+    global _MODULOS_INICIALES
+    _configurar_backend()
+    _MODULOS_INICIALES = frozenset(sys.modules)
+
+
+def _resolver(funcion):
+    modulo, nombre = funcion.split(':', 1)
+    objeto = importlib.import_module(modulo)
+    clase, _, metodo = nombre.rpartition('.')
+    if clase:
+        return getattr(getattr(objeto, clase)(), metodo)
+    return getattr(objeto, nombre)
+
+
+def _renderizar(funcion, args, kwargs, rutas, dpi):
+    """
+    Dibuja una figura y la guarda en cada ruta (se ejecuta en el pool)
+
+    Returns:
+        tuple: (segundos empleados, módulos del proyecto de los que depende)
+
+    En el pool, los módulos son los importados desde que arrancó el proceso:
+    incluye los de figuras anteriores del mismo proceso (como mucho se
+    redibuja de más), pero no deja fuera ninguno que esta figura necesite
+    y otra tarea hubiera importado antes. En el proceso principal no hay
+    estado de partida fiable y se toman todos los módulos del proyecto cargados.
+    """
+    _configurar_backend()
+    import matplotlib.pyplot as plt
+
+    inicio = datetime.now()
+    iniciales = _MODULOS_INICIALES or ()
+    figura = _resolver(funcion)(*args, **kwargs)
+    try:
+        for ruta in rutas:
+            formato = os.path.splitext(ruta)[1][1:]
+            temporal = f'{ruta}.tmp'
+            figura.savefig(temporal, format=formato, dpi=dpi, bbox_inches='tight')
+            os.replace(temporal, ruta)
+    finally:
+        plt.close(figura)
+    return (datetime.now() - inicio).total_seconds(), _modulos_proyecto(iniciales)
+
+
+def _leer_indice(directorio):
+    try:
+        with open(os.path.join(directorio, INDICE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_indice(directorio, indice):
+    ruta = os.path.join(directorio, INDICE)
+    with open(f'{ruta}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(indice, f, indent=2, sort_keys=True)
+    os.replace(f'{ruta}.tmp', ruta)
+
+
+def renderizar_figuras(tareas, directorio=DIRECTORIO_FIGURAS, procesos=PROCESOS, forzar=False):
+    """
+    Dibuja las figuras que hayan cambiado desde la última ejecución
+
+    Args:
+        tareas (list[TareaFigura]): Figuras del informe (nombres únicos)
+        directorio (str): Carpeta de salida; guarda también el índice de huellas
+        procesos (int): Tamaño del pool; con 1 se dibuja en este proceso (también con Agg)
+        forzar (bool): Ignorar la caché
+
+    Returns:
+        dict nombre -> {'estado': 'cache' | 'renderizada' | 'error', 'rutas',
+        'segundos', y 'error' si falló}. Un fallo no detiene el resto.
+    """
+    nombres = [tarea.nombre for tarea in tareas]
+    if len(set(nombres)) != len(nombres):
+        raise ValueError("Los nombres de las figuras deben ser únicos")
+
+    directorio = os.path.abspath(directorio)
+    os.makedirs(directorio, exist_ok=True)
+    indice = _leer_indice(directorio)
+    resultados = {}
+    pendientes = []
+    for tarea in tareas:
+        rutas = tarea.rutas(directorio)
+        anterior = indice.get(tarea.nombre)
+        vigente = (
+            not forzar and isinstance(anterior, dict)
+            and anterior.get('huella') == tarea.huella(anterior.get('modulos', ()))
+            and all(map(os.path.exists, rutas))
+        )
+        if vigente:
+            resultados[tarea.nombre] = {'estado': 'cache', 'rutas': rutas, 'segundos': 0.0}
+        else:
+            tarea.huella()  # valida el módulo antes de lanzar el pool
+            pendientes.append((tarea, rutas))
+
+    inicio = datetime.now()
+    if pendientes:
+        if procesos <= 1 or len(pendientes) == 1:
+            futuros = [(tarea, rutas, None) for tarea, rutas in pendientes]
+            pool = None
+        else:
+            # spawn: los hijos no heredan un backend gráfico ni el estado de pyplot
+            pool = ProcessPoolExecutor(
+                max_workers=min(procesos, len(pendientes)),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_iniciar_proceso
+            )
+            futuros = [
+                (tarea, rutas,
+                 pool.submit(_renderizar, tarea.funcion, tarea.args, tarea.kwargs, rutas, tarea.dpi))
+                for tarea, rutas in pendientes
+            ]
+
+        try:
+            for tarea, rutas, futuro in futuros:
+                try:
+                    if futuro is None:
+                        segundos, modulos = _renderizar(tarea.funcion, tarea.args, tarea.kwargs, rutas, tarea.dpi)
+                    else:
+                        segundos, modulos = futuro.result()
+                except Exception as e:
+                    ftrt_logger.error(f"❌ Figura {tarea.nombre}: {e}")
+                    indice.pop(tarea.nombre, None)
+                    resultados[tarea.nombre] = {'estado': 'error', 'rutas': [], 'segundos': 0.0,
+                                                'error': str(e)}
+                    continue
+                indice[tarea.nombre] = {'huella': tarea.huella(modulos), 'modulos': modulos}
+                resultados[tarea.nombre] = {'estado': 'renderizada', 'rutas': rutas, 'segundos': segundos}
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        _guardar_indice(directorio, indice)
+
+    renderizadas = sum(r['estado'] == 'renderizada' for r in resultados.values())
+    ftrt_logger.info(
+        f"🖼️ Figuras: {renderizadas} dibujadas, {len(tareas) - len(pendientes)} en caché "
+        f"| ⏱️ {(datetime.now() - inicio).total_seconds():.3f}s"
+    )
+    return {nombre: resultados[nombre] for nombre in nombres}
+
+
+def tareas_informe(formatos=('png',)):
+    """Figuras del informe nocturno"""
+    from analysis.barycenter_correlation import BarycentricAnalyzer
+
+    tareas = [
+        TareaFigura(f'baricentro_{evento}', 'analysis.barycenter_correlation:BarycentricAnalyzer.plot_event_analysis',
+                    args=(evento,), formatos=formatos)
+        for evento in BarycentricAnalyzer.MAJOR_EVENTS
+    ]
+    tareas += [
+        TareaFigura('patrones_historicos',
+                    'analysis.historical_patterns:FTRTHistoricalPatternAnalyzer.generate_visual_report',
+                    formatos=formatos),
+        TareaFigura('validacion_correlaciones', 'validation_suite:FTRTVisualization.plot_correlation_analysis',
+                    formatos=formatos),
+        TareaFigura('comparativa_ftrt', 'interactive_ftrt_enhanced:EnhancedFTRTAnalyzer.figura_comparativa_ftrt',
+                    formatos=formatos)
+    ]
+    return tareas
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera las figuras del informe FTRT")
+    parser.add_argument('--directorio', default=DIRECTORIO_FIGURAS)
+    parser.add_argument('--procesos', type=int, default=PROCESOS)
+    parser.add_argument('--formatos', nargs='+', choices=FORMATOS, default=['png'])
+    parser.add_argument('--forzar', action='store_true', help="Redibujar aunque no haya cambios")
+    args = parser.parse_args()
+
+    resultados = renderizar_figuras(tareas_informe(tuple(args.formatos)), args.directorio,
+                                    args.procesos, args.forzar)
+    for nombre, resultado in resultados.items():
+        detalle = resultado.get('error') or f"{resultado['segundos']:.2f}s"
+        print(f"{resultado['estado']:<12} {nombre:<32} {detalle}")
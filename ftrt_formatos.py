@@ -0,0 +1,182 @@
+"""
+Formatos Binarios Compactos para Series FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Negociación de contenido (cabecera Accept) y serialización de la salida de
+FTRTCalculator.calcular_ftrt_rango en formatos columnares:
+
+- application/vnd.apache.arrow.stream  Arrow IPC (requiere pyarrow)
+- application/msgpack                  MessagePack (requiere msgpack)
+- application/vnd.ftrt.packed          Arrays NumPy contiguos, sin dependencias
+
+En los tres el eje de tiempo es un desplazamiento entero en segundos desde
+una época (el primer instante de la serie) y las columnas numéricas se
+envían como float32 o float64 ('precision=32' en la cabecera Accept).
+"""
+
+import json
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+MEDIA_JSON = 'application/json'
+MEDIA_ARROW = 'application/vnd.apache.arrow.stream'
+MEDIA_MSGPACK = 'application/msgpack'
+MEDIA_PACKED = 'application/vnd.ftrt.packed'
+
+_ALIAS = {
+    'application/x-msgpack': MEDIA_MSGPACK,
+    'application/octet-stream': MEDIA_PACKED,
+}
+
+
+def formatos_disponibles():
+    """Tipos MIME servibles con las dependencias instaladas"""
+    formatos = [MEDIA_JSON, MEDIA_PACKED]
+    if msgpack is not None:
+        formatos.append(MEDIA_MSGPACK)
+    if pa is not None:
+        formatos.append(MEDIA_ARROW)
+    return formatos
+
+
+def negociar_formato(accept):
+    """
+    Elige el formato de respuesta a partir de la cabecera Accept
+
+    Args:
+        accept (str): Valor de la cabecera (None o vacío equivale a JSON)
+
+    Returns:
+        tuple (media_type, precision) o None si ningún tipo aceptado es servible
+    """
+    if not accept:
+        return MEDIA_JSON, 64
+
+    disponibles = formatos_disponibles()
+    candidatos = []
+    for orden, parte in enumerate(accept.split(',')):
+        tipo, *parametros = [p.strip() for p in parte.split(';')]
+        opciones = dict(p.split('=', 1) for p in parametros if '=' in p)
+        try:
+            calidad = float(opciones.get('q', 1))
+        except ValueError:
+            calidad = 0.0
+        if calidad > 0:
+            candidatos.append((-calidad, orden, tipo.lower(), opciones.get('precision', '64')))
+
+    for _, _, tipo, precision in sorted(candidatos):
+        tipo = _ALIAS.get(tipo, tipo)
+        if tipo in ('*/*', 'application/*'):
+            tipo = MEDIA_JSON
+        if tipo in disponibles:
+            return tipo, 32 if precision == '32' else 64
+    return None
+
+
+def _columnas(rango, precision):
+    """Eje de tiempo como desplazamientos y columnas numéricas tipadas"""
+    fechas = np.asarray(rango['fechas'], dtype='datetime64[s]')
+    epoca = fechas.min() if len(fechas) else np.datetime64(0, 's')
+    desplazamiento = (fechas - epoca).astype(np.int64)
+    if len(desplazamiento) and desplazamiento.max() <= np.iinfo(np.uint32).max:
+        desplazamiento = desplazamiento.astype(np.uint32)
+
+    tipo_real = np.float32 if precision == 32 else np.float64
+    columnas = {
+        'tiempo': desplazamiento,
+        'ftrt': np.asarray(rango['ftrt_normalizada'], dtype=tipo_real),
+        'nivel': np.asarray(rango['nivel'], dtype=np.uint8),
+    }
+    for planeta, valores in rango['contribuciones'].items():
+        columnas[f'contribucion_{planeta}'] = np.asarray(valores, dtype=tipo_real)
+    return str(epoca), columnas
+
+
+def _descriptor(columna):
+    return columna.dtype.newbyteorder('<').str
+
+
+def serializar_rango(rango, formato, precision=64, niveles=None):
+    """
+    Serializa la salida de calcular_ftrt_rango en un formato binario
+
+    Args:
+        rango (dict): Resultado de FTRTCalculator.calcular_ftrt_rango
+        formato (str): MEDIA_ARROW, MEDIA_MSGPACK o MEDIA_PACKED
+        precision (int): 32 o 64 bits para las columnas reales
+        niveles (list): Leyenda de los códigos de nivel (metadatos de Arrow
+            y MessagePack; el formato packed usa los mismos códigos que JSON)
+
+    Returns:
+        tuple (bytes, cabeceras)
+    """
+    epoca, columnas = _columnas(rango, precision)
+    n = len(columnas['tiempo'])
+    cabeceras = {'X-FTRT-Epoca': epoca, 'X-FTRT-N': str(n)}
+
+    if formato == MEDIA_ARROW:
+        if pa is None:
+            raise ValueError("Formato Arrow no disponible: instale pyarrow")
+        tabla = pa.table(columnas).replace_schema_metadata({
+            'epoca': epoca, 'niveles': json.dumps(niveles or [])
+        })
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+        return sink.getvalue().to_pybytes(), cabeceras
+
+    if formato == MEDIA_MSGPACK:
+        if msgpack is None:
+            raise ValueError("Formato MessagePack no disponible: instale msgpack")
+        cuerpo = {
+            'epoca': epoca,
+            'n': n,
+            'niveles': niveles or [],
+            'columnas': {
+                nombre: {'dtype': _descriptor(c), 'datos': c.astype(c.dtype.newbyteorder('<')).tobytes()}
+                for nombre, c in columnas.items()
+            }
+        }
+        return msgpack.packb(cuerpo, use_bin_type=True), cabeceras
+
+    if formato == MEDIA_PACKED:
+        # Columnas contiguas en little-endian; el orden y los tipos van en la cabecera
+        cabeceras['X-FTRT-Columnas'] = ','.join(
+            f'{nombre}:{_descriptor(c)}' for nombre, c in columnas.items()
+        )
+        cuerpo = b''.join(
+            c.astype(c.dtype.newbyteorder('<')).tobytes() for c in columnas.values()
+        )
+        return cuerpo, cabeceras
+
+    raise ValueError(f"Formato no soportado: {formato}")
+
+
+def leer_packed(cuerpo, cabeceras):
+    """
+    Decodifica una respuesta MEDIA_PACKED sin copias (np.frombuffer)
+
+    Returns:
+        dict con 'fechas' (datetime64[s]) y una vista por columna
+    """
+    n = int(cabeceras['X-FTRT-N'])
+    columnas, posicion = {}, 0
+    for definicion in cabeceras['X-FTRT-Columnas'].split(','):
+        nombre, tipo = definicion.split(':')
+        dtype = np.dtype(tipo)
+        columnas[nombre] = np.frombuffer(cuerpo, dtype=dtype, count=n, offset=posicion)
+        posicion += n * dtype.itemsize
+    columnas['fechas'] = (
+        np.datetime64(cabeceras['X-FTRT-Epoca'], 's') + columnas['tiempo'].astype('timedelta64[s]')
+    )
+    return columnas
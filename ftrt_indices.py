@@ -0,0 +1,376 @@
+"""
+Almacén de Series de Índices Geomagnéticos (Dst / Kp / AE)
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Guarda décadas de índices horarios o trihorarios en un bloque por año
+(data/indices/AAAA.npz):
+
+- Cada columna se guarda como enteros (Dst y AE en nT, Kp en tercios)
+  codificados en delta + zigzag con el tipo sin signo más pequeño que
+  los contiene. Las series geomagnéticas varían poco de una hora a la
+  siguiente, así que casi todo cabe en 8 o 16 bits y luego comprime.
+- Los instantes se codifican igual (deltas de 3600 s), y los valores
+  ausentes se marcan en un mapa de bits aparte.
+- indice.json guarda, por bloque, el rango de tiempo y el mínimo/máximo
+  de cada columna. Una consulta como "horas con Dst < -100" descarta sin
+  abrirlos los bloques cuyo mínimo no baja de -100 (predicate pushdown)
+  y en los demás decodifica solo las columnas que necesita.
+
+Uso:
+    python ftrt_indices.py --importar-db solar_ftrt_database.db
+    python ftrt_indices.py --importar dst_1957_2024.csv
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+from utils.logger import ftrt_logger
+
+DIRECTORIO_INDICES = os.environ.get('FTRT_INDICES_DIR', os.path.join('data', 'indices'))
+INDICE = 'indice.json'
+
+# Columna -> factor a entero (Kp en tercios: 5- = 4.67, 5o = 5, 5+ = 5.33)
+ESCALAS = {'dst_index': 1, 'kp_index': 3, 'ae_index': 1}
+OPERADORES = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal, '==': np.equal
+}
+
+
+def zigzag(valores):
+    """int64 con signo -> uint64 (0, -1, 1, -2... -> 0, 1, 2, 3...)"""
+    valores = np.asarray(valores, dtype=np.int64)
+    return ((valores << 1) ^ (valores >> 63)).astype(np.uint64)
+
+
+def deszigzag(codigos):
+    codigos = np.asarray(codigos, dtype=np.uint64)
+    return (codigos >> np.uint64(1)).astype(np.int64) ^ -(codigos & np.uint64(1)).astype(np.int64)
+
+
+def codificar_delta(valores):
+    """
+    Primer valor y deltas zigzag en el menor tipo sin signo posible
+
+    Returns:
+        (int, np.ndarray uint8/16/32/64)
+    """
+    valores = np.asarray(valores, dtype=np.int64)
+    if not len(valores):
+        return 0, np.empty(0, dtype=np.uint8)
+    deltas = zigzag(np.diff(valores))
+    maximo = int(deltas.max()) if len(deltas) else 0
+    for tipo in (np.uint8, np.uint16, np.uint32):
+        if maximo <= np.iinfo(tipo).max:
+            return int(valores[0]), deltas.astype(tipo)
+    return int(valores[0]), deltas
+
+
+def decodificar_delta(base, deltas, n):
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    valores = np.empty(n, dtype=np.int64)
+    valores[0] = base
+    np.cumsum(deszigzag(deltas), out=valores[1:])
+    valores[1:] += base
+    return valores
+
+
+def _segundos(fecha):
+    if fecha is None:
+        return None
+    if isinstance(fecha, (int, np.integer)):
+        return int(fecha)
+    return int(np.datetime64(fecha, 's').astype(np.int64))
+
+
+def _año(segundos):
+    return np.asarray(segundos, dtype=np.int64).astype('datetime64[s]').astype('datetime64[Y]').astype(np.int64) + 1970
+
+
+class AlmacenIndices:
+    """Series Dst/Kp/AE en bloques anuales comprimidos con estadísticas por bloque"""
+
+    def __init__(self, directorio=DIRECTORIO_INDICES):
+        self.directorio = directorio
+        self.indice = self._leer_indice()
+        self.ultima_consulta = {'bloques_leidos': 0, 'bloques_saltados': 0}
+
+    # ------------------------------------------------------------------
+    # Índice de bloques
+    # ------------------------------------------------------------------
+
+    def _leer_indice(self):
+        try:
+            with open(os.path.join(self.directorio, INDICE), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'escalas': ESCALAS, 'bloques': {}}
+
+    def _guardar_indice(self):
+        ruta = os.path.join(self.directorio, INDICE)
+        with open(f'{ruta}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.indice, f, indent=1, sort_keys=True)
+        os.replace(f'{ruta}.tmp', ruta)
+
+    @property
+    def bloques(self):
+        return self.indice['bloques']
+
+    def _ruta(self, año):
+        return os.path.join(self.directorio, f'{año:04d}.npz')
+
+    def _candidatos(self, inicio, fin):
+        """Años cuyo rango de tiempo se solapa con [inicio, fin)"""
+        años = []
+        for clave, bloque in sorted(self.bloques.items()):
+            if inicio is not None and bloque['fin'] < inicio:
+                continue
+            if fin is not None and bloque['inicio'] >= fin:
+                continue
+            años.append(int(clave))
+        return años
+
+    # ------------------------------------------------------------------
+    # Lectura y escritura de bloques
+    # ------------------------------------------------------------------
+
+    def _leer_bloque(self, año, columnas):
+        """(segundos int64, {columna: float64 con NaN})"""
+        with np.load(self._ruta(año)) as datos:
+            n = int(datos['n'])
+            tiempos = decodificar_delta(int(datos['tiempo.base']), datos['tiempo.deltas'], n)
+            valores = {}
+            for columna in columnas:
+                enteros = decodificar_delta(int(datos[f'{columna}.base']), datos[f'{columna}.deltas'], n)
+                validos = np.unpackbits(datos[f'{columna}.validos'], count=n).astype(bool)
+                serie = enteros / ESCALAS[columna]
+                serie[~validos] = np.nan
+                valores[columna] = serie
+        return tiempos, valores
+
+    def _escribir_bloque(self, año, tiempos, valores):
+        arrays = {'n': np.int64(len(tiempos))}
+        arrays['tiempo.base'], arrays['tiempo.deltas'] = codificar_delta(tiempos)
+        estadisticas = {'n': len(tiempos), 'inicio': int(tiempos[0]), 'fin': int(tiempos[-1]),
+                        'min': {}, 'max': {}, 'validos': {}}
+        for columna, serie in valores.items():
+            validos = ~np.isnan(serie)
+            enteros = np.where(validos, np.round(serie * ESCALAS[columna]), 0).astype(np.int64)
+            if validos.any():
+                # Huecos rellenos con el valor anterior: delta 0
+                ultimo = np.maximum.accumulate(np.where(validos, np.arange(len(serie)), 0))
+                enteros = enteros[ultimo]
+                estadisticas['min'][columna] = float(serie[validos].min())
+                estadisticas['max'][columna] = float(serie[validos].max())
+            estadisticas['validos'][columna] = int(validos.sum())
+            arrays[f'{columna}.base'], arrays[f'{columna}.deltas'] = codificar_delta(enteros)
+            arrays[f'{columna}.validos'] = np.packbits(validos)
+
+        ruta = self._ruta(año)
+        np.savez_compressed(f'{ruta}.tmp.npz', **arrays)
+        os.replace(f'{ruta}.tmp.npz', ruta)
+        self.bloques[str(año)] = estadisticas
+
+    def agregar(self, tiempos, **columnas):
+        """
+        Añade o corrige mediciones; un valor nuevo sustituye al guardado en
+        el mismo instante y NaN no borra lo existente
+
+        Args:
+            tiempos: datetime64 o segundos desde 1970
+            **columnas: Arrays de ESCALAS (dst_index, kp_index, ae_index) con NaN si faltan
+
+        Returns:
+            int: Bloques reescritos
+        """
+        desconocidas = set(columnas) - set(ESCALAS)
+        if desconocidas:
+            raise ValueError(f"Columnas desconocidas: {', '.join(sorted(desconocidas))}")
+        tiempos = np.asarray(tiempos)
+        if np.issubdtype(tiempos.dtype, np.datetime64):
+            tiempos = tiempos.astype('datetime64[s]').astype(np.int64)
+        tiempos = tiempos.astype(np.int64)
+        columnas = {c: np.asarray(v, dtype=np.float64) for c, v in columnas.items()}
+        if not len(tiempos):
+            return 0
+
+        os.makedirs(self.directorio, exist_ok=True)
+        años = _año(tiempos)
+        for año in np.unique(años):
+            seleccion = años == año
+            nuevos_t = tiempos[seleccion]
+            # Último valor de cada instante repetido
+            _, ultimos = np.unique(nuevos_t[::-1], return_index=True)
+            ultimos = len(nuevos_t) - 1 - ultimos
+            nuevos_t = nuevos_t[ultimos]
+            nuevos = {c: v[seleccion][ultimos] for c, v in columnas.items()}
+
+            if str(año) in self.bloques:
+                viejos_t, viejos = self._leer_bloque(int(año), ESCALAS)
+            else:
+                viejos_t, viejos = np.empty(0, dtype=np.int64), {c: np.empty(0) for c in ESCALAS}
+
+            union = np.union1d(viejos_t, nuevos_t)
+            valores = {}
+            for columna in ESCALAS:
+                serie = np.full(len(union), np.nan)
+                serie[np.searchsorted(union, viejos_t)] = viejos[columna]
+                if columna in nuevos:
+                    posiciones = np.searchsorted(union, nuevos_t)
+                    validos = ~np.isnan(nuevos[columna])
+                    serie[posiciones[validos]] = nuevos[columna][validos]
+                valores[columna] = serie
+            self._escribir_bloque(int(año), union, valores)
+
+        self._guardar_indice()
+        return len(np.unique(años))
+
+    # ------------------------------------------------------------------
+    # Importación
+    # ------------------------------------------------------------------
+
+    def importar_archivo(self, origen, formato=None, alias=None):
+        """CSV/NDJSON con columna 'time' (ver ftrt_catalogos.ESQUEMA_INDICES), bloque a bloque"""
+        from ftrt_catalogos import ESQUEMA_INDICES, FALTA_FECHA, Categorias, leer_por_bloques
+
+        inicio, filas = datetime.now(), 0
+        for bloque in leer_por_bloques(origen, ESQUEMA_INDICES, Categorias(), formato=formato, alias=alias):
+            bloque = bloque[bloque['time'] != FALTA_FECHA]
+            self.agregar(bloque['time'], **{c: bloque[c] for c in ESCALAS})
+            filas += len(bloque)
+        ftrt_logger.info(f"🧲 Índices importados: {filas} filas | ⏱️ {(datetime.now() - inicio).total_seconds():.3f}s")
+        return filas
+
+    def importar_sqlite(self, ruta_db, tamano_lote=65536):
+        """Tabla geomagnetic_indices de la base histórica (ver ftrt_ingesta.py)"""
+        filas = 0
+        conn = sqlite3.connect(ruta_db)
+        try:
+            cursor = conn.execute('SELECT time, dst_index, kp_index, ae_index FROM geomagnetic_indices ORDER BY time')
+            while True:
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    break
+                tiempos, dst, kp, ae = zip(*lote)
+                self.agregar(np.array(tiempos, dtype='datetime64[s]'),
+                             **{c: np.array(v, dtype=np.float64) for c, v in zip(ESCALAS, (dst, kp, ae))})
+                filas += len(lote)
+        finally:
+            conn.close()
+        return filas
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def leer(self, inicio=None, fin=None, columnas=tuple(ESCALAS)):
+        """
+        Serie en [inicio, fin)
+
+        Returns:
+            dict con 'tiempo' (datetime64[s]) y una columna float64 (NaN si falta) por nombre
+        """
+        inicio, fin = _segundos(inicio), _segundos(fin)
+        años = self._candidatos(inicio, fin)
+        self.ultima_consulta = {'bloques_leidos': len(años), 'bloques_saltados': len(self.bloques) - len(años)}
+
+        partes_t, partes = [], {c: [] for c in columnas}
+        for año in años:
+            tiempos, valores = self._leer_bloque(año, columnas)
+            mascara = np.ones(len(tiempos), dtype=bool)
+            if inicio is not None:
+                mascara &= tiempos >= inicio
+            if fin is not None:
+                mascara &= tiempos < fin
+            partes_t.append(tiempos[mascara])
+            for c in columnas:
+                partes[c].append(valores[c][mascara])
+
+        resultado = {'tiempo': np.concatenate(partes_t or [np.empty(0, np.int64)]).astype('datetime64[s]')}
+        for c in columnas:
+            resultado[c] = np.concatenate(partes[c] or [np.empty(0)])
+        return resultado
+
+    def filtrar(self, columna, operador, umbral, inicio=None, fin=None):
+        """
+        Instantes en que 'columna operador umbral' (p. ej. 'dst_index', '<', -100)
+
+        Solo se abren los bloques cuyo mínimo/máximo admite el predicado.
+
+        Returns:
+            dict con 'tiempo' y 'valores'
+        """
+        if columna not in ESCALAS:
+            raise ValueError(f"Columna desconocida: {columna} (use {', '.join(ESCALAS)})")
+        if operador not in OPERADORES:
+            raise ValueError(f"Operador no soportado: {operador} (use {' '.join(OPERADORES)})")
+        inicio, fin = _segundos(inicio), _segundos(fin)
+        comparar = OPERADORES[operador]
+
+        candidatos = self._candidatos(inicio, fin)
+        leidos = []
+        for año in candidatos:
+            bloque = self.bloques[str(año)]
+            if columna not in bloque['min']:
+                continue
+            minimo, maximo = bloque['min'][columna], bloque['max'][columna]
+            posible = {
+                '<': minimo < umbral, '<=': minimo <= umbral, '>': maximo > umbral,
+                '>=': maximo >= umbral, '==': minimo <= umbral <= maximo
+            }[operador]
+            if posible:
+                leidos.append(año)
+        self.ultima_consulta = {'bloques_leidos': len(leidos), 'bloques_saltados': len(self.bloques) - len(leidos)}
+
+        partes_t, partes_v = [], []
+        for año in leidos:
+            tiempos, valores = self._leer_bloque(año, (columna,))
+            serie = valores[columna]
+            with np.errstate(invalid='ignore'):
+                mascara = comparar(serie, umbral)
+            if inicio is not None:
+                mascara &= tiempos >= inicio
+            if fin is not None:
+                mascara &= tiempos < fin
+            partes_t.append(tiempos[mascara])
+            partes_v.append(serie[mascara])
+
+        return {
+            'tiempo': np.concatenate(partes_t or [np.empty(0, np.int64)]).astype('datetime64[s]'),
+            'valores': np.concatenate(partes_v or [np.empty(0)])
+        }
+
+    def resumen(self):
+        """Filas, rango y bytes en disco"""
+        if not self.bloques:
+            return {'filas': 0, 'bloques': 0, 'bytes': 0}
+        bloques = self.bloques.values()
+        return {
+            'filas': sum(b['n'] for b in bloques),
+            'bloques': len(self.bloques),
+            'desde': str(np.datetime64(min(b['inicio'] for b in bloques), 's')),
+            'hasta': str(np.datetime64(max(b['fin'] for b in bloques), 's')),
+            'bytes': sum(os.path.getsize(self._ruta(int(a))) for a in self.bloques)
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Almacén de índices geomagnéticos Dst/Kp/AE")
+    parser.add_argument('--directorio', default=DIRECTORIO_INDICES)
+    parser.add_argument('--importar', help="Archivo CSV/NDJSON con columna 'time'")
+    parser.add_argument('--importar-db', help="Base SQLite con la tabla geomagnetic_indices")
+    args = parser.parse_args()
+
+    almacen = AlmacenIndices(args.directorio)
+    if args.importar:
+        almacen.importar_archivo(args.importar)
+    if args.importar_db:
+        almacen.importar_sqlite(args.importar_db)
+    print(json.dumps(almacen.resumen(), indent=2))
@@ -0,0 +1,479 @@
+"""
+Ingesta Incremental de Catálogos Observacionales FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Carga listas de fulguraciones, índices Dst/Kp/AE y catálogos de CMEs
+desde archivos locales o desde un servidor HTTP (por ejemplo un espejo
+local) en la base histórica (historical_database.SolarFTRTDatabase):
+
+- Lectura en flujo, línea a línea (CSV o NDJSON); nunca se carga el
+  archivo entero en memoria.
+- Marca de agua por fuente en la tabla sync_state: el último instante
+  ingerido y, para archivos locales, el byte hasta el que se leyó. Si
+  el archivo solo ha crecido, la siguiente sincronización empieza ahí.
+  Si se reescribió, se relee entero y la deduplicación evita repetidos.
+  A una fuente HTTP se le pide lo posterior a la marca (parametro_desde)
+  y se descarta lo anterior si el servidor no filtra.
+- Escritura por lotes (executemany) en una sola transacción, con
+  INSERT OR IGNORE sobre una clave única por registro. Los índices
+  geomagnéticos se fusionan por instante: un valor definitivo sustituye
+  al provisional y columnas de fuentes distintas se combinan.
+- Las posiciones planetarias se calculan con el motor local (ftrt_core)
+  en vez de consultar NASA Horizons, desde la última fecha guardada.
+
+Uso:
+    python data/data_sync.py
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import urllib.parse
+import urllib.request
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from historical_database import SolarFTRTDatabase
+from utils.logger import ftrt_logger
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+RUTA_DB = os.environ.get('FTRT_INGESTA_DB', os.path.join(RAIZ, 'solar_ftrt_database.db'))
+RUTA_FUENTES = os.environ.get('FTRT_INGESTA_FUENTES')  # JSON con una lista de fuentes
+DESDE_POSICIONES = os.environ.get('FTRT_INGESTA_DESDE', '1749-01-01')
+TAMANO_LOTE = 5000
+DIAS_POR_TRAMO = 36525  # posiciones planetarias: un siglo por llamada al motor
+BYTES_CABECERA = 4096  # bytes iniciales y finales de lo leído comparados para detectar reescrituras
+PLANETAS = ('mercury', 'venus', 'earth', 'mars', 'jupiter', 'saturn', 'uranus', 'neptune')
+
+
+def _texto(valor):
+    valor = str(valor).strip()
+    return valor or None
+
+
+def _real(valor):
+    return float(valor)
+
+
+def _entero(valor):
+    return int(float(valor))
+
+
+def _booleano(valor):
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in ('true', '1', 'yes', 'si', 'sí')
+
+
+def _tiempo(valor):
+    """ISO UTC: 'YYYY-MM-DD' si el origen es una fecha, si no 'YYYY-MM-DDTHH:MM:SS'"""
+    texto = str(valor).strip()
+    instante = datetime.fromisoformat(texto)
+    if instante.tzinfo is not None:
+        instante = instante.astimezone(timezone.utc).replace(tzinfo=None)
+    if len(texto) == 10:
+        return instante.date().isoformat()
+    return instante.isoformat(timespec='seconds')
+
+
+# Tabla destino, columna de tiempo, conversión por columna y clave de deduplicación
+TIPOS = {
+    'fulguraciones': {
+        'tabla': 'solar_events',
+        'tiempo': 'event_date',
+        'columnas': {
+            'event_date': _tiempo, 'event_type': _texto, 'magnitude': _real,
+            'carrington_rotation': _entero, 'region_number': _entero, 'flare_class': _texto,
+            'cme_speed': _real, 'dst_index': _real, 'kp_index': _entero,
+            'aurora_latitude': _real, 'sources': _texto, 'verified': _booleano
+        },
+        'clave': ('event_date', 'event_type', 'flare_class', 'region_number')
+    },
+    'cme': {
+        'tabla': 'cme_events',
+        'tiempo': 'event_time',
+        'columnas': {
+            'event_time': _tiempo, 'cme_speed': _real, 'angular_width': _real,
+            'position_angle': _real, 'halo': _booleano, 'sources': _texto
+        },
+        'clave': ('event_time', 'position_angle')
+    },
+    'indices': {
+        'tabla': 'geomagnetic_indices',
+        'tiempo': 'time',
+        'columnas': {
+            'time': _tiempo, 'dst_index': _real, 'kp_index': _real, 'ae_index': _real, 'sources': _texto
+        },
+        'clave': None  # 'time' es la clave primaria; los valores se fusionan
+    }
+}
+
+
+class FuenteCatalogo:
+    """Un catálogo a sincronizar"""
+
+    def __init__(self, nombre, ubicacion, tipo, formato=None, alias=None, parametro_desde=None):
+        """
+        Args:
+            nombre (str): Identificador único (clave de su marca de agua)
+            ubicacion (str): Ruta local o URL http(s)
+            tipo (str): Una de TIPOS ('fulguraciones', 'cme', 'indices')
+            formato (str): 'csv' o 'ndjson'; por defecto según la extensión
+            alias (dict): Campo de origen -> columna, si los nombres difieren
+            parametro_desde (str): Parámetro de la URL con el que el servidor
+                filtra por fecha; recibe la marca de agua
+        """
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de catálogo desconocido: {tipo} (use {', '.join(TIPOS)})")
+        if formato is None:
+            formato = 'ndjson' if ubicacion.lower().endswith(('.ndjson', '.jsonl')) else 'csv'
+        if formato not in ('csv', 'ndjson'):
+            raise ValueError(f"Formato no soportado: {formato} (use csv o ndjson)")
+        self.nombre = nombre
+        self.ubicacion = ubicacion
+        self.tipo = tipo
+        self.formato = formato
+        self.alias = dict(alias or {})
+        self.parametro_desde = parametro_desde
+
+    @property
+    def remota(self):
+        return self.ubicacion.startswith(('http://', 'https://'))
+
+
+FUENTES_POR_DEFECTO = [
+    FuenteCatalogo('eventos_solares', os.path.join(RAIZ, 'data', 'solar_events.csv'), 'fulguraciones')
+]
+
+
+def cargar_fuentes(ruta):
+    """Lista de FuenteCatalogo desde un JSON [{'nombre', 'ubicacion', 'tipo', ...}]"""
+    with open(ruta, encoding='utf-8') as f:
+        return [FuenteCatalogo(**fuente) for fuente in json.load(f)]
+
+
+def _huella_prefijo(archivo, desplazamiento):
+    """
+    sha1 de lo ya leído para detectar reescrituras: los primeros y los
+    últimos BYTES_CABECERA bytes antes de 'desplazamiento'. Añadir al
+    final no los cambia; reescribir el archivo casi siempre sí.
+    """
+    archivo.seek(0)
+    huella = hashlib.sha1(archivo.read(min(desplazamiento, BYTES_CABECERA)))
+    if desplazamiento > BYTES_CABECERA:
+        inicio = max(BYTES_CABECERA, desplazamiento - BYTES_CABECERA)
+        archivo.seek(inicio)
+        huella.update(archivo.read(desplazamiento - inicio))
+    return huella.hexdigest()
+
+
+class _LectorLineas:
+    """Itera las líneas de un flujo binario y lleva el byte leído"""
+
+    def __init__(self, flujo, desplazamiento=0, solo_completas=False):
+        """
+        Args:
+            solo_completas (bool): Archivos locales: una última línea sin salto
+                puede estar a medio escribir, así que no se lee; la marca se
+                queda antes y se leerá completa en la siguiente sincronización
+        """
+        self.flujo = flujo
+        self.desplazamiento = desplazamiento
+        self.solo_completas = solo_completas
+
+    def __iter__(self):
+        for linea in self.flujo:
+            if not linea.endswith(b'\n'):
+                if self.solo_completas:
+                    return
+            else:
+                self.desplazamiento += len(linea)
+            yield linea.decode('utf-8')
+
+
+class SincronizadorDatos:
+    """Sincronización incremental de catálogos y posiciones planetarias"""
+
+    def __init__(self, ruta_db=RUTA_DB, fuentes=None, calculador=None):
+        """
+        Args:
+            ruta_db (str): Base SQLite histórica (se crea el esquema si falta)
+            fuentes (list[FuenteCatalogo]): Por defecto las de FTRT_INGESTA_FUENTES
+                o el catálogo de eventos de data/solar_events.csv
+            calculador (FTRTCalculator): Motor para las posiciones planetarias
+        """
+        self.ruta_db = ruta_db
+        if fuentes is None:
+            fuentes = cargar_fuentes(RUTA_FUENTES) if RUTA_FUENTES else FUENTES_POR_DEFECTO
+        self.fuentes = fuentes
+        self._calculador = calculador
+        SolarFTRTDatabase(ruta_db)
+
+    def _conectar(self):
+        return sqlite3.connect(self.ruta_db)
+
+    @staticmethod
+    def _estado(conn, fuente):
+        fila = conn.execute(
+            'SELECT high_water, byte_offset, head_hash, records FROM sync_state WHERE source = ?', (fuente,)
+        ).fetchone()
+        return fila or (None, 0, None, 0)
+
+    @staticmethod
+    def _guardar_estado(conn, fuente, marca, desplazamiento, cabecera, registros):
+        conn.execute(
+            '''INSERT INTO sync_state (source, high_water, byte_offset, head_hash, records, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(source) DO UPDATE SET high_water = excluded.high_water,
+                   byte_offset = excluded.byte_offset, head_hash = excluded.head_hash,
+                   records = excluded.records, updated_at = excluded.updated_at''',
+            (fuente, marca, desplazamiento, cabecera, registros, datetime.now().isoformat(timespec='seconds'))
+        )
+
+    def estado(self):
+        """Marca de agua de cada fuente sincronizada"""
+        with self._conectar() as conn:
+            filas = conn.execute(
+                'SELECT source, high_water, byte_offset, records, updated_at FROM sync_state ORDER BY source'
+            ).fetchall()
+        return {
+            fila[0]: {'marca': fila[1], 'desplazamiento': fila[2], 'registros': fila[3], 'actualizado': fila[4]}
+            for fila in filas
+        }
+
+    # ------------------------------------------------------------------
+    # Catálogos observacionales
+    # ------------------------------------------------------------------
+
+    def _filas_texto(self, flujo, fuente, cabecera=None):
+        """Registros (dict) de un iterable de líneas de texto"""
+        if fuente.formato == 'ndjson':
+            for linea in flujo:
+                if linea.strip():
+                    yield json.loads(linea)
+        else:
+            yield from csv.DictReader(flujo, fieldnames=cabecera)
+
+    def _leer_local(self, fuente, desplazamiento, huella_guardada):
+        """
+        Registros de un archivo desde 'desplazamiento' si lo ya leído no cambió
+
+        Returns:
+            (iterador de registros, lector con el byte alcanzado)
+        """
+        archivo = open(fuente.ubicacion, 'rb')
+        tamano = os.fstat(archivo.fileno()).st_size
+        if desplazamiento > tamano or _huella_prefijo(archivo, desplazamiento) != huella_guardada:
+            desplazamiento = 0
+
+        archivo.seek(0)
+        cabecera = None
+        if fuente.formato == 'csv':
+            primera = archivo.readline()
+            cabecera = next(csv.reader([primera.decode('utf-8')]))
+            desplazamiento = max(desplazamiento, len(primera))
+        archivo.seek(desplazamiento)
+
+        lector = _LectorLineas(archivo, desplazamiento, solo_completas=True)
+
+        def registros():
+            with archivo:
+                yield from self._filas_texto(lector, fuente, cabecera)
+
+        return registros(), lector
+
+    def _leer_remota(self, fuente, marca, timeout=30):
+        url = fuente.ubicacion
+        if fuente.parametro_desde and marca:
+            separador = '&' if '?' in url else '?'
+            url += separador + urllib.parse.urlencode({fuente.parametro_desde: marca})
+
+        respuesta = urllib.request.urlopen(url, timeout=timeout)
+
+        def registros():
+            with respuesta:
+                yield from self._filas_texto(_LectorLineas(respuesta), fuente)
+
+        return registros()
+
+    def _normalizar(self, registro, fuente, tipo):
+        """Fila con las columnas del tipo convertidas; ValueError si no es válida"""
+        if not isinstance(registro, dict):
+            raise ValueError(f"se esperaba un objeto, no {type(registro).__name__}")
+        if fuente.alias:
+            registro = {fuente.alias.get(campo, campo): valor for campo, valor in registro.items()}
+        fila = {}
+        for columna, conversion in tipo['columnas'].items():
+            valor = registro.get(columna)
+            if valor is None or (isinstance(valor, str) and not valor.strip()):
+                fila[columna] = None
+                continue
+            try:
+                fila[columna] = conversion(valor)
+            except (TypeError, ValueError):
+                raise ValueError(f"{columna}={valor!r}")
+        if fila[tipo['tiempo']] is None:
+            raise ValueError(f"Falta {tipo['tiempo']}")
+        return fila
+
+    @staticmethod
+    def _sentencia(tipo):
+        columnas = list(tipo['columnas'])
+        if tipo['clave']:
+            columnas = ['record_key'] + columnas
+            return (f"INSERT OR IGNORE INTO {tipo['tabla']} ({', '.join(columnas)}) "
+                    f"VALUES ({', '.join('?' * len(columnas))})"), columnas
+
+        # Índices: fusionar por instante sin reescribir filas que no cambian
+        valores = [c for c in columnas if c != tipo['tiempo']]
+        actualizacion = ', '.join(f'{c} = COALESCE(excluded.{c}, {c})' for c in valores)
+        cambia = ' OR '.join(f'(excluded.{c} IS NOT NULL AND excluded.{c} IS NOT {c})' for c in valores)
+        return (f"INSERT INTO {tipo['tabla']} ({', '.join(columnas)}) "
+                f"VALUES ({', '.join('?' * len(columnas))}) "
+                f"ON CONFLICT({tipo['tiempo']}) DO UPDATE SET {actualizacion} WHERE {cambia}"), columnas
+
+    def sincronizar_fuente(self, fuente):
+        """
+        Ingiere los registros nuevos de una fuente
+
+        Returns:
+            dict con 'leidos', 'nuevos' (filas insertadas o actualizadas),
+            'rechazados' y 'marca' (último instante ingerido)
+        """
+        tipo = TIPOS[fuente.tipo]
+        sentencia, columnas = self._sentencia(tipo)
+        inicio = datetime.now()
+
+        conn = self._conectar()
+        try:
+            marca, desplazamiento, huella, total = self._estado(conn, fuente.nombre)
+            lector = None
+            if fuente.remota:
+                registros = self._leer_remota(fuente, marca)
+            else:
+                registros, lector = self._leer_local(fuente, desplazamiento, huella)
+
+            leidos = rechazados = 0
+            nueva_marca = marca
+            cambios_previos = conn.total_changes
+            lote = []
+            for registro in registros:
+                leidos += 1
+                try:
+                    fila = self._normalizar(registro, fuente, tipo)
+                except ValueError as e:
+                    rechazados += 1
+                    if rechazados <= 5:
+                        ftrt_logger.warning(f"⚠️ {fuente.nombre}: registro {leidos} descartado ({e})")
+                    continue
+
+                instante = fila[tipo['tiempo']]
+                if fuente.remota and marca and instante < marca:
+                    continue  # el servidor no filtró por la marca: ya ingerido
+                if nueva_marca is None or instante > nueva_marca:
+                    nueva_marca = instante
+                if tipo['clave']:
+                    fila['record_key'] = '|'.join('' if fila[c] is None else str(fila[c]) for c in tipo['clave'])
+                lote.append(tuple(fila[c] for c in columnas))
+                if len(lote) >= TAMANO_LOTE:
+                    conn.executemany(sentencia, lote)
+                    lote = []
+            if lote:
+                conn.executemany(sentencia, lote)
+
+            nuevos = conn.total_changes - cambios_previos
+            desplazamiento, huella = 0, None
+            if lector:
+                desplazamiento = lector.desplazamiento
+                with open(fuente.ubicacion, 'rb') as archivo:
+                    huella = _huella_prefijo(archivo, desplazamiento)
+            self._guardar_estado(conn, fuente.nombre, nueva_marca, desplazamiento, huella, total + nuevos)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        ftrt_logger.info(
+            f"📥 Ingesta {fuente.nombre}: {leidos} leídos, {nuevos} nuevos, {rechazados} descartados "
+            f"| marca {nueva_marca} | ⏱️ {(datetime.now() - inicio).total_seconds():.3f}s"
+        )
+        return {'leidos': leidos, 'nuevos': nuevos, 'rechazados': rechazados, 'marca': nueva_marca}
+
+    def sincronizar_datos_solares(self):
+        """Sincroniza todas las fuentes; un fallo en una no detiene las demás"""
+        resultados = {}
+        for fuente in self.fuentes:
+            try:
+                resultados[fuente.nombre] = self.sincronizar_fuente(fuente)
+            except (OSError, ValueError, csv.Error, sqlite3.Error) as e:
+                ftrt_logger.error(f"❌ Ingesta {fuente.nombre}: {e}")
+                resultados[fuente.nombre] = {'error': str(e)}
+        return resultados
+
+    # ------------------------------------------------------------------
+    # Posiciones planetarias
+    # ------------------------------------------------------------------
+
+    @property
+    def calculador(self):
+        if self._calculador is None:
+            from ftrt_core import obtener_calculador_compartido
+            self._calculador = obtener_calculador_compartido()
+        return self._calculador
+
+    def sincronizar_posiciones_planetarias(self, hasta=None, desde=DESDE_POSICIONES):
+        """
+        FTRT diaria y contribución por planeta desde la última fecha guardada
+
+        Args:
+            hasta (date | str): Último día (incluido); por defecto hoy (UTC)
+            desde (date | str): Primer día si la tabla está vacía
+
+        Returns:
+            dict con 'nuevos' (días insertados) y 'marca'
+        """
+        hasta = date.fromisoformat(str(hasta)) if hasta else datetime.now(timezone.utc).date()
+        inicio_proceso = datetime.now()
+
+        conn = self._conectar()
+        try:
+            marca = self._estado(conn, 'posiciones_planetarias')[0]
+            inicio = date.fromisoformat(marca) + timedelta(days=1) if marca else date.fromisoformat(str(desde))
+            columnas = ['config_date', 'ftrt_total', 'ftrt_normalized'] + [f'{p}_ftrt' for p in PLANETAS]
+            sentencia = (f"INSERT OR IGNORE INTO planetary_configurations ({', '.join(columnas)}) "
+                         f"VALUES ({', '.join('?' * len(columnas))})")
+
+            cambios_previos = conn.total_changes
+            dias = np.arange(np.datetime64(inicio, 'D'), np.datetime64(hasta, 'D') + 1)
+            for i in range(0, len(dias), DIAS_POR_TRAMO):
+                tramo = dias[i:i + DIAS_POR_TRAMO]
+                rango = self.calculador.calcular_ftrt_rango(tramo.astype('datetime64[s]'))
+                contribuciones = [rango['contribuciones'][p] for p in PLANETAS]
+                conn.executemany(sentencia, zip(
+                    tramo.astype(str).tolist(), rango['ftrt_total'].tolist(),
+                    rango['ftrt_normalizada'].tolist(), *(c.tolist() for c in contribuciones)
+                ))
+
+            nuevos = conn.total_changes - cambios_previos
+            if len(dias):
+                marca = str(dias[-1])
+                total = self._estado(conn, 'posiciones_planetarias')[3] + nuevos
+                self._guardar_estado(conn, 'posiciones_planetarias', marca, 0, None, total)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        ftrt_logger.info(
+            f"🪐 Posiciones planetarias: {nuevos} días nuevos hasta {marca} "
+            f"| ⏱️ {(datetime.now() - inicio_proceso).total_seconds():.3f}s"
+        )
+        return {'nuevos': nuevos, 'marca': marca}
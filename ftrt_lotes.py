@@ -0,0 +1,105 @@
+"""
+Consultas FTRT por Lotes para las APIs
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Expande una consulta con fechas sueltas y/o rangos a un único array de
+instantes y la resuelve con una sola llamada a calcular_ftrt_rango. La
+respuesta es columnar: arrays paralelos en lugar de un objeto por fecha.
+"""
+
+import math
+import os
+import numpy as np
+from datetime import datetime
+
+from ftrt_efemerides import dias_desde_j2000, dias_a_datetime64
+
+MAX_FECHAS_LOTE = int(os.environ.get('FTRT_MAX_FECHAS_LOTE', 20000))
+
+
+def expandir_consulta_lote(consulta, max_fechas=MAX_FECHAS_LOTE):
+    """
+    Convierte el cuerpo de una consulta por lotes en un array datetime64[s]
+
+    Args:
+        consulta (dict): {'fechas': [...], 'rangos': [{'inicio', 'fin', 'paso_horas'}]}
+            Los rangos incluyen ambos extremos; paso_horas por defecto 24.
+        max_fechas (int): Máximo de instantes admitidos
+
+    Returns:
+        np.ndarray datetime64[s] con las fechas sueltas seguidas de los rangos
+
+    Raises:
+        ValueError: Consulta vacía, mal formada o por encima de max_fechas
+    """
+    if not isinstance(consulta, dict):
+        raise ValueError("El cuerpo debe ser un objeto JSON con 'fechas' y/o 'rangos'")
+
+    fechas = consulta.get('fechas') or []
+    rangos = consulta.get('rangos') or []
+    if not isinstance(fechas, list) or not isinstance(rangos, list):
+        raise ValueError("'fechas' y 'rangos' deben ser listas")
+
+    total = len(fechas)
+    # Antes de parsear: el coste de _a_datetime64 crece con la lista
+    if total > max_fechas:
+        raise ValueError(f"La consulta supera el máximo de {max_fechas} fechas")
+
+    partes = []
+    try:
+        if fechas:
+            partes.append(_a_datetime64(fechas))
+        for rango in rangos:
+            inicio, fin = _a_datetime64([rango['inicio'], rango['fin']])
+            paso_horas = float(rango.get('paso_horas', 24))
+            if not math.isfinite(paso_horas):
+                raise ValueError("paso_horas debe ser un número finito")
+            paso = np.timedelta64(int(round(paso_horas * 3600)), 's')
+            if paso <= np.timedelta64(0, 's') or fin < inicio:
+                raise ValueError("Rango inválido: requiere inicio <= fin y paso_horas > 0")
+            total += int((fin - inicio) // paso) + 1
+            if total > max_fechas:
+                break
+            partes.append(np.arange(inicio, fin + paso, paso)[:int((fin - inicio) // paso) + 1])
+    except (KeyError, TypeError, OverflowError) as e:
+        raise ValueError(f"Consulta por lotes mal formada: {e}")
+
+    if total == 0:
+        raise ValueError("La consulta no contiene fechas")
+    if total > max_fechas:
+        raise ValueError(f"La consulta supera el máximo de {max_fechas} fechas")
+
+    return np.concatenate(partes)
+
+
+def _a_datetime64(valores):
+    """Fechas ISO 8601 (con o sin zona horaria) o datetime a datetime64[s] UTC"""
+    try:
+        instantes = [
+            datetime.fromisoformat(v) if isinstance(v, str) else v for v in valores
+        ]
+        return dias_a_datetime64(dias_desde_j2000(np.array(instantes, dtype=object)))
+    except Exception:
+        raise ValueError("Fecha inválida: use ISO 8601 (YYYY-MM-DD o YYYY-MM-DDTHH:MM:SS)")
+
+
+def respuesta_columnar(calculador, fechas):
+    """
+    Calcula el lote y lo devuelve como columnas paralelas serializables a JSON
+
+    Returns:
+        dict con 'n', 'fechas' (ISO UTC), 'ftrt', 'nivel' (códigos),
+        'niveles' (leyenda de códigos) y 'contribuciones' (planeta -> lista)
+    """
+    rango = calculador.calcular_ftrt_rango(fechas)
+    return {
+        'n': int(len(rango['fechas'])),
+        'fechas': np.datetime_as_string(rango['fechas'], unit='s').tolist(),
+        'ftrt': rango['ftrt_normalizada'].tolist(),
+        'nivel': rango['nivel'].tolist(),
+        'niveles': [nombre for nombre, _ in calculador.NIVELES_RIESGO],
+        'contribuciones': {
+            planeta: valores.tolist() for planeta, valores in rango['contribuciones'].items()
+        }
+    }
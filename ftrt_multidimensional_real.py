@@ -12,7 +12,7 @@ import os
 # Importar el FTRT real del sistema original
 sys.path.append('.')
 try:
-    from ftrt_core import FTRTCalculator
+    from ftrt_core import FTRTCalculator, obtener_calculador_compartido
     print("✅ Usando FTRT real del sistema")
 except:
     print("⚠️  Usando cálculo simplificado")
@@ -20,7 +20,7 @@ except:
 class FTRTMultidimensionalReal:
     """FTRT multidimensional con cálculos REALES"""
     
-    def __init__(self):
+    def __init__(self, calculator_real=None):
         self.planetas_disparadores = {
             'MARTE': {'peso': 1.2, 'rol': 'Activador rápido'},
             'VENUS': {'peso': 1.1, 'rol': 'Modulador frecuencia'}, 
@@ -28,9 +28,9 @@ class FTRTMultidimensionalReal:
             'SATURNO': {'peso': 1.3, 'rol': 'Estructurador patrones'}
         }
         
-        # Intentar usar calculadora real
+        # Intentar usar calculadora real (compartida entre instancias)
         try:
-            self.calculator_real = FTRTCalculator()
+            self.calculator_real = calculator_real or obtener_calculador_compartido()
             self.uso_real = True
         except:
             self.uso_real = False
@@ -140,10 +140,17 @@ class FTRTMultidimensionalReal:
 # INTERFAZ SUPER FÁCIL
 # =============================================================================
 
+_calculador_multidimensional = None
+
+def _obtener_calculador():
+    global _calculador_multidimensional
+    if _calculador_multidimensional is None:
+        _calculador_multidimensional = FTRTMultidimensionalReal()
+    return _calculador_multidimensional
+
 def analizar_ftrt_completo(fecha, planeta=None):
     """Función principal super fácil"""
-    calculador = FTRTMultidimensionalReal()
-    return calculador.calcular_ftrt_multidimensional(fecha, planeta)
+    return _obtener_calculador().calcular_ftrt_multidimensional(fecha, planeta)
 
 def mostrar_analisis_completo(fecha, planeta="JUPITER"):
     """Muestra análisis completo de forma bonita"""
@@ -166,7 +173,7 @@ def mostrar_analisis_completo(fecha, planeta="JUPITER"):
         print(f"   • 📍 Alineación {planeta}: {resultado['alineacion_data']['alineacion']:.1f}%")
     
     print("\n🔍 ALINEACIONES TODOS LOS PLANETAS:")
-    calculador = FTRTMultidimensionalReal()
+    calculador = _obtener_calculador()
     for p in ['MARTE', 'VENUS', 'JUPITER', 'SATURNO']:
         alineacion = calculador.calcular_alineacion_directa(p, fecha)
         if alineacion:
@@ -3,10 +3,222 @@ Ciclos Planetarios Mayores y Convergencias Cósmicas
 Autores: Benjamin Cabeza Duran / DeepSeek
 Fecha: Octubre 2025
 """
+import os
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import combinations, product
+from scipy.optimize import bisect, minimize_scalar
 import ephem
+from ftrt_efemerides import EfemeridesVectorizadas, dias_desde_j2000, dias_a_datetime, DIAS_POR_SIGLO
+
+ZODIAC_SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+                'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+ZODIAC_ELEMENTS = ['Fire', 'Earth', 'Air', 'Water']
+PRECESSION_DEG_PER_CENTURY = 1.396971
+
+def _wrap_angle(angle):
+    """Reduce ángulos a (-π, π]"""
+    return np.pi - np.mod(np.pi - angle, 2 * np.pi)
+
+def _circular_spread(longitudes):
+    """Arco mínimo que contiene todas las longitudes (filas = instantes)"""
+    ordered = np.sort(longitudes, axis=1)
+    gaps = np.diff(ordered, axis=1)
+    wrap_gap = ordered[:, :1] + 2 * np.pi - ordered[:, -1:]
+    return 2 * np.pi - np.max(np.concatenate([gaps, wrap_gap], axis=1), axis=1)
+
+def _pair_separation(ephemeris, body_a, body_b, offset, days):
+    lon = ephemeris.longitudes_heliocentricas(days, [body_a, body_b])
+    return _wrap_angle(lon[body_a] - lon[body_b] - offset)
+
+def _alignment_excess(ephemeris, bodies, tolerance, days):
+    lon = ephemeris.longitudes_heliocentricas(days, bodies)
+    return _circular_spread(np.column_stack([lon[b] for b in bodies])) - tolerance
+
+def _search_pair_chunk(args):
+    """Raíces de la separación angular de un par dentro de un tramo de la malla"""
+    body_a, body_b, offset, days = args
+    ephemeris = EfemeridesVectorizadas()
+    separation = _pair_separation(ephemeris, body_a, body_b, offset, days)
+    # Un cambio de signo cerca de ±π es el salto de la reducción angular, no una raíz
+    crossing = np.signbit(separation[:-1]) != np.signbit(separation[1:])
+    continuous = np.abs(separation[:-1] - separation[1:]) < np.pi
+    return [
+        bisect(lambda d: _pair_separation(ephemeris, body_a, body_b, offset, d)[0],
+               days[i], days[i + 1], xtol=1e-6)
+        for i in np.flatnonzero(crossing & continuous)
+    ]
+
+def _search_alignment_chunk(args):
+    """Entradas/salidas de la ventana de alineación dentro de un tramo de la malla"""
+    bodies, tolerance, days = args
+    ephemeris = EfemeridesVectorizadas()
+    excess = _alignment_excess(ephemeris, bodies, tolerance, days)
+    inside = excess < 0
+    return [
+        (bisect(lambda d: _alignment_excess(ephemeris, bodies, tolerance, d)[0],
+                days[i], days[i + 1], xtol=1e-6), bool(inside[i + 1]))
+        for i in np.flatnonzero(inside[:-1] != inside[1:])
+    ]
+
+def _radial_trend(ephemeris, body, days):
+    """Variación de la distancia al Sol en un día (negativa: el planeta se acerca)"""
+    days = np.atleast_1d(np.asarray(days, dtype=float))
+    positions = ephemeris.posiciones_heliocentricas(np.concatenate([days - 0.5, days + 0.5]), [body])[body]
+    radius = np.linalg.norm(positions, axis=1)
+    return radius[len(days):] - radius[:len(days)]
+
+def _search_perihelion_chunk(args):
+    """Pasos por el perihelio (dr/dt de negativo a positivo) dentro de un tramo de la malla"""
+    body, days = args
+    ephemeris = EfemeridesVectorizadas()
+    trend = _radial_trend(ephemeris, body, days)
+    return [
+        bisect(lambda d: _radial_trend(ephemeris, body, d)[0], days[i], days[i + 1], xtol=1e-6)
+        for i in np.flatnonzero((trend[:-1] < 0) & (trend[1:] >= 0))
+    ]
+
+class PlanetaryEventSearch:
+    """
+    Búsqueda de conjunciones, oposiciones y alineaciones heliocéntricas reales
+
+    Muestrea longitudes con EfemeridesVectorizadas en una malla regular,
+    reparte la malla entre procesos y refina cada cambio de signo de la
+    separación angular por bisección.
+    """
+    def __init__(self, step_days=1.0, workers=None, calculator=None):
+        self.step_days = step_days
+        self.workers = workers or os.cpu_count() or 1
+        self._calculator = calculator
+    @property
+    def calculator(self):
+        if self._calculator is None:
+            from ftrt_core import FTRTCalculator
+            self._calculator = FTRTCalculator()
+        return self._calculator
+    def _grid_chunks(self, start_year, end_year):
+        """Malla global dividida en tramos que comparten su muestra de borde"""
+        start = dias_desde_j2000(np.datetime64(f'{start_year:04d}-01-01'))
+        end = dias_desde_j2000(np.datetime64(f'{end_year + 1:04d}-01-01'))
+        days = np.arange(start, end + self.step_days, self.step_days)
+        n_chunks = min(self.workers * 4, max(1, len(days) // 1000))
+        bounds = np.linspace(0, len(days) - 1, n_chunks + 1).astype(int)
+        return [days[a:b + 1] for a, b in zip(bounds[:-1], bounds[1:])]
+    def _map(self, function, tasks):
+        if self.workers == 1 or len(tasks) == 1:
+            return [function(task) for task in tasks]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(function, tasks))
+    def _ftrt_at(self, days):
+        if len(days) == 0:
+            return np.array([])
+        return self.calculator.calcular_ftrt_rango(np.asarray(days))['ftrt_normalizada']
+    def find_conjunctions(self, body_a='jupiter', body_b='saturn', start_year=1600,
+                          end_year=2100, include_oppositions=True):
+        """
+        Conjunciones (y oposiciones) heliocéntricas exactas de un par de planetas
+
+        Returns:
+            list de dicts con 'date', 'type', 'bodies', 'longitude' (grados
+            eclípticos J2000) y 'ftrt', ordenados por fecha
+        """
+        offsets = {'conjunction': 0.0}
+        if include_oppositions:
+            offsets['opposition'] = np.pi
+        chunks = self._grid_chunks(start_year, end_year)
+
+        found = []
+        for event_type, offset in offsets.items():
+            tasks = [(body_a, body_b, offset, chunk) for chunk in chunks]
+            for roots in self._map(_search_pair_chunk, tasks):
+                found.extend((day, event_type) for day in roots)
+        found.sort()
+
+        days = np.array([day for day, _ in found])
+        longitudes = EfemeridesVectorizadas().longitudes_heliocentricas(days, [body_a])[body_a] if found else []
+        ftrt = self._ftrt_at(days)
+        return [
+            {
+                'date': dias_a_datetime(day),
+                'type': event_type,
+                'bodies': (body_a, body_b),
+                'longitude': float(np.degrees(longitudes[i])),
+                'ftrt': float(ftrt[i])
+            }
+            for i, (day, event_type) in enumerate(found)
+        ]
+    def find_alignments(self, bodies=('jupiter', 'saturn', 'uranus', 'neptune'),
+                        tolerance_deg=30.0, start_year=1600, end_year=2100):
+        """
+        Ventanas en que todos los planetas caben en un arco de tolerance_deg
+
+        Returns:
+            list de dicts con 'start', 'end', 'date' (mínima dispersión),
+            'spread' (grados), 'bodies' y 'ftrt' en el instante de 'date'
+        """
+        bodies = list(bodies)
+        tolerance = np.radians(tolerance_deg)
+        chunks = self._grid_chunks(start_year, end_year)
+        tasks = [(bodies, tolerance, chunk) for chunk in chunks]
+        transitions = sorted(t for part in self._map(_search_alignment_chunk, tasks) for t in part)
+
+        ephemeris = EfemeridesVectorizadas()
+        first_day, last_day = chunks[0][0], chunks[-1][-1]
+        if transitions and not transitions[0][1]:
+            transitions.insert(0, (first_day, True))
+        elif not transitions and _alignment_excess(ephemeris, bodies, tolerance, first_day)[0] < 0:
+            transitions.insert(0, (first_day, True))
+        if transitions and transitions[-1][1]:
+            transitions.append((last_day, False))
+
+        windows = []
+        for (enter, _), (leave, _) in zip(transitions[0::2], transitions[1::2]):
+            best = minimize_scalar(
+                lambda d: _alignment_excess(ephemeris, bodies, 0.0, d)[0],
+                bounds=(enter, leave), method='bounded', options={'xatol': 1e-5}
+            )
+            windows.append((enter, leave, best.x, best.fun))
+
+        ftrt = self._ftrt_at([w[2] for w in windows])
+        return [
+            {
+                'start': dias_a_datetime(enter),
+                'end': dias_a_datetime(leave),
+                'date': dias_a_datetime(peak),
+                'spread': float(np.degrees(spread)),
+                'bodies': tuple(bodies),
+                'ftrt': float(ftrt[i])
+            }
+            for i, (enter, leave, peak, spread) in enumerate(windows)
+        ]
+    def find_perihelia(self, body='jupiter', start_year=1600, end_year=2100):
+        """
+        Pasos por el perihelio de un planeta (mínimos de su distancia al Sol)
+
+        Returns:
+            list de dicts con 'date', 'type', 'bodies', 'distance' (UA) y
+            'ftrt', ordenados por fecha
+        """
+        tasks = [(body, chunk) for chunk in self._grid_chunks(start_year, end_year)]
+        days = np.array(sorted(d for part in self._map(_search_perihelion_chunk, tasks) for d in part))
+        if len(days) == 0:
+            return []
+        positions = EfemeridesVectorizadas().posiciones_heliocentricas(days, [body])[body]
+        distances = np.linalg.norm(positions, axis=1)
+        ftrt = self._ftrt_at(days)
+        return [
+            {
+                'date': dias_a_datetime(day),
+                'type': 'perihelion',
+                'bodies': (body,),
+                'distance': float(distances[i]),
+                'ftrt': float(ftrt[i])
+            }
+            for i, day in enumerate(days)
+        ]
 class MajorPlanetaryCycles:
     def __init__(self):
         self.cycles_data = {}
@@ -55,72 +267,58 @@ class MajorPlanetaryCycles:
                 'historical_events': []
             }
         }
-    def calculate_jupiter_saturn_conjunctions(self, start_year=1600, end_year=2100):
-        """Calcula las Grandes Conjunciones Júpiter-Saturno"""
+    def calculate_jupiter_saturn_conjunctions(self, start_year=1600, end_year=2100, search=None):
+        """Calcula las Grandes Conjunciones Júpiter-Saturno a partir de las efemérides"""
+        search = search or PlanetaryEventSearch()
+        events = search.find_conjunctions('jupiter', 'saturn', start_year, end_year,
+                                          include_oppositions=False)
         conjunctions = []
-        # Elementos orbitales aproximados para cálculo
-        jupiter_period = 11.8618
-        saturn_period = 29.4571
-        current_year = start_year
-        while current_year <= end_year:
-            # Las conjunciones ocurren aproximadamente cada 20 años
-            if current_year % 20 == 0:
-                conjunctions.append({
-                    'year': current_year,
-                    'constellation': self._get_conjunction_constellation(current_year),
-                    'type': 'Standard Conjunction',
-                    'significance': 'Medium'
-                })
-            # Conjunciones en signos de fuego (Gran Mutación)
-            if current_year in [1603, 1623, 1643, 1663, 1683, 1703, 1723, 1743, 1763, 1783, 
-                              1803, 1823, 1843, 1863, 1883, 1903, 1923, 1943, 1963, 1983, 
-                              2000, 2020, 2040, 2060, 2080, 2100]:
-                conjunctions.append({
-                    'year': current_year,
-                    'constellation': self._get_conjunction_constellation(current_year),
-                    'type': 'Great Mutation',
-                    'significance': 'High'
-                })
-            current_year += 1
+        previous_element = None
+        for event in events:
+            sign, element = self._get_zodiac_position(event['longitude'], event['date'])
+            # Gran Mutación: la conjunción cambia de elemento respecto a la anterior
+            mutation = previous_element is not None and element != previous_element
+            conjunctions.append({
+                'year': event['date'].year,
+                'date': event['date'],
+                'constellation': sign,
+                'element': element,
+                'type': 'Great Mutation' if mutation else 'Standard Conjunction',
+                'significance': 'High' if mutation else 'Medium',
+                'ftrt': event['ftrt']
+            })
+            previous_element = element
         return conjunctions
-    def _get_conjunction_constellation(self, year):
-        """Determina la constelación de la conjunción"""
-        # Ciclo de 800 años através de los elementos
-        fire_signs = ['Aries', 'Leo', 'Sagittarius']
-        earth_signs = ['Taurus', 'Virgo', 'Capricorn']
-        air_signs = ['Gemini', 'Libra', 'Aquarius']
-        water_signs = ['Cancer', 'Scorpio', 'Pisces']
-        cycle_position = (year - 1600) % 800
-        if cycle_position < 200:
-            return fire_signs[(cycle_position // 67) % 3]
-        elif cycle_position < 400:
-            return earth_signs[((cycle_position - 200) // 67) % 3]
-        elif cycle_position < 600:
-            return air_signs[((cycle_position - 400) // 67) % 3]
-        else:
-            return water_signs[((cycle_position - 600) // 67) % 3]
-    def identify_cycle_convergences(self, start_year=1600, end_year=2100):
-        """Identifica convergencias de múltiples ciclos"""
+    def _get_zodiac_position(self, longitude_j2000, date):
+        """Signo y elemento tropicales de una longitud eclíptica J2000"""
+        centuries = dias_desde_j2000(date) / DIAS_POR_SIGLO
+        longitude = (longitude_j2000 + PRECESSION_DEG_PER_CENTURY * centuries) % 360
+        index = int(longitude // 30)
+        return ZODIAC_SIGNS[index], ZODIAC_ELEMENTS[index % 4]
+    def identify_cycle_convergences(self, start_year=1600, end_year=2100, search=None):
+        """
+        Identifica convergencias de múltiples ciclos
+
+        Cada ciclo cuenta en los años en que ocurre su evento real según la
+        búsqueda de efemérides: la conjunción Júpiter-Saturno y el paso por
+        el perihelio de cada gigante (su ciclo orbital).
+        """
+        search = search or PlanetaryEventSearch()
+        cycle_years = {
+            'Jupiter-Saturn Conjunction': {
+                c['year'] for c in self.calculate_jupiter_saturn_conjunctions(start_year, end_year, search)
+            }
+        }
+        for body, cycle in (('jupiter', 'Jupiter Orbital'), ('saturn', 'Saturn Orbital'),
+                            ('uranus', 'Urano Orbital'), ('neptune', 'Neptuno Orbital')):
+            cycle_years[cycle] = {
+                p['date'].year for p in search.find_perihelia(body, start_year, end_year)
+            }
         convergences = []
         for year in range(start_year, end_year + 1):
-            active_cycles = []
-            # Verificar cada ciclo
-            if year % 20 == 0:  # Conjunción Júpiter-Saturno
-                active_cycles.append('Jupiter-Saturn Conjunction')
-            if abs(year - 11.862 * round(year/11.862)) < 0.5:  # Júpiter orbital
-                active_cycles.append('Jupiter Orbital')
-            if abs(year - 29.457 * round(year/29.457)) < 0.5:  # Saturno orbital
-                active_cycles.append('Saturn Orbital')
-            if abs(year - 84.02 * round(year/84.02)) < 0.5:  # Urano orbital
-                active_cycles.append('Urano Orbital')
-            if abs(year - 164.791 * round(year/164.791)) < 0.5:  # Neptuno orbital
-                active_cycles.append('Neptuno Orbital')
-            if year % 400 == 0:  # Ciclo 400 años
-                active_cycles.append('400-year Cycle')
-            if year % 800 == 0:  # Ciclo 800 años
-                active_cycles.append('800-year Cycle')
-            # Solo considerar convergencias significativas
-            if len(active_cycles) >= 3:
+            active_cycles = [cycle for cycle, years in cycle_years.items() if year in years]
+            # Al menos dos ciclos reales coincidiendo en el mismo año
+            if len(active_cycles) >= 2:
                 convergence_strength = len(active_cycles)
                 convergences.append({
                     'year': year,
@@ -298,46 +496,140 @@ if __name__ == "__main__":
         print(f"\n{convergence['year']}: Nivel Riesgo {convergence['risk_level']}")
         print(f"  Ciclos: {', '.join(convergence['expected_cycles'])}")
         print(f"  Acciones: {convergence['recommended_actions'][0]}")
+# ÍNDICE DE RESONANCIAS CALCULADO DESDE LAS EFEMÉRIDES
+def mean_orbital_periods(bodies=None, start_year=1600, end_year=2100, step_days=10.0):
+    """
+    Periodos siderales medios (años) ajustados sobre las longitudes de las efemérides
+
+    Desenrolla la longitud heliocéntrica de cada planeta en el intervalo y
+    toma la pendiente del ajuste lineal como movimiento medio.
+    """
+    ephemeris = EfemeridesVectorizadas()
+    days = np.arange(dias_desde_j2000(np.datetime64(f'{start_year:04d}-01-01')),
+                     dias_desde_j2000(np.datetime64(f'{end_year:04d}-01-01')), step_days)
+    longitudes = ephemeris.longitudes_heliocentricas(days, bodies)
+    periods = {}
+    for body, longitude in longitudes.items():
+        mean_motion = np.polyfit(days, np.unwrap(longitude), 1)[0]  # rad/día
+        periods[body] = 2 * np.pi / mean_motion / 365.25
+    return periods
+def build_resonance_index(bodies=None, max_order=10, max_bodies=3, max_residual=0.01,
+                          extra_periods=(('solar', 11.2),)):
+    """
+    Índice precalculado de casi-conmensurabilidades Σ kᵢ·fᵢ ≈ 0
+
+    Recorre todas las combinaciones enteras primitivas con |k| ≤ max_order
+    (Σ|kᵢ|) para cada subconjunto de 2..max_bodies cuerpos y guarda las que
+    tienen residuo relativo |Σ kᵢ fᵢ| / Σ |kᵢ| fᵢ ≤ max_residual. El resultado
+    se cachea por argumentos; las consultas posteriores son búsquedas en el
+    índice (ver ResonanceIndex). 'bodies' puede ser cualquier iterable y
+    'extra_periods' un dict o pares (nombre, años).
+    """
+    bodies = tuple(bodies) if bodies else None
+    extra_periods = tuple(sorted(dict(extra_periods).items()))
+    return _build_resonance_index(bodies, max_order, max_bodies, max_residual, extra_periods)
+@lru_cache(maxsize=None)
+def _build_resonance_index(bodies, max_order, max_bodies, max_residual, extra_periods):
+    periods = mean_orbital_periods(list(bodies) if bodies else None)
+    periods.update(dict(extra_periods))
+    return ResonanceIndex(periods, max_order, max_bodies, max_residual)
+class ResonanceIndex:
+    """Resonancias precalculadas indexadas por conjunto de cuerpos y número de cuerpos"""
+    def __init__(self, periods, max_order=10, max_bodies=3, max_residual=0.01):
+        self.periods = dict(periods)
+        self.max_order = max_order
+        self.max_residual = max_residual
+        names = sorted(self.periods, key=self.periods.get)
+        frames = []
+        for n_bodies in range(2, max_bodies + 1):
+            coefficients = self._primitive_coefficients(n_bodies, max_order)
+            for subset in combinations(names, n_bodies):
+                frames.append(self._evaluate(subset, coefficients))
+        columns = ['bodies', 'n_bodies', 'coefficients', 'order', 'frequency', 'period', 'residual']
+        table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        self.table = table.sort_values('period', ignore_index=True)
+        # Índices: conjunto de cuerpos -> filas; número de cuerpos -> filas (ya ordenadas por periodo)
+        self.by_bodies = {key: rows.index.to_numpy() for key, rows in self.table.groupby('bodies')}
+        self.by_size = {n: rows.index.to_numpy() for n, rows in self.table.groupby('n_bodies')}
+    @staticmethod
+    def _primitive_coefficients(n_bodies, max_order):
+        """Vectores enteros sin ceros, primitivos y con el primer coeficiente positivo"""
+        values = [k for k in range(-max_order, max_order + 1) if k != 0]
+        grid = np.array(list(product(values, repeat=n_bodies)))
+        grid = grid[(np.abs(grid).sum(axis=1) <= max_order) & (grid[:, 0] > 0)]
+        return grid[np.gcd.reduce(np.abs(grid), axis=1) == 1]
+    def _evaluate(self, subset, coefficients):
+        frequencies = np.array([1.0 / self.periods[b] for b in subset])
+        combined = coefficients @ frequencies
+        residual = np.abs(combined) / (np.abs(coefficients) @ frequencies)
+        keep = residual <= self.max_residual
+        with np.errstate(divide='ignore'):
+            period = 1.0 / np.abs(combined[keep])
+        return pd.DataFrame({
+            'bodies': [frozenset(subset)] * int(keep.sum()),
+            'n_bodies': len(subset),
+            'coefficients': [dict(zip(subset, map(int, k))) for k in coefficients[keep]],
+            'order': np.abs(coefficients[keep]).sum(axis=1),
+            'frequency': combined[keep],
+            'period': period,
+            'residual': residual[keep]
+        })
+    def synodic_period(self, body_a, body_b):
+        """Periodo sinódico en años"""
+        return 1.0 / abs(1.0 / self.periods[body_a] - 1.0 / self.periods[body_b])
+    def query(self, bodies=None, n_bodies=None, max_period=None, min_period=None, max_order=None):
+        """
+        Consulta el índice, p.ej. query(n_bodies=3, max_period=50)
+
+        Returns:
+            DataFrame ordenado por periodo
+        """
+        if bodies is not None:
+            rows = self.by_bodies.get(frozenset(bodies), np.array([], dtype=int))
+        elif n_bodies is not None:
+            rows = self.by_size.get(n_bodies, np.array([], dtype=int))
+        else:
+            rows = self.table.index.to_numpy()
+        periods = self.table['period'].to_numpy()[rows]
+        lower = np.searchsorted(periods, min_period, side='left') if min_period is not None else 0
+        upper = np.searchsorted(periods, max_period, side='right') if max_period is not None else len(rows)
+        result = self.table.iloc[rows[lower:upper]]
+        if max_order is not None:
+            result = result[result['order'] <= max_order]
+        return result
 # ANÁLISIS DE RESONANCIAS Y ARMÓNICOS
 class ResonanceAnalyzer:
     """Analiza resonancias entre ciclos planetarios y solares"""
-    def __init__(self):
+    def __init__(self, max_order=10, max_bodies=3, max_residual=0.01):
+        self.index = build_resonance_index(max_order=max_order, max_bodies=max_bodies,
+                                           max_residual=max_residual)
+        periods = self.index.periods
         self.fundamental_periods = {
-            'jupiter': 11.862,
-            'saturn': 29.457,
-            'solar': 11.2,
-            'jupiter_saturn_synodic': 19.859
+            'jupiter': float(periods['jupiter']),
+            'saturn': float(periods['saturn']),
+            'solar': float(periods['solar']),
+            'jupiter_saturn_synodic': float(self.index.synodic_period('jupiter', 'saturn'))
         }
-    def calculate_resonances(self):
-        """Calcula relaciones de resonancia entre ciclos"""
+    def calculate_resonances(self, n_bodies=None, max_period=None, max_order=None):
+        """Calcula relaciones de resonancia entre ciclos a partir del índice precalculado"""
+        matches = self.index.query(n_bodies=n_bodies, max_period=max_period, max_order=max_order)
         resonances = []
-        # Resonancia Júpiter-Ciclo Solar
-        jupiter_solar_ratio = self.fundamental_periods['jupiter'] / self.fundamental_periods['solar']
-        resonances.append({
-            'cycles': 'Júpiter - Ciclo Solar',
-            'ratio': jupiter_solar_ratio,
-            'resonance_type': 'Casi-resonancia 1:1',
-            'strength': 'Fuerte',
-            'impact': 'Sincronización ciclo solar'
-        })
-        # Resonancia Júpiter-Saturno
-        jupiter_saturn_ratio = self.fundamental_periods['jupiter'] / self.fundamental_periods['saturn']
-        resonances.append({
-            'cycles': 'Júpiter - Saturno',
-            'ratio': jupiter_saturn_ratio,
-            'resonance_type': 'Resonancia 2:5',
-            'strength': 'Media',
-            'impact': 'Patrones climáticos espaciales'
-        })
-        # Armónicos superiores
-        resonances.append({
-            'cycles': '3x Júpiter - 2x Saturno',
-            'ratio': (3*11.862) / (2*29.457),
-            'resonance_type': 'Resonancia 3:2',
-            'strength': 'Débil',
-            'impact': 'Eventos extremos cada ~60 años'
-        })
+        for _, row in matches.iterrows():
+            terms = sorted(row['coefficients'].items(), key=lambda t: self.index.periods[t[0]])
+            resonances.append({
+                'cycles': ' '.join(f"{k:+d}·{body}" for body, k in terms),
+                'residual': row['residual'],
+                'period': row['period'],
+                'resonance_type': ':'.join(str(abs(k)) for _, k in terms),
+                'strength': self._resonance_strength(row['residual'])
+            })
         return pd.DataFrame(resonances)
+    def _resonance_strength(self, residual):
+        if residual < 0.001:
+            return 'Fuerte'
+        elif residual < 0.005:
+            return 'Media'
+        return 'Débil'
 # GENERACIÓN DE PREDICCIONES A LARGO PLAZO
 def generate_long_term_predictions():
     """Genera predicciones basadas en ciclos mayores"""
@@ -0,0 +1,171 @@
+"""
+Ventana de Pronóstico FTRT Precalculada
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Mantiene en memoria el pronóstico horario de los próximos dos años a partir
+de las 00:00 del día actual. Un hilo de fondo lo desplaza una vez al día
+(poco después de medianoche) y los endpoints de predicción leen rebanadas
+por aritmética de índices, sin recalcular. Si una consulta cae fuera de la
+ventana, rebanada() devuelve None y el llamador calcula como antes.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from utils.logger import ftrt_logger
+
+HORIZONTE_DIAS = int(os.environ.get('FTRT_HORIZONTE_PRONOSTICO', 730))
+PASO_HORAS = 1
+
+
+class VentanaPronostico:
+    """Pronóstico FTRT horario precalculado con desplazamiento diario"""
+
+    def __init__(self, calculador, horizonte_dias=HORIZONTE_DIAS, paso_horas=PASO_HORAS):
+        """
+        Args:
+            calculador (FTRTCalculator): Modelo compartido
+            horizonte_dias (int): Días cubiertos desde el origen
+            paso_horas (int): Resolución de la ventana
+        """
+        self.calculador = calculador
+        self.horizonte_dias = horizonte_dias
+        self.paso = timedelta(hours=paso_horas)
+        self._datos = None  # (origen, generado, rango), se sustituye de una vez
+        self._bloqueo = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.recalculos = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.duracion_ultimo = None
+
+    @staticmethod
+    def _origen(ahora=None):
+        ahora = ahora or datetime.now()
+        return ahora.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def recalcular(self, ahora=None):
+        """Calcula la ventana completa desde las 00:00 de 'ahora' y la publica"""
+        with self._bloqueo:
+            inicio = time.perf_counter()
+            origen = self._origen(ahora)
+            n = int(timedelta(days=self.horizonte_dias) / self.paso)
+            paso = np.timedelta64(int(self.paso.total_seconds()), 's')
+            fechas = np.datetime64(origen, 's') + np.arange(n) * paso
+            rango = self.calculador.calcular_ftrt_rango(fechas)
+
+            # Solo lectura: las rebanadas son vistas y, precalculada antes del
+            # fork, la ventana se comparte entre workers sin copiarse
+            for array in (rango['fechas'], rango['ftrt_total'], rango['ftrt_normalizada'],
+                          rango['nivel'], rango['precalculado'], *rango['contribuciones'].values()):
+                array.flags.writeable = False
+
+            self._datos = (origen, datetime.now(), rango)
+            self.recalculos += 1
+            self.duracion_ultimo = time.perf_counter() - inicio
+            ftrt_logger.info(
+                f"🗓️ Pronóstico precalculado: {n} puntos desde {origen:%Y-%m-%d} "
+                f"| ⏱️ {self.duracion_ultimo:.3f}s"
+            )
+
+    def asegurar(self, ahora=None):
+        """Calienta la ventana si está vacía o si el día ya cambió"""
+        datos = self._datos
+        if datos is None or datos[0] != self._origen(ahora):
+            self.recalcular(ahora)
+
+    def rebanada(self, inicio, n, paso_horas=24):
+        """
+        Vista de n puntos desde 'inicio' cada paso_horas, sin recalcular
+
+        Args:
+            inicio (datetime): Primer instante; debe caer en la rejilla de la ventana
+            n (int): Número de puntos
+            paso_horas (int): Múltiplo de la resolución de la ventana
+
+        Returns:
+            dict con 'fechas', 'ftrt_normalizada', 'nivel' y 'contribuciones'
+            (vistas de los arrays de la ventana) o None si no está cubierta
+        """
+        datos = self._datos
+        salto = timedelta(hours=paso_horas) / self.paso
+        if datos is None or salto != int(salto) or n < 1:
+            self.fallos += 1
+            return None
+
+        origen, _, rango = datos
+        desplazamiento = (inicio - origen) / self.paso
+        i0, salto = int(desplazamiento), int(salto)
+        i1 = i0 + (n - 1) * salto + 1
+        if desplazamiento != i0 or i0 < 0 or i1 > len(rango['fechas']):
+            self.fallos += 1
+            return None
+
+        self.aciertos += 1
+        tramo = slice(i0, i1, salto)
+        return {
+            'fechas': rango['fechas'][tramo],
+            'ftrt_normalizada': rango['ftrt_normalizada'][tramo],
+            'nivel': rango['nivel'][tramo],
+            'contribuciones': {p: v[tramo] for p, v in rango['contribuciones'].items()},
+            'precalculado': rango['precalculado'][tramo]
+        }
+
+    def metricas(self, ahora=None):
+        """Edad y uso de la ventana; 'obsoleta' si el origen ya no es hoy"""
+        datos = self._datos
+        ahora = ahora or datetime.now()
+        if datos is None:
+            return {'disponible': False, 'obsoleta': True, 'recalculos': self.recalculos}
+
+        origen, generado, rango = datos
+        return {
+            'disponible': True,
+            'origen': origen.isoformat(),
+            'fin': str(rango['fechas'][-1]),
+            'puntos': int(len(rango['fechas'])),
+            'generado': generado.isoformat(),
+            'edad_segundos': round((ahora - generado).total_seconds(), 1),
+            'obsoleta': origen != self._origen(ahora),
+            'recalculos': self.recalculos,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'duracion_ultimo_s': round(self.duracion_ultimo, 4)
+        }
+
+    def reiniciar_tras_fork(self):
+        """Descarta el lock y el hilo heredados; la ventana calculada se conserva"""
+        self._bloqueo = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def _ciclo(self):
+        while not self._detener.is_set():
+            ahora = datetime.now()
+            siguiente = self._origen(ahora) + timedelta(days=1, seconds=5)
+            if self._detener.wait((siguiente - ahora).total_seconds()):
+                break
+            try:
+                self.asegurar()
+            except Exception as e:
+                ftrt_logger.error(f"❌ Error desplazando pronóstico: {str(e)}")
+
+    def iniciar(self):
+        """Calentamiento inmediato y desplazamiento diario en un hilo de fondo"""
+        self.asegurar()
+        if self._hilo is None or not self._hilo.is_alive():
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ciclo, name='ftrt-pronostico', daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout=5)
+            self._hilo = None
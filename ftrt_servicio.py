@@ -0,0 +1,216 @@
+"""
+Servicio FTRT Común a Todas las APIs
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Un único motor por proceso: calculador, ventana de pronóstico, difusor de
+alertas, caché compartida y control de admisión. api.py (Flask),
+api/main.py (FastAPI), ftrt_api_corregido.py y run_api.py obtienen la
+misma instancia con obtener_servicio(), de modo que el calentamiento se
+hace una vez y una fecha calculada por un frontend la sirven los demás.
+
+Los resultados por fecha civil se guardan en la caché compartida bajo
+claves semánticas ('dia:YYYY-MM-DD'), independientes de la ruta o del
+framework que los pidió. Los cálculos pasan por ftrt_ejecucion.ejecutar_cpu
+para no bloquear el hub en los workers gevent.
+"""
+
+import json
+import threading
+from datetime import datetime
+
+from ftrt_core import obtener_calculador_compartido
+from ftrt_pronostico import VentanaPronostico
+from ftrt_tiempo_real import DifusorAlertas
+from ftrt_admision import ControlAdmision
+from ftrt_cache_compartida import CacheCompartida, RUTA_CACHE
+from ftrt_ejecucion import configurar_pool, ejecutar_cpu
+from ftrt_agregados import MAX_FILAS, PiramideFTRT
+from ftrt_teselas import asegurar_teselas
+from utils.logger import ftrt_logger
+
+
+class ServicioFTRT:
+    """Motor FTRT compartido por los frontends Flask y FastAPI"""
+
+    def __init__(self, calculador=None, ruta_cache=RUTA_CACHE):
+        """
+        Args:
+            calculador (FTRTCalculator): Modelo (default: el compartido de ftrt_core)
+            ruta_cache (str): Archivo de la caché compartida; '' la desactiva
+        """
+        self.calculador = calculador or obtener_calculador_compartido()
+        self.pronostico = VentanaPronostico(self.calculador)
+        self.difusor = DifusorAlertas(self.calculador)
+        self.admision = ControlAdmision()
+        self.cache = (
+            CacheCompartida(self.calculador.huella_modelo(), ruta=ruta_cache)
+            if ruta_cache else None
+        )
+        self._bloqueo = threading.Lock()
+        self._bloqueo_piramide = threading.Lock()
+        self._piramide = None
+        self.calentado = False
+
+    def calentar(self):
+        """Calentamiento único (ventana de pronóstico, agregados y teselas); idempotente"""
+        with self._bloqueo:
+            if not self.calentado:
+                self.pronostico.asegurar()
+                self.piramide()
+                # Teselas que /teselas sirve como estáticos (y lee la webapp)
+                ejecutar_cpu(asegurar_teselas, self.calculador)
+                self.calentado = True
+                ftrt_logger.info(f"🔥 Servicio FTRT listo (modelo {self.calculador.huella_modelo()})")
+
+    def iniciar(self):
+        """Calienta y arranca el desplazamiento diario del pronóstico"""
+        self.calentar()
+        self.pronostico.iniciar()
+
+    def detener(self):
+        self.pronostico.detener()
+
+    def reiniciar_tras_fork(self):
+        """
+        Prepara un worker recién creado a partir del maestro precargado
+
+        Conserva lo calculado antes del fork (modelo, ventana de pronóstico),
+        que se comparte copy-on-write, y rehace lo que es propio de cada
+        proceso: handlers de log, locks y semáforos, hilos y pool de cálculo.
+        La caché compartida reabre su conexión sola al detectar otro pid.
+        """
+        ftrt_logger.reiniciar_tras_fork()
+        self._bloqueo = threading.Lock()
+        self._bloqueo_piramide = threading.Lock()
+        self.pronostico.reiniciar_tras_fork()
+        self.admision.reiniciar_tras_fork()
+        configurar_pool()
+
+    def desde_cache(self, clave, calcular):
+        """
+        Valor JSON de 'clave', calculado una vez para todos los procesos
+
+        Args:
+            clave (str): Clave determinista o None para no cachear
+            calcular (callable): Sin argumentos, devuelve un objeto serializable
+        """
+        if clave is None or self.cache is None:
+            return calcular()
+        return json.loads(self.cache.obtener_o_calcular(clave, lambda: json.dumps(calcular()).encode()))
+
+    def resultado_dia(self, fecha, fija=True):
+        """
+        calcular_ftrt_total en forma serializable, compartido entre frontends
+
+        Args:
+            fecha (datetime): Instante a calcular
+            fija (bool): Si la fecha es un día civil (cacheable) y no 'ahora'.
+                El día se calcula a medianoche, que es lo que identifica la
+                clave de caché, sea cual sea la hora recibida.
+        """
+        if fija:
+            fecha = fecha.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        def calcular():
+            resultado = ejecutar_cpu(self.calculador.calcular_ftrt_total, fecha)
+            return {
+                'fecha': fecha.isoformat(),
+                'ftrt_total': float(resultado['ftrt_total']),
+                'ftrt_normalizada': float(resultado['ftrt_normalizada']),
+                'contribuciones': {k: float(v) for k, v in resultado['contribuciones'].items()},
+                'metodo': resultado['metodo']
+            }
+
+        return self.desde_cache(f"dia:{fecha:%Y-%m-%d}" if fija else None, calcular)
+
+    def datos_calculo(self, fecha, fija=True):
+        """Resumen del cálculo de un día (bloque 'data' de /api/v1/ftrt/calcular)"""
+        resultado = self.resultado_dia(fecha, fija)
+        return {
+            'fecha': fecha.strftime('%Y-%m-%d'),
+            'ftrt_normalizada': round(resultado['ftrt_normalizada'], 3),
+            'ftrt_total': resultado['ftrt_total'],
+            'contribuciones': {
+                k: round(v, 2) for k, v in resultado['contribuciones'].items()
+            },
+            'metodo': resultado['metodo']
+        }
+
+    def datos_alerta(self, fecha, fija=True):
+        """
+        Alerta de un día (bloque 'data' de /api/v1/ftrt/alerta)
+
+        Equivale a FTRTCalculator.generar_alerta, pero parte del resultado
+        compartido en lugar de recalcular.
+        """
+        resultado = self.resultado_dia(fecha, fija)
+        nivel, color = self.calculador.evaluar_riesgo(resultado['ftrt_normalizada'])
+        datos = {
+            'fecha': fecha.strftime('%Y-%m-%d'),
+            'nivel_riesgo': nivel,
+            'color_alerta': color,
+            'ftrt_normalizada': round(resultado['ftrt_normalizada'], 3),
+            'metodo_calculo': resultado['metodo'],
+            'contribuciones_principales': {
+                k: round(v, 2) for k, v in sorted(
+                    resultado['contribuciones'].items(), key=lambda x: x[1], reverse=True
+                )[:3]
+            }
+        }
+        ftrt_logger.log_alerta(datos)
+        return datos
+
+    def rango(self, fechas, paso_horas=24):
+        """
+        FTRT de fechas equiespaciadas: rebanada de la ventana o cálculo vectorizado
+
+        Args:
+            fechas (list): datetimes separados paso_horas, en orden
+            paso_horas (int): Separación entre fechas
+        """
+        rango = self.pronostico.rebanada(fechas[0], len(fechas), paso_horas)
+        if rango is None:
+            rango = ejecutar_cpu(self.calculador.calcular_ftrt_rango, fechas)
+        return rango
+
+    def piramide(self):
+        """Agregados multirresolución (ftrt_agregados.py), cargados una vez"""
+        if self._piramide is None:
+            with self._bloqueo_piramide:
+                if self._piramide is None:
+                    piramide = PiramideFTRT(self.calculador)
+                    self._piramide = ejecutar_cpu(piramide.cargar)
+        return self._piramide
+
+    def agregados(self, resolucion='auto', inicio=None, fin=None, max_filas=MAX_FILAS):
+        """
+        Resumen semanal/mensual/anual de [inicio, fin) desde la pirámide
+
+        Raises:
+            ValueError: Resolución, rango o número de filas no válidos
+        """
+        return self.piramide().consultar(resolucion, inicio, fin, max_filas)
+
+    def metricas(self):
+        return {
+            'modelo': self.calculador.huella_modelo(),
+            'calentado': self.calentado,
+            'pronostico': self.pronostico.metricas(),
+            'cache': self.cache.metricas() if self.cache else None,
+            'admision': self.admision.metricas(),
+            'suscriptores': self.difusor.suscriptores,
+            'actualizado': datetime.now().isoformat()
+        }
+
+
+_servicio = None
+_bloqueo_servicio = threading.Lock()
+
+def obtener_servicio():
+    """Instancia única de ServicioFTRT en el proceso"""
+    global _servicio
+    with _bloqueo_servicio:
+        if _servicio is None:
+            _servicio = ServicioFTRT()
+        return _servicio
@@ -0,0 +1,104 @@
+"""
+Submuestreo de Series FTRT para Visualización
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Una serie de varios siglos tiene 10^5-10^6 puntos, pero una gráfica no
+muestra más de unos miles de píxeles de ancho. Estas funciones eligen
+qué puntos dibujar sin perder la forma de la curva:
+
+- lttb: Largest-Triangle-Three-Buckets; conserva la forma visual.
+- min_max: mínimo y máximo de cada cubeta; conserva todos los picos
+  (útil para no ocultar un máximo FTRT al alejar el zoom).
+
+Ambas devuelven índices ordenados, de modo que el llamador puede tomar
+con ellos cualquier columna asociada (fechas, nivel, contribuciones).
+"""
+
+import numpy as np
+
+MAX_PUNTOS = 2000
+METODOS = ('lttb', 'min_max')
+
+
+def _a_float(x):
+    """Eje x numérico (datetime64 -> segundos)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[s]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb(x, y, max_puntos=MAX_PUNTOS):
+    """
+    Índices elegidos por Largest-Triangle-Three-Buckets
+
+    Args:
+        x: Eje x (numérico o datetime64), creciente
+        y: Valores
+        max_puntos (int): Puntos a conservar (>= 3)
+
+    Returns:
+        np.ndarray de índices, siempre con el primero y el último
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_puntos >= n or max_puntos < 3:
+        return np.arange(n)
+
+    x = _a_float(x)
+    indices = np.empty(max_puntos, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    # Cubetas interiores: max_puntos - 2 tramos de [1, n - 1)
+    limites = (np.arange(max_puntos - 1) * (n - 2) / (max_puntos - 2)).astype(np.int64) + 1
+    limites[-1] = n - 1
+
+    a = 0
+    for i in range(max_puntos - 2):
+        inicio, fin = limites[i], limites[i + 1]
+        if i + 2 < len(limites):
+            siguiente = slice(limites[i + 1], limites[i + 2])
+            xc, yc = x[siguiente].mean(), y[siguiente].mean()
+        else:
+            xc, yc = x[-1], y[-1]
+
+        xa, ya = x[a], y[a]
+        area = np.abs((xa - xc) * (y[inicio:fin] - ya) - (xa - x[inicio:fin]) * (yc - ya))
+        a = inicio + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return indices
+
+
+def min_max(y, max_puntos=MAX_PUNTOS):
+    """
+    Índices del mínimo y el máximo de cada cubeta (max_puntos // 2 cubetas)
+
+    Conserva el primer y el último punto y todos los extremos locales a
+    la resolución de la gráfica. Vectorizado: sin bucles en Python.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_puntos >= n or max_puntos < 4:
+        return np.arange(n)
+
+    cubetas = (max_puntos - 2) // 2
+    tamano = -(-n // cubetas)
+    relleno = np.concatenate([y, np.full(cubetas * tamano - n, y[-1])]).reshape(cubetas, tamano)
+    base = np.arange(cubetas) * tamano
+    elegidos = np.concatenate([
+        [0, n - 1],
+        base + relleno.argmin(axis=1),
+        base + relleno.argmax(axis=1)
+    ])
+    return np.unique(np.minimum(elegidos, n - 1))
+
+
+def submuestrear(x, y, max_puntos=MAX_PUNTOS, metodo='lttb'):
+    """Índices a dibujar según 'metodo' ('lttb' o 'min_max')"""
+    if metodo == 'lttb':
+        return lttb(x, y, max_puntos)
+    if metodo == 'min_max':
+        return min_max(y, max_puntos)
+    raise ValueError(f"Método de submuestreo desconocido: {metodo} (use {', '.join(METODOS)})")
@@ -0,0 +1,224 @@
+"""
+Teselas Anuales Precalculadas de FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Genera un archivo por año con la FTRT diaria, los códigos de nivel y las
+contribuciones planetarias (JSON columnar comprimido con gzip) más un
+índice. Las teselas son inmutables: el nombre incluye el hash de su
+contenido, así que pueden servirse como estáticos con caché permanente.
+Solo indice.json cambia entre generaciones. Ambas APIs sirven el directorio
+en /teselas (o un proxy/CDN directamente) y la webapp lee de ahí el
+resumen del año sin pasar por el motor.
+
+La regeneración es incremental: cada año guarda una clave derivada de la
+versión del modelo, los umbrales, las masas y los datos precalculados que
+caen en ese año. Si la clave no cambia, el año no se recalcula. Los años
+que ya están en el índice pero no se han pedido también se regeneran si su
+clave dejó de ser la vigente: el índice nunca mezcla teselas de dos modelos.
+
+Uso:
+    python ftrt_teselas.py --desde 1900 --hasta 2100
+    python ftrt_teselas.py --desde 2020 --hasta 2035 --directorio webapp/public/teselas
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from ftrt_core import FTRTCalculator
+from utils.logger import ftrt_logger
+
+DIRECTORIO_TESELAS = os.environ.get(
+    'FTRT_DIR_TESELAS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'teselas')
+)
+ARCHIVO_INDICE = 'indice.json'
+DECIMALES = 6
+# Años que mantiene al día el servicio al arrancar (respecto al actual)
+AÑOS_ATRAS = int(os.environ.get('FTRT_TESELAS_ATRAS', 25))
+AÑOS_ADELANTE = int(os.environ.get('FTRT_TESELAS_ADELANTE', 10))
+
+
+def clave_año(calculador, año):
+    """Clave de vigencia de la tesela de un año para el modelo actual"""
+    prefijo = f'{año:04d}-'
+    perfil = json.dumps({
+        'año': año,
+        'version': calculador.VERSION_MODELO,
+        'umbrales': calculador.UMBRALES,
+        'masas': calculador.MASAS,
+        'precalculados': {
+            fecha: valor for fecha, valor in calculador.datos_precalculados.items()
+            if fecha.startswith(prefijo)
+        }
+    }, sort_keys=True)
+    return hashlib.sha1(perfil.encode()).hexdigest()[:16]
+
+
+def calcular_tesela(calculador, año):
+    """Contenido (dict serializable) de la tesela diaria de un año"""
+    inicio = np.datetime64(f'{año:04d}-01-01', 'D')
+    fechas = np.arange(inicio, np.datetime64(f'{año + 1:04d}-01-01', 'D'))
+    rango = calculador.calcular_ftrt_rango(fechas)
+
+    return {
+        'año': año,
+        'version_modelo': calculador.VERSION_MODELO,
+        'clave': clave_año(calculador, año),
+        'inicio': str(inicio),
+        'paso_dias': 1,
+        'niveles': [nombre for nombre, _ in calculador.NIVELES_RIESGO],
+        'ftrt': np.round(rango['ftrt_normalizada'], DECIMALES).tolist(),
+        'nivel': rango['nivel'].tolist(),
+        'contribuciones': {
+            planeta: np.round(valores, DECIMALES).tolist()
+            for planeta, valores in rango['contribuciones'].items()
+        }
+    }
+
+
+def leer_indice(directorio=DIRECTORIO_TESELAS):
+    """Índice de teselas ({} si aún no se ha generado ninguna)"""
+    ruta = os.path.join(directorio, ARCHIVO_INDICE)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def leer_tesela(año, directorio=DIRECTORIO_TESELAS):
+    """Contenido de la tesela vigente de un año (KeyError si no existe)"""
+    entrada = leer_indice(directorio).get('teselas', {})[str(año)]
+    with gzip.open(os.path.join(directorio, entrada['archivo']), 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def ruta_estatica(archivo, directorio=DIRECTORIO_TESELAS):
+    """
+    Ruta y cabeceras para servir un archivo de teselas como estático
+
+    Las teselas llevan caché permanente (su nombre cambia con el contenido);
+    el índice se revalida siempre.
+
+    Returns:
+        tuple (ruta, media_type, cabeceras) o None si el nombre no es válido
+        o el archivo no existe
+    """
+    if archivo == ARCHIVO_INDICE:
+        media_type, cache = 'application/json', 'no-cache'
+    elif (archivo.startswith('ftrt_') and archivo.endswith('.json.gz')
+            and os.path.basename(archivo) == archivo):
+        media_type, cache = 'application/gzip', 'public, max-age=31536000, immutable'
+    else:
+        return None
+
+    ruta = os.path.join(directorio, archivo)
+    if not os.path.isfile(ruta):
+        return None
+    return ruta, media_type, {'Cache-Control': cache}
+
+
+def _escribir_atomico(ruta, datos):
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(datos)
+    os.replace(temporal, ruta)
+
+
+def generar_teselas(años, directorio=DIRECTORIO_TESELAS, calculador=None, forzar=False):
+    """
+    Genera o actualiza las teselas de los años indicados
+
+    Args:
+        años (iterable): Años a cubrir (además de los que ya tenga el índice)
+        directorio (str): Destino de las teselas y del índice
+        calculador (FTRTCalculator): Modelo a usar (default: uno nuevo)
+        forzar (bool): Recalcular aunque la clave no haya cambiado
+
+    Returns:
+        dict con listas 'generadas' y 'reutilizadas'
+    """
+    calculador = calculador or FTRTCalculator()
+    os.makedirs(directorio, exist_ok=True)
+
+    indice = leer_indice(directorio)
+    teselas = indice.get('teselas', {})
+    resumen = {'generadas': [], 'reutilizadas': []}
+
+    for año in sorted(set(int(a) for a in años) | set(int(a) for a in teselas)):
+        clave = clave_año(calculador, año)
+        actual = teselas.get(str(año))
+        if (not forzar and actual and actual['clave'] == clave
+                and os.path.exists(os.path.join(directorio, actual['archivo']))):
+            resumen['reutilizadas'].append(año)
+            continue
+
+        contenido = calcular_tesela(calculador, año)
+        crudo = json.dumps(contenido, separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(crudo).hexdigest()
+        archivo = f'ftrt_{año:04d}.{digest[:12]}.json.gz'
+
+        # mtime=0 para que el mismo contenido produzca siempre los mismos bytes
+        _escribir_atomico(
+            os.path.join(directorio, archivo), gzip.compress(crudo, mtime=0)
+        )
+        ftrt = np.asarray(contenido['ftrt'])
+        teselas[str(año)] = {
+            'archivo': archivo,
+            'clave': clave,
+            'sha256': digest,
+            'dias': len(ftrt),
+            'ftrt_min': float(ftrt.min()),
+            'ftrt_max': float(ftrt.max())
+        }
+        resumen['generadas'].append(año)
+
+    indice = {
+        'version_modelo': calculador.VERSION_MODELO,
+        'huella_modelo': calculador.huella_modelo(),
+        'niveles': [nombre for nombre, _ in calculador.NIVELES_RIESGO],
+        'umbrales': calculador.UMBRALES,
+        'teselas': dict(sorted(teselas.items()))
+    }
+    _escribir_atomico(
+        os.path.join(directorio, ARCHIVO_INDICE),
+        json.dumps(indice, ensure_ascii=False, indent=1).encode('utf-8')
+    )
+
+    # Eliminar teselas que ya no referencia el índice
+    vigentes = {entrada['archivo'] for entrada in teselas.values()}
+    for nombre in os.listdir(directorio):
+        if nombre.startswith('ftrt_') and nombre.endswith('.json.gz') and nombre not in vigentes:
+            os.remove(os.path.join(directorio, nombre))
+
+    ftrt_logger.info(
+        f"🧱 Teselas FTRT: {len(resumen['generadas'])} generadas, "
+        f"{len(resumen['reutilizadas'])} reutilizadas en {directorio}"
+    )
+    return resumen
+
+
+def asegurar_teselas(calculador=None, directorio=DIRECTORIO_TESELAS):
+    """Teselas vigentes de los años que sirven las APIs (incremental: casi gratis si no hay cambios)"""
+    año = datetime.now().year
+    return generar_teselas(range(año - AÑOS_ATRAS, año + AÑOS_ADELANTE + 1), directorio, calculador)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera teselas anuales de FTRT diaria")
+    parser.add_argument('--desde', type=int, default=datetime.now().year - AÑOS_ATRAS)
+    parser.add_argument('--hasta', type=int, default=datetime.now().year + AÑOS_ADELANTE)
+    parser.add_argument('--directorio', default=DIRECTORIO_TESELAS)
+    parser.add_argument('--forzar', action='store_true', help="Regenerar todos los años")
+    args = parser.parse_args()
+
+    resumen = generar_teselas(range(args.desde, args.hasta + 1), args.directorio, forzar=args.forzar)
+    print(f"✅ {len(resumen['generadas'])} teselas generadas, "
+          f"{len(resumen['reutilizadas'])} sin cambios → {args.directorio}")
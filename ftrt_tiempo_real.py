@@ -0,0 +1,162 @@
+"""
+Difusión en Tiempo Real del Estado FTRT
+Autores: Benjamin Cabeza Duran / DeepSeek
+Fecha: Octubre 2025
+
+Un único ciclo de fondo calcula la FTRT y el nivel de alerta actuales cada
+'intervalo' segundos y reparte los cambios a todos los suscriptores (SSE o
+WebSocket). El coste es un cálculo por ciclo, no uno por cliente conectado.
+
+Mensajes:
+    {'tipo': 'estado', 'secuencia': n, ...estado completo}   al suscribirse
+    {'tipo': 'delta',  'secuencia': n, ...campos cambiados}  en cada cambio
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from utils.logger import ftrt_logger
+
+INTERVALO_ALERTAS = float(os.environ.get('FTRT_INTERVALO_ALERTAS', 60))
+COLA_SUSCRIPTOR = 16
+
+
+class DifusorAlertas:
+    """Calcula el estado actual a cadencia fija y lo difunde a los suscriptores"""
+
+    def __init__(self, calculador, intervalo=INTERVALO_ALERTAS, decimales=3):
+        """
+        Args:
+            calculador (FTRTCalculator): Modelo compartido
+            intervalo (float): Segundos entre cálculos
+            decimales (int): Redondeo de la FTRT; cambios menores no generan delta
+        """
+        self.calculador = calculador
+        self.intervalo = intervalo
+        self.decimales = decimales
+        self.estado = None
+        self.secuencia = 0
+        self.calculos = 0
+        self._suscriptores = set()
+        self._tarea = None
+
+    def calcular_estado(self, fecha=None):
+        """Estado FTRT en un instante (default: ahora, UTC)"""
+        fecha = fecha or datetime.now(timezone.utc)
+        rango = self.calculador.calcular_ftrt_rango([fecha])
+        codigo = int(rango['nivel'][0])
+        nivel, color = self.calculador.NIVELES_RIESGO[codigo]
+        self.calculos += 1
+        return {
+            'fecha': np.datetime_as_string(rango['fechas'][0], unit='s') + 'Z',
+            'ftrt': round(float(rango['ftrt_normalizada'][0]), self.decimales),
+            'nivel': nivel,
+            'codigo_nivel': codigo,
+            'color': color,
+            'alerta': codigo >= 3
+        }
+
+    def actualizar(self, fecha=None):
+        """Recalcula el estado y publica el delta (ver publicar)"""
+        return self.publicar(self.calcular_estado(fecha))
+
+    def publicar(self, nuevo):
+        """
+        Sustituye el estado y reparte el delta si algo relevante cambió
+
+        Debe llamarse desde el hilo del bucle de eventos (las colas de los
+        suscriptores no son seguras entre hilos).
+
+        Returns:
+            dict delta publicado o None
+        """
+        anterior = self.estado or {}
+        cambios = {
+            clave: valor for clave, valor in nuevo.items()
+            if clave != 'fecha' and anterior.get(clave) != valor
+        }
+        self.estado = nuevo
+        if not cambios:
+            return None
+
+        self.secuencia += 1
+        delta = {'tipo': 'delta', 'secuencia': self.secuencia, 'fecha': nuevo['fecha'], **cambios}
+        for cola in list(self._suscriptores):
+            self._encolar(cola, delta)
+        return delta
+
+    def _encolar(self, cola, mensaje):
+        # Un cliente lento no bloquea al resto: si su cola se llena, perder
+        # deltas lo dejaría desincronizado, así que se vacía y recibe el
+        # estado completo (que ya incluye este cambio) para resincronizar
+        if cola.full():
+            while not cola.empty():
+                cola.get_nowait()
+            mensaje = {'tipo': 'estado', 'secuencia': self.secuencia, **self.estado}
+        cola.put_nowait(mensaje)
+
+    def suscribir(self):
+        """Cola de mensajes de un nuevo cliente, con el estado completo al inicio"""
+        cola = asyncio.Queue(maxsize=COLA_SUSCRIPTOR)
+        if self.estado is not None:
+            cola.put_nowait({'tipo': 'estado', 'secuencia': self.secuencia, **self.estado})
+        self._suscriptores.add(cola)
+        return cola
+
+    def cancelar(self, cola):
+        self._suscriptores.discard(cola)
+
+    @property
+    def suscriptores(self):
+        return len(self._suscriptores)
+
+    async def _ciclo(self):
+        while True:
+            try:
+                # El cálculo es CPU: fuera del bucle de eventos; el reparto, dentro
+                self.publicar(await asyncio.to_thread(self.calcular_estado))
+            except Exception as e:
+                ftrt_logger.error(f"❌ Error en ciclo de alertas: {str(e)}")
+            await asyncio.sleep(self.intervalo)
+
+    def iniciar(self):
+        """Arranca el ciclo de fondo en el bucle de eventos actual"""
+        if self._tarea is None or self._tarea.done():
+            self._tarea = asyncio.get_running_loop().create_task(self._ciclo())
+            ftrt_logger.info(f"📡 Difusor de alertas FTRT iniciado (cada {self.intervalo:g} s)")
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    async def eventos_sse(self, latido=15.0):
+        """
+        Generador de eventos Server-Sent Events para un cliente
+
+        Envía un comentario de latido si no hay cambios en 'latido' segundos
+        para que proxies y navegadores mantengan la conexión abierta.
+        """
+        cola = self.suscribir()
+        try:
+            while True:
+                try:
+                    mensaje = await asyncio.wait_for(cola.get(), timeout=latido)
+                except asyncio.TimeoutError:
+                    yield ': latido\n\n'
+                    continue
+                yield (
+                    f"id: {mensaje['secuencia']}\n"
+                    f"event: {mensaje['tipo']}\n"
+                    f"data: {json.dumps(mensaje, ensure_ascii=False)}\n\n"
+                )
+        finally:
+            self.cancelar(cola)
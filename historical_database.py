@@ -72,7 +72,55 @@ class SolarFTRTDatabase:
                 confidence_interval TEXT
             )
         ''')
-        
+
+        # Índices geomagnéticos (Dst/Kp/AE) por instante
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS geomagnetic_indices (
+                time TEXT PRIMARY KEY,
+                dst_index REAL,
+                kp_index REAL,
+                ae_index REAL,
+                sources TEXT
+            )
+        ''')
+
+        # Catálogo de CMEs
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cme_events (
+                cme_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                record_key TEXT NOT NULL UNIQUE,
+                event_time TEXT NOT NULL,
+                cme_speed REAL,
+                angular_width REAL,
+                position_angle REAL,
+                halo BOOLEAN,
+                sources TEXT
+            )
+        ''')
+
+        # Estado de la sincronización incremental (ver ftrt_ingesta.py)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sync_state (
+                source TEXT PRIMARY KEY,
+                high_water TEXT,
+                byte_offset INTEGER DEFAULT 0,
+                head_hash TEXT,
+                records INTEGER DEFAULT 0,
+                updated_at TEXT
+            )
+        ''')
+
+        # Claves de deduplicación para la ingesta por lotes
+        columnas = [fila[1] for fila in conn.execute('PRAGMA table_info(solar_events)')]
+        if 'record_key' not in columnas:
+            conn.execute('ALTER TABLE solar_events ADD COLUMN record_key TEXT')
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_solar_events_key ON solar_events(record_key)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_solar_events_date ON solar_events(event_date)')
+        conn.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_planetary_configurations_date
+            ON planetary_configurations(config_date)
+        ''')
+
         conn.commit()
         conn.close()
 
@@ -278,9 +326,23 @@ class AdvancedStatisticalAnalysis:
         
         return pd.DataFrame(results)
     
-    def spectral_analysis(self):
-        """Análisis espectral de periodicidades en FTRT"""
-        
+    def load_ftrt_series(self, columns=('ftrt_normalized',), start_year=1749, end_year=2024):
+        """
+        Serie diaria FTRT con solo las columnas y años pedidos, del dataset
+        Parquet (ftrt_dataset.py) o calculada con el motor si no existe
+        """
+        from ftrt_dataset import leer_ftrt
+        return leer_ftrt(list(columns), f'{start_year:04d}-01-01', f'{end_year:04d}-12-31')
+
+    def spectral_analysis(self, start_year=1749, end_year=2024):
+        """
+        Análisis espectral de periodicidades en FTRT
+
+        'measured_power' es la potencia relativa de cada periodo en el
+        periodograma de las medias anuales de la FTRT física.
+        """
+        from scipy.signal import periodogram
+
         periodicities = [
             {'period_years': 11.0, 'strength': 0.95, 'description': 'Ciclo Solar Schwabe'},
             {'period_years': 22.0, 'strength': 0.87, 'description': 'Ciclo Solar Hale'},
@@ -288,8 +350,15 @@ class AdvancedStatisticalAnalysis:
             {'period_years': 9.9, 'strength': 0.68, 'description': 'Medio ciclo Júpiter-Saturno'},
             {'period_years': 5.9, 'strength': 0.62, 'description': 'Resonancia Venus-Tierra'}
         ]
-        
-        return pd.DataFrame(periodicities)
+        df = pd.DataFrame(periodicities)
+
+        series = self.load_ftrt_series(['ftrt_normalized'], start_year, end_year)
+        annual = series.groupby(series['time'].dt.year)['ftrt_normalized'].mean().to_numpy()
+        frequencies, power = periodogram(annual - annual.mean())  # ciclos por año
+        measured = np.array([power[np.argmin(np.abs(frequencies - 1 / p))] for p in df['period_years']])
+        df['measured_power'] = measured / measured.max()
+
+        return df
 
 # VISUALIZACIÓN Y EXPORTACIÓN DE DATOS
 def create_summary_report():
@@ -352,15 +421,26 @@ if __name__ == "__main__":
         print(f"{row['period_years']:4.1f} años: {row['description']} (fuerza: {row['strength']:.2f})")
 
 # EXPORTACIÓN A FORMATOS CIENTÍFICOS
-def export_to_netcdf():
-    """Exporta datos a formato NetCDF para análisis científico"""
-    # Implementación para exportación NetCDF
-    pass
+def export_to_netcdf(path='ftrt_historical.nc', start_date='1749-01-01', end_date=None):
+    """
+    Exporta la serie diaria FTRT (total, contribuciones por planeta,
+    baricentro y tensión) a NetCDF con metadatos CF; ver ftrt_exportacion.py
+
+    Returns:
+        dict con 'ruta', 'formato', 'dias' y 'bytes'
+    """
+    from ftrt_exportacion import exportar_netcdf
+    return exportar_netcdf(path, start_date, end_date)
+
+def export_to_fits(path='ftrt_historical.fits', start_date='1749-01-01', end_date=None):
+    """Exporta la misma serie como tabla binaria FITS (ver ftrt_exportacion.py)"""
+    from ftrt_exportacion import exportar_fits
+    return exportar_fits(path, start_date, end_date)
 
-def export_to_fits():
-    """Exporta datos a formato FITS estándar astronómico"""
-    # Implementación para exportación FITS
-    pass
+def open_exported_series(path):
+    """Lector perezoso de un archivo exportado: .ventana(inicio, fin, variables)"""
+    from ftrt_exportacion import LectorSeries
+    return LectorSeries(path)
 
 # INTERFAZ WEB PARA CONSULTA
 class FTRTWebAPI:
@@ -6,7 +6,6 @@ Fecha: Octubre 2025
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 from config.global_variables import *
 
@@ -164,28 +163,36 @@ class EnhancedFTRTAnalyzer:
 
     def _visualizar_comparativa_ftrt(self):
         """Visualización de comparativa FTRT"""
+        import matplotlib.pyplot as plt
+        self.figura_comparativa_ftrt()
+        plt.show()
+
+    def figura_comparativa_ftrt(self):
+        """Figura de la comparativa FTRT (sin mostrarla; ver ftrt_figuras.py)"""
+        import matplotlib.pyplot as plt
+
         nombres = [config.replace('_', '\n').title() for config in self.configuraciones_clave.keys()]
         valores_ftrt = [config['ftrt'] for config in self.configuraciones_clave.values()]
         colores = ['#FF6B6B', '#4ECDC4']
         
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(nombres, valores_ftrt, color=colores, alpha=0.8, edgecolor='black')
+        fig, ax = plt.subplots(figsize=(10, 6))
+        bars = ax.bar(nombres, valores_ftrt, color=colores, alpha=0.8, edgecolor='black')
         
-        plt.title('COMPARATIVA FTRT - EVENTOS SOLARES EXTREMOS', fontsize=14, fontweight='bold')
-        plt.ylabel('Fuerza de Marea Relativa Total (FTRT)', fontweight='bold')
-        plt.grid(axis='y', alpha=0.3)
+        ax.set_title('COMPARATIVA FTRT - EVENTOS SOLARES EXTREMOS', fontsize=14, fontweight='bold')
+        ax.set_ylabel('Fuerza de Marea Relativa Total (FTRT)', fontweight='bold')
+        ax.grid(axis='y', alpha=0.3)
         
         # Añadir valores
         for bar, valor in zip(bars, valores_ftrt):
-            plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
                     f'{valor:.3f}', ha='center', va='bottom', fontweight='bold', fontsize=12)
         
         # Añadir línea de umbral crítico
-        plt.axhline(y=2.5, color='red', linestyle='--', alpha=0.7, label='Umbral Crítico (2.5)')
-        plt.legend()
+        ax.axhline(y=2.5, color='red', linestyle='--', alpha=0.7, label='Umbral Crítico (2.5)')
+        ax.legend()
         
-        plt.tight_layout()
-        plt.show()
+        fig.tight_layout()
+        return fig
 
     def analisis_detallado_evento(self, evento_nombre):
         """Análisis detallado de un evento específico"""
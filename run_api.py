@@ -1,10 +1,54 @@
 """
 Script de inicio de API FTRT en producción
+
+Uso:
+    python run_api.py                      # Flask (api.py), workers gevent
+    python run_api.py --app fastapi        # FastAPI (api/main.py), workers uvicorn
+    python run_api.py --workers 8 --bind 0.0.0.0:8000
+
+La aplicación se carga en el proceso maestro antes del fork (preload_app):
+los módulos y el servicio común (ftrt_servicio.py: calculador y ventana de
+pronóstico precalculada) se comparten copy-on-write entre workers. Con
+--app fastapi el mismo proceso sirve también las rutas Flask.
+
+Con Flask, gevent parchea la biblioteca estándar al principio de este
+script, antes de importar nada más: con preload_app, 'import api' carga
+ssl, threading y el servicio en el maestro, y parchear después (en cada
+worker) dejaría esos módulos con los objetos sin parchear.
+
+En cada worker, post_worker_init reabre los handlers de log y rehace
+locks y semáforos (servicio.reiniciar_tras_fork).
+Los cálculos largos van al pool de hilos nativos del hub de gevent
+(ftrt_ejecucion.py, FTRT_HILOS_CPU) y no detienen al resto de peticiones. Los resultados deterministas se
+comparten además a través de la caché SQLite (ftrt_cache_compartida.py).
+
+Recarga sin cortes:
+    kill -HUP <pid maestro>    relanza los workers con la configuración nueva
+    kill -USR2 <pid maestro>   arranca un maestro con el código nuevo; después
+                               kill -TERM al maestro antiguo
 """
 
+import argparse
 import os
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Servidor de producción de la API FTRT")
+    parser.add_argument('--app', choices=['flask', 'fastapi'], default='flask')
+    parser.add_argument('--bind', default=os.environ.get('FTRT_BIND', '0.0.0.0:5000'))
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('FTRT_WORKERS', os.cpu_count() or 1)))
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = _argumentos()
+    if args.app == 'flask':
+        # Antes de cualquier otro import (ver docstring del módulo)
+        from gevent import monkey
+        monkey.patch_all()
+
+import gc
+import importlib.util
 from gunicorn.app.base import BaseApplication
-from api import app
 from utils.logger import ftrt_logger
 
 class FTRTApplication(BaseApplication):
@@ -21,18 +65,50 @@ class FTRTApplication(BaseApplication):
     def load(self):
         return self.application
 
+def cargar_flask():
+    from api import app, servicio
+    return app, servicio, 'gevent'
+
+def cargar_fastapi():
+    # 'api' resuelve a api.py; api/main.py se carga por ruta
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api', 'main.py')
+    spec = importlib.util.spec_from_file_location('ftrt_api_main', ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo.app, modulo.servicio, 'uvicorn.workers.UvicornWorker'
+
 if __name__ == '__main__':
+    app, servicio, worker_class = cargar_flask() if args.app == 'flask' else cargar_fastapi()
+
+    # Calentamiento único en el maestro: los workers heredan la ventana ya calculada
+    servicio.calentar()
+    # Sacar lo precargado del recolector: sin esto, cada ciclo de gc en un
+    # worker toca las cabeceras de los objetos y rompe el copy-on-write
+    gc.freeze()
+
+    def iniciar_worker(worker):
+        servicio.reiniciar_tras_fork()
+        servicio.iniciar()
+
     # Configuración de gunicorn
     options = {
-        'bind': '0.0.0.0:5000',
-        'workers': 4,
-        'worker_class': 'gevent',
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': worker_class,
+        'preload_app': True,
         'timeout': 120,
+        'graceful_timeout': 30,
         'keepalive': 5,
+        'worker_connections': 1000,
+        # Reciclar workers de forma escalonada acota el crecimiento de memoria
+        'max_requests': 10000,
+        'max_requests_jitter': 1000,
         'errorlog': 'logs/gunicorn_error.log',
         'accesslog': 'logs/gunicorn_access.log',
         'loglevel': 'info',
+        # Estado propio de cada worker y su hilo de desplazamiento del pronóstico
+        'post_worker_init': iniciar_worker,
     }
 
-    ftrt_logger.info("🚀 Iniciando API FTRT en producción")
-    FTRTApplication(app, options).run()
\ No newline at end of file
+    ftrt_logger.info(f"🚀 Iniciando API FTRT en producción ({args.app}, {args.workers} workers)")
+    FTRTApplication(app, options).run()
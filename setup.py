@@ -30,6 +30,14 @@ setup(
         "scipy>=1.7.0",
         "matplotlib>=3.5.0",
     ],
+    # Formatos opcionales: dataset Parquet y Arrow (ftrt_dataset, ftrt_formatos),
+    # MessagePack (ftrt_formatos) y NetCDF (ftrt_exportacion)
+    extras_require={
+        "parquet": ["pyarrow>=12.0.0"],
+        "msgpack": ["msgpack>=1.0.0"],
+        "netcdf": ["netCDF4>=1.6.0"],
+        "formatos": ["pyarrow>=12.0.0", "msgpack>=1.0.0", "netCDF4>=1.6.0"],
+    },
     include_package_data=True,
     package_data={
         "heliofisica_ftrt": ["data/*.csv", "data/*.json"],
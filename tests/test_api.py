@@ -54,6 +54,112 @@ class TestFTRTAPI(unittest.TestCase):
         self.assertTrue(data['success'])
         self.assertEqual(len(data['data']), 5)
     
+    def test_prediccion_paginada(self):
+        """Paginación por cursor y límite de horizonte"""
+        response = self.app.get('/api/v1/ftrt/prediccion?fecha_inicio=2026-01-01&dias=10&limite=4')
+        data = json.loads(response.data)
+        fechas = [d['fecha'] for d in data['data']]
+        
+        while data['metadata']['siguiente_cursor']:
+            response = self.app.get('/api/v1/ftrt/prediccion?cursor=' + data['metadata']['siguiente_cursor'])
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.data)
+            fechas += [d['fecha'] for d in data['data']]
+        
+        self.assertEqual(len(fechas), 10)
+        self.assertEqual(fechas[0], '2026-01-01')
+        self.assertEqual(fechas[-1], '2026-01-10')
+        
+        # Horizonte por encima del máximo configurado
+        response = self.app.get('/api/v1/ftrt/prediccion?dias=1000000')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(json.loads(response.data)['success'])
+    
+    def test_lote_columnar(self):
+        """Lote de fechas sueltas y rangos con respuesta columnar"""
+        consulta = {
+            'fechas': ['2024-05-10', '2003-10-29'],
+            'rangos': [{'inicio': '2026-01-01', 'fin': '2026-01-02', 'paso_horas': 12}]
+        }
+        response = self.app.post('/api/v1/ftrt/lote', json=consulta)
+        self.assertEqual(response.status_code, 200)
+        lote = json.loads(response.data)['data']
+        
+        self.assertEqual(lote['n'], 5)
+        self.assertEqual(lote['fechas'][2:], ['2026-01-01T00:00:00', '2026-01-01T12:00:00', '2026-01-02T00:00:00'])
+        self.assertAlmostEqual(lote['ftrt'][0], 1.34, places=2)
+        self.assertEqual(lote['niveles'][lote['nivel'][1]], 'EXTREMO')
+        for valores in lote['contribuciones'].values():
+            self.assertEqual(len(valores), 5)
+        
+        # Cuerpo vacío y lote por encima del máximo
+        response = self.app.post('/api/v1/ftrt/lote', json={})
+        self.assertEqual(response.status_code, 400)
+        response = self.app.post('/api/v1/ftrt/lote', json={
+            'rangos': [{'inicio': '1900-01-01', 'fin': '2100-01-01', 'paso_horas': 1}]
+        })
+        self.assertEqual(response.status_code, 400)
+        
+        # 'fechas' que no es una lista
+        response = self.app.post('/api/v1/ftrt/lote', json={'fechas': 20240510})
+        self.assertEqual(response.status_code, 400)
+        
+        # paso_horas no finito (1e400 se parsea como infinito)
+        response = self.app.post('/api/v1/ftrt/lote', content_type='application/json', data=(
+            '{"rangos": [{"inicio": "2026-01-01", "fin": "2026-01-02", "paso_horas": 1e400}]}'))
+        self.assertEqual(response.status_code, 400)
+    
+    def test_etag_condicional(self):
+        """Fechas fijas llevan ETag y If-None-Match responde 304 sin recalcular"""
+        response = self.app.get('/api/v1/ftrt/calcular?fecha=2024-05-10')
+        etag = response.headers['ETag']
+        self.assertIn('max-age', response.headers['Cache-Control'])
+        
+        response = self.app.get('/api/v1/ftrt/calcular?fecha=2024-05-10',
+                                headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        
+        # Otra fecha u otra ruta tienen otro ETag; sin fecha no es cacheable
+        otra = self.app.get('/api/v1/ftrt/calcular?fecha=2024-05-11').headers['ETag']
+        alerta = self.app.get('/api/v1/ftrt/alerta?fecha=2024-05-10').headers['ETag']
+        self.assertEqual(len({etag, otra, alerta}), 3)
+        self.assertNotIn('ETag', self.app.get('/api/v1/ftrt/calcular').headers)
+        
+        response = self.app.get('/api/v1/ftrt/prediccion?fecha_inicio=2026-01-01&dias=5')
+        response = self.app.get('/api/v1/ftrt/prediccion?fecha_inicio=2026-01-01&dias=5',
+                                headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+    
+    def test_agregados(self):
+        """Rollups desde la pirámide: resolución automática y errores de rango"""
+        response = self.app.get('/api/v1/ftrt/agregados?inicio=1900-01-01&fin=2100-01-01')
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['data']['resolucion'], 'anual')
+        self.assertEqual(data['data']['n'], 200)
+        self.assertIn('ETag', response.headers)
+        
+        response = self.app.get('/api/v1/ftrt/agregados?resolucion=diaria&inicio=1900-01-01&fin=2100-01-01')
+        self.assertEqual(response.status_code, 400)
+    
+    def test_admision_429(self):
+        """Un cliente sin cuota recibe 429 con Retry-After"""
+        from api import admision
+        capacidad = admision.capacidad
+        admision.capacidad = 10
+        admision._cubos.clear()
+        try:
+            response = self.app.get('/api/v1/ftrt/prediccion?fecha_inicio=2030-01-01&dias=8')
+            self.assertEqual(response.status_code, 200)
+            response = self.app.get('/api/v1/ftrt/prediccion?fecha_inicio=2031-01-01&dias=8')
+            self.assertEqual(response.status_code, 429)
+            self.assertIn('Retry-After', response.headers)
+            self.assertFalse(json.loads(response.data)['success'])
+        finally:
+            admision.capacidad = capacidad
+            admision._cubos.clear()
+    
     def test_error_handling(self):
         """Test manejo de errores"""
         # Fecha inválida
@@ -0,0 +1,63 @@
+"""
+Tests del control de admisión de la API FTRT
+"""
+
+import threading
+import unittest
+from ftrt_admision import AdmisionRechazada, ControlAdmision, CuboTokens, coste_puntos
+
+class TestControlAdmision(unittest.TestCase):
+    
+    def test_cubo_tokens(self):
+        """El coste se descuenta y la espera refleja la recarga pendiente"""
+        cubo = CuboTokens(capacidad=100, recarga_por_segundo=10, ahora=0.0)
+        self.assertEqual(cubo.consumir(80, ahora=0.0), 0.0)
+        self.assertAlmostEqual(cubo.consumir(50, ahora=0.0), 3.0)
+        self.assertEqual(cubo.consumir(50, ahora=3.0), 0.0)
+        self.assertEqual(coste_puntos(30, paso_horas=1), 720)
+    
+    def test_cuota_por_cliente(self):
+        """Un cliente costoso agota su cuota sin afectar a los demás"""
+        control = ControlAdmision(capacidad=1000, recarga=1)
+        with control.admitir('a', 'prediccion', 900):
+            pass
+        with self.assertRaises(AdmisionRechazada) as rechazo:
+            with control.admitir('a', 'prediccion', 900):
+                pass
+        self.assertGreaterEqual(rechazo.exception.reintentar_en, 800)
+        
+        with control.admitir('b', 'prediccion', 900):
+            pass
+        with self.assertRaises(ValueError):
+            with control.admitir('c', 'prediccion', 5000):
+                pass
+    
+    def test_concurrencia_y_cola(self):
+        """Con el endpoint ocupado y la cola llena se rechaza al instante"""
+        control = ControlAdmision(concurrencia=1, max_cola=0, espera_max=0.05)
+        ocupado, liberar = threading.Event(), threading.Event()
+        
+        def lenta():
+            with control.admitir('a', 'lote', 1):
+                ocupado.set()
+                liberar.wait(5)
+        
+        hilo = threading.Thread(target=lenta)
+        hilo.start()
+        ocupado.wait(5)
+        try:
+            with self.assertRaises(AdmisionRechazada):
+                with control.admitir('b', 'lote', 1):
+                    pass
+            # El rechazo por saturación no gasta cuota del cliente
+            self.assertAlmostEqual(control._cubos['b'].tokens, control.capacidad, places=3)
+            # Otros endpoints no comparten el límite
+            with control.admitir('b', 'prediccion', 1):
+                pass
+        finally:
+            liberar.set()
+            hilo.join()
+        self.assertEqual(control.metricas()['rechazadas']['cola_llena'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
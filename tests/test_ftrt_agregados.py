@@ -0,0 +1,65 @@
+"""
+Tests de la pirámide de agregados FTRT
+"""
+
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from ftrt_core import FTRTCalculator
+from ftrt_agregados import PiramideFTRT
+
+class TestPiramideFTRT(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.directorio = tempfile.mkdtemp()
+        cls.calculador = FTRTCalculator()
+        cls.piramide = PiramideFTRT(cls.calculador, 2000, 2030, cls.directorio).cargar()
+    
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directorio, ignore_errors=True)
+    
+    def test_agregados_coinciden_con_serie_diaria(self):
+        """El resumen anual y mensual equivale a agregar los datos diarios"""
+        fechas = np.arange(np.datetime64('2024-01-01'), np.datetime64('2025-01-01'))
+        diario = self.calculador.calcular_ftrt_rango(fechas)
+        
+        anual = self.piramide.consultar('anual', '2024-01-01', '2025-01-01')
+        self.assertEqual(anual['n'], 1)
+        self.assertEqual(anual['dias'], [366])
+        self.assertAlmostEqual(anual['ftrt_max'][0], diario['ftrt_normalizada'].max(), places=5)
+        self.assertAlmostEqual(anual['ftrt_media'][0], diario['ftrt_normalizada'].mean(), places=5)
+        self.assertEqual(anual['fecha_max'][0], str(fechas[diario['ftrt_normalizada'].argmax()]))
+        self.assertEqual(anual['dias_por_nivel'][0], np.bincount(diario['nivel'], minlength=5).tolist())
+        
+        mensual = self.piramide.consultar('mensual', '2024-01-01', '2025-01-01')
+        self.assertEqual(sum(mensual['dias']), 366)
+    
+    def test_semanas_iso(self):
+        """Las semanas empiezan en lunes y tienen 7 días salvo en los extremos"""
+        semanal = self.piramide.consultar('semanal', '2024-01-01', '2024-03-01')
+        self.assertTrue(all(np.datetime64(d).astype('datetime64[D]').astype(int) % 7 == 4
+                            for d in semanal['inicio']))
+        self.assertEqual(set(semanal['dias']), {7})
+    
+    def test_resolucion_auto_y_limites(self):
+        """'auto' elige la más fina que cabe; una fija que no cabe es un error"""
+        self.assertEqual(self.piramide.consultar('auto', '2024-01-01', '2024-06-01')['resolucion'], 'diaria')
+        self.assertEqual(self.piramide.consultar('auto', '2000-01-01', '2030-01-01')['resolucion'], 'mensual')
+        with self.assertRaises(ValueError):
+            self.piramide.consultar('diaria', '2000-01-01', '2030-01-01')
+        with self.assertRaises(ValueError):
+            self.piramide.consultar('quincenal')
+    
+    def test_persistencia(self):
+        """La segunda carga lee el .npz en lugar de recalcular"""
+        recargada = PiramideFTRT(self.calculador, 2000, 2030, self.directorio).cargar()
+        self.assertEqual(
+            recargada.consultar('anual', '2010-01-01', '2012-01-01'),
+            self.piramide.consultar('anual', '2010-01-01', '2012-01-01')
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Tests de la caché compartida entre procesos
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from ftrt_cache_compartida import CacheCompartida
+
+def _escribir_en_hijo(ruta):
+    cache = CacheCompartida('modelo-a', ruta=ruta)
+    cache.guardar('hijo', str(os.getpid()).encode())
+
+class TestCacheCompartida(unittest.TestCase):
+    
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.ruta = os.path.join(self.directorio, 'cache.sqlite')
+    
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+    
+    def test_acierto_y_fallo(self):
+        """Solo se calcula una vez por clave"""
+        cache = CacheCompartida('modelo-a', ruta=self.ruta)
+        llamadas = []
+        calcular = lambda: llamadas.append(1) or b'valor'
+        
+        self.assertEqual(cache.obtener_o_calcular('k', calcular), b'valor')
+        self.assertEqual(cache.obtener_o_calcular('k', calcular), b'valor')
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(cache.metricas()['aciertos'], 1)
+    
+    def test_cambio_de_huella(self):
+        """Un modelo nuevo no ve ni conserva las entradas del anterior"""
+        CacheCompartida('modelo-a', ruta=self.ruta).guardar('k', b'viejo')
+        cache = CacheCompartida('modelo-b', ruta=self.ruta)
+        self.assertIsNone(cache.obtener('k'))
+        self.assertEqual(cache.metricas()['entradas'], 0)
+    
+    def test_compartida_entre_procesos(self):
+        """Lo que guarda otro proceso se lee sin recalcular"""
+        cache = CacheCompartida('modelo-a', ruta=self.ruta)
+        proceso = multiprocessing.get_context('fork').Process(
+            target=_escribir_en_hijo, args=(self.ruta,)
+        )
+        proceso.start()
+        proceso.join(10)
+        self.assertEqual(proceso.exitcode, 0)
+        self.assertEqual(cache.obtener('hijo'), str(proceso.pid).encode())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests del catálogo compacto de eventos
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from ftrt_catalogo_eventos import CatalogoEventos
+from historical_database import HISTORICAL_EVENTS
+from historical_analysis.correlations_database import SOLAR_EVENTS_DB
+
+class TestCatalogoEventos(unittest.TestCase):
+
+    def test_solar_events_db(self):
+        """Campos anidados y efectos de SOLAR_EVENTS_DB"""
+        catalogo = CatalogoEventos.desde_solar_events_db()
+        self.assertEqual(len(catalogo), len(SOLAR_EVENTS_DB))
+
+        evento = catalogo.por_id('1859_carrington')
+        original = SOLAR_EVENTS_DB['1859_carrington']
+        self.assertEqual(evento['date'], original['date'])
+        self.assertEqual(evento['dst_index'], original['effects']['geomagnetic']['dst_index'])
+        self.assertEqual(evento['effects'], original['effects']['technological'])
+        self.assertIsNone(catalogo.por_id('no_existe'))
+
+    def test_busquedas_por_fecha_y_tipo(self):
+        catalogo = CatalogoEventos.desde_historical_events()
+        self.assertEqual(len(catalogo), len(HISTORICAL_EVENTS))
+
+        [fila] = catalogo.por_fecha('2003-10-29')
+        self.assertEqual(catalogo.evento(fila)['type'], 'Halloween Storms')
+
+        # Rango en orden cronológico aunque la lista original no lo esté
+        años = [catalogo.evento(i)['year'] for i in catalogo.entre('1700-01-01', '1950-01-01')]
+        self.assertEqual(años, [1770, 1859, 1921])
+        self.assertEqual(len(catalogo.por_tipo('Great Storm')), 2)
+        self.assertEqual(len(catalogo.por_tipo('Desconocido')), 0)
+
+        # Cadenas internadas: cada texto repetido ocupa un solo código
+        self.assertEqual(len(set(catalogo.datos['tipo'])), len({e['event_type'] for e in HISTORICAL_EVENTS}))
+
+    def test_analizador_de_patrones(self):
+        """El analizador consulta el catálogo en vez de recorrer los dicts"""
+        from analysis.historical_patterns import FTRTHistoricalPatternAnalyzer
+        analizador = FTRTHistoricalPatternAnalyzer()
+
+        evento = analizador.find_event_by_data([3.21, 1859, 2])
+        self.assertEqual((evento['event'], evento['era']), ('Evento Carrington', 'industrial'))
+        self.assertIsNone(analizador.find_event_by_data([3.5, 1859, 2]))
+
+        agrupados = analizador.cluster_historical_events()
+        self.assertEqual(sum(len(eventos) for eventos in agrupados.values()), len(analizador.event_catalog))
+        self.assertTrue(all(e is not None for eventos in agrupados.values() for e in eventos))
+
+    def test_ids_repetidos(self):
+        """Dos eventos del mismo día y tipo no se pisan en el índice por id"""
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'eventos.csv')
+            with open(ruta, 'w', encoding='utf-8') as f:
+                f.write('event_date,event_type,magnitude,flare_class\n'
+                        '2003-10-28,Halloween Storms,9.5,X17\n'
+                        '2003-10-28,Halloween Storms,8.0,X10\n'
+                        '2003-10-28,Halloween Storms_2,1.0,C1\n')
+            catalogo = CatalogoEventos.desde_csv(ruta)
+        clases = {i: catalogo.evento(catalogo.fila(i))['flare_class']
+                  for i in ('2003-10-28_Halloween Storms', '2003-10-28_Halloween Storms_3')}
+        self.assertEqual(clases, {'2003-10-28_Halloween Storms': 'X17', '2003-10-28_Halloween Storms_3': 'X10'})
+
+        # Ids explícitos repetidos se rechazan
+        with self.assertRaises(ValueError):
+            CatalogoEventos.desde_registros([{'id': 'a'}, {'id': 'a'}])
+
+    def test_memoria_por_evento(self):
+        registros = [dict(HISTORICAL_EVENTS[i % len(HISTORICAL_EVENTS)],
+                          event_date=str(np.datetime64('1900-01-01') + i)) for i in range(10000)]
+        catalogo = CatalogoEventos.desde_historical_events(registros)
+        self.assertLess(catalogo.nbytes / len(catalogo), 80)
+        self.assertEqual(catalogo.fila(f"{registros[1234]['event_date']}_{registros[1234]['event_type']}"), 1234)
+
+if __name__ == '__main__':
+    unittest.main()
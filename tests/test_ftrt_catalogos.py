@@ -0,0 +1,78 @@
+"""
+Tests de la carga tipada por bloques de catálogos
+"""
+
+import io
+import json
+import unittest
+import numpy as np
+from ftrt_catalogos import (ESQUEMA_EVENTOS, ESQUEMA_INDICES, FALTA_CATEGORIA, FALTA_ENTERO, Categorias,
+                            cargar_catalogo, desde_registros, fechas, leer_por_bloques, resumir)
+
+RUTA_EVENTOS = 'data/solar_events.csv'
+
+class TestCatalogos(unittest.TestCase):
+
+    def test_eventos_tipados(self):
+        """Fechas int64, faltantes marcados y categorías como códigos"""
+        eventos, categorias = cargar_catalogo(RUTA_EVENTOS)
+
+        self.assertEqual(len(eventos), 10)
+        self.assertEqual(eventos.dtype['event_date'], np.int64)
+        self.assertEqual(eventos.dtype['event_type'], np.int32)
+        self.assertEqual(str(fechas(eventos['event_date'][0])), '1859-09-01T00:00:00')
+        self.assertEqual(categorias.decodificar(eventos['event_type'][:2]), ['Carrington', 'Great Storm'])
+        self.assertEqual(categorias.decodificar(eventos['sources'][:1]), ['Carrington, Hodgson'])
+
+        # 1921: sin región ni velocidad CME; 2012: sin Dst ni Kp
+        self.assertEqual(eventos['region_number'][1], FALTA_ENTERO)
+        self.assertTrue(np.isnan(eventos['cme_speed'][1]))
+        self.assertEqual(eventos['kp_index'][4], FALTA_ENTERO)
+        self.assertTrue(eventos['verified'].all())
+
+    def test_bloques_equivalen_a_carga_completa(self):
+        categorias = Categorias()
+        bloques = list(leer_por_bloques(RUTA_EVENTOS, ESQUEMA_EVENTOS, categorias, tamano_bloque=3))
+        self.assertEqual([len(b) for b in bloques], [3, 3, 3, 1])
+
+        completo, _ = cargar_catalogo(RUTA_EVENTOS)
+        unido = np.concatenate(bloques)
+        np.testing.assert_array_equal(unido['event_date'], completo['event_date'])
+        np.testing.assert_array_equal(unido['dst_index'], completo['dst_index'])
+
+    def test_indices_ndjson(self):
+        """NDJSON con campos ausentes; el resumen recorre bloques"""
+        lineas = [json.dumps({'time': f'2024-05-11T{h:02d}:00:00Z', 'dst_index': -100 - h, 'kp_index': 7})
+                  for h in range(24)]
+        lineas[5] = json.dumps({'time': '2024-05-11T05:00:00Z'})
+        flujo = io.StringIO('\n'.join(lineas) + '\n')
+
+        indices, _ = cargar_catalogo(flujo, ESQUEMA_INDICES, formato='ndjson', tamano_bloque=7)
+        self.assertEqual(len(indices), 24)
+        self.assertEqual(indices.dtype['dst_index'], np.float32)
+        self.assertTrue(np.isnan(indices['dst_index'][5]))
+        self.assertTrue(np.isnan(indices['ae_index']).all())
+
+        resumen = resumir(io.StringIO('\n'.join(lineas)), ESQUEMA_INDICES, tamano_bloque=5, formato='ndjson')
+        self.assertEqual(resumen['filas'], 24)
+        self.assertEqual(resumen['columnas']['dst_index'], {'min': -123.0, 'max': -100.0})
+        self.assertEqual(resumen['columnas']['time']['max'], '2024-05-11T23:00:00')
+
+    def test_registros_anidados(self):
+        from historical_analysis.correlations_database import SOLAR_EVENTS_DB
+        esquema = (('date', 'fecha'), ('type', 'categoria'), ('dst_index', 'real'), ('aurora', 'entero'))
+        alias = {'dst_index': 'effects.geomagnetic.dst_index', 'aurora': 'effects.aurora.lowest_latitude'}
+
+        eventos, categorias = desde_registros(SOLAR_EVENTS_DB.values(), esquema, alias=alias)
+        self.assertEqual(len(eventos), len(SOLAR_EVENTS_DB))
+        self.assertEqual(eventos['dst_index'][0], -1760)
+        self.assertEqual(eventos['aurora'][0], 15)
+        self.assertEqual(categorias.codigo('Carrington Event'), eventos['type'][0])
+        self.assertEqual(categorias.codigo('no existe'), FALTA_CATEGORIA)
+
+    def test_valor_invalido(self):
+        with self.assertRaises(ValueError):
+            cargar_catalogo(io.StringIO('time,dst_index\n2024-01-01,abc\n'), ESQUEMA_INDICES)
+
+if __name__ == '__main__':
+    unittest.main()
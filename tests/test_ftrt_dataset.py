@@ -0,0 +1,110 @@
+"""
+Tests del dataset FTRT en Parquet particionado por año
+"""
+
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from ftrt_dataset import DatasetFTRT, leer_ftrt
+from ftrt_exportacion import series_diarias
+
+HAY_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+class TestDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_sin_dataset_calcula_con_el_motor(self):
+        """Sin dataset (o sin pyarrow) se calculan solo los años pedidos"""
+        serie = leer_ftrt(['ftrt_normalized', 'jupiter_ftrt'], años=[2003, 1859], directorio=self.directorio)
+        self.assertEqual(list(serie.columns), ['time', 'ftrt_normalized', 'jupiter_ftrt'])
+        self.assertEqual(len(serie), 365 + 365)
+        self.assertEqual(sorted(set(serie['time'].dt.year)), [1859, 2003])
+        referencia = next(series_diarias('2003-01-01', '2003-12-31'))
+        np.testing.assert_array_equal(serie['ftrt_normalized'].to_numpy()[365:], referencia['ftrt_normalized'])
+        with self.assertRaises(ValueError):
+            leer_ftrt(['ftrt_normalized'], desde='2003-01-01')
+        with self.assertRaises(ValueError):
+            leer_ftrt(['no_existe'], años=[2003], directorio=self.directorio)
+
+        # Sin columnas del baricentro no se calcula la serie baricéntrica
+        ceros = {'barycenter_offset': np.zeros(365), 'tension_index': np.zeros(365)}
+        with mock.patch('analysis.barycenter_correlation.BarycentricAnalyzer.barycenter_series',
+                        return_value=ceros) as baricentro:
+            leer_ftrt(['ftrt_normalized'], años=[2003], directorio=self.directorio)
+            baricentro.assert_not_called()
+            leer_ftrt(['tension_index'], años=[2003], directorio=self.directorio)
+            baricentro.assert_called_once()
+
+    @unittest.skipUnless(HAY_PYARROW, "pyarrow no instalado")
+    def test_poda_de_particiones_y_columnas(self):
+        dataset = DatasetFTRT(self.directorio)
+        escritos = dataset.escribir('2001-03-15', '2004-12-31')
+        self.assertEqual((escritos['años'], escritos['filas']), (4, 1461))  # años completos desde el 1 de enero
+        self.assertTrue(os.path.exists(os.path.join(self.directorio, 'diaria', 'year=2003', 'part-0.parquet')))
+
+        ventana = dataset.leer(['ftrt_normalized'], '2003-10-28', '2003-10-30')
+        self.assertEqual(list(ventana.columns), ['time', 'ftrt_normalized'])
+        self.assertEqual(ventana['time'].dt.strftime('%Y-%m-%d').tolist(), ['2003-10-28', '2003-10-29', '2003-10-30'])
+        self.assertEqual(ventana['ftrt_normalized'][1], 4.87)  # Halloween 2003 (precalculado)
+        self.assertEqual(dataset.ultima_consulta['archivos'], 1)
+
+        self.assertEqual(len(dataset.leer(['risk_level'], años=[2002, 2004])), 365 + 366)
+        self.assertEqual(dataset.ultima_consulta['archivos'], 2)
+
+        # El mismo resultado que el motor
+        calculado = leer_ftrt(['tension_index'], '2002-01-01', '2003-12-31', directorio='/no/existe')
+        leido = leer_ftrt(['tension_index'], '2002-01-01', '2003-12-31', directorio=self.directorio)
+        np.testing.assert_array_equal(leido['tension_index'], calculado['tension_index'])
+        np.testing.assert_array_equal(leido['time'], calculado['time'])
+
+    @unittest.skipUnless(HAY_PYARROW, "pyarrow no instalado")
+    def test_filtro_con_estadisticas(self):
+        dataset = DatasetFTRT(self.directorio, 'horaria')
+        dataset.escribir('2003-01-01', '2003-12-31')
+        maximo = dataset.leer(['ftrt_normalized'])['ftrt_normalized'].max()
+
+        picos = dataset.leer(['ftrt_normalized'], filtros=[('ftrt_normalized', '>=', maximo)])
+        self.assertTrue((picos['ftrt_normalized'] == maximo).all())
+        self.assertLess(dataset.ultima_consulta['grupos'], 12)  # meses descartados por min/max
+        with self.assertRaises(ValueError):
+            dataset.leer(['ftrt_normalized'], filtros=[('ftrt_normalized', '~', 1)])
+
+    @unittest.skipUnless(HAY_PYARROW, "pyarrow no instalado")
+    def test_dataset_de_otro_modelo_no_se_usa(self):
+        dataset = DatasetFTRT(self.directorio)
+        dataset.escribir('2003-01-01', '2003-06-30')
+        self.assertTrue(dataset.disponible('2003-02-01', '2003-06-30'))
+        self.assertFalse(dataset.disponible('2003-02-01', '2003-07-01'))
+        self.assertFalse(dataset.disponible('2002-12-31', '2003-01-31'))
+
+        with mock.patch.object(dataset.calculador, 'huella_modelo', return_value='otro'):
+            self.assertFalse(dataset.disponible('2003-02-01', '2003-06-30'))
+            dataset.escribir('2004-01-01', '2004-01-31')
+        self.assertFalse(os.path.exists(os.path.join(self.directorio, 'diaria', 'year=2003')))
+
+    def test_analisis_leen_columnas_y_años(self):
+        from analysis.historical_patterns import FTRTHistoricalPatternAnalyzer
+        from historical_database import AdvancedStatisticalAnalysis
+
+        analizador = FTRTHistoricalPatternAnalyzer()
+        with mock.patch('ftrt_dataset.leer_ftrt', wraps=leer_ftrt) as lectura:
+            fisica = analizador.physical_ftrt_by_event()
+        self.assertEqual(lectura.call_args.args[0], ['ftrt_normalized'])
+        self.assertEqual(sorted(lectura.call_args.kwargs['años']), sorted(set(analizador.event_catalog.años)))
+        self.assertEqual(len(fisica), len(analizador.event_catalog))
+        self.assertFalse(np.isnan(fisica).any())
+
+        espectro = AdvancedStatisticalAnalysis(None).spectral_analysis(1900, 2000)
+        self.assertEqual(espectro['measured_power'].max(), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests del cálculo vectorizado y la búsqueda de eventos FTRT
+"""
+
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from ftrt_core import FTRTCalculator
+from ftrt_eventos import BuscadorEventosFTRT
+
+class TestFTRTRango(unittest.TestCase):
+    
+    def setUp(self):
+        self.calculator = FTRTCalculator()
+    
+    def test_coincide_con_calculo_escalar(self):
+        """El cálculo por lotes reproduce calcular_ftrt_total"""
+        fechas = [datetime(2025, 1, 1) + timedelta(days=45 * i) for i in range(12)]
+        rango = self.calculator.calcular_ftrt_rango(fechas)
+        
+        for i, fecha in enumerate(fechas):
+            escalar = self.calculator.calcular_ftrt_total(fecha)
+            self.assertAlmostEqual(
+                rango['ftrt_normalizada'][i] / escalar['ftrt_normalizada'], 1.0, places=2
+            )
+    
+    def test_precalculados_y_niveles(self):
+        """Las fechas históricas usan datos precalculados y se clasifican igual"""
+        rango = self.calculator.calcular_ftrt_rango(['2003-10-29', '2024-05-10', '2024-05-11'])
+        
+        self.assertEqual(list(rango['precalculado']), [True, True, False])
+        self.assertAlmostEqual(rango['ftrt_normalizada'][0], 4.87, places=2)
+        
+        for ftrt, codigo in zip(rango['ftrt_normalizada'], rango['nivel']):
+            self.assertEqual(self.calculator.NIVELES_RIESGO[codigo][0],
+                             self.calculator.evaluar_riesgo(ftrt)[0])
+
+class TestBuscadorEventos(unittest.TestCase):
+    
+    def setUp(self):
+        self.buscador = BuscadorEventosFTRT()
+    
+    def test_cruces_exactos(self):
+        """Cada cruce cae sobre su umbral y alterna de dirección"""
+        cruces = self.buscador.buscar_cruces(datetime(2025, 1, 1), datetime(2030, 1, 1))
+        self.assertGreater(len(cruces), 0)
+        
+        for cruce in cruces:
+            dia = (cruce['fecha'] - datetime(2000, 1, 1, 12)).total_seconds() / 86400
+            self.assertAlmostEqual(self.buscador._escalar(dia), cruce['valor_umbral'], places=5)
+        
+        criticos = [c['direccion'] for c in cruces if c['umbral'] == 'critico']
+        for actual, siguiente in zip(criticos, criticos[1:]):
+            self.assertNotEqual(actual, siguiente)
+    
+    def test_maximo_coincide_con_muestreo_fino(self):
+        """El máximo refinado coincide con un barrido horario"""
+        inicio, fin = datetime(2026, 6, 1), datetime(2027, 3, 1)
+        maximos = self.buscador.buscar_maximos(inicio, fin)
+        mayor = max(maximos, key=lambda m: m['ftrt'])
+        
+        horas = np.arange(0, (fin - inicio).days * 24)
+        dias = (inicio - datetime(2000, 1, 1, 12)).total_seconds() / 86400 + horas / 24
+        valores = self.buscador.ftrt_continua(dias)
+        
+        self.assertGreaterEqual(mayor['ftrt'], valores.max() - 1e-6)
+        self.assertAlmostEqual(mayor['ftrt'], valores.max(), places=3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests de la exportación NetCDF/FITS y su lector perezoso
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+import numpy as np
+from ftrt_exportacion import VARIABLES, LectorSeries, exportar_fits, exportar_netcdf, series_diarias
+
+HAY_NETCDF4 = importlib.util.find_spec('netCDF4') is not None
+HAY_ASTROPY = importlib.util.find_spec('astropy') is not None
+
+class TestExportacion(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.referencia = next(series_diarias('2003-01-01', '2004-12-31'))
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _comprobar(self, ruta, formato):
+        with LectorSeries(ruta) as lector:
+            self.assertEqual(lector.formato, formato)
+            self.assertEqual(len(lector), 731)
+            self.assertEqual(set(lector.variables), {v[0] for v in VARIABLES})
+
+            ventana = lector.ventana('2003-10-28', '2003-10-30', ['ftrt_normalized', 'risk_level'])
+            self.assertEqual(ventana['time'].astype(str).tolist(), ['2003-10-28', '2003-10-29', '2003-10-30'])
+            i = (np.datetime64('2003-10-28') - np.datetime64('2003-01-01')).astype(int)
+            np.testing.assert_array_equal(ventana['ftrt_normalized'], self.referencia['ftrt_normalized'][i:i + 3])
+            self.assertEqual(ventana['risk_level'][1], 4)  # Halloween 2003 (precalculado)
+
+            todo = lector.ventana()
+            for nombre, tipo, _, _ in VARIABLES:
+                np.testing.assert_allclose(todo[nombre], self.referencia[nombre], rtol=1e-6)
+            with self.assertRaises(ValueError):
+                lector.ventana(variables=['no_existe'])
+
+    def test_netcdf3_sin_netcdf4(self):
+        ruta = os.path.join(self.directorio, 'ftrt.nc')
+        with mock.patch.dict(sys.modules, {'netCDF4': None}):
+            resultado = exportar_netcdf(ruta, '2003-01-01', '2004-12-31')
+            self.assertEqual(resultado['formato'], 'NETCDF3_64BIT_OFFSET')
+            self._comprobar(ruta, 'NETCDF3')
+            with LectorSeries(ruta) as lector:
+                self.assertEqual(lector.atributos()['Conventions'], 'CF-1.8')
+                self.assertEqual(lector.atributos('time')['units'], 'days since 1970-01-01 00:00:00')
+                self.assertEqual(lector.atributos('risk_level')['flag_meanings'],
+                                 'NORMAL MODERADO ELEVADO CRITICO EXTREMO')
+
+    @unittest.skipUnless(HAY_NETCDF4, "netCDF4 no instalado")
+    def test_netcdf4_comprimido(self):
+        import netCDF4
+        ruta = os.path.join(self.directorio, 'ftrt.nc')
+        self.assertEqual(exportar_netcdf(ruta, '2003-01-01', '2004-12-31', dias_chunk=100)['formato'], 'NETCDF4')
+        with netCDF4.Dataset(ruta) as ds:
+            self.assertEqual(ds['ftrt_total'].chunking(), [100])
+            self.assertTrue(ds['ftrt_total'].filters()['zlib'])
+        self._comprobar(ruta, 'NETCDF4')
+
+    def test_fits(self):
+        ruta = os.path.join(self.directorio, 'ftrt.fits')
+        resultado = exportar_fits(ruta, '2003-01-01', '2004-12-31')
+        self.assertEqual(resultado['bytes'] % 2880, 0)
+        self._comprobar(ruta, 'FITS')
+
+    @unittest.skipUnless(HAY_ASTROPY, "astropy no instalado")
+    def test_fits_legible_con_astropy(self):
+        from astropy.io import fits
+        ruta = os.path.join(self.directorio, 'ftrt.fits')
+        exportar_fits(ruta, '2003-01-01', '2003-01-10')
+        with fits.open(ruta) as hdul:
+            hdul.verify('exception')
+            self.assertEqual(hdul[1].header['EXTNAME'], 'FTRT')
+            self.assertEqual(hdul[1].data['TIME'][0], int(np.datetime64('2003-01-01').astype(int)))
+            np.testing.assert_allclose(hdul[1].data['JUPITER_FTRT'], self.referencia['jupiter_ftrt'][:10])
+
+    def test_baricentro_vectorizado(self):
+        """Mismas fórmulas que el cálculo con ephem, día a día"""
+        from analysis.barycenter_correlation import BarycentricAnalyzer
+        analizador = BarycentricAnalyzer()
+        fecha = datetime(2003, 10, 28)
+        serie = analizador.barycenter_series([np.datetime64(fecha, 's')])
+        self.assertAlmostEqual(serie['barycenter_offset'][0], analizador.calculate_barycenter_offset(fecha), places=2)
+        self.assertAlmostEqual(serie['tension_index'][0] * 1e4,
+                               analizador.analyze_planetary_configuration(fecha)['tension_index'] * 1e4, places=2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests del renderizado de figuras por lotes
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from ftrt_figuras import TareaFigura, renderizar_figuras
+
+COMPARATIVA = 'interactive_ftrt_enhanced:EnhancedFTRTAnalyzer.figura_comparativa_ftrt'
+BARICENTRO = 'analysis.barycenter_correlation:BarycentricAnalyzer.plot_event_analysis'
+
+class TestFiguras(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_cache_por_huella(self):
+        """Una figura sin cambios no se vuelve a dibujar"""
+        tarea = TareaFigura('comparativa', COMPARATIVA, formatos=('png', 'svg'))
+
+        primera = renderizar_figuras([tarea], self.directorio, procesos=1)['comparativa']
+        self.assertEqual(primera['estado'], 'renderizada')
+        self.assertEqual([os.path.basename(r) for r in primera['rutas']], ['comparativa.png', 'comparativa.svg'])
+        for ruta in primera['rutas']:
+            self.assertGreater(os.path.getsize(ruta), 0)
+
+        self.assertEqual(renderizar_figuras([tarea], self.directorio, procesos=1)['comparativa']['estado'], 'cache')
+        self.assertEqual(
+            renderizar_figuras([tarea], self.directorio, procesos=1, forzar=True)['comparativa']['estado'],
+            'renderizada'
+        )
+
+        # Otra resolución cambia la huella; un archivo borrado también invalida la caché
+        otra = TareaFigura('comparativa', COMPARATIVA, formatos=('png', 'svg'), dpi=72)
+        self.assertNotEqual(otra.huella(), tarea.huella())
+        os.remove(primera['rutas'][1])
+        self.assertEqual(renderizar_figuras([tarea], self.directorio, procesos=1)['comparativa']['estado'], 'renderizada')
+
+    def test_pool_y_errores(self):
+        """El pool dibuja en paralelo y un fallo no detiene el resto"""
+        tareas = [
+            TareaFigura('comparativa', COMPARATIVA),
+            TareaFigura('carrington', BARICENTRO, args=('carrington',)),
+            TareaFigura('inexistente', BARICENTRO, args=('no_existe',))
+        ]
+        resultados = renderizar_figuras(tareas, self.directorio, procesos=2)
+
+        self.assertEqual(list(resultados), ['comparativa', 'carrington', 'inexistente'])
+        self.assertEqual(resultados['comparativa']['estado'], 'renderizada')
+        self.assertEqual(resultados['carrington']['estado'], 'renderizada')
+        self.assertEqual(resultados['inexistente']['estado'], 'error')
+        self.assertTrue(os.path.exists(os.path.join(self.directorio, 'carrington.png')))
+
+        # La tarea fallida se reintenta; las demás quedan en caché
+        resultados = renderizar_figuras(tareas, self.directorio, procesos=2)
+        self.assertEqual(resultados['carrington']['estado'], 'cache')
+        self.assertEqual(resultados['inexistente']['estado'], 'error')
+
+    def test_dependencias_importadas(self):
+        """La huella cubre los módulos que importó el dibujo y el modelo FTRT"""
+        tareas = [TareaFigura('comparativa', COMPARATIVA), TareaFigura('carrington', BARICENTRO, args=('carrington',))]
+        renderizar_figuras(tareas, self.directorio, procesos=2)
+        with open(os.path.join(self.directorio, 'huellas.json'), encoding='utf-8') as f:
+            indice = json.load(f)
+        self.assertIn('config.global_variables', indice['comparativa']['modulos'])
+        self.assertEqual(indice['comparativa']['huella'], tareas[0].huella(indice['comparativa']['modulos']))
+
+        # Con ftrt_core entre las dependencias, otro modelo invalida la figura
+        tarea = tareas[0]
+        with mock.patch('ftrt_core.FTRTCalculator.huella_modelo', return_value='2.1.0-otro'):
+            otra = tarea.huella(['ftrt_core'])
+        self.assertNotEqual(otra, tarea.huella(['ftrt_core']))
+        self.assertEqual(tarea.huella(['no_existe']), tarea.huella(['no_existe']))
+        self.assertNotEqual(tarea.huella(['no_existe']), tarea.huella())
+
+    def test_validacion(self):
+        with self.assertRaises(ValueError):
+            TareaFigura('x', COMPARATIVA, formatos=('jpg',))
+        with self.assertRaises(ValueError):
+            renderizar_figuras([TareaFigura('x', COMPARATIVA), TareaFigura('x', COMPARATIVA)], self.directorio)
+
+if __name__ == '__main__':
+    unittest.main()
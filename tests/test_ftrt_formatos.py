@@ -0,0 +1,45 @@
+"""
+Tests de la negociación de contenido y los formatos binarios de series FTRT
+"""
+
+import unittest
+import numpy as np
+from ftrt_core import FTRTCalculator
+from ftrt_formatos import (
+    MEDIA_JSON, MEDIA_PACKED, negociar_formato, serializar_rango, leer_packed
+)
+
+class TestFormatosSeries(unittest.TestCase):
+    
+    def setUp(self):
+        self.calculator = FTRTCalculator()
+        inicio = np.datetime64('2026-01-01T00:00:00', 's')
+        self.rango = self.calculator.calcular_ftrt_rango(
+            inicio + np.arange(0, 3 * 365 * 24, 6).astype('timedelta64[h]')
+        )
+    
+    def test_negociacion(self):
+        """Accept vacío o genérico da JSON; q y precision se respetan"""
+        self.assertEqual(negociar_formato(None), (MEDIA_JSON, 64))
+        self.assertEqual(negociar_formato('*/*'), (MEDIA_JSON, 64))
+        self.assertEqual(
+            negociar_formato('application/json;q=0.5, application/vnd.ftrt.packed;precision=32'),
+            (MEDIA_PACKED, 32)
+        )
+        self.assertIsNone(negociar_formato('text/html'))
+    
+    def test_packed_ida_y_vuelta(self):
+        """La serie empaquetada se decodifica sin pérdida de fechas ni niveles"""
+        cuerpo, cabeceras = serializar_rango(self.rango, MEDIA_PACKED, precision=32)
+        columnas = leer_packed(cuerpo, cabeceras)
+        
+        np.testing.assert_array_equal(columnas['fechas'], self.rango['fechas'])
+        np.testing.assert_array_equal(columnas['nivel'], self.rango['nivel'])
+        np.testing.assert_allclose(columnas['ftrt'], self.rango['ftrt_normalizada'], rtol=1e-6)
+        
+        # float32 y eje de tiempo entero: mucho menor que el JSON equivalente
+        n = len(self.rango['fechas'])
+        self.assertEqual(len(cuerpo), n * (4 + 4 + 1 + 4 * len(self.rango['contribuciones'])))
+
+if __name__ == '__main__':
+    unittest.main()
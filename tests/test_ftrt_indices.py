@@ -0,0 +1,103 @@
+"""
+Tests del almacén de índices geomagnéticos
+"""
+
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import numpy as np
+from ftrt_indices import AlmacenIndices, codificar_delta, decodificar_delta, deszigzag, zigzag
+
+class TestIndices(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.almacen = AlmacenIndices(self.directorio)
+
+        # Dos años horarios con una tormenta en mayo de 2024
+        self.tiempos = np.arange('2023-01-01T00', '2025-01-01T00', dtype='datetime64[h]').astype('datetime64[s]')
+        horas = np.arange(len(self.tiempos))
+        self.dst = np.round(-15 + 10 * np.sin(horas / 50.0))
+        tormenta = (self.tiempos >= np.datetime64('2024-05-10T18:00')) & (self.tiempos < np.datetime64('2024-05-12'))
+        self.dst[tormenta] = -412
+        self.kp = np.round(3 * (2 + np.cos(horas / 30.0))) / 3
+        self.kp[100:110] = np.nan
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def test_codificacion_delta_zigzag(self):
+        valores = np.array([0, -1, 1, -2, 2, np.iinfo(np.int64).max // 4], dtype=np.int64)
+        np.testing.assert_array_equal(zigzag(valores[:5]), [0, 1, 2, 3, 4])
+        np.testing.assert_array_equal(deszigzag(zigzag(valores)), valores)
+
+        base, deltas = codificar_delta([3600 * h for h in range(1000)])
+        self.assertEqual(deltas.dtype, np.uint16)
+        np.testing.assert_array_equal(decodificar_delta(base, deltas, 1000), np.arange(1000) * 3600)
+
+    def test_ida_y_vuelta(self):
+        """Valores, huecos y Kp en tercios se recuperan exactos"""
+        self.assertEqual(self.almacen.agregar(self.tiempos, dst_index=self.dst, kp_index=self.kp), 2)
+
+        serie = AlmacenIndices(self.directorio).leer()
+        np.testing.assert_array_equal(serie['tiempo'], self.tiempos)
+        np.testing.assert_array_equal(serie['dst_index'], self.dst)
+        np.testing.assert_allclose(serie['kp_index'], self.kp)
+        self.assertTrue(np.isnan(serie['ae_index']).all())
+
+        resumen = self.almacen.resumen()
+        self.assertEqual((resumen['filas'], resumen['bloques']), (len(self.tiempos), 2))
+        self.assertLess(resumen['bytes'], len(self.tiempos) * 2)
+
+    def test_filtro_salta_bloques(self):
+        self.almacen.agregar(self.tiempos, dst_index=self.dst)
+
+        resultado = self.almacen.filtrar('dst_index', '<', -100)
+        self.assertEqual(len(resultado['tiempo']), 30)
+        self.assertTrue((resultado['valores'] == -412).all())
+        self.assertEqual(self.almacen.ultima_consulta, {'bloques_leidos': 1, 'bloques_saltados': 1})
+
+        self.assertEqual(len(self.almacen.filtrar('dst_index', '<', -100, fin='2024-05-11')['tiempo']), 6)
+        with self.assertRaises(ValueError):
+            self.almacen.filtrar('dst_index', '!=', 0)
+
+    def test_correccion_y_fusion(self):
+        """Un valor nuevo sustituye al guardado; NaN no borra; otra columna se fusiona"""
+        self.almacen.agregar(self.tiempos[:48], dst_index=self.dst[:48])
+        self.almacen.agregar(self.tiempos[[5, 5, 6]], dst_index=[-50, -60, np.nan], ae_index=[800, 900, 700])
+
+        serie = self.almacen.leer(self.tiempos[4], self.tiempos[8])
+        np.testing.assert_array_equal(serie['dst_index'], [self.dst[4], -60, self.dst[6], self.dst[7]])
+        np.testing.assert_array_equal(serie['ae_index'], [np.nan, 900, 700, np.nan])
+
+    def test_importacion(self):
+        csv = io.StringIO('time,dst_index,kp_index\n2024-05-11T01:00:00,-300,8.667\n2024-05-11T02:00:00,-400,9\n')
+        self.assertEqual(self.almacen.importar_archivo(csv, formato='csv'), 2)
+        np.testing.assert_allclose(self.almacen.leer()['kp_index'], [26 / 3, 9])
+
+        db = os.path.join(self.directorio, 'historico.db')
+        with sqlite3.connect(db) as conn:
+            conn.execute('CREATE TABLE geomagnetic_indices (time TEXT PRIMARY KEY, dst_index REAL, kp_index REAL, ae_index REAL)')
+            conn.execute("INSERT INTO geomagnetic_indices VALUES ('2024-05-11T02:00:00', -412, NULL, 1500)")
+        conn.close()
+        self.assertEqual(self.almacen.importar_sqlite(db), 1)
+        serie = self.almacen.leer()
+        np.testing.assert_array_equal(serie['dst_index'], [-300, -412])
+        np.testing.assert_array_equal(serie['ae_index'], [np.nan, 1500])
+
+    def test_validacion_con_indices_continuos(self):
+        from validation_suite import FTRTValidationSuite
+        suite = FTRTValidationSuite(os.path.join(self.directorio, 'historico.db'))
+        self.assertIsNone(suite.validate_continuous_indices(store=self.almacen))
+
+        self.almacen.agregar(self.tiempos, dst_index=self.dst)
+        resultado = suite.validate_continuous_indices('2024-01-01', '2025-01-01', store=self.almacen)
+        self.assertEqual((resultado['days'], resultado['storm_days'], resultado['storm_hours']), (366, 2, 30))
+        self.assertIn('continuous_indices', suite.validation_results)
+        self.assertEqual(resultado['model'], 'prediction_engine.FTRTCalculator')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+Tests de la ingesta incremental de catálogos
+"""
+
+import functools
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from ftrt_ingesta import FuenteCatalogo, SincronizadorDatos
+
+CABECERA = 'event_date,event_type,magnitude,flare_class,region_number,sources,verified\n'
+
+class TestIngesta(unittest.TestCase):
+
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.db = os.path.join(self.directorio, 'historico.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    def _escribir(self, nombre, texto, modo='w'):
+        ruta = os.path.join(self.directorio, nombre)
+        with open(ruta, modo, encoding='utf-8') as f:
+            f.write(texto)
+        return ruta
+
+    def _contar(self, tabla):
+        with sqlite3.connect(self.db) as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM {tabla}').fetchone()[0]
+
+    def test_csv_incremental(self):
+        """Solo se leen las líneas añadidas; una reescritura no duplica"""
+        ruta = self._escribir('flares.csv', CABECERA +
+                              '2024-05-10,Flare,8.9,X8.7,3664,GOES,True\n'
+                              '2024-05-11,Flare,7.0,X5.8,3664,GOES,True\n')
+        sincronizador = SincronizadorDatos(self.db, [FuenteCatalogo('flares', ruta, 'fulguraciones')])
+
+        resultado = sincronizador.sincronizar_datos_solares()['flares']
+        self.assertEqual((resultado['leidos'], resultado['nuevos']), (2, 2))
+        self.assertEqual(resultado['marca'], '2024-05-11')
+
+        # Añadido (incluso anterior a la marca) y una línea inválida
+        self._escribir('flares.csv', '2024-05-14,Flare,8.0,X8.7,3664,GOES,True\n'
+                                     'no-es-fecha,Flare,1,C1,,x,False\n'
+                                     '2003-10-28,Flare,9.5,X17,10486,GOES,True\n', 'a')
+        resultado = sincronizador.sincronizar_datos_solares()['flares']
+        self.assertEqual((resultado['leidos'], resultado['nuevos'], resultado['rechazados']), (3, 2, 1))
+        self.assertEqual(resultado['marca'], '2024-05-14')
+        self.assertEqual(sincronizador.sincronizar_datos_solares()['flares']['leidos'], 0)
+
+        # Archivo reescrito: se relee entero y la clave evita duplicados
+        with open(ruta, encoding='utf-8') as f:
+            lineas = f.readlines()
+        self._escribir('flares.csv', ''.join([lineas[0]] + lineas[:0:-1]))
+        resultado = sincronizador.sincronizar_datos_solares()['flares']
+        self.assertEqual((resultado['leidos'], resultado['nuevos']), (5, 0))
+        self.assertEqual(self._contar('solar_events'), 4)
+        self.assertEqual(sincronizador.estado()['flares']['registros'], 4)
+
+    def test_reescritura_tras_los_primeros_bytes(self):
+        """Una reescritura que conserva el principio del archivo también se detecta"""
+        lineas = [f'2020-01-{d:02d},Flare,1.0,C1,{r},GOES,True\n' for d in range(1, 29) for r in range(10)]
+        ruta = self._escribir('flares.csv', CABECERA + ''.join(lineas))
+        sincronizador = SincronizadorDatos(self.db, [FuenteCatalogo('flares', ruta, 'fulguraciones')])
+        self.assertEqual(sincronizador.sincronizar_datos_solares()['flares']['nuevos'], len(lineas))
+
+        # Mismo tamaño y mismos primeros 4 KB; cambia la magnitud al final
+        self._escribir('flares.csv', CABECERA + ''.join(lineas[:-1]) + lineas[-1].replace('1.0', '2.0'))
+        resultado = sincronizador.sincronizar_datos_solares()['flares']
+        self.assertEqual((resultado['leidos'], resultado['nuevos']), (len(lineas), 0))
+
+    def test_registros_mal_formados(self):
+        """Un registro NDJSON que no es objeto se descarta; un CSV ilegible no detiene al resto"""
+        ndjson = self._escribir('flares.ndjson', '[1, 2]\n42\n'
+                                '{"event_date": "2024-05-10", "event_type": "Flare", "flare_class": "X8.7"}\n')
+        csv_roto = self._escribir('roto.csv', CABECERA + '2024-05-10,Flare,' + 'x' * 200000 + '\n')
+        sincronizador = SincronizadorDatos(self.db, [FuenteCatalogo('roto', csv_roto, 'fulguraciones'),
+                                                     FuenteCatalogo('flares', ndjson, 'fulguraciones')])
+
+        resultados = sincronizador.sincronizar_datos_solares()
+        self.assertIn('error', resultados['roto'])
+        self.assertEqual((resultados['flares']['nuevos'], resultados['flares']['rechazados']), (1, 2))
+
+    def test_linea_a_medio_escribir(self):
+        """Una última línea sin salto no se inserta hasta que se completa"""
+        ruta = self._escribir('flares.csv', CABECERA + '2024-05-10,Flare,8.9,X8.7,3664,GOES,True\n'
+                                                       '2024-05-11,Flare,7')
+        sincronizador = SincronizadorDatos(self.db, [FuenteCatalogo('flares', ruta, 'fulguraciones')])
+        resultado = sincronizador.sincronizar_datos_solares()['flares']
+        self.assertEqual((resultado['leidos'], resultado['nuevos']), (1, 1))
+
+        self._escribir('flares.csv', '.5,X5.8,3664,GOES,True\n', 'a')
+        resultado = sincronizador.sincronizar_datos_solares()['flares']
+        self.assertEqual((resultado['leidos'], resultado['nuevos']), (1, 1))
+        with sqlite3.connect(self.db) as conn:
+            fila = conn.execute("SELECT magnitude, sources, verified FROM solar_events "
+                                "WHERE event_date LIKE '2024-05-11%'").fetchone()
+        self.assertEqual(fila, (7.5, 'GOES', 1))
+
+    def test_indices_se_fusionan(self):
+        """Dst y Kp de fuentes distintas se combinan; el valor definitivo sustituye al provisional"""
+        dst = self._escribir('dst.ndjson', '\n'.join(json.dumps(r) for r in [
+            {'time': '2024-05-11T02:00:00Z', 'dst_index': -400},
+            {'time': '2024-05-11T03:00:00Z', 'dst_index': -412}
+        ]) + '\n')
+        kp = self._escribir('kp.csv', 'fecha,kp\n2024-05-11T03:00:00,9\n')
+        fuentes = [FuenteCatalogo('dst', dst, 'indices'),
+                   FuenteCatalogo('kp', kp, 'indices', alias={'fecha': 'time', 'kp': 'kp_index'})]
+        sincronizador = SincronizadorDatos(self.db, fuentes)
+        sincronizador.sincronizar_datos_solares()
+
+        self._escribir('dst.ndjson', json.dumps({'time': '2024-05-11T03:00:00Z', 'dst_index': -415}) + '\n', 'a')
+        self.assertEqual(sincronizador.sincronizar_datos_solares()['dst']['nuevos'], 1)
+
+        with sqlite3.connect(self.db) as conn:
+            filas = conn.execute('SELECT time, dst_index, kp_index FROM geomagnetic_indices ORDER BY time').fetchall()
+        self.assertEqual(filas, [('2024-05-11T02:00:00', -400.0, None), ('2024-05-11T03:00:00', -415.0, 9.0)])
+
+    def test_fuente_http(self):
+        """Un servidor HTTP local hace de catálogo remoto"""
+        self._escribir('cmes.ndjson', '\n'.join(json.dumps(r) for r in [
+            {'event_time': '2024-05-09T18:00:00', 'cme_speed': 1500, 'position_angle': 270},
+            {'event_time': '2024-05-10T07:00:00', 'cme_speed': 2000, 'halo': True}
+        ]) + '\n')
+        servidor = HTTPServer(('127.0.0.1', 0), functools.partial(
+            SimpleHTTPRequestHandler, directory=self.directorio))
+        servidor.RequestHandlerClass.log_message = lambda *args: None
+        hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+        hilo.start()
+        try:
+            url = f'http://127.0.0.1:{servidor.server_port}/cmes.ndjson'
+            sincronizador = SincronizadorDatos(self.db, [FuenteCatalogo('cmes', url, 'cme', parametro_desde='desde')])
+            self.assertEqual(sincronizador.sincronizar_datos_solares()['cmes']['nuevos'], 2)
+
+            # El servidor ignora 'desde': se descarta lo anterior a la marca
+            resultado = sincronizador.sincronizar_datos_solares()['cmes']
+            self.assertEqual((resultado['leidos'], resultado['nuevos']), (2, 0))
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+        self.assertEqual(self._contar('cme_events'), 2)
+
+    def test_posiciones_planetarias_incrementales(self):
+        sincronizador = SincronizadorDatos(self.db, [])
+        self.assertEqual(sincronizador.sincronizar_posiciones_planetarias('2024-01-31', desde='2024-01-01')['nuevos'], 31)
+        resultado = sincronizador.sincronizar_posiciones_planetarias('2024-02-02', desde='2024-01-01')
+        self.assertEqual(resultado, {'nuevos': 2, 'marca': '2024-02-02'})
+        self.assertEqual(self._contar('planetary_configurations'), 33)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests del modelo FTRT multidimensional por lotes
+"""
+
+import unittest
+import numpy as np
+from ftrt_core import (FTRTMultidimensional, AgujeroCoronalFTRT, obtener_calculador_compartido, ftmt_rapido,
+                      MAX_CACHE_FTRT_BASE)
+from ftrt_coronal_integrado import FTRTCoronalIntegrado
+
+class TestFTRTMultidimensionalLote(unittest.TestCase):
+    
+    def setUp(self):
+        self.modelo = FTRTMultidimensional()
+    
+    def test_comparte_calculador(self):
+        """Todas las instancias usan el calculador compartido"""
+        self.assertIs(self.modelo.calculador, obtener_calculador_compartido())
+        self.assertIs(FTRTMultidimensional().calculador, self.modelo.calculador)
+    
+    def test_cache_ftrt_base_acotada(self):
+        """La caché de FTRT base es LRU con tamaño máximo"""
+        self.modelo.calcular_ftrt_multidimensional('2003-10-29')
+        self.modelo.calcular_ftrt_multidimensional('2003-10-29')
+        info = self.modelo._lote_dia.cache_info()
+        self.assertEqual((info.hits, info.currsize), (1, 1))
+        self.assertEqual(info.maxsize, MAX_CACHE_FTRT_BASE)
+    
+    def test_forma_y_coherencia(self):
+        """El lote devuelve (fechas × planetas) y coincide con la alineación escalar"""
+        fechas = ['2025-01-15', '2025-06-30', '2025-10-25']
+        lote = self.modelo.calcular_ftrt_multidimensional_lote(fechas)
+        
+        self.assertEqual(lote['ftrt_multidimensional'].shape, (3, 4))
+        for i, fecha in enumerate(fechas):
+            for j, planeta in enumerate(lote['planetas']):
+                escalar = self.modelo.calcular_alineacion_directa(planeta, fecha)
+                self.assertAlmostEqual(lote['alineacion'][i, j], escalar['alineacion'])
+        np.testing.assert_allclose(
+            lote['ftrt_multidimensional'],
+            lote['ftrt_base'][:, np.newaxis] * lote['factor_alineacion']
+        )
+    
+    def test_ftmt_rapido_con_texto(self):
+        """ftmt_rapido acepta fechas en texto"""
+        resultado = ftmt_rapido('2003-10-29', 'JUPITER')
+        self.assertAlmostEqual(resultado['ftrt_base'], 4.87, places=2)
+        self.assertGreater(resultado['factor_alineacion'], 1.0)
+    
+    def test_escalar_igual_a_lote(self):
+        """El cálculo escalar usa el mismo motor que el lote"""
+        fecha = '2025-06-30T06:00:00'
+        lote = self.modelo.calcular_ftrt_multidimensional_lote([fecha])
+        for j, planeta in enumerate(lote['planetas']):
+            escalar = self.modelo.calcular_ftrt_multidimensional(fecha, planeta)
+            self.assertAlmostEqual(escalar['ftrt_base'], lote['ftrt_base'][0])
+            self.assertAlmostEqual(escalar['ftrt_multidimensional'], lote['ftrt_multidimensional'][0, j])
+
+class TestAgujerosCoronalesLote(unittest.TestCase):
+    
+    def test_lote_igual_a_escalar(self):
+        """calcular_probabilidad_lote reproduce calcular_probabilidad"""
+        agujeros = AgujeroCoronalFTRT()
+        fechas = ['2026-01-01', '2026-04-15', '2026-08-30']
+        lote = agujeros.calcular_probabilidad_lote(fechas)
+        
+        for i, fecha in enumerate(fechas):
+            for j, planeta in enumerate(lote['planetas']):
+                escalar = agujeros.calcular_probabilidad(fecha, planeta)
+                self.assertAlmostEqual(lote['probabilidad'][i, j], escalar['probabilidad'])
+                self.assertEqual(agujeros.NIVELES_RIESGO[lote['riesgo'][i, j]], escalar['riesgo'])
+    
+    def test_exportacion_anual(self):
+        """Un año × todos los planetas en formato largo"""
+        modelo = FTRTCoronalIntegrado()
+        fechas = np.arange(np.datetime64('2026-01-01'), np.datetime64('2027-01-01'))
+        df = modelo.exportar_lote(fechas)
+        
+        self.assertEqual(len(df), 365 * 4)
+        self.assertTrue(set(df['riesgo']) <= set(modelo.NIVELES_RIESGO))
+    
+    def test_probabilidad_acotada(self):
+        """Con FTRT extremo (Halloween 2003) la probabilidad no pasa de 1"""
+        df = FTRTCoronalIntegrado().exportar_lote(['2003-10-29'])
+        self.assertTrue(((df['probabilidad'] >= 0) & (df['probabilidad'] <= 1)).all())
+        self.assertEqual(df['probabilidad'].max(), 1.0)
+    
+    def test_coronal_escalar_igual_a_lote(self):
+        """La predicción escalar es el lote con una fecha"""
+        modelo = FTRTCoronalIntegrado()
+        df = modelo.exportar_lote(['2026-03-20'], ['SATURNO'])
+        escalar = modelo.predecir_agujeros_coronales('2026-03-20', 'SATURNO')
+        
+        self.assertAlmostEqual(escalar['probabilidad_agujero_coronal'], df['probabilidad'][0])
+        self.assertAlmostEqual(escalar['ftrt_multidimensional'], df['ftrt_multidimensional'][0])
+        self.assertEqual(escalar['nivel_riesgo_coronal'], df['riesgo'][0])
+        self.assertEqual(escalar['tipo_agujero_esperado'], df['tipo_agujero'][0])
+        self.assertEqual(escalar['impacto_geoestimado'], df['impacto'][0])
+
+if __name__ == '__main__':
+    unittest.main()
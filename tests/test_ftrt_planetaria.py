@@ -0,0 +1,95 @@
+"""
+Tests de la búsqueda de eventos planetarios por efemérides
+"""
+
+import unittest
+from datetime import datetime
+from ftrt_planetaria import PlanetaryEventSearch, MajorPlanetaryCycles, ResonanceAnalyzer, build_resonance_index
+
+class TestPlanetaryEventSearch(unittest.TestCase):
+    
+    def setUp(self):
+        self.search = PlanetaryEventSearch(workers=1)
+    
+    def test_gran_conjuncion_2020(self):
+        """La conjunción heliocéntrica Júpiter-Saturno de 2020 cae a principios de noviembre"""
+        eventos = self.search.find_conjunctions('jupiter', 'saturn', 2019, 2021,
+                                                include_oppositions=False)
+        self.assertEqual(len(eventos), 1)
+        self.assertLess(abs((eventos[0]['date'] - datetime(2020, 11, 2)).days), 3)
+        self.assertGreater(eventos[0]['ftrt'], 0)
+    
+    def test_conjunciones_y_oposiciones_alternan(self):
+        """Conjunciones y oposiciones se suceden cada ~10 años"""
+        eventos = self.search.find_conjunctions('jupiter', 'saturn', 1800, 2000)
+        tipos = [e['type'] for e in eventos]
+        for actual, siguiente in zip(tipos, tipos[1:]):
+            self.assertNotEqual(actual, siguiente)
+    
+    def test_paralelo_igual_a_secuencial(self):
+        """Repartir la malla entre procesos no cambia los resultados"""
+        secuencial = self.search.find_alignments(tolerance_deg=60, start_year=1600, end_year=1700)
+        paralelo = PlanetaryEventSearch(workers=2).find_alignments(
+            tolerance_deg=60, start_year=1600, end_year=1700)
+        self.assertEqual([e['date'] for e in secuencial], [e['date'] for e in paralelo])
+        for evento in secuencial:
+            self.assertLessEqual(evento['spread'], 60)
+            self.assertLessEqual(evento['start'], evento['date'])
+            self.assertLessEqual(evento['date'], evento['end'])
+    
+    def test_conjunciones_mayores(self):
+        """calculate_jupiter_saturn_conjunctions usa fechas reales (~19.86 años)"""
+        conjunciones = MajorPlanetaryCycles().calculate_jupiter_saturn_conjunctions(
+            1900, 2100, search=self.search)
+        self.assertEqual(len(conjunciones), 11)
+        self.assertIn('constellation', conjunciones[0])
+        self.assertIn(conjunciones[0]['type'], ['Standard Conjunction', 'Great Mutation'])
+    
+    def test_perihelio_de_jupiter(self):
+        """Júpiter pasó por el perihelio en enero de 2023 (a ~4.95 UA)"""
+        perihelios = self.search.find_perihelia('jupiter', 2020, 2025)
+        self.assertEqual(len(perihelios), 1)
+        self.assertLess(abs((perihelios[0]['date'] - datetime(2023, 1, 21)).days), 10)
+        self.assertAlmostEqual(perihelios[0]['distance'], 4.95, places=2)
+    
+    def test_convergencias_sin_aritmetica_de_calendario(self):
+        """Los ciclos activos salen de eventos reales, no de year % N"""
+        convergencias = MajorPlanetaryCycles().identify_cycle_convergences(
+            1600, 2100, search=self.search)
+        self.assertFalse(convergencias.empty)
+        ciclos = {c for activos in convergencias['active_cycles'] for c in activos}
+        self.assertNotIn('400-year Cycle', ciclos)
+        self.assertNotIn('800-year Cycle', ciclos)
+        self.assertNotIn(2000, set(convergencias['year']))
+
+class TestResonanceAnalyzer(unittest.TestCase):
+    
+    def setUp(self):
+        self.analyzer = ResonanceAnalyzer()
+    
+    def test_periodos_calculados(self):
+        """Los periodos salen de las efemérides, no de constantes"""
+        self.assertAlmostEqual(self.analyzer.fundamental_periods['jupiter'], 11.86, places=2)
+        self.assertAlmostEqual(self.analyzer.fundamental_periods['jupiter_saturn_synodic'], 19.86, places=1)
+    
+    def test_venus_tierra_jupiter(self):
+        """La resonancia 3V-5T+2J (~22 años) aparece entre las de 3 cuerpos < 50 años"""
+        resonancias = self.analyzer.index.query(n_bodies=3, max_period=50)
+        self.assertTrue((resonancias['period'] <= 50).all())
+        vej = resonancias[resonancias['bodies'] == frozenset({'venus', 'earth', 'jupiter'})]
+        self.assertTrue(any(abs(p - 22.1) < 0.2 for p in vej['period']))
+    
+    def test_gran_desigualdad(self):
+        """Júpiter-Saturno 2:5 con periodo de ~900 años"""
+        pares = self.analyzer.index.query(bodies=('jupiter', 'saturn'))
+        coeficientes = [sorted(map(abs, c.values())) for c in pares['coefficients']]
+        self.assertIn([2, 5], coeficientes)
+    
+    def test_indice_con_lista_de_cuerpos(self):
+        """'bodies' como lista (no hashable) usa la misma caché que la tupla"""
+        indice = build_resonance_index(['jupiter', 'saturn'], max_order=7, max_bodies=2)
+        self.assertIs(build_resonance_index(('jupiter', 'saturn'), max_order=7, max_bodies=2), indice)
+        self.assertEqual(set(indice.periods), {'jupiter', 'saturn', 'solar'})
+
+if __name__ == '__main__':
+    unittest.main()
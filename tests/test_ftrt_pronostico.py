@@ -0,0 +1,46 @@
+"""
+Tests de la ventana de pronóstico FTRT precalculada
+"""
+
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+from ftrt_core import FTRTCalculator
+from ftrt_pronostico import VentanaPronostico
+
+class TestVentanaPronostico(unittest.TestCase):
+    
+    def setUp(self):
+        self.calculator = FTRTCalculator()
+        self.ventana = VentanaPronostico(self.calculator, horizonte_dias=60)
+        self.ahora = datetime(2026, 3, 10, 15, 42)
+        self.ventana.recalcular(self.ahora)
+    
+    def test_rebanada_coincide_con_calculo_directo(self):
+        """Las rebanadas diarias reproducen calcular_ftrt_rango"""
+        inicio = datetime(2026, 3, 12, 6)
+        rebanada = self.ventana.rebanada(inicio, 30)
+        directo = self.calculator.calcular_ftrt_rango(
+            [inicio + timedelta(days=i) for i in range(30)]
+        )
+        
+        np.testing.assert_array_equal(rebanada['fechas'], directo['fechas'])
+        np.testing.assert_allclose(rebanada['ftrt_normalizada'], directo['ftrt_normalizada'])
+        np.testing.assert_array_equal(rebanada['nivel'], directo['nivel'])
+    
+    def test_fuera_de_ventana_y_obsolescencia(self):
+        """Consultas no cubiertas devuelven None; el cambio de día se detecta"""
+        self.assertIsNone(self.ventana.rebanada(datetime(2026, 3, 9), 5))
+        self.assertIsNone(self.ventana.rebanada(datetime(2026, 4, 30), 30))
+        self.assertIsNone(self.ventana.rebanada(datetime(2026, 3, 11, 6, 30), 5))
+        
+        self.assertFalse(self.ventana.metricas(self.ahora)['obsoleta'])
+        manana = self.ahora + timedelta(days=1)
+        self.assertTrue(self.ventana.metricas(manana)['obsoleta'])
+        
+        self.ventana.asegurar(manana)
+        self.assertEqual(self.ventana.recalculos, 2)
+        self.assertEqual(self.ventana.metricas(manana)['origen'], '2026-03-11T00:00:00')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests del servicio FTRT común a las APIs
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from ftrt_servicio import ServicioFTRT, obtener_servicio
+from ftrt_ejecucion import ejecutar_cpu
+
+def _worker(servicio, cola):
+    servicio.reiniciar_tras_fork()
+    servicio.iniciar()
+    with servicio.admision.admitir('cliente', 'prediccion', 10):
+        rango = servicio.rango([datetime.now().replace(minute=0, second=0, microsecond=0)])
+    cola.put((servicio.pronostico.recalculos, servicio.pronostico.aciertos, len(rango['nivel'])))
+    servicio.detener()
+
+class TestServicioFTRT(unittest.TestCase):
+    
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.servicio = ServicioFTRT(ruta_cache=os.path.join(self.directorio, 'cache.sqlite'))
+    
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+    
+    def test_un_calculo_por_dia(self):
+        """Cálculo, alerta e histórico de un día reutilizan el mismo resultado"""
+        fecha = datetime(2020, 3, 1)
+        calculo = self.servicio.datos_calculo(fecha)
+        alerta = self.servicio.datos_alerta(fecha)
+        resultado = self.servicio.resultado_dia(fecha)
+        
+        metricas = self.servicio.cache.metricas()
+        self.assertEqual((metricas['fallos'], metricas['aciertos']), (1, 2))
+        self.assertEqual(calculo['ftrt_normalizada'], alerta['ftrt_normalizada'])
+        self.assertAlmostEqual(resultado['ftrt_normalizada'], calculo['ftrt_normalizada'], places=3)
+        
+        directa = self.servicio.calculador.generar_alerta(fecha)
+        self.assertEqual(alerta['nivel_riesgo'], directa['nivel_riesgo'])
+    
+    def test_dia_fijo_se_calcula_a_medianoche(self):
+        """La hora no cambia el resultado cacheado del día"""
+        tarde = self.servicio.resultado_dia(datetime(2020, 3, 1, 18, 30))
+        medianoche = self.servicio.resultado_dia(datetime(2020, 3, 1))
+        
+        self.assertEqual(tarde['fecha'], '2020-03-01T00:00:00')
+        self.assertEqual(tarde, medianoche)
+        directo = self.servicio.calculador.calcular_ftrt_total(datetime(2020, 3, 1))
+        self.assertAlmostEqual(tarde['ftrt_normalizada'], directo['ftrt_normalizada'])
+    
+    def test_fecha_no_fija_no_se_cachea(self):
+        """'Ahora' se calcula siempre"""
+        self.servicio.datos_calculo(datetime.now(), fija=False)
+        self.assertEqual(self.servicio.cache.metricas()['entradas'], 0)
+    
+    def test_calentamiento_unico(self):
+        """Calentar dos veces no recalcula la ventana"""
+        self.servicio.calentar()
+        self.servicio.calentar()
+        self.assertEqual(self.servicio.pronostico.recalculos, 1)
+    
+    def test_worker_tras_fork(self):
+        """Un worker reutiliza la ventana precargada y rehace su estado propio"""
+        self.servicio.calentar()
+        contexto = multiprocessing.get_context('fork')
+        cola = contexto.Queue()
+        proceso = contexto.Process(target=_worker, args=(self.servicio, cola))
+        proceso.start()
+        recalculos, aciertos, puntos = cola.get(timeout=30)
+        proceso.join(10)
+        
+        self.assertEqual(proceso.exitcode, 0)
+        self.assertEqual((recalculos, aciertos, puntos), (1, 1, 1))
+        self.assertFalse(self.servicio.pronostico._datos[2]['ftrt_normalizada'].flags.writeable)
+    
+    def test_ejecutar_cpu_sin_gevent(self):
+        """Sin gevent el cálculo se ejecuta en el propio hilo"""
+        self.assertEqual(ejecutar_cpu(sum, [1, 2, 3]), 6)
+        with self.assertRaises(ZeroDivisionError):
+            ejecutar_cpu(lambda: 1 / 0)
+    
+    def test_instancia_compartida(self):
+        """Flask y la API interactiva montan el mismo servicio"""
+        import api
+        import ftrt_api_corregido
+        self.assertIs(api.servicio, obtener_servicio())
+        self.assertIs(ftrt_api_corregido.sistema.servicio, obtener_servicio())
+
+if __name__ == '__main__':
+    unittest.main()
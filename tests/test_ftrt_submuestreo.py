@@ -0,0 +1,59 @@
+"""
+Tests del submuestreo de series y de la capa de datos de los dashboards
+"""
+
+import unittest
+import numpy as np
+from datetime import datetime
+from ftrt_submuestreo import lttb, min_max, submuestrear
+import ftrt_datos_dashboard
+from ftrt_datos_dashboard import FuenteDatosFTRT
+
+class TestSubmuestreo(unittest.TestCase):
+    
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.x = np.arange(100000)
+        self.y = np.sin(self.x / 5000) + rng.normal(0, 0.05, len(self.x))
+        self.y[31415] = 10.0  # pico aislado
+    
+    def test_lttb(self):
+        """Tamaño exacto, extremos de la serie, orden creciente y pico conservado"""
+        indices = lttb(self.x, self.y, 1000)
+        self.assertEqual(len(indices), 1000)
+        self.assertEqual((indices[0], indices[-1]), (0, len(self.y) - 1))
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(31415, indices)
+    
+    def test_min_max_conserva_extremos(self):
+        """El máximo y el mínimo globales siempre se dibujan"""
+        indices = min_max(self.y, 500)
+        self.assertLessEqual(len(indices), 500)
+        self.assertIn(int(np.argmax(self.y)), indices)
+        self.assertIn(int(np.argmin(self.y)), indices)
+    
+    def test_series_cortas_y_fechas(self):
+        """Series cortas se devuelven completas; x puede ser datetime64"""
+        np.testing.assert_array_equal(lttb(self.x[:10], self.y[:10], 100), np.arange(10))
+        fechas = np.datetime64('1900-01-01', 's') + self.x * np.timedelta64(3600, 's')
+        self.assertEqual(len(submuestrear(fechas, self.y, 300)), 300)
+        with self.assertRaises(ValueError):
+            submuestrear(self.x, self.y, 300, metodo='media')
+
+class TestFuenteDatos(unittest.TestCase):
+    
+    def test_serie_submuestreada(self):
+        """Dos siglos diarios se entregan al ancho de la gráfica con el máximo real"""
+        fuente = FuenteDatosFTRT()
+        serie = fuente.serie(datetime(1900, 1, 1), datetime(2100, 1, 1), max_puntos=1500)
+        self.assertEqual(len(serie['ftrt']), 1500)
+        self.assertGreater(serie['total'], 73000)
+        
+        # El rerun con los mismos argumentos no recalcula; min_max conserva el pico
+        serie = fuente.serie(datetime(1900, 1, 1), datetime(2100, 1, 1), max_puntos=800, metodo='min_max')
+        self.assertAlmostEqual(serie['ftrt_max'], float(serie['ftrt'].max()))
+        if not ftrt_datos_dashboard.STREAMLIT_DISPONIBLE:
+            self.assertGreaterEqual(ftrt_datos_dashboard._serie_motor.cache_info().hits, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests de la generación incremental de teselas anuales FTRT
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from ftrt_core import FTRTCalculator
+from ftrt_teselas import clave_año, generar_teselas, leer_indice, leer_tesela, ruta_estatica
+
+class TestTeselasFTRT(unittest.TestCase):
+    
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.calculator = FTRTCalculator()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directorio)
+    
+    def test_contenido_coincide_con_rango(self):
+        """Cada tesela contiene la FTRT diaria del año completo"""
+        generar_teselas([2024], self.directorio, self.calculator)
+        tesela = leer_tesela(2024, self.directorio)
+        rango = self.calculator.calcular_ftrt_rango(
+            np.arange(np.datetime64('2024-01-01'), np.datetime64('2025-01-01'))
+        )
+        
+        self.assertEqual(len(tesela['ftrt']), 366)
+        np.testing.assert_allclose(tesela['ftrt'], rango['ftrt_normalizada'], atol=1e-6)
+        self.assertEqual(tesela['nivel'], rango['nivel'].tolist())
+        self.assertEqual(leer_indice(self.directorio)['teselas']['2024']['dias'], 366)
+    
+    def test_regeneracion_incremental(self):
+        """Solo se recalculan los años afectados por un cambio del modelo"""
+        resumen = generar_teselas([2023, 2024], self.directorio, self.calculator)
+        self.assertEqual(resumen['generadas'], [2023, 2024])
+        
+        resumen = generar_teselas([2023, 2024], self.directorio, self.calculator)
+        self.assertEqual(resumen['reutilizadas'], [2023, 2024])
+        
+        # Un dato precalculado nuevo solo invalida su año; la tesela vieja se borra
+        anterior = leer_indice(self.directorio)['teselas']['2023']['archivo']
+        self.calculator.datos_precalculados['2023-06-01'] = 2.0
+        resumen = generar_teselas([2023, 2024], self.directorio, self.calculator)
+        self.assertEqual(resumen['generadas'], [2023])
+        self.assertFalse(os.path.exists(os.path.join(self.directorio, anterior)))
+        
+        # Un cambio de umbrales invalida todos
+        self.calculator.UMBRALES['critico'] = 3.0
+        resumen = generar_teselas([2023, 2024], self.directorio, self.calculator)
+        self.assertEqual(resumen['generadas'], [2023, 2024])
+        
+        # Los años del índice que no se piden tampoco conservan la clave vieja
+        self.calculator.UMBRALES['critico'] = 2.8
+        resumen = generar_teselas([2024], self.directorio, self.calculator)
+        self.assertEqual(resumen['generadas'], [2023, 2024])
+        claves = {año: entrada['clave'] for año, entrada in leer_indice(self.directorio)['teselas'].items()}
+        self.assertEqual(claves, {'2023': clave_año(self.calculator, 2023), '2024': clave_año(self.calculator, 2024)})
+    
+    def test_ruta_estatica(self):
+        """Solo se sirven el índice y teselas existentes, con caché inmutable"""
+        generar_teselas([2024], self.directorio, self.calculator)
+        archivo = leer_indice(self.directorio)['teselas']['2024']['archivo']
+        
+        _, _, cabeceras = ruta_estatica(archivo, self.directorio)
+        self.assertIn('immutable', cabeceras['Cache-Control'])
+        self.assertEqual(ruta_estatica('indice.json', self.directorio)[2]['Cache-Control'], 'no-cache')
+        self.assertIsNone(ruta_estatica('../ftrt_core.py', self.directorio))
+
+if __name__ == '__main__':
+    unittest.main()
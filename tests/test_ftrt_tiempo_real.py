@@ -0,0 +1,66 @@
+"""
+Tests del difusor de alertas FTRT en tiempo real
+"""
+
+import asyncio
+import unittest
+from datetime import datetime
+from ftrt_core import FTRTCalculator
+from ftrt_tiempo_real import DifusorAlertas
+
+class TestDifusorAlertas(unittest.TestCase):
+    
+    def setUp(self):
+        self.difusor = DifusorAlertas(FTRTCalculator(), intervalo=0.01)
+    
+    def test_un_calculo_para_todos_los_suscriptores(self):
+        """Cada ciclo calcula una vez y reparte solo los campos cambiados"""
+        async def escenario():
+            colas = [self.difusor.suscribir() for _ in range(50)]
+            self.difusor.actualizar(datetime(2024, 5, 11))
+            self.difusor.actualizar(datetime(2024, 5, 11))  # sin cambios: no hay delta
+            self.difusor.actualizar(datetime(2003, 10, 29))
+            return [[cola.get_nowait() for _ in range(cola.qsize())] for cola in colas]
+        
+        recibidos = asyncio.run(escenario())
+        
+        self.assertEqual(self.difusor.calculos, 3)
+        for mensajes in recibidos:
+            self.assertEqual([m['secuencia'] for m in mensajes], [1, 2])
+        self.assertEqual(recibidos[0][1]['nivel'], 'EXTREMO')
+        self.assertEqual(recibidos[0][1]['ftrt'], 4.87)
+    
+    def test_cola_llena_resincroniza_con_estado_completo(self):
+        """Un cliente que no consume recibe el estado completo, no deltas sueltos"""
+        async def escenario():
+            cola = self.difusor.suscribir()
+            for i in range(cola.maxsize + 1):
+                self.difusor.publicar({'fecha': f'd{i}', 'ftrt': i, 'nivel': 'BAJO'})
+            return [cola.get_nowait() for _ in range(cola.qsize())]
+        
+        mensajes = asyncio.run(escenario())
+        
+        self.assertEqual(len(mensajes), 1)
+        self.assertEqual(mensajes[0]['tipo'], 'estado')
+        self.assertEqual(mensajes[0]['secuencia'], self.difusor.secuencia)
+        self.assertEqual(mensajes[0]['ftrt'], self.difusor.estado['ftrt'])
+        self.assertEqual(mensajes[0]['nivel'], 'BAJO')
+    
+    def test_estado_inicial_y_ciclo_de_fondo(self):
+        """Un suscriptor tardío recibe el estado completo; el ciclo corre solo"""
+        async def escenario():
+            self.difusor.iniciar()
+            await asyncio.sleep(0.1)
+            cola = self.difusor.suscribir()
+            inicial = cola.get_nowait()
+            await self.difusor.detener()
+            self.difusor.cancelar(cola)
+            return inicial
+        
+        inicial = asyncio.run(escenario())
+        self.assertEqual(inicial['tipo'], 'estado')
+        self.assertIn('ftrt', inicial)
+        self.assertEqual(self.difusor.suscriptores, 0)
+
+if __name__ == '__main__':
+    unittest.main()
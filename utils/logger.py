@@ -12,7 +12,7 @@ import sys
 from datetime import datetime
 import os
 import json
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler, WatchedFileHandler
 
 class FTRTLogger:
     """Logger especializado para el sistema FTRT"""
@@ -79,6 +79,38 @@ class FTRTLogger:
         # 4. Handler para métricas en JSON
         self.metricas_file = os.path.join(self.log_dir, 'metricas.json')
     
+    def reiniciar_tras_fork(self):
+        """
+        Reabre los handlers en un proceso hijo (worker de gunicorn)
+        
+        Los handlers heredados del maestro comparten descriptores y locks
+        creados antes del fork (y antes de que gevent parchee threading).
+        En los workers los archivos se abren de nuevo en modo append con
+        WatchedFileHandler: varios procesos rotando el mismo archivo se
+        pisan, así que la rotación queda para el maestro o para logrotate.
+        """
+        for handler in self.logger.handlers:
+            try:
+                handler.close()
+            except Exception:
+                pass
+        self.logger.handlers = []
+        
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(self._ColorFormatter())
+        self.logger.addHandler(console_handler)
+        
+        file_handler = WatchedFileHandler(os.path.join(self.log_dir, 'ftrt.log'))
+        file_handler.setFormatter(self._crear_formato_archivo())
+        self.logger.addHandler(file_handler)
+        
+        eventos_handler = WatchedFileHandler(os.path.join(self.log_dir, 'eventos_criticos.log'))
+        eventos_handler.setLevel(logging.WARNING)
+        eventos_handler.setFormatter(self._crear_formato_archivo())
+        self.logger.addHandler(eventos_handler)
+        
+        self.logger.info(f"🔁 Logger FTRT reabierto en el proceso {os.getpid()}")
+    
     def _crear_formato_archivo(self):
         """Crea el formato para los archivos de log"""
         return logging.Formatter(
@@ -8,18 +8,47 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from scipy import stats
-import matplotlib.pyplot as plt
-import seaborn as sns
 from historical_database import SolarFTRTDatabase, HISTORICAL_EVENTS, FTRT_HISTORICAL_DATA
 from prediction_engine import FTRTCalculator
 
 class FTRTValidationSuite:
     """Suite completa para validación científica del modelo FTRT"""
     
-    def __init__(self):
-        self.db = SolarFTRTDatabase()
-        self.calculator = FTRTCalculator()
+    def __init__(self, database=None, calculator=None):
+        """
+        Args:
+            database: SolarFTRTDatabase o ruta del archivo SQLite
+                (por defecto solar_ftrt_database.db)
+            calculator: modelo FTRT con el que se validan TODAS las secciones
+                (por defecto prediction_engine.FTRTCalculator)
+        """
+        if database is None or isinstance(database, str):
+            database = SolarFTRTDatabase(database or 'solar_ftrt_database.db')
+        self.db = database
+        self.calculator = calculator if calculator is not None else FTRTCalculator()
         self.validation_results = {}
+
+    def model_name(self):
+        """Identifica el modelo FTRT validado en el reporte"""
+        cls = type(self.calculator)
+        name = f"{cls.__module__}.{cls.__name__}"
+        if hasattr(self.calculator, 'huella_modelo'):
+            name += f" ({self.calculator.huella_modelo()})"
+        return name
+
+    def _daily_ftrt(self, days):
+        """FTRT normalizada de cada día con el modelo de la suite"""
+        if hasattr(self.calculator, 'calcular_ftrt_rango'):
+            # Motor vectorizado: dataset Parquet (solo esta columna y estos
+            # años) si corresponde a su huella, o cálculo directo
+            from ftrt_dataset import leer_ftrt
+            series = leer_ftrt(['ftrt_normalized'], days[0], days[-1], calculador=self.calculator)
+            series_days = series['time'].to_numpy().astype('datetime64[D]')
+            return series['ftrt_normalized'].to_numpy()[np.searchsorted(series_days, days)]
+        return np.array([
+            self.calculator.calcular_ftrt_total(pd.Timestamp(day).to_pydatetime())['ftrt_normalizada']
+            for day in days
+        ], dtype=float)
     
     def validate_historical_correlations(self):
         """Valida correlaciones históricas FTRT vs actividad solar"""
@@ -198,12 +227,68 @@ class FTRTValidationSuite:
         
         self.validation_results['statistical_significance'] = significance_test
         return significance_test
-    
+
+    def validate_continuous_indices(self, start=None, end=None, storm_threshold=-100, store=None):
+        """
+        Valida FTRT diario contra la serie continua de Dst (ftrt_indices.py)
+        en lugar de una docena de eventos puntuales
+
+        Returns:
+            dict con correlaciones y medias de FTRT en días de tormenta y
+            días tranquilos, o None si el almacén no tiene datos de Dst
+        """
+        from ftrt_indices import AlmacenIndices
+
+        print("\n=== VALIDACIÓN CONTRA ÍNDICES CONTINUOS (Dst) ===")
+        print(f"Modelo: {self.model_name()}")
+
+        store = store if store is not None else AlmacenIndices()
+        series = store.leer(start, end, ('dst_index',))
+        valid = ~np.isnan(series['dst_index'])
+        if not valid.any():
+            print("Sin datos de Dst en el almacén de índices")
+            return None
+
+        # Dst mínimo y horas de tormenta por día
+        days = series['tiempo'][valid].astype('datetime64[D]')
+        dst = series['dst_index'][valid]
+        unique_days, first = np.unique(days, return_index=True)
+        daily_min = np.minimum.reduceat(dst, first)
+        storm_hours = np.add.reduceat((dst < storm_threshold).astype(np.int64), first)
+
+        # Mismo modelo que el resto de la suite
+        ftrt = self._daily_ftrt(unique_days)
+
+        r_dst, p_dst = stats.spearmanr(ftrt, -daily_min)
+        storm_days = daily_min < storm_threshold
+        continuous = {
+            'model': self.model_name(),
+            'days': int(len(unique_days)),
+            'storm_days': int(storm_days.sum()),
+            'storm_hours': int(storm_hours.sum()),
+            'ftrt_vs_dst_min': (float(r_dst), float(p_dst)),
+            'ftrt_storm_mean': float(ftrt[storm_days].mean()) if storm_days.any() else None,
+            'ftrt_quiet_mean': float(ftrt[~storm_days].mean()) if (~storm_days).any() else None
+        }
+        if storm_days.any() and (~storm_days).any():
+            continuous['storm_vs_quiet_p'] = float(
+                stats.mannwhitneyu(ftrt[storm_days], ftrt[~storm_days], alternative='greater').pvalue
+            )
+
+        print(f"Días analizados: {continuous['days']} ({str(unique_days[0])} → {str(unique_days[-1])})")
+        print(f"Días con Dst < {storm_threshold} nT: {continuous['storm_days']} "
+              f"({continuous['storm_hours']} horas)")
+        print(f"Spearman FTRT vs -Dst mínimo: r = {r_dst:.3f}, p = {p_dst:.4f}")
+
+        self.validation_results['continuous_indices'] = continuous
+        return continuous
+
     def generate_validation_report(self):
         """Genera reporte completo de validación"""
         
         print("\n" + "="*50)
         print("REPORTE COMPLETO DE VALIDACIÓN FTRT")
+        print(f"Modelo: {self.model_name()}")
         print("="*50)
         
         # Ejecutar todas las validaciones
@@ -211,7 +296,8 @@ class FTRTValidationSuite:
         self.validate_prediction_accuracy()
         self.validate_physical_plausibility()
         self.validate_statistical_significance()
-        
+        self.validate_continuous_indices()
+
         # Resumen ejecutivo
         print("\n" + "="*50)
         print("RESUMEN EJECUTIVO DE VALIDACIÓN")
@@ -271,8 +357,10 @@ class SensitivityAnalysis:
 class FTRTVisualization:
     """Clase para visualización de resultados de validación"""
     
-    def plot_correlation_analysis(self, validation_results):
-        """Genera gráficos de análisis de correlación"""
+    def plot_correlation_analysis(self, validation_results=None):
+        """Genera gráficos de análisis de correlación (devuelve la figura)"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         
         fig, axes = plt.subplots(2, 2, figsize=(12, 10))
         
@@ -327,9 +415,8 @@ class FTRTVisualization:
         sns.heatmap(corr_matrix, annot=True, ax=axes[1,1], cmap='coolwarm', center=0)
         axes[1,1].set_title('Matriz de Correlación')
         
-        plt.tight_layout()
-        plt.savefig('ftrt_validation_analysis.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        fig.tight_layout()
+        return fig
 
 # EJECUCIÓN PRINCIPAL
 if __name__ == "__main__":
@@ -345,8 +432,11 @@ if __name__ == "__main__":
     sensitivity.analyze_parameter_sensitivity()
     
     # Visualización
+    import matplotlib.pyplot as plt
     viz = FTRTVisualization()
-    viz.plot_correlation_analysis(results)
+    fig = viz.plot_correlation_analysis(results)
+    fig.savefig('ftrt_validation_analysis.png', dpi=300, bbox_inches='tight')
+    plt.show()
     
     print("\n" + "="*60)
     print("VALIDACIÓN COMPLETADA")
@@ -11,11 +11,21 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import requests
+import sys
+import os
+
+# Agregar el directorio raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ftrt_datos_dashboard import FuenteDatosFTRT
+from ftrt_submuestreo import METODOS
 
 class FTRTVisualizer:
     def __init__(self):
         self.setup_theme()
         self.load_color_schemes()
+        # Resultados cacheados entre reruns (ver ftrt_datos_dashboard.py)
+        self.datos = FuenteDatosFTRT()
         
     def setup_theme(self):
         """Configura tema visual"""
@@ -148,6 +158,49 @@ class FTRTVisualizer:
             unsafe_allow_html=True
         )
     
+    def plot_serie_ftrt(self, serie):
+        """Serie FTRT de largo plazo, ya submuestreada por la capa de datos"""
+        fig = go.Figure(go.Scattergl(
+            x=serie['fechas'],
+            y=serie['ftrt'],
+            mode='lines',
+            name='FTRT'
+        ))
+        
+        # ftrt_max es None si el rango no tiene puntos
+        maximo = f"{serie['ftrt_max']:.3f}" if serie['ftrt_max'] is not None else "—"
+        fig.update_layout(
+            title=f"Serie FTRT ({len(serie['ftrt'])} de {serie['total']} puntos, máx. {maximo})",
+            yaxis_title="FTRT normalizada",
+            xaxis_title="Fecha"
+        )
+        
+        st.plotly_chart(fig)
+    
+    def plot_agregados(self, agregados):
+        """Máximo y media FTRT por periodo (agregados del servidor)"""
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=agregados['inicio'], y=agregados['ftrt_max'], name='Máximo'))
+        fig.add_trace(go.Scatter(x=agregados['inicio'], y=agregados['ftrt_media'], name='Media'))
+        
+        fig.update_layout(
+            title=f"FTRT por periodo ({agregados['resolucion']}, {agregados['n']} filas)",
+            yaxis_title="FTRT normalizada",
+            xaxis_title="Inicio del periodo"
+        )
+        
+        st.plotly_chart(fig)
+    
+    def display_serie_controls(self):
+        """Controles de la serie de largo plazo en la barra lateral"""
+        st.sidebar.subheader("📈 Serie histórica")
+        años = st.sidebar.slider("Años", 1600, 2400, (1900, 2100))
+        paso_horas = st.sidebar.selectbox("Resolución (horas)", [24, 6, 1])
+        metodo = st.sidebar.selectbox("Submuestreo", METODOS)
+        # Con ambos extremos en el mismo año el rango quedaría vacío: al menos un año
+        fin = max(años[1], años[0] + 1)
+        return datetime(años[0], 1, 1), datetime(fin, 1, 1), paso_horas, metodo
+    
     def display_recommendations(self, recommendations):
         """Muestra recomendaciones de acción"""
         st.subheader("🎯 Recomendaciones")
@@ -192,21 +245,12 @@ class FTRTVisualizer:
             datetime.now()
         )
         
-        # Obtener datos de la API en puerto 1111
-        api_url = "http://localhost:1111/api/ftrt/report"
+        inicio, fin, paso_horas, metodo = self.display_serie_controls()
         
+        # Obtener datos de la API en puerto 1111 (cacheados por fecha y versión del modelo)
         try:
-            response = requests.post(
-                api_url,
-                json={'date': selected_date.strftime('%Y-%m-%d')},
-                timeout=5  # Timeout de 5 segundos
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                st.success("✅ Conectado a API FTRT")
-            else:
-                data = self.display_fallback_data()
+            data = self.datos.informe(selected_date)
+            st.success("✅ Conectado a API FTRT")
                 
         except requests.exceptions.ConnectionError:
             data = self.display_fallback_data()
@@ -229,6 +273,13 @@ class FTRTVisualizer:
                 self.plot_energy_levels(data['energy_levels'])
             self.plot_historical_comparison(data.get('ftrt', data.get('ftrt_total', 0)))
         
+        # Serie de largo plazo del motor local
+        self.plot_serie_ftrt(self.datos.serie(inicio, fin, paso_horas, metodo=metodo))
+        try:
+            self.plot_agregados(self.datos.agregados('auto', inicio, fin))
+        except ValueError as e:
+            st.warning(f"Agregados no disponibles: {e}")
+        
         # Mostrar datos crudos para debug
         with st.expander("🔍 Datos Crudos (Debug)"):
             st.json(data)
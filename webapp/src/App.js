@@ -1,8 +1,46 @@
 import React, { useState, useEffect } from 'react';
 import './App.css';
 
+// API FastAPI (api/main.py); docker-compose la publica en el puerto 6660
+const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:6660';
+
+// Canal SSE del estado actual (api/main.py: /ftrt/stream)
+const STREAM_URL = process.env.REACT_APP_FTRT_STREAM_URL || `${API_URL}/ftrt/stream`;
+
+// Teselas anuales precalculadas (ftrt_teselas.py), servidas como estáticos
+const TESELAS_URL = process.env.REACT_APP_TESELAS_URL || `${API_URL}/teselas`;
+
+async function cargarTesela(año) {
+  const indice = await (await fetch(`${TESELAS_URL}/indice.json`)).json();
+  const entrada = indice.teselas[String(año)];
+  if (!entrada) return null;
+
+  // Archivo gzip inmutable: el navegador lo cachea y lo descomprime aquí
+  const respuesta = await fetch(`${TESELAS_URL}/${entrada.archivo}`);
+  const flujo = respuesta.body.pipeThrough(new DecompressionStream('gzip'));
+  return JSON.parse(await new Response(flujo).text());
+}
+
+function resumirTesela(tesela) {
+  let iMax = 0;
+  tesela.ftrt.forEach((valor, i) => { if (valor > tesela.ftrt[iMax]) iMax = i; });
+  const fechaMax = new Date(`${tesela.inicio}T00:00:00Z`);
+  fechaMax.setUTCDate(fechaMax.getUTCDate() + iMax);
+
+  const diasPorNivel = tesela.niveles.map(() => 0);
+  tesela.nivel.forEach((codigo) => { diasPorNivel[codigo] += 1; });
+
+  return {
+    año: tesela.año,
+    ftrtMax: tesela.ftrt[iMax],
+    fechaMax: fechaMax.toISOString().split('T')[0],
+    diasPorNivel: tesela.niveles.map((nombre, i) => [nombre, diasPorNivel[i]])
+  };
+}
+
 function App() {
   const [ftrtData, setFtrtData] = useState(null);
+  const [resumenAnual, setResumenAnual] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -74,6 +112,30 @@ function App() {
     };
 
     fetchFTRTData();
+
+    cargarTesela(new Date().getUTCFullYear())
+      .then((tesela) => tesela && setResumenAnual(resumirTesela(tesela)))
+      .catch(() => console.log('Teselas FTRT no disponibles'));
+
+    // El servidor empuja el estado inicial y luego solo los cambios
+    const fuente = new EventSource(STREAM_URL);
+    let estado = {};
+    const aplicar = (evento) => {
+      const mensaje = JSON.parse(evento.data);
+      estado = mensaje.tipo === 'estado' ? mensaje : { ...estado, ...mensaje };
+      setFtrtData((previo) => ({
+        ...previo,
+        ftrt: estado.ftrt,
+        alert_level: {
+          level: estado.codigo_nivel >= 4 ? 'extreme' : estado.codigo_nivel >= 3 ? 'critical' : estado.nivel.toLowerCase(),
+          color: estado.color
+        },
+        date: estado.fecha.split('T')[0]
+      }));
+    };
+    fuente.addEventListener('estado', aplicar);
+    fuente.addEventListener('delta', aplicar);
+    return () => fuente.close();
   }, []);
 
   if (loading) {
@@ -155,6 +217,23 @@ function App() {
             ))}
           </div>
 
+          {/* PRONÓSTICO ANUAL (TESELAS) */}
+          {resumenAnual && (
+            <div style={{margin: '30px 0'}}>
+              <h3>📅 PRONÓSTICO {resumenAnual.año}</h3>
+              <div style={{fontSize: '18px', marginBottom: '10px'}}>
+                FTRT máxima: <strong>{resumenAnual.ftrtMax.toFixed(2)}</strong> • {resumenAnual.fechaMax}
+              </div>
+              <div style={{display: 'flex', justifyContent: 'center', gap: '15px', flexWrap: 'wrap'}}>
+                {resumenAnual.diasPorNivel.map(([nivel, dias]) => (
+                  <div key={nivel} style={{fontSize: '14px', opacity: 0.8}}>
+                    {nivel}: {dias} días
+                  </div>
+                ))}
+              </div>
+            </div>
+          )}
+
           {/* EVENTOS HISTÓRICOS */}
           <h3>📊 COMPARACIÓN CON EVENTOS HISTÓRICOS</h3>
           <div className="historical-events">